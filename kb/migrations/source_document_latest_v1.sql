@@ -0,0 +1,23 @@
+-- source_document_latest_v1.sql
+-- Newest source_document row per canonical_url, for the watchers' run-wide
+-- prefetch (workers/kangavisa_workers/db.py get_latest_source_docs).
+-- One row per URL, so a canonical_url=in.(...) batch is bounded by the batch
+-- size however much history a URL accumulates, and never hits max-rows.
+-- Run in Supabase SQL Editor after schema.sql has been applied.
+
+CREATE INDEX IF NOT EXISTS idx_source_document_url_latest
+    ON source_document (canonical_url, retrieved_at DESC);
+
+DROP VIEW IF EXISTS vw_source_document_latest;
+
+CREATE VIEW vw_source_document_latest
+WITH (security_invoker = on) AS
+SELECT DISTINCT ON (canonical_url)
+    canonical_url,
+    source_doc_id,
+    content_hash,
+    retrieved_at,
+    status,
+    metadata_json
+FROM source_document
+ORDER BY canonical_url, retrieved_at DESC;
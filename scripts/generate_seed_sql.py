@@ -9,15 +9,26 @@ Reads all kb/seed/visa_NNN_*.json files and emits a single idempotent
 SQL migration to migrations/seed_kb_v1.sql, ready to paste into the
 Supabase SQL Editor.
 
+Output formats (--format):
+    multirow  one multi-row INSERT ... VALUES (...),(...) ON CONFLICT DO NOTHING
+              per table and subclass (default)
+    rows      one INSERT ... ON CONFLICT DO NOTHING per row
+    copy      psql only: per table, COPY ... FROM STDIN into a temp table,
+              then one INSERT ... SELECT ... ON CONFLICT DO NOTHING
+
+Statements are streamed to the output file as they are generated.  Seed
+files and the visa catalogue come from kangavisa_workers.kb_model, the KB
+model shared with seed_loader and kb_validate.
+
 Usage:
-    python3 scripts/generate_seed_sql.py
+    python3 scripts/generate_seed_sql.py [--format multirow|rows|copy] [--output PATH]
 
 Output:
     migrations/seed_kb_v1.sql
 """
 
+import argparse
 import json
-import os
 import sys
 import uuid
 from pathlib import Path
@@ -27,20 +38,18 @@ from datetime import datetime
 # Paths
 # ---------------------------------------------------------------------------
 REPO_ROOT = Path(__file__).parent.parent
-SEED_DIR  = REPO_ROOT / "kb" / "seed"
 MIGRATIONS_DIR = REPO_ROOT / "migrations"
 OUTPUT_FILE = MIGRATIONS_DIR / "seed_kb_v1.sql"
 
+sys.path.insert(0, str(REPO_ROOT / "workers"))
+from kangavisa_workers import kb_model  # noqa: E402
+
+SEED_DIR = kb_model.SEED_DIR
+
 # ---------------------------------------------------------------------------
 # Visa subclasses to seed (order matters — all references must exist)
 # ---------------------------------------------------------------------------
-VISA_SUBCLASSES = [
-    {"code": "500", "stream": None,  "audience": "B2C", "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/student-500"},
-    {"code": "485", "stream": None,  "audience": "B2C", "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/temporary-graduate-485"},
-    {"code": "482", "stream": None,  "audience": "Both","url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/temporary-skill-shortage-482"},
-    {"code": "417", "stream": None,  "audience": "B2C", "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/work-holiday-417"},
-    {"code": "820", "stream": None,  "audience": "B2C", "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/partner-onshore-820-801"},
-]
+VISA_SUBCLASSES = kb_model.VISA_SUBCLASSES
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -65,154 +74,188 @@ def deterministic_uuid(namespace: str, name: str) -> str:
     ns = uuid.UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8")  # UUID namespace URL
     return str(uuid.uuid5(ns, f"{namespace}:{name}"))
 
-def load_json(path: Path):
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
 
 # ---------------------------------------------------------------------------
-# SQL generators
+# Table layouts: (column, cast) in INSERT order, and the ON CONFLICT target
+# ---------------------------------------------------------------------------
+TABLE_COLUMNS = {
+    "visa_subclass": [
+        ("visa_id", "uuid"), ("subclass_code", None), ("stream", None),
+        ("audience", "kb_audience"), ("canonical_info_url", None), ("last_verified_at", None),
+    ],
+    "requirement": [
+        ("requirement_id", "uuid"), ("visa_id", "uuid"), ("requirement_type", "kb_requirement_type"),
+        ("title", None), ("plain_english", None), ("legal_basis", "jsonb"),
+        ("operational_basis", "jsonb"), ("rule_logic", "jsonb"), ("effective_from", "date"),
+        ("effective_to", "date"), ("confidence", "kb_confidence"), ("last_reviewed_at", None),
+    ],
+    "evidence_item": [
+        ("evidence_id", "uuid"), ("requirement_id", "uuid"), ("label", None),
+        ("what_it_proves", None), ("examples", "jsonb"), ("common_gaps", "jsonb"),
+        ("priority", None), ("effective_from", "date"), ("effective_to", "date"),
+        ("legal_basis", "jsonb"),
+    ],
+    "flag_template": [
+        ("flag_id", "uuid"), ("visa_id", "uuid"), ("title", None), ("trigger_schema", "jsonb"),
+        ("why_it_matters", None), ("actions", "jsonb"), ("evidence_examples", "jsonb"),
+        ("severity", "kb_flag_severity"), ("effective_from", "date"), ("effective_to", "date"),
+        ("sources", "jsonb"),
+    ],
+}
+
+CONFLICT_TARGETS = {
+    "visa_subclass": "",
+    "requirement": " (requirement_id)",
+    "evidence_item": " (evidence_id)",
+    "flag_template": " (flag_id)",
+}
+
+FORMATS = ("multirow", "rows", "copy")
+
+
+# ---------------------------------------------------------------------------
+# Row values (Python values in TABLE_COLUMNS order)
 # ---------------------------------------------------------------------------
-def gen_visa_subclass(subclass: dict, visa_uuid: str) -> str:
-    code     = subclass["code"]
-    stream   = sql_str(subclass.get("stream"))
-    audience = subclass["audience"]
-    url      = sql_str(subclass.get("url"))
-    now      = f"'{datetime.utcnow().isoformat()}Z'"
+def visa_subclass_values(subclass: dict, visa_uuid: str, now: str) -> tuple:
     return (
-        f"INSERT INTO visa_subclass (visa_id, subclass_code, stream, audience, canonical_info_url, last_verified_at)\n"
-        f"  VALUES ('{visa_uuid}':uuid, {sql_str(code)}, {stream}, '{audience}':kb_audience, {url}, {now})\n"
-        f"  ON CONFLICT DO NOTHING;\n"
+        visa_uuid, subclass["subclass_code"], subclass.get("stream"),
+        subclass["audience"], subclass.get("canonical_info_url"), now,
     )
 
-def gen_requirement(req: dict, req_uuid: str, visa_uuid: str) -> str:
+def requirement_values(req: dict, req_uuid: str, visa_uuid: str) -> tuple:
     eff = req.get("effective", {})
     return (
-        f"INSERT INTO requirement\n"
-        f"  (requirement_id, visa_id, requirement_type, title, plain_english,\n"
-        f"   legal_basis, operational_basis, rule_logic, effective_from, effective_to,\n"
-        f"   confidence, last_reviewed_at)\n"
-        f"VALUES (\n"
-        f"  '{req_uuid}'::uuid,\n"
-        f"  '{visa_uuid}'::uuid,\n"
-        f"  {sql_str(req['requirement_type'])}::kb_requirement_type,\n"
-        f"  {sql_str(req['title'])},\n"
-        f"  {sql_str(req['plain_english'])},\n"
-        f"  {sql_json(req.get('legal_basis', []))}::jsonb,\n"
-        f"  {sql_json(req.get('operational_basis', []))}::jsonb,\n"
-        f"  {sql_json(req.get('rule_logic', {}))}::jsonb,\n"
-        f"  {sql_date(eff.get('from'))},\n"
-        f"  {sql_date(eff.get('to'))},\n"
-        f"  {sql_str(req.get('confidence', 'medium'))}::kb_confidence,\n"
-        f"  {sql_str(req.get('last_reviewed_at'))}\n"
-        f") ON CONFLICT (requirement_id) DO NOTHING;\n"
+        req_uuid, visa_uuid, req["requirement_type"], req["title"], req["plain_english"],
+        req.get("legal_basis", []), req.get("operational_basis", []), req.get("rule_logic", {}),
+        eff.get("from"), eff.get("to"), req.get("confidence", "medium"), req.get("last_reviewed_at"),
     )
 
-def gen_evidence_item(ev: dict, ev_uuid: str, req_uuid: str) -> str:
+def evidence_item_values(ev: dict, ev_uuid: str, req_uuid: str) -> tuple:
     eff = ev.get("effective", {})
     return (
-        f"INSERT INTO evidence_item\n"
-        f"  (evidence_id, requirement_id, label, what_it_proves, examples,\n"
-        f"   common_gaps, priority, effective_from, effective_to, legal_basis)\n"
-        f"VALUES (\n"
-        f"  '{ev_uuid}'::uuid,\n"
-        f"  '{req_uuid}'::uuid,\n"
-        f"  {sql_str(ev['label'])},\n"
-        f"  {sql_str(ev['what_it_proves'])},\n"
-        f"  {sql_json(ev.get('examples', []))}::jsonb,\n"
-        f"  {sql_json(ev.get('common_gaps', []))}::jsonb,\n"
-        f"  {ev.get('priority', 3)},\n"
-        f"  {sql_date(eff.get('from'))},\n"
-        f"  {sql_date(eff.get('to'))},\n"
-        f"  {sql_json(ev.get('legal_basis', []))}::jsonb\n"
-        f") ON CONFLICT (evidence_id) DO NOTHING;\n"
+        ev_uuid, req_uuid, ev["label"], ev["what_it_proves"], ev.get("examples", []),
+        ev.get("common_gaps", []), ev.get("priority", 3), eff.get("from"), eff.get("to"),
+        ev.get("legal_basis", []),
     )
 
-def gen_flag_template(flag: dict, flag_uuid: str, visa_uuid: str) -> str:
+def flag_template_values(flag: dict, flag_uuid: str, visa_uuid: str) -> tuple:
     eff = flag.get("effective", {})
     return (
-        f"INSERT INTO flag_template\n"
-        f"  (flag_id, visa_id, title, trigger_schema, why_it_matters,\n"
-        f"   actions, evidence_examples, severity, effective_from, effective_to, sources)\n"
-        f"VALUES (\n"
-        f"  '{flag_uuid}'::uuid,\n"
-        f"  '{visa_uuid}'::uuid,\n"
-        f"  {sql_str(flag['title'])},\n"
-        f"  {sql_json(flag.get('trigger_schema', {}))}::jsonb,\n"
-        f"  {sql_str(flag['why_it_matters'])},\n"
-        f"  {sql_json(flag.get('actions', []))}::jsonb,\n"
-        f"  {sql_json(flag.get('evidence_examples', []))}::jsonb,\n"
-        f"  {sql_str(flag.get('severity', 'warning'))}::kb_flag_severity,\n"
-        f"  {sql_date(eff.get('from'))},\n"
-        f"  {sql_date(eff.get('to'))},\n"
-        f"  {sql_json(flag.get('sources', {}))}::jsonb\n"
-        f") ON CONFLICT (flag_id) DO NOTHING;\n"
+        flag_uuid, visa_uuid, flag["title"], flag.get("trigger_schema", {}), flag["why_it_matters"],
+        flag.get("actions", []), flag.get("evidence_examples", []), flag.get("severity", "warning"),
+        eff.get("from"), eff.get("to"), flag.get("sources", {}),
     )
 
+
 # ---------------------------------------------------------------------------
-# Main
+# SQL rendering
 # ---------------------------------------------------------------------------
-def main():
-    MIGRATIONS_DIR.mkdir(exist_ok=True)
-
-    lines = []
-    lines.append("-- ============================================================")
-    lines.append("-- KangaVisa KB Seed — v1")
-    lines.append(f"-- Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
-    lines.append("-- US-F6 | FR-K1, FR-K2, FR-K3")
-    lines.append("-- Idempotent: safe to re-run (ON CONFLICT DO NOTHING)")
-    lines.append("-- ============================================================")
-    lines.append("")
-
-    # ------------------------------------------------------------------
-    # 1. visa_subclass rows
-    # ------------------------------------------------------------------
-    lines.append("-- ---- 1. Visa subclasses ----")
-    visa_uuid_map: dict[str, str] = {}  # code → uuid
-    for vs in VISA_SUBCLASSES:
-        code = vs["code"]
-        visa_uuid = deterministic_uuid("visa_subclass", code)
-        visa_uuid_map[code] = visa_uuid
-        lines.append(gen_visa_subclass(vs, visa_uuid))
-    lines.append("")
-
-    # ------------------------------------------------------------------
-    # 2. Requirements
-    # ------------------------------------------------------------------
-    lines.append("-- ---- 2. Requirements ----")
-    req_uuid_map: dict[str, str] = {}  # requirement_id string → uuid
+def sql_value(value, cast) -> str:
+    """Render one value as a SQL literal with its cast."""
+    if value is None:
+        return "NULL"
+    if cast == "jsonb":
+        return f"{sql_json(value)}::jsonb"
+    if cast == "date":
+        return sql_date(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return sql_str(value) + (f"::{cast}" if cast else "")
+
+def insert_sql(table: str, rows: list) -> str:
+    """One INSERT for *rows* (tuples in TABLE_COLUMNS order), ignoring conflicts."""
+    columns = TABLE_COLUMNS[table]
+    tuples = ",\n".join(
+        "  (" + ", ".join(sql_value(v, cast) for v, (_, cast) in zip(row, columns)) + ")"
+        for row in rows
+    )
+    return (
+        f"INSERT INTO {table} ({', '.join(name for name, _ in columns)})\n"
+        f"VALUES\n{tuples}\n"
+        f"ON CONFLICT{CONFLICT_TARGETS[table]} DO NOTHING;\n"
+    )
+
+def copy_value(value, cast) -> str:
+    """Render one value in COPY text format."""
+    if value is None:
+        return r"\N"
+    text = json.dumps(value, ensure_ascii=False) if cast == "jsonb" else str(value)
+    return (
+        text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+def copy_line(table: str, row: tuple) -> str:
+    columns = TABLE_COLUMNS[table]
+    return "\t".join(copy_value(v, cast) for v, (_, cast) in zip(row, columns)) + "\n"
+
+def copy_begin(table: str) -> str:
+    names = ", ".join(name for name, _ in TABLE_COLUMNS[table])
+    return (
+        f"CREATE TEMP TABLE _seed_{table} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;\n"
+        f"COPY _seed_{table} ({names}) FROM STDIN;\n"
+    )
+
+def copy_end(table: str) -> str:
+    names = ", ".join(name for name, _ in TABLE_COLUMNS[table])
+    return (
+        "\\.\n"
+        f"INSERT INTO {table} ({names})\n"
+        f"  SELECT {names} FROM _seed_{table}\n"
+        f"ON CONFLICT{CONFLICT_TARGETS[table]} DO NOTHING;\n"
+    )
+
+# Per-row generators (the "rows" format)
+def gen_visa_subclass(subclass: dict, visa_uuid: str, now: str) -> str:
+    return insert_sql("visa_subclass", [visa_subclass_values(subclass, visa_uuid, now)])
+
+def gen_requirement(req: dict, req_uuid: str, visa_uuid: str) -> str:
+    return insert_sql("requirement", [requirement_values(req, req_uuid, visa_uuid)])
+
+def gen_evidence_item(ev: dict, ev_uuid: str, req_uuid: str) -> str:
+    return insert_sql("evidence_item", [evidence_item_values(ev, ev_uuid, req_uuid)])
+
+def gen_flag_template(flag: dict, flag_uuid: str, visa_uuid: str) -> str:
+    return insert_sql("flag_template", [flag_template_values(flag, flag_uuid, visa_uuid)])
 
+
+# ---------------------------------------------------------------------------
+# Seed groups: (comment, rows) per table and subclass, in FK order
+# ---------------------------------------------------------------------------
+def visa_subclass_groups(visa_uuid_map: dict, now: str):
+    rows = []
     for vs in VISA_SUBCLASSES:
-        code = vs["code"]
-        visa_uuid = visa_uuid_map[code]
+        code = vs["subclass_code"]
+        visa_uuid_map[code] = deterministic_uuid("visa_subclass", code)
+        rows.append(visa_subclass_values(vs, visa_uuid_map[code], now))
+    yield "All subclasses", rows
 
-        req_files = sorted(SEED_DIR.glob(f"visa_{code}_requirements*.json"))
-        if not req_files:
-            print(f"  [WARN] No requirements JSON for subclass {code}", file=sys.stderr)
-            continue
+def _subclass_items(kb, code: str, kind: str, label: str, warn: bool = True):
+    """Seed items of *kind* for subclass *code*; warns if a seeded subclass has none."""
+    items = kb.by_subclass.get(code, {}).get(kind, [])
+    if not items and warn and code in kb.by_subclass:
+        print(f"  [WARN] No {label} JSON for subclass {code}", file=sys.stderr)
+    return items
 
-        lines.append(f"-- Subclass {code} requirements")
-        for req_file in req_files:
-            reqs = load_json(req_file)
-            for req in reqs:
-                rid = req["requirement_id"]
-                req_uuid = deterministic_uuid("requirement", rid)
-                req_uuid_map[rid] = req_uuid
-                lines.append(gen_requirement(req, req_uuid, visa_uuid))
-        lines.append("")
-
-    # ------------------------------------------------------------------
-    # 3. Evidence items
-    # ------------------------------------------------------------------
-    lines.append("-- ---- 3. Evidence items ----")
+def requirement_groups(kb, visa_uuid_map: dict, req_uuid_map: dict):
     for vs in VISA_SUBCLASSES:
-        code = vs["code"]
-        ev_file = SEED_DIR / f"visa_{code}_evidence_items.json"
-        if not ev_file.exists():
-            print(f"  [WARN] No evidence_items JSON for subclass {code}", file=sys.stderr)
+        code = vs["subclass_code"]
+        reqs = _subclass_items(kb, code, "requirement", "requirements")
+        if not reqs:
             continue
+        rows = []
+        for req in reqs:
+            rid = req["requirement_id"]
+            req_uuid_map[rid] = deterministic_uuid("requirement", rid)
+            rows.append(requirement_values(req, req_uuid_map[rid], visa_uuid_map[code]))
+        yield f"Subclass {code} requirements", rows
 
-        lines.append(f"-- Subclass {code} evidence items")
-        evidence_items = load_json(ev_file)
+def evidence_item_groups(kb, req_uuid_map: dict):
+    for vs in VISA_SUBCLASSES:
+        code = vs["subclass_code"]
+        evidence_items = _subclass_items(kb, code, "evidence_item", "evidence_items")
+        if not evidence_items:
+            continue
+        rows = []
         for ev in evidence_items:
             eid = ev["evidence_id"]
             rid = ev["requirement_id"]
@@ -220,45 +263,103 @@ def main():
             if not req_uuid:
                 print(f"  [WARN] evidence {eid} references unknown requirement {rid} — skipping", file=sys.stderr)
                 continue
-            ev_uuid = deterministic_uuid("evidence_item", eid)
-            lines.append(gen_evidence_item(ev, ev_uuid, req_uuid))
-        lines.append("")
-
-    # ------------------------------------------------------------------
-    # 4. Flag templates (500 only for now — other subclasses TBD)
-    # ------------------------------------------------------------------
-    lines.append("-- ---- 4. Flag templates ----")
+            rows.append(evidence_item_values(ev, deterministic_uuid("evidence_item", eid), req_uuid))
+        yield f"Subclass {code} evidence items", rows
+
+def flag_template_groups(kb, visa_uuid_map: dict):
     for vs in VISA_SUBCLASSES:
-        code = vs["code"]
-        visa_uuid = visa_uuid_map[code]
-        flags_file = SEED_DIR / f"visa_{code}_flags.json"
-        if not flags_file.exists():
+        code = vs["subclass_code"]
+        flags = _subclass_items(kb, code, "flag_template", "flags", warn=False)
+        if not flags:
             continue
+        rows = [
+            flag_template_values(flag, deterministic_uuid("flag_template", flag["flag_id"]), visa_uuid_map[code])
+            for flag in flags
+        ]
+        yield f"Subclass {code} flag templates", rows
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+def write_seed_sql(out, fmt: str = "multirow", kb=None) -> dict:
+    """
+    Stream the seed SQL in *fmt* to the text file *out*, from *kb*
+    (default: kb_model.load_kb()).  Returns row counts by table.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    kb = kb or kb_model.load_kb(SEED_DIR)
+    now = f"{datetime.utcnow().isoformat()}Z"
+    visa_uuid_map: dict[str, str] = {}  # code → uuid
+    req_uuid_map: dict[str, str] = {}   # requirement_id string → uuid
+    sections = [
+        ("1. Visa subclasses", "visa_subclass", visa_subclass_groups(visa_uuid_map, now)),
+        ("2. Requirements", "requirement", requirement_groups(kb, visa_uuid_map, req_uuid_map)),
+        ("3. Evidence items", "evidence_item", evidence_item_groups(kb, req_uuid_map)),
+        ("4. Flag templates", "flag_template", flag_template_groups(kb, visa_uuid_map)),
+    ]
+
+    out.write(
+        "-- ============================================================\n"
+        "-- KangaVisa KB Seed — v1\n"
+        f"-- Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')} ({fmt} format)\n"
+        "-- US-F6 | FR-K1, FR-K2, FR-K3\n"
+        "-- Idempotent: safe to re-run (ON CONFLICT DO NOTHING)\n"
+    )
+    if fmt == "copy":
+        out.write("-- psql only (COPY ... FROM STDIN): psql -f seed_kb_v1.sql\n")
+    out.write("-- ============================================================\n\n")
+    if fmt == "copy":
+        out.write("BEGIN;\n\n")
+
+    counts: dict[str, int] = {}
+    for title, table, groups in sections:
+        out.write(f"-- ---- {title} ----\n")
+        counts[table] = 0
+        if fmt == "copy":
+            out.write(copy_begin(table))
+        for comment, rows in groups:
+            counts[table] += len(rows)
+            if fmt == "copy":
+                out.writelines(copy_line(table, row) for row in rows)
+                continue
+            out.write(f"-- {comment}\n")
+            if fmt == "rows":
+                out.writelines(insert_sql(table, [row]) + "\n" for row in rows)
+            elif rows:
+                out.write(insert_sql(table, rows) + "\n")
+        if fmt == "copy":
+            out.write(copy_end(table))
+        out.write("\n")
+
+    if fmt == "copy":
+        out.write("COMMIT;\n")
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the KB seed SQL migration")
+    parser.add_argument("--format", choices=FORMATS, default="multirow", help="Statement layout (default: multirow)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help=f"Output path (default: {OUTPUT_FILE})")
+    args = parser.parse_args(argv)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as out:
+        counts = write_seed_sql(out, args.format)
 
-        lines.append(f"-- Subclass {code} flag templates")
-        flags = load_json(flags_file)
-        for flag in flags:
-            fid = flag["flag_id"]
-            flag_uuid = deterministic_uuid("flag_template", fid)
-            lines.append(gen_flag_template(flag, flag_uuid, visa_uuid))
-        lines.append("")
-
-    # ------------------------------------------------------------------
-    # Write output
-    # ------------------------------------------------------------------
-    sql_content = "\n".join(lines)
-    OUTPUT_FILE.write_text(sql_content, encoding="utf-8")
-
-    # Summary
-    req_count  = len(req_uuid_map)
-    ev_count   = sum(len(load_json(f)) for f in SEED_DIR.glob("visa_*_evidence_items.json") if f.exists())
-    flag_count = sum(len(load_json(f)) for f in SEED_DIR.glob("visa_*_flags.json") if f.exists())
-    print(f"\n✅  Seed SQL written to: {OUTPUT_FILE.relative_to(REPO_ROOT)}")
-    print(f"   Visa subclasses : {len(VISA_SUBCLASSES)}")
-    print(f"   Requirements    : {req_count}")
-    print(f"   Evidence items  : {ev_count}")
-    print(f"   Flag templates  : {flag_count}")
-    print(f"\nNext: Paste {OUTPUT_FILE.name} into your Supabase SQL Editor and run it.\n")
+    print(f"\n✅  Seed SQL written to: {args.output}")
+    print(f"   Visa subclasses : {counts['visa_subclass']}")
+    print(f"   Requirements    : {counts['requirement']}")
+    print(f"   Evidence items  : {counts['evidence_item']}")
+    print(f"   Flag templates  : {counts['flag_template']}")
+    if args.format == "copy":
+        print(f"\nNext: psql \"$DATABASE_URL\" -f {args.output.name}  (COPY needs psql, not the SQL Editor)\n")
+    else:
+        print(f"\nNext: Paste {args.output.name} into your Supabase SQL Editor and run it.\n")
 
 if __name__ == "__main__":
     main()
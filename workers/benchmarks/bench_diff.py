@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+bench_diff.py — Benchmark text_diff / impact_scorer on synthetic legislation.
+
+Builds a deterministic ~5 MB Act-like text (parts, divisions, numbered
+sections and subsections), applies a set of realistic amendments, and times
+text_diff.diff_stats() and impact_scorer.score() on each.  No network.
+
+Usage:
+    cd workers/
+    python3 benchmarks/bench_diff.py [--size-mb 5] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kangavisa_workers import impact_scorer, text_diff  # noqa: E402
+
+WORDS = (
+    "the a an of to in for by under with subject any person applicant visa "
+    "Minister criterion requirement holder application prescribed period "
+    "subsection paragraph regulation Schedule specified satisfied grant "
+    "condition day time decision officer Australia stream nominated"
+).split()
+
+
+def synthetic_act(size_bytes: int, seed: int = 1958) -> bytes:
+    """Return ~*size_bytes* of Act-like text with a stable structure."""
+    rng = random.Random(seed)
+    lines: list[str] = []
+    total = 0
+    part = division = section = 0
+
+    def add(line: str) -> None:
+        nonlocal total
+        lines.append(line)
+        total += len(line.encode("utf-8")) + 1
+
+    while total < size_bytes:
+        if section % 200 == 0:
+            part += 1
+            add(f"Part {part}—Visas for non-citizens")
+        if section % 40 == 0:
+            division += 1
+            add(f"Division {division}—Criteria for visas")
+        section += 1
+        add(f"{section}  Section heading {section}")
+        for sub in range(1, rng.randint(2, 6)):
+            body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 40)))
+            add(f"     ({sub}) {body}.")
+        add("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def amendments(doc: bytes) -> dict[str, bytes]:
+    """Named edits of *doc*, from a one-line insertion to a large repeal."""
+    lines = doc.split(b"\n")
+    n = len(lines)
+    rng = random.Random(42)
+
+    scattered = list(lines)
+    for i in rng.sample(range(n), 200):
+        scattered[i] = scattered[i] + b" (as amended)"
+
+    return {
+        "insert_one_line_at_top": b"Compilation No. 151\n" + doc,
+        "200_scattered_line_edits": b"\n".join(scattered),
+        "repeal_10pct_block": b"\n".join(lines[: n // 2] + lines[n // 2 + n // 10:]),
+        "insert_new_part_middle": b"\n".join(
+            lines[: n // 3]
+            + [f"     ({i}) New visa stream criterion {i}.".encode() for i in range(500)]
+            + lines[n // 3:]
+        ),
+        "identical": doc,
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    doc = synthetic_act(int(args.size_mb * 1024 * 1024))
+    line_count = doc.count(b"\n") + 1
+    print(f"Synthetic Act: {len(doc) / 1e6:.2f} MB, {line_count:,} lines\n")
+    print(f"{'edit':<28} {'diff_ratio':>10} {'ins':>7} {'del':>7} {'chg':>7} {'diff s':>8} {'score s':>8}")
+
+    for name, edited in amendments(doc).items():
+        stats = text_diff.diff_stats(doc, edited)
+        diff_s = _time(lambda: text_diff.diff_stats(doc, edited), args.repeat)
+        score_s = _time(lambda: impact_scorer.score(doc, edited, "FRL_ACT"), args.repeat)
+        print(
+            f"{name:<28} {stats['diff_ratio']:>10.2%} {stats['inserted']:>7} "
+            f"{stats['deleted']:>7} {stats['changed']:>7} {diff_s:>8.3f} {score_s:>8.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+bench_pipeline.py — Offline throughput / concurrency benchmark of the ingestion pipeline.
+
+Runs the real write paths against postgrest_stub.PostgrestStub (a local
+SQLite-backed PostgREST stand-in with injected per-request latency), so
+round-trip counts and pool sizes show up the way they do against Supabase:
+
+    ingest.row            run_frl_watch_and_persist over --targets FRL targets,
+                          --workers threads, one pooled db.SupabaseSession
+    ingest.write_behind   same, through db.WriteBehindSession (bulk inserts)
+    seed_upsert           seed_loader.UpsertEngine over --rows requirement rows,
+                          parallelism = each --workers value
+
+Each ingest run does two passes over the same targets — first sight
+(new_instrument) then amended content (text_change) — with the run's
+get_latest_source_docs() prefetch in front of each pass, as run_watchers
+does.  Fetches are local callables returning synthetic Act text; snapshots
+go to a temp directory.  No network.
+
+Results are written as JSON to benchmarks/results/ (or --out).
+
+Usage:
+    cd workers/
+    python3 benchmarks/bench_pipeline.py [--quick]
+    python3 benchmarks/bench_pipeline.py --targets 200 --latency 0.02 --workers 1,4,16
+    python3 benchmarks/bench_pipeline.py --only seed_upsert --rows 5000 --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+WORKERS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WORKERS_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_diff import synthetic_act  # noqa: E402
+from bench_suite import amended, environment  # noqa: E402
+from kangavisa_workers import db, frl_watcher, seed_loader  # noqa: E402
+from kangavisa_workers.postgrest_stub import PostgrestStub  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SERVICE_ROLE_KEY = "sb_secret_bench"
+
+DEFAULT_TARGETS = 100
+DEFAULT_ROWS = 2_000
+DEFAULT_WORKERS = [1, 4, 16]
+DEFAULT_LATENCY = 0.01          # seconds per request, roughly a same-region Supabase round trip
+DEFAULT_DOC_SIZE = 16 * 1024
+QUICK_TARGETS = 20
+QUICK_ROWS = 200
+QUICK_WORKERS = [1, 4]
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def _local_fetch(bodies: dict[str, bytes]):
+    """A fetch_frl_conditional stand-in serving *bodies* ({url: content})."""
+    def fetch(url: str, validators: Optional[dict] = None) -> dict:
+        return {"content": bodies[url], "not_modified": False, "validators": {"etag": f'"{len(bodies[url])}"'}}
+    return fetch
+
+
+def _ingest_pass(session, urls: list[str], bodies: dict[str, bytes], workers: int) -> list[dict]:
+    prev_docs = session.get_latest_source_docs(urls)
+    fetch = _local_fetch(bodies)
+
+    def one(url: str) -> dict:
+        return frl_watcher.run_frl_watch_and_persist(
+            url, url.rsplit("/", 1)[-1], "FRL_ACT", url,
+            fetch=fetch, session=session, prev_docs=prev_docs,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(one, urls))
+
+
+def case_ingest(write_behind: bool):
+    def case(stub: PostgrestStub, args, workers: int) -> dict:
+        urls = [f"https://www.legislation.gov.au/Details/C2026C{i:05d}" for i in range(args.targets)]
+        first = {url: synthetic_act(args.doc_size, seed=i) for i, url in enumerate(urls)}
+        second = {url: amended(body) for url, body in first.items()}
+        with db.SupabaseSession(stub.url, SERVICE_ROLE_KEY) as base:
+            session = db.WriteBehindSession(base) if write_behind else base
+            start = time.perf_counter()
+            for bodies in (first, second):
+                results = _ingest_pass(session, urls, bodies, workers)
+            if write_behind:
+                session.close()
+            seconds = time.perf_counter() - start
+        events = len(stub.rows("change_event"))
+        assert events == 2 * args.targets, f"expected {2 * args.targets} change events, found {events}"
+        assert all(r["change_event_id"] for r in results)
+        return {"items": 2 * args.targets, "unit": "targets", "seconds": seconds}
+    return case
+
+
+def case_seed_upsert(stub: PostgrestStub, args, workers: int) -> dict:
+    template = seed_loader.ROW_BUILDERS["requirement"]()
+    rows = [
+        {**template[i % len(template)], "requirement_id": f"REQ-500-BENCH-{i:06d}"}
+        for i in range(args.rows)
+    ]
+    seed_loader.SUPABASE_URL, seed_loader.SERVICE_ROLE_KEY = stub.url, SERVICE_ROLE_KEY
+    with seed_loader.UpsertEngine(parallelism=workers) as engine:
+        start = time.perf_counter()
+        engine.upsert("requirement", rows)
+        seconds = time.perf_counter() - start
+        retries = engine.stats["requirement"]["retries"]
+    assert len(stub.rows("requirement")) == args.rows
+    return {"items": args.rows, "unit": "rows", "seconds": seconds, "retries": retries}
+
+
+CASES = {
+    "ingest.row": case_ingest(write_behind=False),
+    "ingest.write_behind": case_ingest(write_behind=True),
+    "seed_upsert": case_seed_upsert,
+}
+
+
+def run_case(name: str, args, workers: int) -> dict:
+    """
+    Run one case against a fresh stub at one concurrency level.
+
+    Returns::
+
+        {
+            "name": str, "workers": int, "unit": "targets" | "rows",
+            "items": int, "seconds": float, "throughput": float,
+            "requests": int, "injected_errors": int, ...case extras
+        }
+    """
+    stub = PostgrestStub(
+        service_role_key=SERVICE_ROLE_KEY, latency=args.latency,
+        latency_jitter=args.latency / 2, error_rate=args.error_rate, retry_after=0,
+    )
+    with stub, tempfile.TemporaryDirectory(prefix="kv-bench-") as tmp:
+        frl_watcher.SNAPSHOTS_DIR = Path(tmp)
+        result = CASES[name](stub, args, workers)
+        stats = stub.stats
+    return {
+        "name": name,
+        "workers": workers,
+        **result,
+        "throughput": result["items"] / result["seconds"] if result["seconds"] else float("inf"),
+        "requests": stats["requests"],
+        "injected_errors": stats["injected_errors"],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def format_row(result: dict) -> str:
+    return (
+        f"{result['name']:<22} {result['workers']:>7} {result['items']:>8,} "
+        f"{result['seconds']:>9.3f} {result['throughput']:>12,.1f}/s {result['requests']:>9,}"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--only", default=None, help="Comma-separated case names (default: all)")
+    parser.add_argument("--targets", type=int, default=None, help=f"FRL targets per ingest run (default {DEFAULT_TARGETS})")
+    parser.add_argument("--rows", type=int, default=None, help=f"Seed rows per upsert run (default {DEFAULT_ROWS})")
+    parser.add_argument("--workers", default=None, help="Comma-separated concurrency levels")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Stub seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests answered 503")
+    parser.add_argument("--doc-size", type=int, default=DEFAULT_DOC_SIZE, help="Bytes of Act text per target")
+    parser.add_argument("--quick", action="store_true", help="Small sizes only (smoke run)")
+    parser.add_argument("--out", type=Path, default=None, help="Results JSON (default: benchmarks/results/)")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s) {unknown}; expected any of {list(CASES)}")
+    args.targets = args.targets or (QUICK_TARGETS if args.quick else DEFAULT_TARGETS)
+    args.rows = args.rows or (QUICK_ROWS if args.quick else DEFAULT_ROWS)
+    workers = [int(w) for w in args.workers.split(",")] if args.workers else (QUICK_WORKERS if args.quick else DEFAULT_WORKERS)
+
+    env = environment()
+    print(f"Python {env['python']} · {env['platform']} · commit {env['git_commit']} · "
+          f"stub latency {args.latency * 1000:.0f} ms · error rate {args.error_rate:.0%}\n")
+    print(f"{'case':<22} {'workers':>7} {'items':>8} {'seconds':>9} {'throughput':>14} {'requests':>9}")
+
+    results = []
+    for name in names:
+        for level in workers:
+            result = run_case(name, args, level)
+            results.append(result)
+            print(format_row(result), flush=True)
+
+    stamp = datetime.now(timezone.utc)
+    out = args.out or RESULTS_DIR / f"pipeline-{stamp:%Y%m%dT%H%M%SZ}-{env['git_commit'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "generated_at": stamp.isoformat(),
+        "environment": env,
+        "settings": {
+            "targets": args.targets, "rows": args.rows, "latency": args.latency,
+            "error_rate": args.error_rate, "doc_size": args.doc_size,
+        },
+        "results": results,
+    }, indent=1) + "\n", encoding="utf-8")
+    print(f"\nResults written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
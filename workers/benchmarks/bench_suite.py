@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+bench_suite.py — Offline benchmark suite for the worker hot paths.
+
+Times each hot path on synthetic, size-parameterised inputs and records
+throughput and peak memory, so runs can be compared across commits:
+
+    hash_content            Act text, --sizes bytes
+    snapshot                Act text into a fresh snapshot store
+    impact_scorer.score     Act text vs. the same text with every 50th line amended
+    extract_sections        Home Affairs-like HTML built from the Act text
+    split_sections          (section fingerprints — same HTML)
+    validate_file           --rows seed items (requirements, evidence, flags)
+    seed_loader.rows        row building for every table, cold KB parse
+    generate_seed_sql.*     multirow / COPY SQL for the same seed rows
+
+Text comes from bench_diff.synthetic_act(); seed rows are clones of the
+visa 500 seed items written to a temp seed directory.  No network.
+
+Each case runs --repeat times (best and mean wall time) plus one run under
+tracemalloc for the peak of Python-level allocations; native buffers
+(e.g. zstd / gzip internals) are not counted.
+
+Results are written as JSON; --compare flags any case whose best time grew
+by more than --threshold against a saved baseline and exits 1.
+
+Usage:
+    cd workers/
+    python3 benchmarks/bench_suite.py [--quick] [--only hash_content,snapshot]
+    python3 benchmarks/bench_suite.py --out base.json
+    python3 benchmarks/bench_suite.py --compare base.json [--threshold 1.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import importlib.util
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+WORKERS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WORKERS_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_diff import synthetic_act  # noqa: E402
+from kangavisa_workers import (  # noqa: E402
+    impact_scorer,
+    kb_model,
+    schema_validator,
+    seed_loader,
+    snapshot_store,
+)
+from kangavisa_workers.frl_watcher import hash_content, snapshot  # noqa: E402
+from kangavisa_workers.homeaffairs_watcher import extract_sections, split_sections  # noqa: E402
+
+GENERATE_SEED_SQL = WORKERS_DIR.parent / "scripts" / "generate_seed_sql.py"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+KB = 1024
+MB = 1024 * 1024
+DEFAULT_SIZES = [1 * KB, 64 * KB, 1 * MB, 20 * MB]
+DEFAULT_ROWS = [10, 1_000, 10_000, 100_000]
+QUICK_SIZES = [1 * KB, 64 * KB]
+QUICK_ROWS = [10, 1_000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25   # --compare: best time may grow by 25%
+
+# Visa 500 seed files cloned into synthetic seed directories
+TEMPLATE_FILES = {
+    "requirement": "visa_500_requirements.json",
+    "evidence_item": "visa_500_evidence_items.json",
+    "flag_template": "visa_500_flags.json",
+}
+
+
+# ---------------------------------------------------------------------------
+# Synthetic inputs
+# ---------------------------------------------------------------------------
+
+def amended(doc: bytes, every: int = 50) -> bytes:
+    """*doc* with every *every*-th line amended."""
+    lines = doc.split(b"\n")
+    for i in range(0, len(lines), every):
+        lines[i] += b" (as amended)"
+    return b"\n".join(lines)
+
+
+def synthetic_page(doc: bytes) -> bytes:
+    """Home Affairs-like HTML: Parts / Divisions as <h2>, sections as <h3>."""
+    parts = [b"<html><body><header>Home Affairs</header><main>"]
+    for line in doc.split(b"\n"):
+        text = line.strip()
+        if not text:
+            continue
+        if text.startswith((b"Part ", b"Division ")):
+            parts.append(b"<h2>" + text + b"</h2>")
+        elif text[:1].isdigit():
+            parts.append(b"<h3>" + text + b"</h3>")
+        else:
+            parts.append(b"<p>" + text + b"</p>")
+    parts.append(b"</main></body></html>")
+    return b"\n".join(parts)
+
+
+def _templates() -> dict[str, dict]:
+    return {
+        kind: kb_model.seed_items(json.loads((kb_model.SEED_DIR / name).read_text(encoding="utf-8")))[0]
+        for kind, name in TEMPLATE_FILES.items()
+    }
+
+
+def write_seed_dir(root: Path, rows: int) -> dict[str, Path]:
+    """
+    Write *rows* seed items, split across requirements, evidence items and
+    flags, as visa 500 seed files under *root*.  Returns ``{kind: path}``.
+    """
+    templates = _templates()
+    per_kind = max(rows // 3, 1)
+    counts = {"requirement": rows - 2 * per_kind if rows >= 3 else 1,
+              "evidence_item": per_kind, "flag_template": per_kind}
+    items: dict[str, list[dict]] = {kind: [] for kind in TEMPLATE_FILES}
+    for i in range(counts["requirement"]):
+        item = copy.deepcopy(templates["requirement"])
+        item["requirement_id"] = f"REQ-500-BENCH-{i:06d}"
+        items["requirement"].append(item)
+    for i in range(counts["evidence_item"]):
+        item = copy.deepcopy(templates["evidence_item"])
+        item["evidence_id"] = f"EV-500-BENCH-{i:06d}"
+        item["requirement_id"] = f"REQ-500-BENCH-{i % counts['requirement']:06d}"
+        items["evidence_item"].append(item)
+    for i in range(counts["flag_template"]):
+        item = copy.deepcopy(templates["flag_template"])
+        item["flag_id"] = f"FLAG-500-BENCH-{i:06d}"
+        items["flag_template"].append(item)
+
+    root.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for kind, name in TEMPLATE_FILES.items():
+        paths[kind] = root / name
+        paths[kind].write_text(json.dumps(items[kind]), encoding="utf-8")
+    return paths
+
+
+def _load_generate_seed_sql():
+    spec = importlib.util.spec_from_file_location("generate_seed_sql", GENERATE_SEED_SQL)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable, repeat: int, setup: Optional[Callable] = None) -> dict:
+    """
+    Time *fn* (after an untimed *setup*, each run) and trace its peak memory.
+
+    Returns::
+
+        {"best_s": float, "mean_s": float, "peak_bytes": int}
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"best_s": min(times), "mean_s": sum(times) / len(times), "peak_bytes": peak}
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+# Each case factory takes (size, workdir) and returns (fn, setup, amount):
+# *amount* is the bytes or rows one call of *fn* processes.
+
+def case_hash_content(size: int, workdir: Path):
+    doc = synthetic_act(size)
+    return (lambda: hash_content(doc)), None, len(doc)
+
+
+def case_snapshot(size: int, workdir: Path):
+    doc = synthetic_act(size)
+    runs = iter(range(1_000_000))
+    state = {}
+
+    def setup():
+        state["root"] = workdir / f"snapshots-{next(runs)}"
+
+    return (lambda: snapshot(doc, "bench", state["root"])), setup, len(doc)
+
+
+def case_impact_score(size: int, workdir: Path):
+    doc = synthetic_act(size)
+    edited = amended(doc)
+    return (lambda: impact_scorer.score(doc, edited, "FRL_ACT")), None, len(doc)
+
+
+def case_extract_sections(size: int, workdir: Path):
+    page = synthetic_page(synthetic_act(size))
+    return (lambda: extract_sections(page)), None, len(page)
+
+
+def case_split_sections(size: int, workdir: Path):
+    page = synthetic_page(synthetic_act(size))
+    return (lambda: split_sections(page)), None, len(page)
+
+
+MODEL_TYPES = {"requirement": "Requirement", "evidence_item": "EvidenceItem", "flag_template": "FlagTemplate"}
+
+
+def case_validate_file(rows: int, workdir: Path):
+    paths = write_seed_dir(workdir / "seed", rows)
+    schema_validator.get_validator("Requirement")  # compile outside the timing
+
+    def fn():
+        for kind, path in paths.items():
+            schema_validator.validate_file(path, MODEL_TYPES[kind])
+
+    return fn, None, rows
+
+
+def case_seed_rows(rows: int, workdir: Path):
+    seed_dir = workdir / "seed"
+    write_seed_dir(seed_dir, rows)
+
+    def fn():
+        saved = seed_loader.SEED_DIR
+        seed_loader.SEED_DIR = seed_dir
+        try:
+            for table in seed_loader.TABLE_ORDER:
+                seed_loader.ROW_BUILDERS[table]()
+        finally:
+            seed_loader.SEED_DIR = saved
+
+    return fn, kb_model.clear_cache, rows
+
+
+def _case_generate_seed_sql(fmt: str):
+    def case(rows: int, workdir: Path):
+        generator = _load_generate_seed_sql()
+        seed_dir = workdir / "seed"
+        write_seed_dir(seed_dir, rows)
+        kb = kb_model.load_kb(seed_dir)
+        return (lambda: generator.write_seed_sql(io.StringIO(), fmt, kb=kb)), None, rows
+    return case
+
+
+# name → (unit, factory); unit "bytes" cases use --sizes, "rows" use --rows
+CASES: dict[str, tuple[str, Callable]] = {
+    "hash_content": ("bytes", case_hash_content),
+    "snapshot": ("bytes", case_snapshot),
+    "impact_scorer.score": ("bytes", case_impact_score),
+    "extract_sections": ("bytes", case_extract_sections),
+    "split_sections": ("bytes", case_split_sections),
+    "validate_file": ("rows", case_validate_file),
+    "seed_loader.rows": ("rows", case_seed_rows),
+    "generate_seed_sql.multirow": ("rows", _case_generate_seed_sql("multirow")),
+    "generate_seed_sql.copy": ("rows", _case_generate_seed_sql("copy")),
+}
+
+
+def run_case(name: str, size: int, repeat: int) -> dict:
+    """
+    Run one case at one size in a throwaway directory.
+
+    Returns::
+
+        {
+            "name": str, "unit": "bytes" | "rows", "size": int,
+            "best_s": float, "mean_s": float, "peak_bytes": int,
+            "throughput": float,          # units per second (best run)
+        }
+    """
+    unit, factory = CASES[name]
+    with tempfile.TemporaryDirectory(prefix="kv-bench-") as tmp:
+        fn, setup, amount = factory(size, Path(tmp))
+        stats = measure(fn, repeat, setup)
+    kb_model.clear_cache()
+    return {
+        "name": name,
+        "unit": unit,
+        "size": size,
+        **stats,
+        "throughput": amount / stats["best_s"] if stats["best_s"] else float("inf"),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def environment() -> dict:
+    """Interpreter, platform, optional-dependency and git details for the results file."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=WORKERS_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    optional = {}
+    for module in ("numpy", "zstandard"):
+        optional[module] = importlib.util.find_spec(module) is not None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git_commit": commit,
+        "snapshot_codec": snapshot_store.DEFAULT_CODEC,
+        "optional_deps": optional,
+    }
+
+
+def _human(amount: float, unit: str) -> str:
+    if unit == "bytes":
+        for suffix, scale in (("GB", 1 << 30), ("MB", MB), ("KB", KB)):
+            if amount >= scale:
+                return f"{amount / scale:.1f} {suffix}"
+        return f"{amount:.0f} B"
+    return f"{amount:,.0f} rows"
+
+
+def format_row(result: dict) -> str:
+    return (
+        f"{result['name']:<28} {_human(result['size'], result['unit']):>12} "
+        f"{result['best_s']:>9.4f} {_human(result['throughput'], result['unit']) + '/s':>16} "
+        f"{result['peak_bytes'] / MB:>9.1f}"
+    )
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Regression lines for cases whose best time exceeds baseline × *threshold*."""
+    before = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        old = before.get((result["name"], result["size"]))
+        if not old or not old["best_s"]:
+            continue
+        ratio = result["best_s"] / old["best_s"]
+        if ratio > threshold:
+            regressions.append(
+                f"{result['name']} @ {_human(result['size'], result['unit'])}: "
+                f"{old['best_s']:.4f}s → {result['best_s']:.4f}s (×{ratio:.2f})"
+            )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--only", default=None, help="Comma-separated case names (default: all)")
+    parser.add_argument("--sizes", default=None, help="Comma-separated text sizes in bytes")
+    parser.add_argument("--rows", default=None, help="Comma-separated seed row counts")
+    parser.add_argument("--quick", action="store_true", help="Small sizes only (smoke run)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--out", type=Path, default=None, help="Results JSON (default: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s) {unknown}; expected any of {list(CASES)}")
+    sizes = {
+        "bytes": [int(s) for s in args.sizes.split(",")] if args.sizes else (QUICK_SIZES if args.quick else DEFAULT_SIZES),
+        "rows": [int(r) for r in args.rows.split(",")] if args.rows else (QUICK_ROWS if args.quick else DEFAULT_ROWS),
+    }
+
+    env = environment()
+    print(f"Python {env['python']} · {env['platform']} · commit {env['git_commit']} · codec {env['snapshot_codec']}\n")
+    print(f"{'case':<28} {'size':>12} {'best s':>9} {'throughput':>16} {'peak MB':>9}")
+
+    results = []
+    for name in names:
+        for size in sizes[CASES[name][0]]:
+            result = run_case(name, size, args.repeat)
+            results.append(result)
+            print(format_row(result), flush=True)
+
+    stamp = datetime.now(timezone.utc)
+    out = args.out or RESULTS_DIR / f"bench-{stamp:%Y%m%dT%H%M%SZ}-{env['git_commit'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "generated_at": stamp.isoformat(),
+        "environment": env,
+        "repeat": args.repeat,
+        "results": results,
+    }, indent=1) + "\n", encoding="utf-8")
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over ×{args.threshold:.2f}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions over ×{args.threshold:.2f} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
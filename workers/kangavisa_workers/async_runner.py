@@ -0,0 +1,438 @@
+"""
+async_runner.py — Concurrent execution mode for the KangaVisa watchers.
+
+US-G1 | FR-K4: Keep a full ingestion run inside the cron window as the
+target list grows from a handful of sources to hundreds.
+
+All HTTP traffic for a run (legislation.gov.au, immi.homeaffairs.gov.au,
+data.gov.au and Supabase) goes through one shared ``httpx.AsyncClient``.
+A per-host semaphore caps in-flight requests to each upstream so a large
+target list cannot hammer any single host, and upstream fetches go through
+a fetch_policy.FetchPolicy (per-host request rate, jittered retries,
+circuit breaker) — waits and backoff happen outside the semaphore.
+
+Previous source_document state for every target is prefetched in one bulk
+request before any upstream fetch starts, and the source_document /
+change_event inserts go through a db.WriteBehindSession, so a run's writes
+cost a few bulk requests rather than two per changed target.  The pipelines themselves are not
+duplicated: each target runs its existing
+``run_*_watch_and_persist`` in a worker thread, with *fetch* and *session*
+bridged back onto the event loop.  Result dicts and the fatal / transient
+error classification are therefore identical to the sequential runner.
+
+Usage::
+
+    results = run_async(FRL_TARGETS, HOMEAFFAIRS_TARGETS, DATAGOV_TARGETS,
+                        host_limits={"legislation.gov.au": 1})
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from kangavisa_workers import db, fetch_policy, frl_watcher, snapshot_store
+from kangavisa_workers.datagov_watcher import (
+    DATAGOV_CKAN_API,
+    ckan_conditional_result,
+    run_datagov_watch_and_persist,
+)
+from kangavisa_workers.frl_watcher import (
+    conditional_headers,
+    conditional_result,
+    response_validators,
+    run_frl_watch_and_persist,
+)
+from kangavisa_workers.homeaffairs_watcher import (
+    USER_AGENT,
+    run_homeaffairs_watch_and_persist,
+)
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+DEFAULT_TIMEOUT = 30  # seconds
+
+# Max in-flight requests per upstream.  Keys match the host itself or any
+# subdomain of it ("data.gov.au" also covers "www.data.gov.au").  The special
+# key "supabase" resolves to the host of SUPABASE_URL.
+DEFAULT_HOST_LIMITS: dict[str, int] = {
+    "legislation.gov.au": 2,
+    "immi.homeaffairs.gov.au": 4,
+    "data.gov.au": 4,
+    "supabase": 8,
+}
+DEFAULT_HOST_LIMIT = 4  # any host not listed above
+
+MAX_WORKER_THREADS = 64
+
+
+# ---------------------------------------------------------------------------
+# Per-host concurrency limits
+# ---------------------------------------------------------------------------
+
+class HostLimiter:
+    """
+    Hand out one ``asyncio.Semaphore`` per configured host.
+
+    *limits* is merged over DEFAULT_HOST_LIMITS; hosts that match no key
+    share the *default* cap individually.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, int]] = None,
+        default: int = DEFAULT_HOST_LIMIT,
+    ) -> None:
+        self.limits = {**DEFAULT_HOST_LIMITS, **(limits or {})}
+        self.default = default
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _key_for(self, host: str) -> str:
+        supabase_host = urlparse(db.SUPABASE_URL).hostname
+        if supabase_host and host == supabase_host:
+            return "supabase"
+        for key in self.limits:
+            if host == key or host.endswith("." + key):
+                return key
+        return host
+
+    def limit_for(self, url: str) -> int:
+        """Return the concurrency cap that applies to *url*."""
+        key = self._key_for(urlparse(url).hostname or "")
+        return self.limits.get(key, self.default)
+
+    def semaphore(self, url: str) -> asyncio.Semaphore:
+        """Return the (lazily created) semaphore guarding *url*'s host."""
+        key = self._key_for(urlparse(url).hostname or "")
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self.limits.get(key, self.default))
+        return self._semaphores[key]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+class _BridgedSession:
+    """db-module lookalike whose calls run on the runner's event loop."""
+
+    def __init__(self, runner: "AsyncWatchRunner") -> None:
+        self._runner = runner
+
+    def get_latest_source_doc(self, canonical_url: str) -> Optional[dict]:
+        return self._runner._call(self._runner._get_latest_source_doc(canonical_url))
+
+    def get_latest_source_docs(self, canonical_urls: list[str]) -> dict:
+        return self._runner._call(self._runner._get_latest_source_docs(canonical_urls))
+
+    def insert_source_document(self, meta: dict) -> str:
+        return self._runner._call(self._runner._insert_source_document(meta))
+
+    def insert_change_event(self, event: dict) -> str:
+        return self._runner._call(self._runner._insert_change_event(event))
+
+    def update_source_document_metadata(self, source_doc_id: str, metadata_json: dict) -> None:
+        return self._runner._call(
+            self._runner._update_source_document_metadata(source_doc_id, metadata_json)
+        )
+
+    def insert_rows(self, table: str, rows: list[dict], on_conflict: str) -> int:
+        return self._runner._call(self._runner._insert_rows(table, rows, on_conflict))
+
+
+class AsyncWatchRunner:
+    """
+    Run FRL, Home Affairs and data.gov.au targets concurrently.
+
+    Each target dict has the same shape as the lists in run_watchers.py.
+    ``run()`` returns one result dict per target, in input order::
+
+        {"source_id": str, "ok": True, **pipeline_result}
+        {"source_id": str, "ok": False, "error": str, "fatal": bool}
+
+    Inserts are buffered write-behind in batches of *write_batch_size*
+    (None writes each row as it comes).  The final flush happens after every
+    target finished, so *on_result* may report a target OK whose rows then
+    fail to land; the returned list reflects the flush.
+    """
+
+    def __init__(
+        self,
+        host_limits: Optional[dict[str, int]] = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        max_workers: Optional[int] = None,
+        policy: Optional[fetch_policy.FetchPolicy] = None,
+        write_batch_size: Optional[int] = db.WRITE_BATCH_SIZE,
+    ) -> None:
+        self.limiter = HostLimiter(host_limits)
+        self.policy = policy or fetch_policy.FetchPolicy()
+        self.write_batch_size = write_batch_size
+        self.writer: Optional[db.WriteBehindSession] = None
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    # -- loop bridge --------------------------------------------------------
+
+    def _call(self, coro):
+        """Run *coro* on the runner's loop from a worker thread and wait."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one request under *url*'s host limit (status is not checked)."""
+        async with self.limiter.semaphore(url):
+            return await self._client.request(method, url, **kwargs)
+
+    # -- upstream fetches ---------------------------------------------------
+
+    async def _fetch_frl(self, url: str, validators: Optional[dict]) -> dict:
+        """Async frl_watcher.fetch_frl_streaming(): body staged to disk chunk by chunk."""
+        return await self.policy.acall(url, lambda: self._fetch_frl_once(url, validators))
+
+    async def _fetch_frl_once(self, url: str, validators: Optional[dict]) -> dict:
+        async with self.limiter.semaphore(url):
+            headers = conditional_headers(validators)
+            async with self._client.stream("GET", url, headers=headers) as resp:
+                if resp.status_code == 304:
+                    return {**conditional_result(resp, validators), "staged": None}
+                resp.raise_for_status()
+                staged = snapshot_store.StagedBlob(frl_watcher.SNAPSHOTS_DIR)
+                try:
+                    async for chunk in resp.aiter_bytes(snapshot_store.CHUNK_SIZE):
+                        staged.write(chunk)
+                except BaseException:
+                    staged.discard()
+                    raise
+                return {
+                    "not_modified": False,
+                    "content": None,
+                    "staged": staged.close(),
+                    "validators": response_validators(resp),
+                }
+
+    async def _fetch_homeaffairs(self, url: str, validators: Optional[dict]) -> dict:
+        headers = {"User-Agent": USER_AGENT, **conditional_headers(validators)}
+
+        async def attempt() -> dict:
+            resp = await self._request("GET", url, headers=headers)
+            return conditional_result(resp, validators)
+
+        return await self.policy.acall(url, attempt)
+
+    async def _fetch_dataset_metadata(self, dataset_id: str, validators: Optional[dict]) -> dict:
+        async def attempt() -> dict:
+            resp = await self._request(
+                "GET", DATAGOV_CKAN_API,
+                params={"id": dataset_id},
+                headers=conditional_headers(validators),
+            )
+            return ckan_conditional_result(resp, dataset_id, validators)
+
+        return await self.policy.acall(DATAGOV_CKAN_API, attempt)
+
+    # -- Supabase -----------------------------------------------------------
+
+    async def _get_latest_source_doc(self, canonical_url: str) -> Optional[dict]:
+        resp = await self._request(
+            "GET", db._rest("source_document"),
+            headers=db._headers(),
+            params=db._latest_source_doc_params(canonical_url),
+        )
+        resp.raise_for_status()
+        rows = resp.json()
+        return rows[0] if rows else None
+
+    async def _get_latest_source_docs(self, canonical_urls: list[str]) -> dict:
+        urls = list(dict.fromkeys(canonical_urls))
+        batches = [
+            urls[i:i + db.PREFETCH_BATCH_SIZE]
+            for i in range(0, len(urls), db.PREFETCH_BATCH_SIZE)
+        ]
+        responses = await asyncio.gather(*(
+            self._request(
+                "GET", db._rest(db.LATEST_SOURCE_DOC_VIEW),
+                headers=db._headers(),
+                params=db._latest_source_docs_params(batch),
+            )
+            for batch in batches
+        ))
+        latest: dict = {}
+        for batch, resp in zip(batches, responses):
+            latest.update(db._prefetched(batch, resp))
+        return latest
+
+    async def _prefetch_prev_docs(self, jobs: list[tuple]) -> Optional[dict]:
+        """
+        Bulk-load previous state for every job.  On failure return None so
+        each pipeline falls back to its own lookup — which then surfaces the
+        error with the usual fatal / transient classification.
+        """
+        try:
+            return await self._get_latest_source_docs(
+                [kwargs["canonical_url"] for _, _, kwargs in jobs]
+            )
+        except Exception:
+            return None
+
+    async def _insert_source_document(self, meta: dict) -> str:
+        resp = await self._request(
+            "POST", db._rest("source_document"),
+            headers=db._headers(),
+            json=db._source_document_payload(meta),
+        )
+        resp.raise_for_status()
+        return resp.json()[0]["source_doc_id"]
+
+    async def _insert_change_event(self, event: dict) -> str:
+        resp = await self._request(
+            "POST", db._rest("change_event"),
+            headers=db._headers(),
+            json=db._change_event_payload(event),
+        )
+        resp.raise_for_status()
+        return resp.json()[0]["change_event_id"]
+
+    async def _insert_rows(self, table: str, rows: list[dict], on_conflict: str) -> int:
+        batches = db._uniform_batches(rows)
+        for batch in batches:
+            resp = await self._request(
+                "POST", db._rest(table),
+                headers={**db._headers(), "Prefer": db.BULK_INSERT_PREFER},
+                params={"on_conflict": on_conflict},
+                json=batch,
+            )
+            resp.raise_for_status()
+        return len(batches)
+
+    async def _update_source_document_metadata(self, source_doc_id: str, metadata_json: dict) -> None:
+        resp = await self._request(
+            "PATCH", db._rest("source_document"),
+            headers=db._headers(),
+            params={"source_doc_id": f"eq.{source_doc_id}"},
+            json={"metadata_json": metadata_json},
+        )
+        resp.raise_for_status()
+
+    # -- targets ------------------------------------------------------------
+
+    def _jobs(self, frl_targets, homeaffairs_targets, datagov_targets, session=None) -> list[tuple]:
+        """Return (source_id, pipeline, kwargs) for every target."""
+        session = session or _BridgedSession(self)
+        jobs = []
+        for t in frl_targets:
+            jobs.append((t["source_id"], run_frl_watch_and_persist, {
+                "url": t["url"],
+                "source_id": t["source_id"],
+                "source_type": t["source_type"],
+                "canonical_url": t["canonical_url"],
+                "title": t.get("title"),
+                "fetch": lambda url, validators=None, **kw: self._call(
+                    self._fetch_frl(url, validators)
+                ),
+                "session": session,
+            }))
+        for t in homeaffairs_targets:
+            jobs.append((t["source_id"], run_homeaffairs_watch_and_persist, {
+                "url": t["url"],
+                "source_id": t["source_id"],
+                "canonical_url": t["canonical_url"],
+                "title": t.get("title"),
+                "fetch": lambda url, validators=None, **kw: self._call(
+                    self._fetch_homeaffairs(url, validators)
+                ),
+                "session": session,
+            }))
+        for t in datagov_targets:
+            jobs.append((t["dataset_id"], run_datagov_watch_and_persist, {
+                "dataset_id": t["dataset_id"],
+                "canonical_url": t["canonical_url"],
+                "title": t.get("title"),
+                "fetch": lambda dataset_id, validators=None, **kw: self._call(
+                    self._fetch_dataset_metadata(dataset_id, validators)
+                ),
+                "session": session,
+            }))
+        return jobs
+
+    async def _run_target(
+        self,
+        executor: ThreadPoolExecutor,
+        source_id: str,
+        pipeline: Callable[..., dict],
+        kwargs: dict,
+        on_result: Optional[Callable[[dict], None]],
+    ) -> dict:
+        try:
+            result = await self._loop.run_in_executor(
+                executor, functools.partial(pipeline, **kwargs)
+            )
+            entry = {"source_id": source_id, "ok": True, **result}
+        except EnvironmentError as exc:
+            entry = {"source_id": source_id, "ok": False, "error": str(exc), "fatal": True}
+        except Exception as exc:
+            entry = {"source_id": source_id, "ok": False, "error": str(exc), "fatal": False}
+        if on_result:
+            on_result(entry)
+        return entry
+
+    async def run(
+        self,
+        frl_targets: Iterable[dict] = (),
+        homeaffairs_targets: Iterable[dict] = (),
+        datagov_targets: Iterable[dict] = (),
+        on_result: Optional[Callable[[dict], None]] = None,
+    ) -> list[dict]:
+        """
+        Run every target concurrently and return results in input order.
+        *on_result* is called with each result dict as soon as it completes.
+        """
+        self._loop = asyncio.get_running_loop()
+        session = _BridgedSession(self)
+        if self.write_batch_size:
+            session = self.writer = db.WriteBehindSession(session, batch_size=self.write_batch_size)
+        jobs = self._jobs(frl_targets, homeaffairs_targets, datagov_targets, session)
+        if not jobs:
+            return []
+
+        workers = self.max_workers or min(len(jobs), MAX_WORKER_THREADS)
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
+            self._client = client
+            prev_docs = await self._prefetch_prev_docs(jobs)
+            for _, _, kwargs in jobs:
+                kwargs["prev_docs"] = prev_docs
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = await asyncio.gather(*(
+                    self._run_target(executor, source_id, pipeline, kwargs, on_result)
+                    for source_id, pipeline, kwargs in jobs
+                ))
+                if self.writer:
+                    # Bridged calls block on this loop — flush from a worker thread
+                    await self._loop.run_in_executor(executor, self.writer.close)
+                    self.writer.apply_failures(results)
+                return results
+
+
+def run_async(
+    frl_targets: Iterable[dict] = (),
+    homeaffairs_targets: Iterable[dict] = (),
+    datagov_targets: Iterable[dict] = (),
+    host_limits: Optional[dict[str, int]] = None,
+    on_result: Optional[Callable[[dict], None]] = None,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+    write_batch_size: Optional[int] = db.WRITE_BATCH_SIZE,
+) -> list[dict]:
+    """
+    Synchronous entry point: run all targets on a fresh event loop.
+    Pass *policy* to read its retry / throttle / trip counters afterwards.
+    """
+    runner = AsyncWatchRunner(host_limits=host_limits, policy=policy, write_batch_size=write_batch_size)
+    return asyncio.run(runner.run(
+        frl_targets, homeaffairs_targets, datagov_targets, on_result=on_result,
+    ))
@@ -16,12 +16,22 @@ import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import httpx
 
-from kangavisa_workers import db, impact_scorer
-from kangavisa_workers.frl_watcher import hash_content, snapshot
+from kangavisa_workers import db, fetch_policy, impact_scorer
+from kangavisa_workers.frl_watcher import (
+    conditional_headers,
+    conditional_result,
+    hash_content,
+    not_modified_result,
+    previous_content,
+    previous_source_doc,
+    refresh_validators,
+    snapshot,
+    stored_validators,
+)
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -35,20 +45,86 @@ DEFAULT_TIMEOUT = 30
 # Fetch helpers
 # ---------------------------------------------------------------------------
 
-def fetch_dataset_metadata(dataset_id: str, timeout: int = DEFAULT_TIMEOUT) -> dict:
+def fetch_dataset_metadata(
+    dataset_id: str,
+    timeout: int = DEFAULT_TIMEOUT,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+) -> dict:
     """
-    Fetch CKAN dataset metadata for *dataset_id*.
+    Fetch CKAN dataset metadata for *dataset_id* under *policy*
+    (default fetch_policy.DEFAULT_POLICY).
     Returns the `result` dict from the CKAN API response.
     Raises httpx.HTTPStatusError on 4xx/5xx.
     Raises KeyError if API returns success=false.
     """
-    with httpx.Client(timeout=timeout) as client:
+    def attempt() -> dict:
         resp = client.get(DATAGOV_CKAN_API, params={"id": dataset_id})
         resp.raise_for_status()
-        data = resp.json()
-        if not data.get("success"):
-            raise KeyError(f"CKAN API returned success=false for dataset_id={dataset_id}")
-        return data["result"]
+        return ckan_result(resp.json(), dataset_id)
+
+    with httpx.Client(timeout=timeout) as client:
+        return (policy or fetch_policy.DEFAULT_POLICY).call(DATAGOV_CKAN_API, attempt)
+
+
+def fetch_dataset_metadata_conditional(
+    dataset_id: str,
+    validators: Optional[dict] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+) -> dict:
+    """
+    Conditional GET of the CKAN metadata for *dataset_id*.
+
+    Returns::
+
+        {
+            "not_modified": bool,
+            "metadata": dict | None,     # CKAN `result` (None on 304)
+            "validators": dict,
+        }
+    """
+    def attempt() -> dict:
+        resp = client.get(
+            DATAGOV_CKAN_API,
+            params={"id": dataset_id},
+            headers=conditional_headers(validators),
+        )
+        return ckan_conditional_result(resp, dataset_id, validators)
+
+    with httpx.Client(timeout=timeout) as client:
+        return (policy or fetch_policy.DEFAULT_POLICY).call(DATAGOV_CKAN_API, attempt)
+
+
+def ckan_conditional_result(
+    resp: httpx.Response,
+    dataset_id: str,
+    validators: Optional[dict] = None,
+) -> dict:
+    """Interpret a conditional CKAN response (see fetch_dataset_metadata_conditional)."""
+    result = conditional_result(resp, validators)
+    return {
+        "not_modified": result["not_modified"],
+        "metadata": None if result["not_modified"] else ckan_result(resp.json(), dataset_id),
+        "validators": result["validators"],
+    }
+
+
+def ckan_result(data: dict, dataset_id: str) -> dict:
+    """
+    Unwrap a CKAN ``package_show`` response body.
+    Raises KeyError if API returns success=false.
+    """
+    if not data.get("success"):
+        raise KeyError(f"CKAN API returned success=false for dataset_id={dataset_id}")
+    return data["result"]
+
+
+def diff_view(metadata_bytes: bytes) -> bytes:
+    """
+    One-key-per-line rendering of snapshotted metadata JSON, so the
+    line-aligned diff in impact_scorer sees individual fields change.
+    """
+    return json.dumps(json.loads(metadata_bytes), indent=1, sort_keys=True).encode("utf-8")
 
 
 # ---------------------------------------------------------------------------
@@ -59,29 +135,43 @@ def run_datagov_watch_and_persist(
     dataset_id: str,
     canonical_url: str,
     title: Optional[str] = None,
+    fetch: Optional[Callable] = None,
+    session=None,
+    prev_docs: Optional[dict] = None,
 ) -> dict:
     """
     US-G1 | US-G2 | US-G4: Full data.gov.au ingestion pipeline.
 
-    1. Fetch CKAN dataset metadata
+    1. Conditional fetch of CKAN dataset metadata (304 → no change)
     2. Hash `metadata_modified` field for efficient change detection
     3. Snapshot full JSON to disk
     4. Score impact
     5. Insert source_document → source_doc_id (with metadata_json for US-G4)
     6. If changed: insert change_event → change_event_id
 
+    *fetch* / *session* override ``fetch_dataset_metadata_conditional`` and the ``db`` module
+    (see run_frl_watch_and_persist); *prev_docs* is the prefetched state map.
+
     Returns result dict (same shape as run_frl_watch_and_persist).
     """
-    prev_doc = db.get_latest_source_doc(canonical_url)
+    fetch = fetch or fetch_dataset_metadata_conditional
+    session = session or db
+
+    prev_doc = previous_source_doc(session, canonical_url, prev_docs)
     prev_hash = prev_doc["content_hash"] if prev_doc else None
     prev_doc_id = prev_doc["source_doc_id"] if prev_doc else None
 
-    metadata = fetch_dataset_metadata(dataset_id)
+    fetched = fetch(dataset_id, validators=stored_validators(prev_doc))
+    if fetched["not_modified"]:
+        return not_modified_result(prev_doc_id)
+
+    metadata = fetched["metadata"]
     metadata_bytes = json.dumps(metadata, sort_keys=True).encode("utf-8")
     curr_hash = hash_content(metadata_bytes)
 
     if prev_hash == curr_hash:
-        snap_meta = snapshot(metadata_bytes, f"datagov_{dataset_id}", SNAPSHOTS_DIR)
+        refresh_validators(session, prev_doc, fetched["validators"])
+        snap_meta = snapshot(metadata_bytes, f"datagov_{dataset_id}", SNAPSHOTS_DIR, content_hash=curr_hash)
         return {
             "source_doc_id": prev_doc_id,
             "change_event_id": None,
@@ -91,12 +181,17 @@ def run_datagov_watch_and_persist(
             "snapshot": snap_meta,
         }
 
-    snap_meta = snapshot(metadata_bytes, f"datagov_{dataset_id}", SNAPSHOTS_DIR)
-    score_result = impact_scorer.score(None, metadata_bytes, "DATAGOV_DATASET")
+    snap_meta = snapshot(metadata_bytes, f"datagov_{dataset_id}", SNAPSHOTS_DIR, content_hash=curr_hash)
+    prev_bytes = previous_content(prev_hash, SNAPSHOTS_DIR)
+    score_result = impact_scorer.score(
+        diff_view(prev_bytes) if prev_bytes is not None else None,
+        diff_view(metadata_bytes),
+        "DATAGOV_DATASET",
+    )
 
     now_iso = datetime.now(timezone.utc).isoformat()
     # US-G4: metadata_json records dataset_id + metadata_modified for reproducibility
-    source_doc_id = db.insert_source_document({
+    source_doc_id = session.insert_source_document({
         "source_type": "DATAGOV_DATASET",
         "title": title or metadata.get("title", f"data.gov.au: {dataset_id}"),
         "canonical_url": canonical_url,
@@ -107,11 +202,12 @@ def run_datagov_watch_and_persist(
             "dataset_id": dataset_id,
             "metadata_modified": metadata.get("metadata_modified"),
             "resource_count": len(metadata.get("resources", [])),
+            "validators": fetched["validators"],
         },
     })
 
     event_type = "new_instrument" if prev_hash is None else "dataset_update"
-    change_event_id = db.insert_change_event({
+    change_event_id = session.insert_change_event({
         "source_doc_id_new": source_doc_id,
         "source_doc_id_old": prev_doc_id,
         "change_type": event_type,
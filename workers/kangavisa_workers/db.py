@@ -7,6 +7,26 @@ US-G2 | FR-K4: change_event written with impact score + review gating.
 Uses httpx directly against the Supabase REST API with the service role key
 (bypasses RLS — appropriate for server-side ingestion workers only).
 
+Connections are pooled: a ``SupabaseSession`` keeps one keep-alive
+``httpx.Client`` (optionally HTTP/2) for its lifetime, so a run pays one
+TCP+TLS handshake rather than one per call.  The module-level functions
+delegate to a lazily created default session; pipelines can instead be
+handed an explicit session::
+
+    with db.SupabaseSession() as session:
+        run_frl_watch_and_persist(..., session=session)
+
+Write-behind: a ``WriteBehindSession`` wraps a session and buffers the
+source_document / change_event inserts of a run.  IDs are generated client
+side (UUID4), so a change_event can reference its source_document before
+either row is written; buffered rows go out in bulk — sources first, then
+events — when *batch_size* source documents are pending, when the oldest
+pending row is *flush_interval* seconds old, and when the session closes::
+
+    with db.SupabaseSession() as session, db.WriteBehindSession(session) as writer:
+        results = [run_frl_watch_and_persist(..., session=writer) for ...]
+    writer.apply_failures(results)   # targets whose rows did not land → transient failures
+
 Environment variables required:
     SUPABASE_URL              — e.g. https://xxxx.supabase.co
     SUPABASE_SERVICE_ROLE_KEY — secret key (sb_secret_...)
@@ -14,71 +34,118 @@ Environment variables required:
 
 from __future__ import annotations
 
+import atexit
+import logging
 import os
-from typing import Optional
+import threading
+import time
+import uuid
+from typing import Callable, Optional
 
 import httpx
 
+from kangavisa_workers.fetch_policy import FetchPolicy
+
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
 DEFAULT_TIMEOUT = 20  # seconds
+DEFAULT_MAX_CONNECTIONS = 10
+# canonical_urls per bulk lookup request — keeps the in.(...) query string
+# well under proxy URL-length limits.
+PREFETCH_BATCH_SIZE = 50
+# Newest source_document row per canonical_url (kb/migrations/source_document_latest_v1.sql)
+LATEST_SOURCE_DOC_VIEW = "vw_source_document_latest"
+# Write-behind defaults: source_documents per bulk flush, max seconds a row waits.
+WRITE_BATCH_SIZE = 25
+FLUSH_INTERVAL = 5.0
+# Flush retries go through a fetch_policy.FetchPolicy (jittered backoff,
+# Retry-After, per-host circuit breaker); its rate is headroom, not a throttle.
+FLUSH_RETRIES = 2
+FLUSH_BACKOFF = 0.5       # seconds; backoff ceiling doubles per retry
+FLUSH_RATE = 50.0         # bulk requests / second to the Supabase host
+# Bulk inserts carry client-generated primary keys, so a retried request that
+# already landed is a no-op instead of a duplicate.
+BULK_INSERT_PREFER = "return=minimal,resolution=ignore-duplicates"
 
+logger = logging.getLogger("db")
 
-def _headers() -> dict:
-    if not SUPABASE_URL or not SERVICE_ROLE_KEY:
+
+def _build_headers(url: str, key: str) -> dict:
+    if not url or not key:
         raise EnvironmentError(
             "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set."
         )
     return {
-        "apikey": SERVICE_ROLE_KEY,
-        "Authorization": f"Bearer {SERVICE_ROLE_KEY}",
+        "apikey": key,
+        "Authorization": f"Bearer {key}",
         "Content-Type": "application/json",
         "Prefer": "return=representation",
     }
 
 
+def _headers() -> dict:
+    return _build_headers(SUPABASE_URL, SERVICE_ROLE_KEY)
+
+
 def _rest(table: str) -> str:
     return f"{SUPABASE_URL}/rest/v1/{table}"
 
 
-# ---------------------------------------------------------------------------
-# source_document
-# ---------------------------------------------------------------------------
+SOURCE_DOC_STATE_COLUMNS = "source_doc_id,content_hash,retrieved_at,status,metadata_json"
 
-def get_latest_source_doc(canonical_url: str) -> Optional[dict]:
-    """
-    US-G1: Retrieve the most recent source_document row for *canonical_url*.
-    Returns the row dict (including content_hash) or None if not yet seen.
-    """
-    with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-        resp = client.get(
-            _rest("source_document"),
-            headers=_headers(),
-            params={
-                "canonical_url": f"eq.{canonical_url}",
-                "order": "retrieved_at.desc",
-                "limit": "1",
-                "select": "source_doc_id,content_hash,retrieved_at,status",
-            },
-        )
-        resp.raise_for_status()
-        rows = resp.json()
-        return rows[0] if rows else None
+
+def _latest_source_doc_params(canonical_url: str) -> dict:
+    return {
+        "canonical_url": f"eq.{canonical_url}",
+        "order": "retrieved_at.desc",
+        "limit": "1",
+        "select": SOURCE_DOC_STATE_COLUMNS,
+    }
 
 
-def insert_source_document(meta: dict) -> str:
-    """
-    US-G1: Insert a new source_document row.
+def _in_filter(values: list[str]) -> str:
+    """PostgREST ``in.(...)`` filter with every value double-quoted."""
+    quoted = ",".join(
+        '"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values
+    )
+    return f"in.({quoted})"
 
-    *meta* must include:
-        source_type, title, canonical_url, content_hash,
-        raw_blob_uri, retrieved_at, metadata_json (dict)
 
-    Returns the new source_doc_id (UUID string).
+def _latest_source_docs_params(canonical_urls: list[str]) -> dict:
+    # The view holds one row per URL, so a batch answers at most len(batch) rows.
+    return {
+        "canonical_url": _in_filter(canonical_urls),
+        "select": f"canonical_url,{SOURCE_DOC_STATE_COLUMNS}",
+        "limit": str(len(canonical_urls)),
+    }
+
+
+def _latest_by_url(canonical_urls: list[str], rows: list[dict]) -> dict:
+    """Map each of *canonical_urls* to its row from the latest view; unseen URLs map to None."""
+    latest: dict = {url: None for url in canonical_urls}
+    for row in rows:
+        latest[row.pop("canonical_url")] = row
+    return latest
+
+
+def _prefetched(canonical_urls: list[str], resp: httpx.Response) -> dict:
     """
+    ``{canonical_url: row | None}`` for one prefetch batch.  If the latest
+    view is not deployed (404) the batch is left out — "not prefetched" — so
+    the watchers fall back to one get_latest_source_doc() per URL.
+    """
+    if resp.status_code == 404:
+        logger.warning("%s not found — apply kb/migrations/source_document_latest_v1.sql; "
+                       "falling back to per-URL lookups", LATEST_SOURCE_DOC_VIEW)
+        return {}
+    resp.raise_for_status()
+    return _latest_by_url(canonical_urls, resp.json())
+
+
+def _source_document_payload(meta: dict) -> dict:
     payload = {
         "source_type": meta["source_type"],
         "title": meta["title"],
@@ -91,12 +158,444 @@ def insert_source_document(meta: dict) -> str:
     }
     if meta.get("effective_from"):
         payload["effective_from"] = meta["effective_from"]
+    return payload
+
+
+def _change_event_payload(event: dict) -> dict:
+    payload = {
+        "source_doc_id_new": event["source_doc_id_new"],
+        "change_type": event.get("change_type", "text_change"),
+        "impact_score": event["impact_score"],
+        "summary": event["summary"],
+        "requires_review": event["requires_review"],
+        "affected_visa_ids": event.get("affected_visa_ids", []),
+    }
+    if event.get("source_doc_id_old"):
+        payload["source_doc_id_old"] = event["source_doc_id_old"]
+    return payload
+
+
+def _uniform_batches(rows: list[dict]) -> list[list[dict]]:
+    """
+    Split *rows* into runs sharing one key set — a PostgREST bulk insert
+    takes its columns from the first object, so optional keys
+    (effective_from, source_doc_id_old) must not vary within a request.
+    """
+    batches: dict[tuple, list[dict]] = {}
+    for row in rows:
+        batches.setdefault(tuple(sorted(row)), []).append(row)
+    return list(batches.values())
+
+
+def _is_client_error(exc: Exception) -> bool:
+    """True for a 4xx response other than 429 — the request itself was rejected."""
+    return (
+        isinstance(exc, httpx.HTTPStatusError)
+        and 400 <= exc.response.status_code < 500
+        and exc.response.status_code != 429
+    )
+
+
+# ---------------------------------------------------------------------------
+# Pooled session
+# ---------------------------------------------------------------------------
+
+class SupabaseSession:
+    """
+    Keep-alive connection pool to the Supabase REST API.
+
+    *url* / *service_role_key* default to SUPABASE_URL / SERVICE_ROLE_KEY,
+    read at call time so the module config can still be changed after the
+    session is created.  Auth headers are built once per (url, key) pair.
+
+    Set *http2* to multiplex requests over one connection (requires the
+    ``h2`` package: ``pip install -e ".[http2]"``).
+    """
 
-    with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-        resp = client.post(_rest("source_document"), headers=_headers(), json=payload)
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        service_role_key: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ) -> None:
+        self._url = url
+        self._key = service_role_key
+        self._headers_cache: Optional[tuple[tuple[str, str], dict]] = None
+        self.client = httpx.Client(
+            timeout=timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def __enter__(self) -> "SupabaseSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.client.close()
+
+    @property
+    def url(self) -> str:
+        return self._url if self._url is not None else SUPABASE_URL
+
+    @property
+    def service_role_key(self) -> str:
+        return self._key if self._key is not None else SERVICE_ROLE_KEY
+
+    def headers(self) -> dict:
+        """Return the (cached) auth headers. Raises EnvironmentError if unset."""
+        config = (self.url, self.service_role_key)
+        if self._headers_cache is None or self._headers_cache[0] != config:
+            self._headers_cache = (config, _build_headers(*config))
+        return self._headers_cache[1]
+
+    def rest(self, table: str) -> str:
+        return f"{self.url}/rest/v1/{table}"
+
+    # -- source_document ----------------------------------------------------
+
+    def get_latest_source_doc(self, canonical_url: str) -> Optional[dict]:
+        """See module-level get_latest_source_doc()."""
+        resp = self.client.get(
+            self.rest("source_document"),
+            headers=self.headers(),
+            params=_latest_source_doc_params(canonical_url),
+        )
+        resp.raise_for_status()
+        rows = resp.json()
+        return rows[0] if rows else None
+
+    def get_latest_source_docs(self, canonical_urls: list[str]) -> dict:
+        """See module-level get_latest_source_docs()."""
+        urls = list(dict.fromkeys(canonical_urls))
+        latest: dict = {}
+        for i in range(0, len(urls), PREFETCH_BATCH_SIZE):
+            batch = urls[i:i + PREFETCH_BATCH_SIZE]
+            resp = self.client.get(
+                self.rest(LATEST_SOURCE_DOC_VIEW),
+                headers=self.headers(),
+                params=_latest_source_docs_params(batch),
+            )
+            latest.update(_prefetched(batch, resp))
+        return latest
+
+    def insert_source_document(self, meta: dict) -> str:
+        """See module-level insert_source_document()."""
+        resp = self.client.post(
+            self.rest("source_document"),
+            headers=self.headers(),
+            json=_source_document_payload(meta),
+        )
         resp.raise_for_status()
         return resp.json()[0]["source_doc_id"]
 
+    def update_source_document_metadata(self, source_doc_id: str, metadata_json: dict) -> None:
+        """See module-level update_source_document_metadata()."""
+        resp = self.client.patch(
+            self.rest("source_document"),
+            headers=self.headers(),
+            params={"source_doc_id": f"eq.{source_doc_id}"},
+            json={"metadata_json": metadata_json},
+        )
+        resp.raise_for_status()
+
+    # -- change_event -------------------------------------------------------
+
+    def insert_change_event(self, event: dict) -> str:
+        """See module-level insert_change_event()."""
+        resp = self.client.post(
+            self.rest("change_event"),
+            headers=self.headers(),
+            json=_change_event_payload(event),
+        )
+        resp.raise_for_status()
+        return resp.json()[0]["change_event_id"]
+
+    # -- bulk (write-behind) ------------------------------------------------
+
+    def insert_rows(self, table: str, rows: list[dict], on_conflict: str) -> int:
+        """
+        Bulk-insert *rows* (payload dicts carrying their own primary key
+        *on_conflict*) into *table*; rows whose key already exists are
+        skipped.  One request per distinct key set.  Returns requests made.
+        """
+        batches = _uniform_batches(rows)
+        for batch in batches:
+            resp = self.client.post(
+                self.rest(table),
+                headers={**self.headers(), "Prefer": BULK_INSERT_PREFER},
+                params={"on_conflict": on_conflict},
+                json=batch,
+            )
+            resp.raise_for_status()
+        return len(batches)
+
+
+_default_session: Optional[SupabaseSession] = None
+
+
+def default_session() -> SupabaseSession:
+    """Return the process-wide session used by the module-level functions."""
+    global _default_session
+    if _default_session is None:
+        _default_session = SupabaseSession()
+        atexit.register(_default_session.close)
+    return _default_session
+
+
+# ---------------------------------------------------------------------------
+# Write-behind buffer
+# ---------------------------------------------------------------------------
+
+class WriteBehindSession:
+    """
+    Session wrapper that buffers source_document / change_event inserts and
+    writes them in bulk (see module docstring).
+
+    *session* is any db-module lookalike that also has
+    ``insert_rows(table, rows, on_conflict)`` — a SupabaseSession, or the
+    async runner's bridged session.  Reads and metadata updates of rows
+    already written pass straight through; insert_* return the client-side
+    UUID at once.
+
+    Bulk requests run under *policy* (default: a FetchPolicy allowing
+    *retries* retries of 429 / 5xx / transport errors, honouring
+    Retry-After and failing fast while the Supabase host's circuit is open).
+    Each uniform batch (one request) succeeds or fails on its own, and a
+    batch rejected with a 4xx is bisected down to the offending rows.
+    A flush never raises: rows that could not be written are recorded in ``failed``
+    as ``{row_id: (error, fatal)}`` — change_events of a failed
+    source_document included — and apply_failures() turns the affected
+    result dicts into transient (or, for missing secrets, fatal) failures.
+    Thread-safe; flushes are serialised so sources always land before the
+    events that reference them.
+
+    ``stats``::
+
+        {"source_documents": int, "change_events": int, "requests": int, "flushes": int}
+    """
+
+    def __init__(
+        self,
+        session,
+        batch_size: int = WRITE_BATCH_SIZE,
+        flush_interval: Optional[float] = FLUSH_INTERVAL,
+        retries: int = FLUSH_RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+        policy: Optional[FetchPolicy] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        self.session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy or FetchPolicy(
+            default_rate=FLUSH_RATE, burst=int(FLUSH_RATE),
+            max_retries=retries, backoff_base=FLUSH_BACKOFF, sleep=sleep,
+        )
+        self.failed: dict[str, tuple[str, bool]] = {}
+        self.stats = {"source_documents": 0, "change_events": 0, "requests": 0, "flushes": 0}
+        self._sources: dict[str, dict] = {}      # source_doc_id → payload, insertion order
+        self._events: list[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __enter__(self) -> "WriteBehindSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flush everything still buffered (run end)."""
+        self.flush()
+
+    # -- pass-through reads -------------------------------------------------
+
+    def get_latest_source_doc(self, canonical_url: str) -> Optional[dict]:
+        return self.session.get_latest_source_doc(canonical_url)
+
+    def get_latest_source_docs(self, canonical_urls: list[str]) -> dict:
+        return self.session.get_latest_source_docs(canonical_urls)
+
+    # -- buffered writes ----------------------------------------------------
+
+    def insert_source_document(self, meta: dict) -> str:
+        source_doc_id = str(uuid.uuid4())
+        with self._lock:
+            self._sources[source_doc_id] = {
+                "source_doc_id": source_doc_id, **_source_document_payload(meta),
+            }
+            full = len(self._sources) >= self.batch_size
+            self._arm_timer()
+        if full:
+            self.flush()
+        return source_doc_id
+
+    def insert_change_event(self, event: dict) -> str:
+        change_event_id = str(uuid.uuid4())
+        with self._lock:
+            self._events.append({"change_event_id": change_event_id, **_change_event_payload(event)})
+            self._arm_timer()
+        return change_event_id
+
+    def update_source_document_metadata(self, source_doc_id: str, metadata_json: dict) -> None:
+        with self._lock:
+            pending = self._sources.get(source_doc_id)
+            if pending is not None:
+                pending["metadata_json"] = metadata_json
+                return
+        self.session.update_source_document_metadata(source_doc_id, metadata_json)
+
+    def pending(self) -> int:
+        """Rows buffered and not yet flushed."""
+        with self._lock:
+            return len(self._sources) + len(self._events)
+
+    # -- flushing -----------------------------------------------------------
+
+    def _arm_timer(self) -> None:
+        """Start the flush_interval timer for the oldest pending row (lock held)."""
+        if self.flush_interval is None or self._timer is not None:
+            return
+        self._timer = threading.Timer(self.flush_interval, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _write(self, table: str, rows: list[dict], on_conflict: str) -> None:
+        url = f"{getattr(self.session, 'url', None) or SUPABASE_URL}/rest/v1/{table}"
+        self.stats["requests"] += self.policy.call(
+            url, lambda: self.session.insert_rows(table, rows, on_conflict),
+        )
+
+    def _write_rows(self, table: str, rows: list[dict], key: str) -> int:
+        """Write *rows* one uniform batch at a time; returns rows written (failures go to ``failed``)."""
+        return sum(self._write_batch(table, batch, key) for batch in _uniform_batches(rows))
+
+    def _write_batch(self, table: str, batch: list[dict], key: str) -> int:
+        """
+        Write one batch.  A client error (4xx other than 429 — e.g. a 409 on
+        source_document's (canonical_url, content_hash) when a page reverts
+        to earlier content) is bisected so only the offending rows fail;
+        anything else fails the batch.  Earlier batches stay written.
+        """
+        try:
+            self._write(table, batch, key)
+            return len(batch)
+        except Exception as exc:
+            if len(batch) > 1 and _is_client_error(exc):
+                mid = len(batch) // 2
+                return self._write_batch(table, batch[:mid], key) + self._write_batch(table, batch[mid:], key)
+            logger.warning("%s flush of %d rows failed: %s", table, len(batch), exc)
+            for row in batch:
+                self.failed[row[key]] = (str(exc), isinstance(exc, EnvironmentError))
+            return 0
+
+    def flush(self) -> int:
+        """Write every buffered row now.  Returns rows written (failures go to ``failed``)."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                sources, self._sources = list(self._sources.values()), {}
+                events, self._events = self._events, []
+            if not sources and not events:
+                return 0
+            self.stats["flushes"] += 1
+            written = 0
+
+            if sources:
+                count = self._write_rows("source_document", sources, "source_doc_id")
+                self.stats["source_documents"] += count
+                written += count
+
+            lost = [e for e in events if e["source_doc_id_new"] in self.failed]
+            for event in lost:
+                self.failed[event["change_event_id"]] = self.failed[event["source_doc_id_new"]]
+            events = [e for e in events if e["source_doc_id_new"] not in self.failed]
+            if events:
+                count = self._write_rows("change_event", events, "change_event_id")
+                self.stats["change_events"] += count
+                written += count
+            return written
+
+    def apply_failures(self, results: list[dict]) -> int:
+        """
+        Mark run_watchers result dicts whose source_document or change_event
+        was not written as failed.  Returns how many were changed.
+        """
+        marked = 0
+        for entry in results:
+            if not entry.get("ok"):
+                continue
+            for key in ("source_doc_id", "change_event_id"):
+                failure = self.failed.get(entry.get(key) or "")
+                if failure:
+                    entry.update(ok=False, error=f"write-behind flush failed: {failure[0]}", fatal=failure[1])
+                    marked += 1
+                    break
+        return marked
+
+
+# ---------------------------------------------------------------------------
+# source_document
+# ---------------------------------------------------------------------------
+
+def get_latest_source_doc(canonical_url: str) -> Optional[dict]:
+    """
+    US-G1: Retrieve the most recent source_document row for *canonical_url*.
+    Returns the row dict (including content_hash and metadata_json, which
+    carries the HTTP validators for conditional GET) or None if not yet seen.
+    """
+    return default_session().get_latest_source_doc(canonical_url)
+
+
+def get_latest_source_docs(canonical_urls: list[str]) -> dict:
+    """
+    US-G1: Bulk form of get_latest_source_doc() for a whole run.
+
+    Reads the newest row for every URL in *canonical_urls* from
+    LATEST_SOURCE_DOC_VIEW (DISTINCT ON canonical_url, so history never
+    inflates or truncates the answer) with one ``canonical_url=in.(...)``
+    request per PREFETCH_BATCH_SIZE URLs, and returns
+    ``{canonical_url: row | None}``.  URLs of a batch that could not be
+    prefetched (view not deployed) are absent, and the watchers treat a
+    missing entry as "not prefetched".
+    """
+    return default_session().get_latest_source_docs(canonical_urls)
+
+
+def insert_source_document(meta: dict) -> str:
+    """
+    US-G1: Insert a new source_document row.
+
+    *meta* must include:
+        source_type, title, canonical_url, content_hash,
+        raw_blob_uri, retrieved_at, metadata_json (dict)
+
+    Returns the new source_doc_id (UUID string).
+    """
+    return default_session().insert_source_document(meta)
+
+
+def update_source_document_metadata(source_doc_id: str, metadata_json: dict) -> None:
+    """
+    Replace metadata_json on an existing source_document row.
+
+    Used when content is unchanged but the upstream issued new HTTP
+    validators (ETag / Last-Modified) that the next run should send.
+    """
+    default_session().update_source_document_metadata(source_doc_id, metadata_json)
+
 
 # ---------------------------------------------------------------------------
 # change_event
@@ -114,18 +613,4 @@ def insert_change_event(event: dict) -> str:
 
     Returns the new change_event_id (UUID string).
     """
-    payload = {
-        "source_doc_id_new": event["source_doc_id_new"],
-        "change_type": event.get("change_type", "text_change"),
-        "impact_score": event["impact_score"],
-        "summary": event["summary"],
-        "requires_review": event["requires_review"],
-        "affected_visa_ids": event.get("affected_visa_ids", []),
-    }
-    if event.get("source_doc_id_old"):
-        payload["source_doc_id_old"] = event["source_doc_id_old"]
-
-    with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-        resp = client.post(_rest("change_event"), headers=_headers(), json=payload)
-        resp.raise_for_status()
-        return resp.json()[0]["change_event_id"]
+    return default_session().insert_change_event(event)
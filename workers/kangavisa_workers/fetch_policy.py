@@ -0,0 +1,372 @@
+"""
+fetch_policy.py — Shared rate limit / retry / circuit-breaker layer for watcher fetches.
+
+US-G1 | FR-K4: Keep ingestion runs reliable (and polite) as the target list
+grows and fetches run concurrently.
+
+Every upstream fetch (frl_watcher.fetch_frl*, homeaffairs_watcher.fetch_homeaffairs*,
+datagov_watcher.fetch_dataset_metadata* and the async runner's equivalents)
+goes through a FetchPolicy, which applies per host:
+
+  token bucket    — at most *rate* requests/second with bursts of *burst*;
+                    callers sleep for their slot instead of drawing a 429
+  retry + backoff — 429 / 5xx responses and transport errors (timeouts,
+                    resets) are retried up to *max_retries* times after
+                    full-jitter exponential backoff, or exactly the
+                    Retry-After the server asked for (seconds or HTTP date),
+                    which also pauses the host's bucket for everyone
+  circuit breaker — *failure_threshold* consecutive retryable failures open
+                    the circuit: calls fail fast with CircuitOpenError for
+                    *cooldown* seconds, then one probe is let through
+                    (half-open) and its outcome closes or re-opens it
+
+Other errors (404, CKAN success=false, …) are raised at once and count as
+the host being up.  A fetch is wrapped as one *attempt* callable that
+performs the request and raises on failure, so streaming bodies are retried
+from scratch::
+
+    policy = FetchPolicy(rates={"legislation.gov.au": 1.0})
+    content = policy.call(url, lambda: fetch_once(url))
+    await policy.acall(url, lambda: afetch_once(url))
+    policy.stats()   # {host: {"requests", "retries", "throttled", "throttle_seconds",
+                     #         "trips", "rejected", "state"}}
+
+DEFAULT_POLICY is shared by the synchronous fetch functions, so one
+process's sequential run (and run_watchers' summary) sees every host's
+counters; queue worker processes each hold their own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlparse
+
+import httpx
+
+T = TypeVar("T")
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+# Requests/second per upstream.  Keys match the host itself or any subdomain
+# of it ("legislation.gov.au" also covers "www.legislation.gov.au").
+DEFAULT_HOST_RATES: dict[str, float] = {
+    "legislation.gov.au": 2.0,
+    "immi.homeaffairs.gov.au": 4.0,
+    "data.gov.au": 4.0,
+}
+DEFAULT_RATE = 4.0            # any host not listed above
+DEFAULT_BURST = 4             # requests allowed back to back before the rate applies
+
+MAX_RETRIES = 3               # retries per fetch after the first attempt
+BACKOFF_BASE = 1.0            # seconds; the jitter ceiling doubles per retry
+BACKOFF_CAP = 30.0
+MAX_RETRY_AFTER = 120.0       # a longer Retry-After gives up instead of stalling the run
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+FAILURE_THRESHOLD = 5         # consecutive retryable failures that open the circuit
+COOLDOWN_SECONDS = 60.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching while a host's circuit is open (a transient error)."""
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for 429 / 5xx responses and transport errors (timeouts, connection resets)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, httpx.TransportError)
+
+
+def retry_after_seconds(resp, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Seconds asked for by *resp*'s Retry-After header — delta-seconds or an
+    HTTP date — or None when absent or unparseable.
+    """
+    value = (resp.headers.get("retry-after") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+# ---------------------------------------------------------------------------
+# Token bucket + circuit breaker (one of each per host)
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """
+    Reservation-style token bucket: reserve() always takes a token and
+    returns how long the caller must wait for it, so concurrent callers
+    queue up in order without holding a lock while they sleep.
+    """
+
+    def __init__(self, rate: float, burst: int, now: float) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"rate must be > 0 and burst >= 1, got {rate}, {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take one token; return the seconds until it is available (0 if now)."""
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= 1
+        ready = self.updated + max(0.0, -self.tokens) / self.rate
+        return max(0.0, ready - now)
+
+    def pause(self, now: float, seconds: float) -> None:
+        """
+        Hand out no tokens for *seconds* (the server sent Retry-After), then
+        at most one at once — for the retry — before the rate applies again.
+        """
+        until = now + seconds
+        if until > self.updated:
+            self.tokens = min(self.tokens, 1.0)
+            self.updated = until
+
+
+class CircuitBreaker:
+    """Closed → open after *threshold* consecutive failures → half-open after *cooldown*."""
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self, now: float) -> bool:
+        """May a request go out now?  Lets exactly one probe through once cooled down."""
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.state == HALF_OPEN:
+            if self.probing:
+                return False
+            self.probing = True
+            return True
+        return self.state == CLOSED
+
+    def retry_in(self, now: float) -> float:
+        return max(0.0, self.opened_at + self.cooldown - now)
+
+    def success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def failure(self, now: float) -> bool:
+        """Record a failure; return True if it opened the circuit."""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.state = OPEN
+            self.opened_at = now
+            self.probing = False
+            return True
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Policy
+# ---------------------------------------------------------------------------
+
+class FetchPolicy:
+    """
+    Per-host rate limit, retry and circuit breaker around fetch attempts.
+
+    *rates* is merged over DEFAULT_HOST_RATES.  *clock* (monotonic seconds),
+    *sleep* and *rng* are injectable for tests; the async path sleeps with
+    asyncio.sleep.  Thread-safe: one policy may serve the async runner's
+    worker threads and the sequential runner alike.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[dict[str, float]] = None,
+        default_rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_cap: float = BACKOFF_CAP,
+        max_retry_after: float = MAX_RETRY_AFTER,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.rates = {**DEFAULT_HOST_RATES, **(rates or {})}
+        self.default_rate = default_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._stats: dict[str, dict] = {}
+
+    # -- per-host state -----------------------------------------------------
+
+    def host_key(self, url: str) -> str:
+        """Configured rate key covering *url*'s host, else the host itself."""
+        host = urlparse(url).hostname or ""
+        for key in self.rates:
+            if host == key or host.endswith("." + key):
+                return key
+        return host
+
+    def _host(self, key: str) -> tuple[TokenBucket, CircuitBreaker, dict]:
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(self.rates.get(key, self.default_rate), self.burst, self.clock())
+            self._breakers[key] = CircuitBreaker(self.failure_threshold, self.cooldown)
+            self._stats[key] = {
+                "requests": 0, "retries": 0, "throttled": 0,
+                "throttle_seconds": 0.0, "trips": 0, "rejected": 0,
+            }
+        return self._buckets[key], self._breakers[key], self._stats[key]
+
+    def stats(self) -> dict[str, dict]:
+        """Counters per host key, plus the circuit state."""
+        with self._lock:
+            return {
+                key: {**stats, "throttle_seconds": round(stats["throttle_seconds"], 3),
+                      "state": self._breakers[key].state}
+                for key, stats in self._stats.items()
+            }
+
+    # -- attempt bookkeeping ------------------------------------------------
+
+    def _before(self, key: str) -> float:
+        """Admit one attempt: raise if the circuit is open, else return the throttle wait."""
+        with self._lock:
+            bucket, breaker, stats = self._host(key)
+            now = self.clock()
+            if not breaker.allow(now):
+                stats["rejected"] += 1
+                raise CircuitOpenError(
+                    f"Circuit open for {key} after {breaker.failures} consecutive failures "
+                    f"(retry in {breaker.retry_in(now):.0f}s)"
+                )
+            stats["requests"] += 1
+            wait = bucket.reserve(now)
+            if wait > 0:
+                stats["throttled"] += 1
+                stats["throttle_seconds"] += wait
+            return wait
+
+    def _succeeded(self, key: str) -> None:
+        with self._lock:
+            self._breakers[key].success()
+
+    def _retry_delay(self, key: str, attempt: int, exc: Exception) -> Optional[float]:
+        """Record a failed *attempt* (1-based); return the delay before the next, or None to give up."""
+        with self._lock:
+            bucket, breaker, stats = self._host(key)
+            if not is_retryable(exc):
+                breaker.success()          # the host answered
+                return None
+            now = self.clock()
+            if breaker.failure(now):
+                stats["trips"] += 1
+                return None
+            if attempt > self.max_retries:
+                return None
+            response = getattr(exc, "response", None) if isinstance(exc, httpx.HTTPStatusError) else None
+            retry_after = retry_after_seconds(response) if response is not None else None
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                bucket.pause(now, retry_after)
+                delay = retry_after
+            else:
+                ceiling = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+                delay = self.rng.uniform(0, ceiling)
+            stats["retries"] += 1
+            return delay
+
+    # -- entry points -------------------------------------------------------
+
+    def call(self, url: str, attempt: Callable[[], T]) -> T:
+        """Run *attempt* (one request to *url*, raising on failure) under the policy."""
+        key = self.host_key(url)
+        tries = 0
+        while True:
+            tries += 1
+            wait = self._before(key)
+            if wait:
+                self.sleep(wait)
+            try:
+                result = attempt()
+            except Exception as exc:
+                delay = self._retry_delay(key, tries, exc)
+                if delay is None:
+                    raise
+                self.sleep(delay)
+                continue
+            self._succeeded(key)
+            return result
+
+    async def acall(self, url: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Async counterpart of call(): *attempt* returns a fresh awaitable each time."""
+        key = self.host_key(url)
+        tries = 0
+        while True:
+            tries += 1
+            wait = self._before(key)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                result = await attempt()
+            except Exception as exc:
+                delay = self._retry_delay(key, tries, exc)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._succeeded(key)
+            return result
+
+
+def format_stats(stats: dict[str, dict]) -> list[str]:
+    """One summary line per host for run_watchers' report."""
+    return [
+        f"{key}: {s['requests']} requests · {s['retries']} retries · "
+        f"{s['throttled']} throttled ({s['throttle_seconds']:.1f}s) · "
+        f"{s['trips']} circuit trips · {s['rejected']} rejected · {s['state']}"
+        for key, s in sorted(stats.items())
+    ]
+
+
+DEFAULT_POLICY = FetchPolicy()
@@ -0,0 +1,435 @@
+"""
+flag_rules.py — Compiled, column-wise evaluator for kb/rules/flag_detection_rules.json.
+
+US-G2 | FR-K3: deterministic rules (R001–R032) map intake / case signals to
+readiness flag codes.  Rules generate risk indicators, not determinations.
+
+    engine = load_engine()                       # compiled once per file mtime
+    engine.evaluate(records, subclass="600")     # [frozenset({"RF_…"}), ...]
+    engine.evaluate_columns(columns, subclass)   # same, from {field: sequence}
+    engine.evaluate_record(record, "600")        # one record
+
+Compilation turns every rule into a predicate tree (leaf comparisons joined
+by "all" / "any") and builds per-subclass predicate tables (``tables``;
+applies_to "all" rules are in every table).  A batch is evaluated rule by
+rule over whole columns rather than record by record:
+
+  numpy backend   each field becomes one float array (None → NaN) or object
+                  array; a rule is a handful of vectorised compares ANDed
+                  with its subclass mask, and hits are OR-ed into a per-record
+                  uint64 bitmask (one bit per flag or rule id)
+  python backend  rows are bucketed by subclass once; each rule scans only
+                  the rows its applies_to covers, narrowing the candidate
+                  rows leaf by leaf through an "all"
+
+Bitmasks decode to shared frozensets, one per distinct combination.  numpy
+is optional (``pip install -e ".[numpy]"``); without it the python backend
+is used.
+
+Missing values (absent field, None or NaN) never satisfy a comparison, so
+unknown data raises no flag.  Ordered comparisons (< <= > >=) only match
+two numbers (bools count as 0 / 1); any other pairing — a string such as
+"100", a list — is incomparable and does not match either.  Both backends
+apply the same rule (compare()).
+"""
+
+from __future__ import annotations
+
+import json
+import numbers
+import operator
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency — fall back to the python backend
+    np = None
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+RULES_PATH = Path(__file__).parent.parent.parent / "kb" / "rules" / "flag_detection_rules.json"
+SUBCLASS_FIELD = "subclass"
+ALL_SUBCLASSES = "all"
+BACKENDS = ("numpy", "python")
+DEFAULT_BACKEND = "numpy" if np is not None else "python"
+MAX_BITMASK_KEYS = 64             # flags / rule ids per uint64 bitmask
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+ORDERED_OPERATORS = frozenset({">", ">=", "<", "<="})
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+def compile_condition(condition: Mapping) -> tuple:
+    """
+    Compile a rule condition into a predicate tree::
+
+        ("value", field, op, constant)
+        ("field", left_field, op, right_field)
+        ("all", (child, ...)) | ("any", (child, ...))
+
+    Raises ValueError for unknown operators or condition shapes.
+    """
+    for combinator in ("all", "any"):
+        if combinator in condition:
+            children = tuple(compile_condition(c) for c in condition[combinator])
+            if not children:
+                raise ValueError(f"Empty {combinator!r} condition")
+            return (combinator, children)
+
+    op = condition.get("operator")
+    if op not in OPERATORS:
+        raise ValueError(f"Unknown operator {op!r} in condition {condition}")
+    if "field" in condition and "value" in condition:
+        return ("value", condition["field"], op, condition["value"])
+    if "left_field" in condition and "right_field" in condition:
+        return ("field", condition["left_field"], op, condition["right_field"])
+    raise ValueError(f"Unrecognised condition shape: {condition}")
+
+
+def condition_fields(tree: tuple) -> set[str]:
+    """Fields read by a compiled predicate tree."""
+    if tree[0] in ("all", "any"):
+        return set().union(*(condition_fields(child) for child in tree[1]))
+    if tree[0] == "value":
+        return {tree[1]}
+    return {tree[1], tree[3]}
+
+
+class CompiledRule:
+    """One rule: id, flag code, predicate tree and applies_to scope."""
+
+    __slots__ = ("rule_id", "flag", "tree", "applies_to", "fields")
+
+    def __init__(self, rule: Mapping) -> None:
+        self.rule_id: str = rule["id"]
+        self.flag: str = rule["flag"]
+        self.tree = compile_condition(rule["condition"])
+        applies = [str(code) for code in rule.get("applies_to") or []]
+        # None = every subclass
+        self.applies_to: Optional[frozenset[str]] = (
+            None if ALL_SUBCLASSES in applies else frozenset(applies)
+        )
+        self.fields = frozenset(condition_fields(self.tree))
+
+    def applies(self, subclass: str) -> bool:
+        return self.applies_to is None or subclass in self.applies_to
+
+
+# ---------------------------------------------------------------------------
+# Comparison semantics (shared by both backends)
+# ---------------------------------------------------------------------------
+
+def _missing(value: Any) -> bool:
+    return value is None or value != value     # NaN != NaN
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, numbers.Real)
+
+
+def compare(op: str, left: Any, right: Any) -> bool:
+    """
+    One leaf comparison.  False when either side is missing, or when an
+    ordered operator meets a non-numeric value — never a TypeError.
+    """
+    if _missing(left) or _missing(right):
+        return False
+    if op in ORDERED_OPERATORS and not (_is_number(left) and _is_number(right)):
+        return False
+    return bool(OPERATORS[op](left, right))
+
+
+# ---------------------------------------------------------------------------
+# Python backend
+# ---------------------------------------------------------------------------
+
+def _py_record(tree: tuple, record: Mapping) -> bool:
+    kind = tree[0]
+    if kind == "all":
+        return all(_py_record(child, record) for child in tree[1])
+    if kind == "any":
+        return any(_py_record(child, record) for child in tree[1])
+    right = tree[3] if kind == "value" else record.get(tree[3])
+    return compare(tree[2], record.get(tree[1]), right)
+
+
+def _py_rows(tree: tuple, columns: Mapping[str, Sequence], rows: list[int]) -> list[int]:
+    """Subset of *rows* (indices) satisfying *tree*."""
+    kind = tree[0]
+    if kind == "all":
+        for child in tree[1]:
+            if not rows:
+                break
+            rows = _py_rows(child, columns, rows)
+        return rows
+    if kind == "any":
+        hit: set[int] = set()
+        for child in tree[1]:
+            hit.update(_py_rows(child, columns, rows))
+        return [i for i in rows if i in hit]
+
+    op = tree[2]
+    left = columns.get(tree[1])
+    if left is None:
+        return []
+    if kind == "value":
+        constant = tree[3]
+        if _missing(constant):
+            return []
+        return [i for i in rows if compare(op, left[i], constant)]
+    right = columns.get(tree[3])
+    if right is None:
+        return []
+    return [i for i in rows if compare(op, left[i], right[i])]
+
+
+# ---------------------------------------------------------------------------
+# numpy backend
+# ---------------------------------------------------------------------------
+
+def _np_column(values: Sequence):
+    """
+    (array, present-mask) for a column: float with NaN for None when every
+    value is a number or None, else object (strings are never coerced, so
+    "100" stays incomparable as in the python backend).
+    """
+    values = list(values)
+    if all(v is None or _is_number(v) for v in values):
+        array = np.array([np.nan if v is None else v for v in values], dtype=float)
+        return array, ~np.isnan(array)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array, np.array([not _missing(v) for v in values], dtype=bool)
+
+
+def _np_mask(tree: tuple, arrays: dict, n: int):
+    kind = tree[0]
+    if kind in ("all", "any"):
+        masks = [_np_mask(child, arrays, n) for child in tree[1]]
+        combine = np.logical_and if kind == "all" else np.logical_or
+        return combine.reduce(masks)
+
+    op = OPERATORS[tree[2]]
+    if tree[1] not in arrays or _missing(tree[3]):
+        return np.zeros(n, dtype=bool)
+    left, present = arrays[tree[1]]
+    if kind == "value":
+        right = tree[3]
+    elif tree[3] in arrays:
+        right, right_present = arrays[tree[3]]
+        present = present & right_present
+    else:
+        return np.zeros(n, dtype=bool)
+
+    if left.dtype.kind == "f" and (right.dtype.kind == "f" if kind == "field" else _is_number(right)):
+        with np.errstate(invalid="ignore"):
+            return np.asarray(op(left, right), dtype=bool) & present
+    # object columns (or a non-numeric constant): compare() each present value
+    result = np.zeros(n, dtype=bool)
+    for i in np.flatnonzero(present):
+        result[i] = compare(tree[2], left[i], right if kind == "value" else right[i])
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+SubclassArg = Union[str, Sequence[str], None]
+
+
+class RuleEngine:
+    """
+    Compiled rule set.  *backend* is "numpy" or "python" (default: numpy
+    when installed).
+
+    Attributes::
+
+        rules    list[CompiledRule]            # file order
+        tables   {subclass: [CompiledRule]}    # per-subclass predicate tables
+        fields   frozenset[str]                # every field any rule reads
+        flags    list[str]                     # distinct flag codes, sorted
+    """
+
+    def __init__(self, rules: Iterable[Mapping], backend: Optional[str] = None) -> None:
+        backend = backend or DEFAULT_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+        if backend == "numpy" and np is None:
+            raise ImportError("numpy backend requested but numpy is not installed")
+        self.backend = backend
+        self.rules = [CompiledRule(rule) for rule in rules]
+        self.fields = frozenset().union(*(rule.fields for rule in self.rules))
+        self.flags = sorted({rule.flag for rule in self.rules})
+
+        subclasses = sorted({code for rule in self.rules if rule.applies_to for code in rule.applies_to})
+        self._universal = [rule for rule in self.rules if rule.applies_to is None]
+        self.tables: dict[str, list[CompiledRule]] = {
+            code: [rule for rule in self.rules if rule.applies(code)] for code in subclasses
+        }
+
+    def table(self, subclass: str) -> list[CompiledRule]:
+        """Predicate table for *subclass* (only applies_to "all" rules if unlisted)."""
+        return self.tables.get(str(subclass), self._universal)
+
+    # -- single record -------------------------------------------------------
+
+    def evaluate_record(self, record: Mapping, subclass: Optional[str] = None, by: str = "flag") -> frozenset:
+        """Flags (or rule ids, ``by="rule"``) raised by one record."""
+        subclass = str(subclass if subclass is not None else record.get(SUBCLASS_FIELD, ""))
+        key = _key_getter(by)
+        return frozenset(key(rule) for rule in self.table(subclass) if _py_record(rule.tree, record))
+
+    # -- batches -------------------------------------------------------------
+
+    def evaluate(self, records: Sequence[Mapping], subclass: SubclassArg = None, by: str = "flag") -> list[frozenset]:
+        """
+        Flags (or rule ids) raised by each of *records*, in order.  The
+        subclass is *subclass* (one code for the batch, or one per record),
+        else each record's "subclass" field.
+        """
+        if subclass is None:
+            subclass = [str(record.get(SUBCLASS_FIELD, "")) for record in records]
+        columns = {field: [record.get(field) for record in records] for field in self.fields}
+        return self.evaluate_columns(columns, subclass, n=len(records), by=by)
+
+    def evaluate_columns(
+        self,
+        columns: Mapping[str, Sequence],
+        subclass: SubclassArg,
+        n: Optional[int] = None,
+        by: str = "flag",
+    ) -> list[frozenset]:
+        """
+        Column-wise form of evaluate(): *columns* maps field → per-record
+        values (lists, or numpy arrays with NaN for missing on the numpy
+        backend).  Absent columns are all-missing.
+        """
+        if n is None:
+            if isinstance(subclass, str) or subclass is None:
+                n = len(next(iter(columns.values()))) if columns else 0
+            else:
+                n = len(subclass)
+        key = _key_getter(by)
+        keys = sorted({key(rule) for rule in self.rules})
+        if len(keys) > MAX_BITMASK_KEYS:
+            raise ValueError(f"{len(keys)} distinct {by} keys exceed the {MAX_BITMASK_KEYS}-bit mask")
+        bit_of = {k: i for i, k in enumerate(keys)}
+
+        if self.backend == "numpy":
+            masks = self._numpy_bitmasks(columns, subclass, n, key, bit_of)
+            return _decode_numpy(masks, keys)
+        masks = self._python_bitmasks(columns, subclass, n, key, bit_of)
+        return _decode(masks, keys)
+
+    def _python_bitmasks(self, columns, subclass, n, key, bit_of) -> list[int]:
+        if isinstance(subclass, str):
+            buckets = {subclass: list(range(n))}
+        else:
+            buckets = {}
+            for i, code in enumerate(subclass):
+                buckets.setdefault(str(code), []).append(i)
+
+        masks = [0] * n
+        for rule in self.rules:
+            rows: list[int] = []
+            for code, bucket in buckets.items():
+                if rule.applies(code):
+                    rows.extend(bucket)
+            if not rows:
+                continue
+            bit = 1 << bit_of[key(rule)]
+            for i in _py_rows(rule.tree, columns, rows):
+                masks[i] |= bit
+        return masks
+
+    def _numpy_bitmasks(self, columns, subclass, n, key, bit_of):
+        arrays = {}
+        for field in self.fields:
+            if field in columns:
+                values = columns[field]
+                if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+                    arrays[field] = (values, ~np.isnan(values))
+                else:
+                    arrays[field] = _np_column(values)
+        codes = None if isinstance(subclass, str) else np.asarray([str(c) for c in subclass], dtype=object)
+
+        scope_cache: dict = {}
+        masks = np.zeros(n, dtype=np.uint64)
+        for rule in self.rules:
+            if rule.applies_to is None:
+                scope = True
+            elif codes is None:
+                if subclass not in rule.applies_to:
+                    continue
+                scope = True
+            else:
+                if rule.applies_to not in scope_cache:
+                    scope_cache[rule.applies_to] = np.isin(codes, list(rule.applies_to))
+                scope = scope_cache[rule.applies_to]
+                if not scope.any():
+                    continue
+            hit = _np_mask(rule.tree, arrays, n) & scope
+            masks |= hit.astype(np.uint64) << np.uint64(bit_of[key(rule)])
+        return masks
+
+
+def _key_getter(by: str):
+    if by == "flag":
+        return operator.attrgetter("flag")
+    if by == "rule":
+        return operator.attrgetter("rule_id")
+    raise ValueError(f"by must be 'flag' or 'rule', not {by!r}")
+
+
+def _decode(masks: Sequence[int], keys: list[str]) -> list[frozenset]:
+    decoded: dict[int, frozenset] = {}
+    out = []
+    for mask in masks:
+        found = decoded.get(mask)
+        if found is None:
+            found = decoded[mask] = frozenset(k for i, k in enumerate(keys) if mask >> i & 1)
+        out.append(found)
+    return out
+
+
+def _decode_numpy(masks, keys: list[str]) -> list[frozenset]:
+    unique, inverse = np.unique(masks, return_inverse=True)
+    sets = _decode([int(mask) for mask in unique], keys)
+    return [sets[i] for i in inverse.tolist()]
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+_cache: dict[tuple[Path, str], tuple[int, RuleEngine]] = {}
+
+
+def load_engine(path: Optional[Path] = None, backend: Optional[str] = None) -> RuleEngine:
+    """
+    Compile *path* (default kb/rules/flag_detection_rules.json) into a
+    RuleEngine.  Recompiled only when the file's mtime changes.
+    """
+    path = Path(path or RULES_PATH)
+    backend = backend or DEFAULT_BACKEND
+    mtime = path.stat().st_mtime_ns
+    cached = _cache.get((path, backend))
+    if cached and cached[0] == mtime:
+        return cached[1]
+    data: Any = json.loads(path.read_text(encoding="utf-8"))
+    engine = RuleEngine(data.get("rules", []), backend=backend)
+    _cache[(path, backend)] = (mtime, engine)
+    return engine
@@ -7,11 +7,26 @@ US-G2 | FR-K4: change_event generated with impact score + review gating.
 Phase 0 — hello world skeleton (Sprint 0):
   fetch_frl()          → download raw bytes from FRL URL
   hash_content()       → SHA-256 hex digest for change detection
-  snapshot()           → write raw bytes to kb/snapshots/, return metadata dict
+  snapshot()           → store raw bytes in kb/snapshots/ (content-addressed), return metadata dict
   create_change_event()→ produce a change_event dict (no DB writes)
 
 Sprint 1 (this file):
   run_frl_watch_and_persist() → full pipeline: fetch → diff → score → write to Supabase
+
+Conditional GET (shared with the Home Affairs / data.gov.au watchers):
+  fetch_frl_conditional() → If-None-Match / If-Modified-Since using the
+                            ETag / Last-Modified stored in metadata_json;
+                            a 304 short-circuits to "no change detected"
+
+Streaming fetch (default for the FRL pipeline — compilations run to MBs):
+  fetch_frl_streaming()   → conditional GET whose body is written chunk by
+                            chunk to a snapshot_store.StagedBlob, hashed on
+                            the way in; the staged file is then memory-mapped
+                            for scoring and moved into the store unhashed
+
+Every fetch_* helper here and in the other watchers runs under a
+fetch_policy.FetchPolicy — per-host token bucket, jittered retries that
+honour Retry-After, circuit breaker.
 """
 
 from __future__ import annotations
@@ -19,12 +34,15 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional, Union
 
 import httpx
 
+from kangavisa_workers import fetch_policy, snapshot_store
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -43,55 +61,260 @@ def hash_content(content: bytes) -> str:
     return hashlib.sha256(content).hexdigest()
 
 
-def fetch_frl(url: str, timeout: int = DEFAULT_TIMEOUT) -> bytes:
+def fetch_frl(
+    url: str,
+    timeout: int = DEFAULT_TIMEOUT,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+) -> bytes:
     """
     Fetch *url* and return raw response bytes.
 
+    Every fetch_* helper runs under *policy* (default
+    fetch_policy.DEFAULT_POLICY): per-host rate limit, retries on 429 / 5xx /
+    timeouts, circuit breaker.
+
     Raises httpx.HTTPStatusError on 4xx/5xx.
     Raises httpx.TimeoutException on timeout.
+    Raises fetch_policy.CircuitOpenError while the host's circuit is open.
     """
-    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+    def attempt() -> bytes:
         resp = client.get(url)
         resp.raise_for_status()
         return resp.content
 
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        return (policy or fetch_policy.DEFAULT_POLICY).call(url, attempt)
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET (ETag / Last-Modified)
+# ---------------------------------------------------------------------------
+
+def previous_source_doc(session, canonical_url: str, prev_docs: Optional[dict] = None) -> Optional[dict]:
+    """
+    Return the previous source_document state for *canonical_url*.
+
+    Uses the run's prefetched ``{canonical_url: row | None}`` map
+    (db.get_latest_source_docs) when it has an entry, else one lookup.
+    """
+    if prev_docs is not None and canonical_url in prev_docs:
+        return prev_docs[canonical_url]
+    return session.get_latest_source_doc(canonical_url)
+
+
+def stored_validators(prev_doc: Optional[dict]) -> Optional[dict]:
+    """Return the HTTP validators recorded in *prev_doc*'s metadata_json, if any."""
+    if not prev_doc:
+        return None
+    return (prev_doc.get("metadata_json") or {}).get("validators") or None
+
+
+def conditional_headers(validators: Optional[dict]) -> dict:
+    """Build If-None-Match / If-Modified-Since request headers from *validators*."""
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def response_validators(resp: httpx.Response) -> dict:
+    """Extract the ETag / Last-Modified validators from *resp*."""
+    validators = {}
+    if resp.headers.get("etag"):
+        validators["etag"] = resp.headers["etag"]
+    if resp.headers.get("last-modified"):
+        validators["last_modified"] = resp.headers["last-modified"]
+    return validators
+
+
+def conditional_result(resp: httpx.Response, validators: Optional[dict] = None) -> dict:
+    """
+    Interpret the response to a conditional GET.
+
+    Returns::
+
+        {
+            "not_modified": bool,        # True on 304 — body not downloaded
+            "content": bytes | None,
+            "validators": dict,          # validators to store for the next run
+        }
+
+    Raises httpx.HTTPStatusError on 4xx/5xx.
+    """
+    if resp.status_code == 304:
+        return {
+            "not_modified": True,
+            "content": None,
+            "validators": {**(validators or {}), **response_validators(resp)},
+        }
+    resp.raise_for_status()
+    return {
+        "not_modified": False,
+        "content": resp.content,
+        "validators": response_validators(resp),
+    }
+
+
+def fetch_frl_conditional(
+    url: str,
+    validators: Optional[dict] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+) -> dict:
+    """
+    Conditional GET for *url* using *validators* from the previous run.
+    Returns the conditional_result() dict.
+    """
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        return (policy or fetch_policy.DEFAULT_POLICY).call(url, lambda: conditional_result(
+            client.get(url, headers=conditional_headers(validators)), validators,
+        ))
+
+
+def staged_result(
+    resp: httpx.Response,
+    validators: Optional[dict] = None,
+    snapshots_dir: Optional[Path] = None,
+) -> dict:
+    """
+    Streaming counterpart of conditional_result() for a response opened with
+    ``client.stream(...)``: the body is staged to disk instead of buffered.
+
+    Returns::
+
+        {
+            "not_modified": bool,
+            "content": None,                       # body is never held in memory
+            "staged": snapshot_store.StagedBlob | None,
+            "validators": dict,
+        }
+
+    Raises httpx.HTTPStatusError on 4xx/5xx.
+    """
+    if resp.status_code == 304:
+        return {**conditional_result(resp, validators), "staged": None}
+    resp.raise_for_status()
+    staged = snapshot_store.stage(
+        resp.iter_bytes(snapshot_store.CHUNK_SIZE), snapshots_dir or SNAPSHOTS_DIR,
+    )
+    return {
+        "not_modified": False,
+        "content": None,
+        "staged": staged,
+        "validators": response_validators(resp),
+    }
+
+
+def fetch_frl_streaming(
+    url: str,
+    validators: Optional[dict] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+) -> dict:
+    """
+    Conditional GET for *url* that streams the body to a staged snapshot
+    file (peak memory is one chunk, whatever the document size).  A retried
+    attempt re-streams from the start.
+    Returns the staged_result() dict.
+    """
+    def attempt() -> dict:
+        with client.stream("GET", url, headers=conditional_headers(validators)) as resp:
+            return staged_result(resp, validators)
+
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        return (policy or fetch_policy.DEFAULT_POLICY).call(url, attempt)
+
+
+def fetched_hash(fetched: dict) -> str:
+    """SHA-256 of a fetch result's body — staged bodies were hashed while streaming."""
+    staged = fetched.get("staged")
+    return staged.content_hash if staged else hash_content(fetched["content"])
+
+
+@contextmanager
+def fetched_content(fetched: dict) -> Iterator[Union[bytes, memoryview]]:
+    """Yield a fetch result's body: the bytes, or a memory-mapped view of the staged file."""
+    staged = fetched.get("staged")
+    if staged is None:
+        yield fetched["content"]
+    else:
+        with staged.view() as view:
+            yield view
+
+
+def not_modified_result(prev_doc_id: Optional[str]) -> dict:
+    """Pipeline result for a 304 — same shape as the identical-hash result."""
+    return {
+        "source_doc_id": prev_doc_id,
+        "change_event_id": None,
+        "impact_score": 0,
+        "requires_review": False,
+        "signals": ["no change detected — 304 Not Modified"],
+        "snapshot": None,
+    }
+
+
+def refresh_validators(session, prev_doc: dict, validators: dict) -> None:
+    """
+    Content is unchanged but the server issued new validators: record them on
+    the existing source_document so the next run can still get a 304.
+    """
+    if not validators or validators == stored_validators(prev_doc):
+        return
+    metadata_json = {**(prev_doc.get("metadata_json") or {}), "validators": validators}
+    session.update_source_document_metadata(prev_doc["source_doc_id"], metadata_json)
+
 
 def snapshot(
-    content: bytes,
+    content: Union[bytes, snapshot_store.StagedBlob],
     source_id: str,
     snapshots_dir: Optional[Path] = None,
+    content_hash: Optional[str] = None,
 ) -> dict:
     """
-    Write *content* to disk and return a snapshot metadata dict.
+    Store *content* in the content-addressed snapshot store and return a
+    snapshot metadata dict (see snapshot_store.put — identical content is
+    written once; every call appends a capture record for *source_id*).
 
-    File name: ``{source_id}_{iso_timestamp}.bin``
+    *content* may be a StagedBlob from fetch_frl_streaming(), which is moved
+    into the store.  Pass *content_hash* if the bytes were already hashed.
 
     Returns::
 
         {
             "source_id": str,
-            "snapshot_path": str,        # relative path to snapshot file
-            "content_hash": str,         # SHA-256 hex
+            "snapshot_path": str,        # content-addressed blob; suffix names the codec
+            "content_hash": str,         # SHA-256 hex of the uncompressed bytes
             "byte_size": int,
+            "stored_size": int,          # compressed size on disk
+            "codec": str,                # "zstd" | "gzip" | "none"
             "captured_at": str,          # ISO-8601 UTC
+            "deduplicated": bool,        # True if the blob already existed
         }
-    """
-    dir_ = snapshots_dir or SNAPSHOTS_DIR
-    dir_.mkdir(parents=True, exist_ok=True)
 
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    filename = f"{source_id}_{ts}.bin"
-    file_path = dir_ / filename
+    Read it back with snapshot_store.open_snapshot(snapshot_path).
+    """
+    if isinstance(content, snapshot_store.StagedBlob):
+        return snapshot_store.put_staged(content, source_id, snapshots_dir or SNAPSHOTS_DIR)
+    return snapshot_store.put(
+        content, source_id, snapshots_dir or SNAPSHOTS_DIR, content_hash=content_hash,
+    )
 
-    file_path.write_bytes(content)
 
-    return {
-        "source_id": source_id,
-        "snapshot_path": str(file_path),
-        "content_hash": hash_content(content),
-        "byte_size": len(content),
-        "captured_at": datetime.now(timezone.utc).isoformat(),
-    }
+def previous_content(prev_hash: Optional[str], snapshots_dir: Optional[Path] = None) -> Optional[bytes]:
+    """
+    Load the previous snapshot for diffing, by content hash, from the local
+    snapshot store.  Returns None for an initial snapshot or when the blob is
+    not on this host's disk.
+    """
+    if not prev_hash:
+        return None
+    try:
+        return snapshot_store.read(prev_hash, snapshots_dir or SNAPSHOTS_DIR)
+    except FileNotFoundError:
+        return None
 
 
 def create_change_event(
@@ -176,12 +399,15 @@ def run_frl_watch_and_persist(
     source_type: str,
     canonical_url: str,
     title: Optional[str] = None,
+    fetch: Optional[Callable[..., dict]] = None,
+    session=None,
+    prev_docs: Optional[dict] = None,
 ) -> dict:
     """
     US-G1 | US-G2 | FR-K4: Full FRL ingestion pipeline.
 
-    1. Retrieve previous source_document hash from Supabase (if any)
-    2. Fetch + snapshot current content
+    1. Retrieve previous source_document hash + HTTP validators (if any)
+    2. Conditional streaming fetch (304 → no change) + snapshot current content
     3. Score impact vs prev content
     4. Insert source_document row → source_doc_id
     5. If changed: insert change_event row → change_event_id
@@ -197,52 +423,82 @@ def run_frl_watch_and_persist(
             "snapshot": dict,
         }
 
+    *fetch* overrides ``fetch_frl_streaming`` (a fetch returning buffered
+    ``content`` instead of ``staged``, e.g. fetch_frl_conditional, also
+    works).  *session* overrides the ``db`` module: pass a ``db.SupabaseSession`` to reuse one pooled
+    connection across targets, or any object exposing the same methods
+    (get_latest_source_doc / insert_source_document / insert_change_event /
+    update_source_document_metadata), as the async runner does.
+
+    *prev_docs* is the run's prefetched ``{canonical_url: row | None}`` map
+    from db.get_latest_source_docs(); when it covers *canonical_url* the
+    per-target lookup in step 1 is skipped.
+
     Raises EnvironmentError if SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY not set.
     Raises httpx.HTTPStatusError on network/Supabase errors.
     """
     # Import here to keep pure functions testable without env vars
     from kangavisa_workers import db, impact_scorer
 
+    fetch = fetch or fetch_frl_streaming
+    session = session or db
+
     # 1. Get previous state
-    prev_doc = db.get_latest_source_doc(canonical_url)
+    prev_doc = previous_source_doc(session, canonical_url, prev_docs)
     prev_hash = prev_doc["content_hash"] if prev_doc else None
     prev_doc_id = prev_doc["source_doc_id"] if prev_doc else None
 
-    # 2. Fetch + snapshot
-    content = fetch_frl(url)
-    snap_meta = snapshot(content, source_id)
-    curr_hash = snap_meta["content_hash"]
-
-    # If content unchanged, skip DB writes
-    if prev_hash == curr_hash:
-        return {
-            "source_doc_id": prev_doc_id,
-            "change_event_id": None,
-            "impact_score": 0,
-            "requires_review": False,
-            "signals": ["no change detected — identical hash"],
-            "snapshot": snap_meta,
-        }
-
-    # 3. Score impact
-    prev_content: Optional[bytes] = None  # byte diff requires re-fetch; hash match guards above
-    score_result = impact_scorer.score(prev_content, content, source_type)
+    # 2. Fetch (streamed + hashed once) + snapshot current content
+    fetched = fetch(url, validators=stored_validators(prev_doc))
+    if fetched["not_modified"]:
+        return not_modified_result(prev_doc_id)
+
+    body = fetched.get("staged") or fetched["content"]
+    try:
+        curr_hash = fetched_hash(fetched)
+
+        # If content unchanged, skip DB writes
+        if prev_hash == curr_hash:
+            snap_meta = snapshot(body, source_id, content_hash=curr_hash)
+            refresh_validators(session, prev_doc, fetched["validators"])
+            return {
+                "source_doc_id": prev_doc_id,
+                "change_event_id": None,
+                "impact_score": 0,
+                "requires_review": False,
+                "signals": ["no change detected — identical hash"],
+                "snapshot": snap_meta,
+            }
+
+        # 3. Score impact
+        prev_content = previous_content(prev_hash)
+        with fetched_content(fetched) as content:
+            score_result = impact_scorer.score(prev_content, content, source_type)
+
+        snap_meta = snapshot(body, source_id, content_hash=curr_hash)
+    finally:
+        if fetched.get("staged"):
+            fetched["staged"].discard()  # no-op once moved into the store
 
     # 4. Insert source_document
     now_iso = datetime.now(timezone.utc).isoformat()
-    source_doc_id = db.insert_source_document({
+    source_doc_id = session.insert_source_document({
         "source_type": source_type,
         "title": title or f"FRL snapshot: {source_id}",
         "canonical_url": canonical_url,
         "content_hash": curr_hash,
         "raw_blob_uri": snap_meta["snapshot_path"],
         "retrieved_at": now_iso,
-        "metadata_json": {"source_id": source_id, "byte_size": snap_meta["byte_size"]},
+        "metadata_json": {
+            "source_id": source_id,
+            "byte_size": snap_meta["byte_size"],
+            "validators": fetched["validators"],
+        },
     })
 
     # 5. Insert change_event
     event_type = "new_instrument" if prev_hash is None else "text_change"
-    change_event_id = db.insert_change_event({
+    change_event_id = session.insert_change_event({
         "source_doc_id_new": source_doc_id,
         "source_doc_id_old": prev_doc_id,
         "change_type": event_type,
@@ -7,6 +7,18 @@ US-G2 | FR-K4: change_event generation with impact scoring.
 Sprint 1 scope: fetch → section-level diff (BeautifulSoup) →
                 source_document insert + change_event.
 Sprint 2: Structured requirement/flag extraction from parsed sections.
+
+Section fingerprints: the page text is split at every <h2>/<h3> into an
+ordered list of sections, each hashed on its own and recorded in
+metadata_json["sections"] as ``[level, heading, sha256, units]`` (no text).
+On the next change, section_changes() matches sections by hash, then by
+heading, so a banner edit surfaces as one changed section rather than a
+whole new page.  Only changed / added sections are snapshotted (ref
+``{source_id}.sections``) and only they — plus the previous text of changed
+and removed sections — are passed to impact scoring, with the diff ratio
+still taken over the whole previous page.  Pages first seen without a
+fingerprint, or whose previous section blobs are not on this host, fall
+back to whole-page scoring.
 """
 
 from __future__ import annotations
@@ -14,13 +26,23 @@ from __future__ import annotations
 import os
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
-from kangavisa_workers import db, impact_scorer
-from kangavisa_workers.frl_watcher import hash_content, snapshot
+from kangavisa_workers import db, fetch_policy, impact_scorer, snapshot_store, text_diff
+from kangavisa_workers.frl_watcher import (
+    conditional_headers,
+    conditional_result,
+    hash_content,
+    not_modified_result,
+    previous_content,
+    previous_source_doc,
+    refresh_validators,
+    snapshot,
+    stored_validators,
+)
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -28,19 +50,50 @@ from kangavisa_workers.frl_watcher import hash_content, snapshot
 HOMEAFFAIRS_BASE = "https://immi.homeaffairs.gov.au"
 SNAPSHOTS_DIR = Path(os.getenv("KANGAVISA_SNAPSHOTS_DIR", "kb/snapshots"))
 DEFAULT_TIMEOUT = 30
+USER_AGENT = "KangaVisaBot/1.0"
+SECTION_TAGS = ("h2", "h3")
+SECTION_REF_SUFFIX = ".sections"   # snapshot ref log for section blobs
 
 
 # ---------------------------------------------------------------------------
 # Fetch + section extraction
 # ---------------------------------------------------------------------------
 
-def fetch_homeaffairs(url: str, timeout: int = DEFAULT_TIMEOUT) -> bytes:
-    """Fetch *url* and return raw HTML bytes."""
-    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-        resp = client.get(url, headers={"User-Agent": "KangaVisaBot/1.0"})
+def fetch_homeaffairs(
+    url: str,
+    timeout: int = DEFAULT_TIMEOUT,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+) -> bytes:
+    """Fetch *url* under *policy* (default fetch_policy.DEFAULT_POLICY) and return raw HTML bytes."""
+    def attempt() -> bytes:
+        resp = client.get(url, headers={"User-Agent": USER_AGENT})
         resp.raise_for_status()
         return resp.content
 
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        return (policy or fetch_policy.DEFAULT_POLICY).call(url, attempt)
+
+
+def fetch_homeaffairs_conditional(
+    url: str,
+    validators: Optional[dict] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    policy: Optional[fetch_policy.FetchPolicy] = None,
+) -> dict:
+    """
+    Conditional GET for *url* using *validators* from the previous run.
+    Returns the frl_watcher.conditional_result() dict.
+    """
+    headers = {"User-Agent": USER_AGENT, **conditional_headers(validators)}
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        return (policy or fetch_policy.DEFAULT_POLICY).call(
+            url, lambda: conditional_result(client.get(url, headers=headers), validators),
+        )
+
+
+def _content_root(soup: BeautifulSoup):
+    return soup.find("main") or soup.find("article") or soup.body or soup
+
 
 def extract_sections(html: bytes) -> str:
     """
@@ -49,10 +102,169 @@ def extract_sections(html: bytes) -> str:
     Used as the unit of comparison for diff scoring.
     """
     soup = BeautifulSoup(html, "html.parser")
-    main = soup.find("main") or soup.find("article") or soup.body
-    if not main:
-        return soup.get_text(separator="\n", strip=True)
-    return main.get_text(separator="\n", strip=True)
+    return _content_root(soup).get_text(separator="\n", strip=True)
+
+
+def split_sections(html: bytes) -> list[dict]:
+    """
+    Split the page text into h2/h3-delimited sections, in page order.
+
+    Text before the first heading forms a level-0 section with an empty
+    heading; sections without text are dropped.  Joining every section's
+    text with "\n" gives exactly extract_sections(html).
+
+    Returns::
+
+        [
+            {
+                "level": int,        # 2 / 3, or 0 for the preamble
+                "heading": str,
+                "text": str,         # heading line + body lines
+                "hash": str,         # SHA-256 hex of text (UTF-8)
+                "units": int,        # text_diff units in text
+            },
+        ]
+    """
+    root = _content_root(BeautifulSoup(html, "html.parser"))
+    # Same strings, in the same order, as Tag.get_text()
+    string_types = root.interesting_string_types
+    sections = [{"level": 0, "heading": "", "lines": []}]
+    for node in root.descendants:
+        if isinstance(node, Tag):
+            if node.name in SECTION_TAGS:
+                sections.append({
+                    "level": int(node.name[1]),
+                    "heading": node.get_text(" ", strip=True),
+                    "lines": [],
+                })
+        elif type(node) in string_types:
+            line = node.strip()
+            if line:
+                sections[-1]["lines"].append(line)
+
+    result = []
+    for section in sections:
+        if not section["lines"]:
+            continue
+        text = "\n".join(section["lines"])
+        data = text.encode("utf-8")
+        result.append({
+            "level": section["level"],
+            "heading": section["heading"],
+            "text": text,
+            "hash": hash_content(data),
+            "units": len(text_diff.split_units(data)),
+        })
+    return result
+
+
+def section_fingerprint(sections: list[dict]) -> list[list]:
+    """Compact metadata_json form of split_sections(): ``[[level, heading, hash, units], ...]``."""
+    return [[s["level"], s["heading"], s["hash"], s["units"]] for s in sections]
+
+
+def stored_fingerprint(prev_doc: Optional[dict]) -> Optional[list[list]]:
+    """Section fingerprint recorded in *prev_doc*'s metadata_json, if any."""
+    if not prev_doc:
+        return None
+    return (prev_doc.get("metadata_json") or {}).get("sections") or None
+
+
+def section_changes(prev: list[list], curr: list[list]) -> dict:
+    """
+    Match two section fingerprints.  A current section whose hash occurs in
+    *prev* is unchanged (moves included); an unmatched one with the same
+    level + heading as an unmatched previous section is changed, else added.
+    Leftover previous sections were removed.
+
+    Returns::
+
+        {
+            "changed": [(prev_index, curr_index)],
+            "added": [curr_index],
+            "removed": [prev_index],
+            "unchanged": int,
+        }
+    """
+    by_hash: dict[str, list[int]] = {}
+    for i, (_, _, digest, _) in enumerate(prev):
+        by_hash.setdefault(digest, []).append(i)
+
+    matched: set[int] = set()
+    unmatched: list[int] = []
+    for j, (_, _, digest, _) in enumerate(curr):
+        candidates = by_hash.get(digest)
+        if candidates:
+            matched.add(candidates.pop(0))
+        else:
+            unmatched.append(j)
+
+    by_heading: dict[tuple, list[int]] = {}
+    for i, (level, heading, _, _) in enumerate(prev):
+        if i not in matched:
+            by_heading.setdefault((level, heading), []).append(i)
+
+    changed, added = [], []
+    for j in unmatched:
+        candidates = by_heading.get((curr[j][0], curr[j][1]))
+        if candidates:
+            i = candidates.pop(0)
+            matched.add(i)
+            changed.append((i, j))
+        else:
+            added.append(j)
+
+    return {
+        "changed": changed,
+        "added": added,
+        "removed": [i for i in range(len(prev)) if i not in matched],
+        "unchanged": len(curr) - len(unmatched),
+    }
+
+
+def _section_label(entry: list) -> str:
+    return entry[1] or "(page intro)"
+
+
+def _snapshot_sections(sections: list[dict], source_id: str) -> None:
+    for section in sections:
+        snapshot(
+            section["text"].encode("utf-8"), f"{source_id}{SECTION_REF_SUFFIX}",
+            SNAPSHOTS_DIR, content_hash=section["hash"],
+        )
+
+
+def _previous_sections(prev: list[list], indexes: list[int]) -> Optional[list[bytes]]:
+    """Previous text of the *indexes* sections, or None if any blob is missing."""
+    texts = []
+    for i in indexes:
+        try:
+            texts.append(snapshot_store.read(prev[i][2], SNAPSHOTS_DIR))
+        except FileNotFoundError:
+            return None
+    return texts
+
+
+def score_sections(
+    prev: list[list],
+    sections: list[dict],
+    changes: dict,
+) -> Optional[dict]:
+    """
+    impact_scorer.score() over only the changed sections: previous text of
+    changed + removed sections against current text of changed + added ones,
+    with the diff ratio relative to the whole previous page.  Returns None
+    when a previous section is not in the local snapshot store.
+    """
+    prev_texts = _previous_sections(prev, [i for i, _ in changes["changed"]] + changes["removed"])
+    if prev_texts is None:
+        return None
+    curr_indexes = [j for _, j in changes["changed"]] + changes["added"]
+    curr_text = "\n".join(sections[j]["text"] for j in curr_indexes).encode("utf-8")
+    return impact_scorer.score(
+        b"\n".join(prev_texts), curr_text, "HOMEAFFAIRS_PAGE",
+        base_units=sum(entry[3] for entry in prev),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -64,29 +276,45 @@ def run_homeaffairs_watch_and_persist(
     source_id: str,
     canonical_url: str,
     title: Optional[str] = None,
+    fetch: Optional[Callable] = None,
+    session=None,
+    prev_docs: Optional[dict] = None,
 ) -> dict:
     """
     US-G1 | US-G2: Full Home Affairs ingestion pipeline.
 
-    1. Retrieve previous source_document hash from Supabase (if any)
-    2. Fetch page + extract sections
-    3. Score impact
-    4. Insert source_document → source_doc_id
+    1. Retrieve previous source_document hash + HTTP validators (if any)
+    2. Conditional fetch (304 → no change) + extract sections
+    3. Score impact — changed sections only when a fingerprint is stored
+    4. Insert source_document (with the section fingerprint) → source_doc_id
     5. If changed: insert change_event → change_event_id
 
-    Returns result dict (same shape as run_frl_watch_and_persist).
+    *fetch* / *session* override ``fetch_homeaffairs_conditional`` and the ``db`` module
+    (see run_frl_watch_and_persist); *prev_docs* is the prefetched state map.
+
+    Returns result dict (same shape as run_frl_watch_and_persist), plus on a
+    change ``"sections": {"changed", "added", "removed": list[str] headings,
+    "unchanged": int}`` (None when scored as a whole page).
     """
-    prev_doc = db.get_latest_source_doc(canonical_url)
+    fetch = fetch or fetch_homeaffairs_conditional
+    session = session or db
+
+    prev_doc = previous_source_doc(session, canonical_url, prev_docs)
     prev_hash = prev_doc["content_hash"] if prev_doc else None
     prev_doc_id = prev_doc["source_doc_id"] if prev_doc else None
 
-    html = fetch_homeaffairs(url)
-    section_text = extract_sections(html)
-    section_bytes = section_text.encode("utf-8")
+    fetched = fetch(url, validators=stored_validators(prev_doc))
+    if fetched["not_modified"]:
+        return not_modified_result(prev_doc_id)
+
+    html = fetched["content"]
+    sections = split_sections(html)
+    section_bytes = "\n".join(s["text"] for s in sections).encode("utf-8")
     curr_hash = hash_content(section_bytes)
 
     if prev_hash == curr_hash:
-        snap_meta = snapshot(section_bytes, source_id, SNAPSHOTS_DIR)
+        refresh_validators(session, prev_doc, fetched["validators"])
+        snap_meta = snapshot(section_bytes, source_id, SNAPSHOTS_DIR, content_hash=curr_hash)
         return {
             "source_doc_id": prev_doc_id,
             "change_event_id": None,
@@ -96,31 +324,58 @@ def run_homeaffairs_watch_and_persist(
             "snapshot": snap_meta,
         }
 
-    snap_meta = snapshot(section_bytes, source_id, SNAPSHOTS_DIR)
-    score_result = impact_scorer.score(None, section_bytes, "HOMEAFFAIRS_PAGE")
+    snap_meta = snapshot(section_bytes, source_id, SNAPSHOTS_DIR, content_hash=curr_hash)
+    fingerprint = section_fingerprint(sections)
+    prev_fingerprint = stored_fingerprint(prev_doc)
+
+    score_result = section_summary = None
+    if prev_fingerprint:
+        changes = section_changes(prev_fingerprint, fingerprint)
+        score_result = score_sections(prev_fingerprint, sections, changes)
+    if score_result is not None:
+        touched = [j for _, j in changes["changed"]] + changes["added"]
+        _snapshot_sections([sections[j] for j in touched], source_id)
+        section_summary = {
+            "changed": [_section_label(fingerprint[j]) for _, j in changes["changed"]],
+            "added": [_section_label(fingerprint[j]) for j in changes["added"]],
+            "removed": [_section_label(prev_fingerprint[i]) for i in changes["removed"]],
+            "unchanged": changes["unchanged"],
+        }
+    else:
+        # No fingerprint, or its section blobs are not on this host: score
+        # the whole page and store every section for the next change.
+        _snapshot_sections(sections, source_id)
+        prev_sections = previous_content(prev_hash, SNAPSHOTS_DIR)
+        score_result = impact_scorer.score(prev_sections, section_bytes, "HOMEAFFAIRS_PAGE")
 
     now_iso = datetime.now(timezone.utc).isoformat()
-    source_doc_id = db.insert_source_document({
+    source_doc_id = session.insert_source_document({
         "source_type": "HOMEAFFAIRS_PAGE",
         "title": title or f"Home Affairs page: {source_id}",
         "canonical_url": canonical_url,
         "content_hash": curr_hash,
         "raw_blob_uri": snap_meta["snapshot_path"],
         "retrieved_at": now_iso,
-        "metadata_json": {"source_id": source_id, "byte_size": snap_meta["byte_size"]},
+        "metadata_json": {
+            "source_id": source_id,
+            "byte_size": snap_meta["byte_size"],
+            "validators": fetched["validators"],
+            "sections": fingerprint,
+        },
     })
 
     event_type = "new_instrument" if prev_hash is None else "text_change"
-    change_event_id = db.insert_change_event({
+    summary = f"Home Affairs change detected for {source_id}. "
+    if section_summary:
+        headings = section_summary["changed"] + section_summary["added"] + section_summary["removed"]
+        summary += f"Sections: {', '.join(headings) or 'reordered only'}. "
+    change_event_id = session.insert_change_event({
         "source_doc_id_new": source_doc_id,
         "source_doc_id_old": prev_doc_id,
         "change_type": event_type,
         "impact_score": score_result["impact_score"],
         "requires_review": score_result["requires_review"],
-        "summary": (
-            f"Home Affairs change detected for {source_id}. "
-            f"Signals: {'; '.join(score_result['signals'])}"
-        ),
+        "summary": summary + f"Signals: {'; '.join(score_result['signals'])}",
     })
 
     return {
@@ -130,4 +385,5 @@ def run_homeaffairs_watch_and_persist(
         "requires_review": score_result["requires_review"],
         "signals": score_result["signals"],
         "snapshot": snap_meta,
+        "sections": section_summary,
     }
@@ -5,8 +5,9 @@ US-G2 | FR-K4: change_event scored 0-100; score >= 70 triggers requires_review.
 
 Scoring heuristic:
   +10  base (any detected change)
-  +40  content diff > 5% of document size
-  +30  keyword match on trigger terms (per US-G2 AC)
+  +40  line-aligned diff (text_diff) touches > 5% of the previous document
+  +30  keyword match on trigger terms (per US-G2 AC) or the
+       review_gates.high_impact_instrument_keywords in kb/sources.yml
   +20  source type is FRL_ACT or FRL_REGS (highest legal tier)
 
 Maximum possible score: 100.
@@ -14,6 +15,11 @@ Maximum possible score: 100.
 
 from __future__ import annotations
 
+import functools
+
+from kangavisa_workers import sources, text_diff
+from kangavisa_workers.keyword_matcher import KeywordMatcher
+
 # ---------------------------------------------------------------------------
 # Keywords that signal high-impact legislative/policy changes (US-G2 AC)
 # ---------------------------------------------------------------------------
@@ -25,13 +31,30 @@ TRIGGER_KEYWORDS = frozenset([
 
 HIGH_TIER_SOURCE_TYPES = frozenset(["FRL_ACT", "FRL_REGS"])
 
+LARGE_DIFF_RATIO = 0.05
+
 REVIEW_THRESHOLD = 70
 
 
+@functools.lru_cache(maxsize=1)
+def keyword_matcher() -> KeywordMatcher:
+    """The compiled matcher for TRIGGER_KEYWORDS + kb/sources.yml review-gate keywords (built once)."""
+    return KeywordMatcher(TRIGGER_KEYWORDS | set(sources.review_gate_keywords()))
+
+
+def keyword_hits(content: bytes | memoryview) -> dict[str, dict]:
+    """
+    Scan *content* for trigger keywords in one pass (whole words or their plurals, any case).
+    Returns ``{keyword: {"count": int, "offsets": list[int]}}`` for matches.
+    """
+    return keyword_matcher().scan(content)
+
+
 def score(
-    prev_content: bytes | None,
-    curr_content: bytes,
+    prev_content: bytes | memoryview | None,
+    curr_content: bytes | memoryview,
     source_type: str,
+    base_units: int | None = None,
 ) -> dict:
     """
     Score a detected change and return a dict:
@@ -40,9 +63,16 @@ def score(
             "impact_score": int,       # 0-100
             "requires_review": bool,   # True if score >= REVIEW_THRESHOLD
             "signals": list[str],      # human-readable explanation of what fired
+            "diff": dict | None,       # text_diff.diff_stats(), None without prev
+            "keywords": dict,          # keyword_hits(): per-keyword count + offsets
         }
 
-    *prev_content* is None for an initial snapshot (no diff possible).
+    *prev_content* is None for an initial snapshot, or when the previous
+    snapshot is not in the local store (no diff possible).
+    Either argument may be a memoryview (e.g. a memory-mapped staged snapshot).
+    When only excerpts are passed (changed Home Affairs sections), *base_units*
+    is the previous whole document's unit count, so the diff ratio is still
+    relative to the whole document.
     """
     signals: list[str] = []
     total = 0
@@ -52,25 +82,27 @@ def score(
     signals.append("base: change detected (+10)")
 
     # Diff size: > 5% of document
+    diff = None
     if prev_content is not None:
-        prev_size = max(len(prev_content), 1)
-        overlap = min(len(prev_content), len(curr_content))
-        differing = sum(a != b for a, b in zip(prev_content[:overlap], curr_content[:overlap]))
-        diff_ratio = differing / prev_size
-        if diff_ratio > 0.05:
+        diff = text_diff.diff_stats(prev_content, curr_content, base_units)
+        if diff["diff_ratio"] > LARGE_DIFF_RATIO:
             total += 40
-            signals.append(f"large diff: {diff_ratio:.1%} of document changed (+40)")
+            signals.append(
+                f"large diff: {diff['diff_ratio']:.1%} of document changed "
+                f"({diff['inserted_ratio']:.1%} inserted, {diff['deleted_ratio']:.1%} deleted, "
+                f"{diff['changed_ratio']:.1%} changed) (+40)"
+            )
     else:
         # Initial snapshot — no prev to diff against; treat as significant
         total += 20
-        signals.append("initial snapshot: no prev hash, assumed significant (+20)")
+        signals.append("initial snapshot: no prev content to diff, assumed significant (+20)")
 
     # Keyword match in current content
-    text = curr_content.decode("utf-8", errors="ignore").lower()
-    matched = {kw for kw in TRIGGER_KEYWORDS if kw in text}
-    if matched:
+    keywords = keyword_hits(curr_content)
+    if keywords:
         total += 30
-        signals.append(f"keyword match: {sorted(matched)} (+30)")
+        counts = ", ".join(f"{kw} ×{hit['count']}" for kw, hit in sorted(keywords.items()))
+        signals.append(f"keyword match: {counts} (+30)")
 
     # High-tier source type
     if source_type in HIGH_TIER_SOURCE_TYPES:
@@ -82,4 +114,6 @@ def score(
         "impact_score": total,
         "requires_review": total >= REVIEW_THRESHOLD,
         "signals": signals,
+        "diff": diff,
+        "keywords": keywords,
     }
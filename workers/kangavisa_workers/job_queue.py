@@ -0,0 +1,358 @@
+"""
+job_queue.py — Durable SQLite job queue for watch runs.
+
+US-G1 | FR-K4: spread one ingestion run over several worker processes and
+survive crashes and restarts mid-run.
+
+Each target × run is one row in ``watch_job``:
+
+    job_id            INTEGER PRIMARY KEY
+    run_id            TEXT      one per watcher run; (run_id, target_id) is unique
+    watcher           TEXT      frl | homeaffairs | datagov
+    target_id         TEXT      source_id, or dataset_id for data.gov.au
+    target_json       TEXT      the target dict
+    status            TEXT      queued | leased | done | failed
+    attempts          INTEGER   leases handed out so far
+    max_attempts      INTEGER
+    lease_owner       TEXT      worker id holding the lease
+    lease_expires_at  REAL      epoch seconds; extended by heartbeat()
+    heartbeat_at      REAL
+    enqueued_at / started_at / finished_at   REAL
+    result_json       TEXT      pipeline result (done) or error entry (failed)
+    error             TEXT
+
+Workers claim() the queued job with the fewest attempts (oldest first, so
+retries go behind fresh work) inside a ``BEGIN IMMEDIATE`` transaction, so
+two processes never lease the same job.  A worker keeps its
+lease alive with heartbeat() while the pipeline runs; a lease that expires
+(the worker crashed or hung) is put back to queued by the next claim(), or
+marked failed once max_attempts leases have been spent.  Enqueueing the same
+run_id again is a no-op for jobs already present, so a restarted run
+resumes where it stopped.
+
+The database runs in WAL mode so readers never block the writer.  WAL needs
+shared memory: every process must open the file on the same host.  Hosts
+sharing the file over a network filesystem must pass ``wal=False`` (rollback
+journal) instead.
+
+    queue = JobQueue("kb/.watch_queue.sqlite")
+    run_id = queue.enqueue_run({"frl": [...], "homeaffairs": [...]})
+    work(queue, "host-a:1234", run_job)   # run_job(watcher, target) → result entry
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from kangavisa_workers import sources
+from kangavisa_workers.scheduler import target_id
+
+logger = logging.getLogger("job_queue")
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+QUEUE_PATH = Path(os.environ.get("KANGAVISA_JOB_QUEUE", sources.KB_DIR / ".watch_queue.sqlite"))
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+BUSY_TIMEOUT_MS = 30_000
+STATUSES = ("queued", "leased", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watch_job (
+    job_id            INTEGER PRIMARY KEY,
+    run_id            TEXT    NOT NULL,
+    watcher           TEXT    NOT NULL,
+    target_id         TEXT    NOT NULL,
+    target_json       TEXT    NOT NULL,
+    status            TEXT    NOT NULL DEFAULT 'queued',
+    attempts          INTEGER NOT NULL DEFAULT 0,
+    max_attempts      INTEGER NOT NULL,
+    lease_owner       TEXT,
+    lease_expires_at  REAL,
+    heartbeat_at      REAL,
+    enqueued_at       REAL    NOT NULL,
+    started_at        REAL,
+    finished_at       REAL,
+    result_json       TEXT,
+    error             TEXT,
+    UNIQUE (run_id, target_id)
+);
+CREATE INDEX IF NOT EXISTS idx_watch_job_status ON watch_job (status, attempts, job_id);
+CREATE INDEX IF NOT EXISTS idx_watch_job_lease ON watch_job (status, lease_expires_at);
+"""
+
+
+class Job:
+    """A leased job, as handed to a worker by claim()."""
+
+    __slots__ = ("job_id", "run_id", "watcher", "target_id", "target", "attempts", "max_attempts")
+
+    def __init__(self, row: sqlite3.Row) -> None:
+        self.job_id = row["job_id"]
+        self.run_id = row["run_id"]
+        self.watcher = row["watcher"]
+        self.target_id = row["target_id"]
+        self.target = json.loads(row["target_json"])
+        self.attempts = row["attempts"]
+        self.max_attempts = row["max_attempts"]
+
+
+# ---------------------------------------------------------------------------
+# Queue
+# ---------------------------------------------------------------------------
+
+class JobQueue:
+    """
+    The watch_job table in one SQLite file.  Every call opens its own
+    connection, so one JobQueue may be shared by threads (e.g. a heartbeat
+    thread) and each process simply creates its own.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        wal: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path or QUEUE_PATH)
+        self.lease_seconds = lease_seconds
+        self.wal = wal
+        self.clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute(f"PRAGMA journal_mode = {'WAL' if self.wal else 'DELETE'}")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the write lock up front (BEGIN IMMEDIATE)."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    # -- producers -----------------------------------------------------------
+
+    def enqueue_run(
+        self,
+        targets: dict[str, list[dict]],
+        run_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> str:
+        """
+        Queue one job per target in *targets* (``{watcher: [target]}``) under
+        *run_id* (default: a new id).  Targets already queued for *run_id*
+        are left as they are.  Returns the run_id.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        now = self.clock()
+        rows = [
+            (run_id, watcher, target_id(target), json.dumps(target), max_attempts, now)
+            for watcher, group in targets.items() for target in group
+        ]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO watch_job "
+                "(run_id, watcher, target_id, target_json, max_attempts, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return run_id
+
+    # -- workers -------------------------------------------------------------
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> int:
+        failed = conn.execute(
+            "UPDATE watch_job SET status = 'failed', finished_at = ?, lease_owner = NULL, "
+            "error = 'lease expired after ' || attempts || ' attempt(s)' "
+            "WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts",
+            (now, now),
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE watch_job SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL "
+            "WHERE status = 'leased' AND lease_expires_at < ?",
+            (now,),
+        ).rowcount
+        if failed or requeued:
+            logger.info("Expired leases: %d re-queued, %d failed", requeued, failed)
+        return requeued
+
+    def requeue_expired(self) -> int:
+        """Re-queue jobs whose lease has expired.  Returns how many were re-queued."""
+        with self._transaction() as conn:
+            return self._expire_leases(conn, self.clock())
+
+    def claim(self, worker_id: str, run_id: Optional[str] = None) -> Optional[Job]:
+        """
+        Lease the next queued job (of *run_id*, if given) to *worker_id* —
+        fewest attempts first, then oldest — after re-queueing expired leases.  Returns None when nothing is queued.
+        """
+        now = self.clock()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            where, params = "status = 'queued'", []
+            if run_id is not None:
+                where += " AND run_id = ?"
+                params.append(run_id)
+            row = conn.execute(
+                f"SELECT job_id FROM watch_job WHERE {where} ORDER BY attempts, job_id LIMIT 1", params,
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE watch_job SET status = 'leased', lease_owner = ?, lease_expires_at = ?, "
+                "heartbeat_at = ?, started_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (worker_id, now + self.lease_seconds, now, now, row["job_id"]),
+            )
+            return Job(conn.execute("SELECT * FROM watch_job WHERE job_id = ?", (row["job_id"],)).fetchone())
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend *worker_id*'s lease on *job_id*.  False if the lease was lost."""
+        now = self.clock()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE watch_job SET lease_expires_at = ?, heartbeat_at = ? "
+                "WHERE job_id = ? AND lease_owner = ? AND status = 'leased'",
+                (now + self.lease_seconds, now, job_id, worker_id),
+            ).rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: dict) -> bool:
+        """Mark *job_id* done with *result*.  False if *worker_id* no longer holds the lease."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE watch_job SET status = 'done', finished_at = ?, result_json = ?, "
+                "error = NULL, lease_owner = NULL, lease_expires_at = NULL "
+                "WHERE job_id = ? AND lease_owner = ? AND status = 'leased'",
+                (self.clock(), json.dumps(result, default=str), job_id, worker_id),
+            ).rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str, result: Optional[dict] = None, retry: bool = True) -> bool:
+        """
+        Record a failed attempt.  The job is re-queued while *retry* and
+        attempts remain, else marked failed.  False if the lease was lost.
+        """
+        now = self.clock()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE watch_job SET "
+                "status = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                "finished_at = CASE WHEN ? AND attempts < max_attempts THEN NULL ELSE ? END, "
+                "error = ?, result_json = ?, lease_owner = NULL, lease_expires_at = NULL "
+                "WHERE job_id = ? AND lease_owner = ? AND status = 'leased'",
+                (retry, retry, now, error, json.dumps(result, default=str) if result else None, job_id, worker_id),
+            ).rowcount == 1
+
+    # -- reporting -----------------------------------------------------------
+
+    def summary(self, run_id: str) -> dict[str, int]:
+        """Job counts by status for *run_id* (every status present, zero if none)."""
+        counts = dict.fromkeys(STATUSES, 0)
+        with self._connect() as conn:
+            for row in conn.execute(
+                "SELECT status, COUNT(*) AS n FROM watch_job WHERE run_id = ? GROUP BY status", (run_id,),
+            ):
+                counts[row["status"]] = row["n"]
+        return counts
+
+    def results(self, run_id: str) -> list[dict]:
+        """
+        Finished jobs of *run_id* in queue order, as run_watchers result
+        entries (``{"source_id", "ok", ...}``), with ``attempts`` added.
+        """
+        entries = []
+        with self._connect() as conn:
+            for row in conn.execute(
+                "SELECT * FROM watch_job WHERE run_id = ? AND status IN ('done', 'failed') ORDER BY job_id",
+                (run_id,),
+            ):
+                entry = json.loads(row["result_json"]) if row["result_json"] else {}
+                if row["status"] == "failed":
+                    entry = {"fatal": False, **entry, "ok": False, "error": row["error"]}
+                entries.append({"source_id": row["target_id"], **entry, "attempts": row["attempts"]})
+        return entries
+
+
+# ---------------------------------------------------------------------------
+# Worker loop
+# ---------------------------------------------------------------------------
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def work(
+    queue: JobQueue,
+    worker_id: Optional[str] = None,
+    run_job: Optional[Callable[[str, dict], dict]] = None,
+    run_id: Optional[str] = None,
+    heartbeat_seconds: Optional[float] = None,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """
+    Claim and run jobs until none are queued (or *max_jobs* have run).
+    Returns the number of jobs run.
+
+    *run_job(watcher, target)* returns a run_watchers result entry:
+    ``ok`` → done; ``ok: False`` → retried unless ``fatal``; an exception is
+    a transient failure.  A background thread heartbeats the lease every
+    *heartbeat_seconds* (default: a third of the lease).
+    """
+    worker_id = worker_id or default_worker_id()
+    heartbeat_seconds = heartbeat_seconds or queue.lease_seconds / 3
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = queue.claim(worker_id, run_id)
+        if job is None:
+            return done
+
+        stop = threading.Event()
+
+        def beat(job_id: int = job.job_id) -> None:
+            while not stop.wait(heartbeat_seconds):
+                if not queue.heartbeat(job_id, worker_id):
+                    logger.warning("Lost lease on job %d", job_id)
+                    return
+
+        beater = threading.Thread(target=beat, name=f"heartbeat-{job.job_id}", daemon=True)
+        beater.start()
+        try:
+            entry = run_job(job.watcher, job.target)
+        except Exception as exc:
+            entry = {"source_id": job.target_id, "ok": False, "error": str(exc), "fatal": False}
+        finally:
+            stop.set()
+            beater.join()
+
+        if entry.get("ok"):
+            queue.complete(job.job_id, worker_id, entry)
+        else:
+            queue.fail(job.job_id, worker_id, entry.get("error", "failed"), entry, retry=not entry.get("fatal"))
+        done += 1
+    return done
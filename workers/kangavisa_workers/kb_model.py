@@ -0,0 +1,215 @@
+"""
+kb_model.py — Shared, indexed in-memory model of the KB seed files.
+
+US-F6 | FR-K1, FR-K2, FR-K3: one parse of kb/seed/ for every KB tool —
+seed_loader, seed_reconcile, kb_validate and scripts/generate_seed_sql.py.
+
+    load_kb()          → KBModel over every seed file, with indexes
+    seed_files()       → sorted seed files matching a pattern, minus SQL-seeded visas
+    load_seed_file()   → one parsed seed file
+    VISA_SUBCLASSES    → the visa subclass catalogue
+
+Parsed files are cached per path and re-read only when their mtime or size
+changes, so a full KB build reads each file exactly once, and a rebuild
+after one edit re-parses only that file.
+
+Standard library only: scripts/ import this without the workers' deps.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+# ---------------------------------------------------------------------------
+# Paths and catalogue
+# ---------------------------------------------------------------------------
+KB_DIR = Path(__file__).parent.parent.parent / "kb"
+SEED_DIR = KB_DIR / "seed"
+
+# Visas seeded via SQL migrations — their JSON files use a different schema
+# and must not be processed by the seed tools.
+SQL_SEEDED_VISAS = frozenset({"600", "189", "190", "491"})
+
+# Seed kind (target table) → filename pattern
+SEED_PATTERNS = {
+    "requirement": "visa_*_requirements*.json",
+    "evidence_item": "visa_*_evidence_items.json",
+    "flag_template": "visa_*_flags.json",
+}
+
+# US-F6: all MVP visa groups
+VISA_SUBCLASSES = [
+    {"subclass_code": "500", "stream": None, "name": "Student", "description": "International student visa",
+     "audience": "B2C", "canonical_info_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/student-500"},
+    {"subclass_code": "485", "stream": None, "name": "Temporary Graduate", "description": "Post-study graduate visa",
+     "audience": "B2C", "canonical_info_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/temporary-graduate-485"},
+    {"subclass_code": "482", "stream": "SID", "name": "Temporary Skill Shortage (SID)", "description": "Employer-sponsored TSS — Short-term and Medium-term streams",
+     "audience": "Both", "canonical_info_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/temporary-skill-shortage-482"},
+    {"subclass_code": "417", "stream": None, "name": "Working Holiday", "description": "Working Holiday Maker — first, second, and third grant",
+     "audience": "B2C", "canonical_info_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/work-holiday-417"},
+    {"subclass_code": "820", "stream": None, "name": "Partner (onshore)", "description": "Partner visa — onshore temporary (820) → permanent (801)",
+     "audience": "B2C", "canonical_info_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/partner-onshore-820-801"},
+    {"subclass_code": "309", "stream": None, "name": "Partner (offshore)", "description": "Partner visa — offshore temporary (309) → permanent (100)",
+     "audience": "B2C", "canonical_info_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/partner-offshore-309-100"},
+]
+
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+
+def seed_subclass(path: Path) -> str:
+    """Visa code in a seed filename, e.g. "visa_600_evidence_items.json" → "600"."""
+    parts = path.stem.split("_")  # ["visa", "600", "evidence", "items"]
+    return parts[1] if len(parts) >= 2 else ""
+
+
+def seed_files(pattern: str, seed_dir: Optional[Path] = None) -> list[Path]:
+    """
+    Return sorted seed files matching *pattern* in *seed_dir* (default
+    SEED_DIR), excluding visas whose data is loaded via SQL migration
+    (SQL_SEEDED_VISAS).
+    """
+    return [
+        path for path in sorted(Path(seed_dir or SEED_DIR).glob(pattern))
+        if seed_subclass(path) not in SQL_SEEDED_VISAS
+    ]
+
+
+def seed_items(raw) -> list:
+    """
+    Items in a parsed seed file: flat lists as-is, wrapped ``{"flags": [...]}``
+    objects unwrapped, else the single object.
+    """
+    if isinstance(raw, list):
+        return raw
+    if isinstance(raw, dict) and "flags" in raw:
+        return raw["flags"]
+    return [raw]
+
+
+class SeedFile:
+    """One parsed seed file: *raw* JSON plus the SHA-256 *digest* of its bytes."""
+
+    __slots__ = ("path", "kind", "subclass", "digest", "raw")
+
+    def __init__(self, path: Path, kind: str, digest: str, raw: Any) -> None:
+        self.path = path
+        self.kind = kind
+        self.subclass = seed_subclass(path)
+        self.digest = digest
+        self.raw = raw
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def items(self) -> list:
+        return seed_items(self.raw)
+
+
+_file_cache: dict[Path, tuple[tuple[int, int], str, Any]] = {}
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _parse(path: Path) -> tuple[str, Any]:
+    """(digest, parsed JSON) for *path*, cached per (mtime_ns, size)."""
+    stamp = _stamp(path)
+    cached = _file_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1], cached[2]
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    raw = json.loads(data)
+    _file_cache[path] = (stamp, digest, raw)
+    return digest, raw
+
+
+def load_seed_file(path: Path) -> Any:
+    """
+    Parsed JSON of one seed file (cached until its mtime or size changes).
+    Raises OSError / ValueError for missing or malformed files.
+    """
+    return _parse(Path(path))[1]
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+class KBModel:
+    """
+    Every seed file under one seed directory, with indexes::
+
+        kb.files["requirement"]              # [SeedFile, ...] in seed_files() order
+        kb.by_subclass["500"]["evidence_item"]   # items, by the file's visa code
+        kb.requirement_by_id["REQ-500-001"]
+        kb.evidence_by_requirement["REQ-500-001"]   # [evidence item, ...]
+        kb.flags_by_subclass["500"]          # by the flag's visa.subclass
+
+    Items are the parsed dicts themselves — treat them as read-only.
+    """
+
+    def __init__(self, files: dict[str, list[SeedFile]]) -> None:
+        self.files = files
+        self.by_subclass: dict[str, dict[str, list[dict]]] = {}
+        self.requirement_by_id: dict[str, dict] = {}
+        self.evidence_by_requirement: dict[str, list[dict]] = {}
+        self.flags_by_subclass: dict[str, list[dict]] = {}
+
+        for kind, seeds in files.items():
+            for seed in seeds:
+                items = [item for item in seed.items if isinstance(item, dict)]
+                per_kind = self.by_subclass.setdefault(seed.subclass, {k: [] for k in SEED_PATTERNS})
+                per_kind[kind].extend(items)
+                for item in items:
+                    if kind == "requirement" and "requirement_id" in item:
+                        self.requirement_by_id[item["requirement_id"]] = item
+                    elif kind == "evidence_item" and "requirement_id" in item:
+                        self.evidence_by_requirement.setdefault(item["requirement_id"], []).append(item)
+                    elif kind == "flag_template":
+                        subclass = (item.get("visa") or {}).get("subclass") or seed.subclass
+                        self.flags_by_subclass.setdefault(subclass, []).append(item)
+
+    def items(self, kind: str) -> list[dict]:
+        """All items of *kind* across files, in file order."""
+        return [item for seed in self.files.get(kind, []) for item in seed.items]
+
+
+_model_cache: dict[Path, tuple[tuple, KBModel]] = {}
+
+
+def load_kb(seed_dir: Optional[Path] = None) -> KBModel:
+    """
+    Return the KBModel for *seed_dir* (default SEED_DIR).  Rebuilt only when
+    the set of seed files or any file's mtime/size changes; unchanged files
+    come from the per-file parse cache.
+    """
+    seed_dir = Path(seed_dir or SEED_DIR)
+    paths = {kind: seed_files(pattern, seed_dir) for kind, pattern in SEED_PATTERNS.items()}
+    key = tuple((path, _stamp(path)) for kind in SEED_PATTERNS for path in paths[kind])
+    cached = _model_cache.get(seed_dir)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    files = {
+        kind: [SeedFile(path, kind, *_parse(path)) for path in kind_paths]
+        for kind, kind_paths in paths.items()
+    }
+    model = KBModel(files)
+    _model_cache[seed_dir] = (key, model)
+    return model
+
+
+def clear_cache() -> None:
+    """Forget every parsed file and model."""
+    _file_cache.clear()
+    _model_cache.clear()
@@ -0,0 +1,171 @@
+"""
+kb_validate.py — Validate every KB seed file against its model schema.
+
+US-F6 | FR-K1, FR-K2, FR-K3: Pre-publish gate for kb/seed/ — run it before
+seed_loader or scripts/generate_seed_sql.py.
+
+Seed files are discovered with kb_model.seed_files (the same filename
+conventions and SQL-seeded visa exclusions as every KB tool), mapped to a
+model type, and validated across a process pool.  Each worker compiles each schema once
+(schema_validator's validator cache).  Errors are printed as each file
+finishes; the JSON report carries per-file timings.
+
+Usage:
+    python3 -m kangavisa_workers.kb_validate [--workers N] [--report kb_validation.json]
+
+Exit code 0 when every file is valid, 1 otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Optional
+
+from kangavisa_workers import schema_validator
+from kangavisa_workers.kb_model import SEED_DIR, load_seed_file, seed_files, seed_items
+
+# ---------------------------------------------------------------------------
+# Seed filename pattern → model type (patterns match seed_loader's loaders)
+# ---------------------------------------------------------------------------
+SEED_MODEL_PATTERNS: list[tuple[str, str]] = [
+    ("visa_*_requirements*.json", "Requirement"),
+    ("visa_*_evidence_items.json", "EvidenceItem"),
+    ("visa_*_flags.json", "FlagTemplate"),
+    ("visa_*_instruments.json", "Instrument"),
+]
+
+# Below this many files a process pool costs more than it saves.
+MIN_FILES_FOR_POOL = 4
+
+
+def discover(seed_dir: Optional[Path] = None) -> list[tuple[Path, str]]:
+    """Return ``(seed_file, model_type)`` pairs for every validatable seed file."""
+    return [
+        (path, model_type)
+        for pattern, model_type in SEED_MODEL_PATTERNS
+        for path in seed_files(pattern, seed_dir)
+    ]
+
+
+def validate_seed_file(path: Path, model_type: str) -> dict:
+    """
+    Validate one seed file.  Runs in a pool worker, so it never raises:
+    unreadable JSON is reported as an error.
+
+    Returns::
+
+        {
+            "file": str,
+            "model_type": str,
+            "items": int,
+            "errors": list[str],        # schema_validator.format_error() strings
+            "seconds": float,
+        }
+    """
+    start = time.perf_counter()
+    try:
+        items = seed_items(load_seed_file(path))
+        errors = [
+            schema_validator.format_error(i, error)
+            for i, error in schema_validator.iter_errors(items, model_type)
+        ]
+    except (OSError, ValueError) as exc:
+        items, errors = [], [f"unreadable seed file: {exc}"]
+    return {
+        "file": str(path),
+        "model_type": model_type,
+        "items": len(items),
+        "errors": errors,
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+
+
+def validate_kb(
+    seed_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Validate every discovered seed file, fanning out across *workers*
+    processes (default: CPU count; 1 = in-process).  *on_result* is called
+    with each file's result as soon as it finishes.
+
+    Returns::
+
+        {
+            "ok": bool,
+            "files": int,
+            "items": int,
+            "error_count": int,
+            "seconds": float,
+            "results": list[dict],      # validate_seed_file() dicts, in discovery order
+        }
+    """
+    start = time.perf_counter()
+    jobs = discover(seed_dir)
+    workers = workers or os.cpu_count() or 1
+
+    results: dict[int, dict] = {}
+    if workers == 1 or len(jobs) < MIN_FILES_FOR_POOL:
+        for index, job in enumerate(jobs):
+            results[index] = validate_seed_file(*job)
+            if on_result:
+                on_result(results[index])
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {pool.submit(validate_seed_file, *job): index for index, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if on_result:
+                    on_result(results[futures[future]])
+
+    ordered = [results[index] for index in range(len(jobs))]
+    error_count = sum(len(r["errors"]) for r in ordered)
+    return {
+        "ok": error_count == 0,
+        "files": len(ordered),
+        "items": sum(r["items"] for r in ordered),
+        "error_count": error_count,
+        "seconds": round(time.perf_counter() - start, 6),
+        "results": ordered,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _print_result(result: dict) -> None:
+    name = Path(result["file"]).name
+    status = "ok" if not result["errors"] else f"{len(result['errors'])} error(s)"
+    print(f"{name:<40} {result['model_type']:<13} {result['items']:>4} items  {status}", flush=True)
+    for error in result["errors"]:
+        print(f"  {name}: {error}", file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate kb/seed/ against the KB JSON Schemas")
+    parser.add_argument("--seed-dir", type=Path, default=SEED_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--report", type=Path, default=None, help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = validate_kb(args.seed_dir, args.workers, on_result=_print_result)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(
+        f"{'PASS' if report['ok'] else 'FAIL'}: {report['files']} files, {report['items']} items, "
+        f"{report['error_count']} errors in {report['seconds']:.2f}s"
+    )
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+keyword_matcher.py — Single-pass multi-keyword matcher (word-level Aho-Corasick).
+
+US-G2 | FR-K4: trigger keywords drive the change_event impact score.
+
+Keywords are compiled once into an Aho-Corasick automaton whose alphabet is
+*words* rather than bytes.  A scan lowercases the raw bytes (ASCII only, so
+offsets are preserved), splits them into words with one C-level regex split
+per window, and steps the automaton only on words that occur in some
+keyword.  Consequences:
+
+  - word boundaries are exact: "visa" does not match inside "advisable",
+    and multi-word keywords ("specified work") match across any run of
+    whitespace;
+  - plurals count as the keyword: each keyword word also matches its
+    INFLECTIONS ("visas", "schedules", "exemptions"; "y" → "ies"), and
+    possessives already split at the apostrophe ("criterion's");
+  - per-document cost is one regex split plus a set lookup per word, so it
+    stays flat as the keyword list grows from tens to hundreds of terms;
+  - documents are scanned in windows (memoryviews of memory-mapped
+    snapshots are never copied whole), with automaton state carried over.
+
+Word characters are ASCII letters, digits, "_" and any non-ASCII byte.
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import accumulate
+from typing import Iterable, Union
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+WORD_SPLIT = re.compile(rb"([a-z0-9_\x80-\xff]+)")
+WORD_BYTES = b"abcdefghijklmnopqrstuvwxyz0123456789_" + bytes(range(0x80, 0x100))
+SCAN_WINDOW = 1 << 20
+# Suffixes a keyword word also matches with (plurals); words ending in "y" also take "ies"
+INFLECTIONS = (b"s", b"es")
+INFLECTABLE = re.compile(rb"^[a-z]{3,}$")
+
+
+def _normalise_sep(sep: bytes) -> bytes:
+    return b" " if sep.isspace() else sep
+
+
+def _inflections(word: bytes) -> list[bytes]:
+    """Plural forms of *word*: "visa" → visas / visaes, "duty" → ... / duties."""
+    if not INFLECTABLE.match(word):
+        return []
+    forms = [word + suffix for suffix in INFLECTIONS]
+    if word.endswith(b"y"):
+        forms.append(word[:-1] + b"ies")
+    return forms
+
+
+class KeywordMatcher:
+    """
+    Compiled automaton over *keywords* (case-insensitive).
+
+    Example::
+
+        matcher = KeywordMatcher(["visa", "specified work"])
+        matcher.scan(b"Specified  work visa conditions")
+        # {"specified work": {"count": 1, "offsets": [0]},
+        #  "visa": {"count": 1, "offsets": [16]}}
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: list[str] = []
+        self._goto: list[dict[bytes, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self._lengths: list[int] = []
+        self._joinable: set[bytes] = {b" "}
+
+        for keyword in sorted({kw.strip().lower() for kw in keywords if kw.strip()}):
+            parts = WORD_SPLIT.split(keyword.encode("utf-8"))
+            words = parts[1::2]
+            if not words:
+                continue
+            self._joinable.update(_normalise_sep(sep) for sep in parts[2:-1:2])
+            state = 0
+            for word in words:
+                if word not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][word] = len(self._goto) - 1
+                state = self._goto[state][word]
+            self._out[state] += (len(self.keywords),)
+            self.keywords.append(keyword)
+            self._lengths.append(len(words))
+
+        self._build_failure_links()
+        words = frozenset(w for edges in self._goto for w in edges)
+        # Inflected form → keyword word; a form that is itself a keyword word stays literal
+        self._inflected: dict[bytes, bytes] = {}
+        for word in sorted(words):
+            for form in _inflections(word):
+                if form not in words:
+                    self._inflected.setdefault(form, word)
+        self.vocabulary = words | self._inflected.keys()
+        self._max_words = max(self._lengths, default=0)
+
+    def _build_failure_links(self) -> None:
+        queue = list(self._goto[0].values())  # depth-1 states fail to the root
+        for state in queue:  # BFS — the queue grows while iterating
+            for word, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(word, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def _step(self, state: int, word: bytes) -> int:
+        while state and word not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(word, 0)
+
+    def scan(self, content: Union[bytes, memoryview]) -> dict[str, dict]:
+        """
+        Scan *content* once and return the keywords found::
+
+            {keyword: {"count": int, "offsets": list[int]}}   # byte offsets
+
+        Keywords that do not occur are omitted.
+        """
+        hits: dict[str, dict] = {}
+        vocabulary = self.vocabulary
+        state = 0
+        run: list[int] = []          # offsets of the current run of adjacent keyword words
+        last_word = -2               # global index of the previous keyword word
+        word_base = 0                # global index of the window's first word
+        byte_base = 0                # byte offset of the window's first byte
+        pending_sep = b""
+        carry = b""
+
+        for start in range(0, max(len(content), 1), SCAN_WINDOW):
+            text = carry + bytes(content[start:start + SCAN_WINDOW]).lower()
+            if start + SCAN_WINDOW < len(content):
+                # Hold back a trailing partial word for the next window
+                cut = len(text.rstrip(WORD_BYTES))
+                text, carry = text[:cut], text[cut:]
+            else:
+                carry = b""
+
+            parts = WORD_SPLIT.split(text)
+            offsets = list(accumulate(map(len, parts), initial=byte_base))
+            words = parts[1::2]
+            for k in [k for k, word in enumerate(words) if word in vocabulary]:
+                sep = parts[2 * k] if k else pending_sep + parts[0]
+                if word_base + k != last_word + 1 or _normalise_sep(sep) not in self._joinable:
+                    state = 0
+                    run.clear()
+                state = self._step(state, self._inflected.get(words[k], words[k]))
+                run.append(offsets[2 * k + 1])
+                del run[:-self._max_words]
+                for idx in self._out[state]:
+                    hit = hits.setdefault(self.keywords[idx], {"count": 0, "offsets": []})
+                    hit["count"] += 1
+                    hit["offsets"].append(run[-self._lengths[idx]])
+                last_word = word_base + k
+
+            word_base += len(words)
+            byte_base += len(text)
+            pending_sep = parts[-1] if words else pending_sep + parts[-1]
+
+        return hits
@@ -0,0 +1,495 @@
+"""
+postgrest_stub.py — In-process PostgREST stand-in backed by SQLite.
+
+US-G1 | FR-K4: Measure db.py, the watcher pipelines and seed_loader.upsert
+under realistic volume and concurrency without a live Supabase project.
+
+A ThreadingHTTPServer on 127.0.0.1 (keep-alive HTTP/1.1, so the workers'
+pooled clients behave as they do against Supabase) serving
+``/rest/v1/{table}`` with the subset of PostgREST the workers use:
+
+  GET     filters, ``select=a,b``, ``order=col.desc,col2.asc``, ``limit``, ``offset``
+  POST    one object or a uniform array; ``on_conflict=cols``;
+          Prefer ``return=representation|minimal`` and
+          ``resolution=merge-duplicates|ignore-duplicates``
+  PATCH   filters + partial object (merged into every matching row)
+  DELETE  filters
+
+  filters ``col=eq.|neq.|gt.|gte.|lt.|lte.|is.|in.(a,"b c")``
+
+LATEST_VIEWS are served read-only, newest row per partition column.
+
+Rows are stored as JSON documents, one SQLite table per REST table (created
+on first use), keyed by the table's primary key from PRIMARY_KEYS — a UUID4
+is filled in when a posted row has none, like ``gen_random_uuid()``.
+Filtered columns get a lazily created expression index.  Without a
+resolution, a posted primary key that already exists is a 409 (23505); a
+non-uniform array is a 400 (PGRST102).  UNIQUE_KEYS (or *unique_keys*)
+declare secondary unique constraints; a collision on one that is not the
+request's on_conflict target is a 409 whatever the resolution.  There is no schema: unknown
+columns are accepted and unknown tables read as empty.
+
+Latency and failures are injectable: every request sleeps *latency*
+(+ uniform *latency_jitter*) seconds outside the database lock, a random
+*error_rate* fraction answers *error_status* (with Retry-After when set),
+and fail_next() queues deterministic failures::
+
+    with PostgrestStub(service_role_key="sb_secret_stub", latency=0.02) as stub:
+        session = db.SupabaseSession(stub.url, "sb_secret_stub")
+        ...
+        stub.rows("source_document")     # everything written
+        stub.stats                        # {"requests", "injected_errors", "by_table": {table: {method: n}}}
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+# Primary key per table (kb/schema.sql); other tables use DEFAULT_PRIMARY_KEY.
+PRIMARY_KEYS: dict[str, str] = {
+    "source_document": "source_doc_id",
+    "change_event": "change_event_id",
+    "instrument": "instrument_id",
+    "visa_subclass": "visa_id",
+    "requirement": "requirement_id",
+    "evidence_item": "evidence_id",
+    "flag_template": "flag_id",
+    "kb_release": "release_id",
+}
+DEFAULT_PRIMARY_KEY = "id"
+# Secondary unique constraints per table (kb/schema.sql); a posted row that
+# collides on one that is not its on_conflict target is a 409, as in Postgres.
+UNIQUE_KEYS: dict[str, list[tuple[str, ...]]] = {
+    "source_document": [("canonical_url", "content_hash")],
+}
+# Read-only DISTINCT ON views (kb/migrations): view → (table, partition column, newest-first column)
+LATEST_VIEWS: dict[str, tuple[str, str, str]] = {
+    "vw_source_document_latest": ("source_document", "canonical_url", "retrieved_at"),
+}
+REST_PREFIX = "/rest/v1/"
+RESERVED_PARAMS = frozenset({"select", "order", "limit", "offset", "on_conflict", "columns"})
+FILTER_OPS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class StubError(Exception):
+    """A PostgREST-style error response: HTTP *status* with a {code, message} body."""
+
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+# ---------------------------------------------------------------------------
+# Query parsing
+# ---------------------------------------------------------------------------
+
+def _ident(name: str) -> str:
+    if not _IDENT.match(name):
+        raise StubError(400, "PGRST100", f"unsupported identifier {name!r}")
+    return name
+
+
+def _expr(column: str) -> str:
+    return f"json_extract(doc, '$.{_ident(column)}')"
+
+
+def _scalar_forms(value: str) -> list:
+    """
+    SQL parameters a PostgREST filter literal may equal: the string itself
+    plus its boolean / numeric reading ("500" matches both "500" and 500).
+    """
+    forms: list = [value]
+    if value in ("true", "false"):
+        forms.append(1 if value == "true" else 0)
+    else:
+        try:
+            forms.append(int(value))
+        except ValueError:
+            try:
+                forms.append(float(value))
+            except ValueError:
+                pass
+    return forms
+
+
+def _in_values(value: str) -> list[str]:
+    """Split an ``in.(...)`` list: comma separated, optionally double-quoted with \\ escapes."""
+    if not (value.startswith("(") and value.endswith(")")):
+        raise StubError(400, "PGRST100", f"malformed in filter {value!r}")
+    inner = value[1:-1]
+    if not inner:
+        return []
+    return next(csv.reader([inner], delimiter=",", quotechar='"', escapechar="\\", doublequote=False))
+
+
+def _filter_sql(column: str, spec: str) -> tuple[str, list]:
+    """SQL condition + parameters for one ``column=op.value`` filter."""
+    op, _, value = spec.partition(".")
+    expr = _expr(column)
+    if op == "in":
+        params = [form for v in _in_values(value) for form in _scalar_forms(v)]
+        if not params:
+            return "0", []
+        return f"{expr} IN ({','.join('?' * len(params))})", params
+    if op == "is":
+        if value == "null":
+            return f"{expr} IS NULL", []
+        if value in ("true", "false"):
+            return f"{expr} = ?", [1 if value == "true" else 0]
+        raise StubError(400, "PGRST100", f"unsupported is.{value}")
+    if op in ("eq", "neq"):
+        forms = _scalar_forms(value)
+        negate = "NOT " if op == "neq" else ""
+        return f"{negate}{expr} IN ({','.join('?' * len(forms))})", forms
+    if op in FILTER_OPS:
+        forms = _scalar_forms(value)
+        if len(forms) > 1 and not isinstance(forms[1], str):
+            return f"{expr} {FILTER_OPS[op]} ?", [forms[1]]
+        return f"CAST({expr} AS TEXT) {FILTER_OPS[op]} ?", [value]
+    raise StubError(400, "PGRST100", f"unsupported operator {op!r}")
+
+
+def _order_sql(order: str) -> str:
+    """``col.desc,col2.asc.nullsfirst`` → ORDER BY terms (PostgREST null placement)."""
+    terms = []
+    for part in order.split(","):
+        column, *mods = part.split(".")
+        desc = "desc" in mods
+        nulls_first = "nullsfirst" in mods or (desc and "nullslast" not in mods)
+        expr = _expr(column)
+        terms.append(f"({expr} IS NULL) {'DESC' if nulls_first else 'ASC'}")
+        terms.append(f"{expr} {'DESC' if desc else 'ASC'}")
+    return ", ".join(terms)
+
+
+def _prefer(headers) -> dict[str, str]:
+    """Parse the Prefer header into ``{"return": ..., "resolution": ...}``."""
+    prefer = {}
+    for token in (headers.get("Prefer") or "").split(","):
+        key, _, value = token.strip().partition("=")
+        if key:
+            prefer[key] = value
+    return prefer
+
+
+def _project(row: dict, select: Optional[str]) -> dict:
+    if not select or select == "*":
+        return row
+    return {column: row.get(column) for column in select.split(",")}
+
+
+# ---------------------------------------------------------------------------
+# Stub
+# ---------------------------------------------------------------------------
+
+class PostgrestStub:
+    """
+    SQLite-backed PostgREST stand-in; see the module docstring.
+
+    *path* is the SQLite database (default in-memory).  With
+    *service_role_key* set, requests whose ``apikey`` header differs get a
+    401.  handle() serves one request without sockets; start() / the context
+    manager run the HTTP server on an ephemeral port.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        service_role_key: Optional[str] = None,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: Optional[int] = None,
+        primary_keys: Optional[dict[str, str]] = None,
+        unique_keys: Optional[dict[str, list[tuple[str, ...]]]] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.service_role_key = service_role_key
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.primary_keys = {**PRIMARY_KEYS, **(primary_keys or {})}
+        self.unique_keys = {**UNIQUE_KEYS, **(unique_keys or {})}
+        self.rng = rng or random.Random()
+        self.stats: dict = {"requests": 0, "injected_errors": 0, "by_table": {}}
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._tables: set[str] = set()
+        self._indexes: set[tuple[str, str]] = set()
+        self._failures: list[dict] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def __enter__(self) -> "PostgrestStub":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> "PostgrestStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True     # headers and body go out in separate writes
+
+            def _serve(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, payload = stub.handle(self.command, self.path, self.headers, body)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _serve
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="postgrest-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._conn.close()
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as SUPABASE_URL (server must be started)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # -- injection + inspection ---------------------------------------------
+
+    def fail_next(
+        self,
+        count: int = 1,
+        status: int = 503,
+        table: Optional[str] = None,
+        method: Optional[str] = None,
+        retry_after: Optional[int] = None,
+    ) -> None:
+        """Answer the next *count* matching requests with *status*."""
+        with self._lock:
+            self._failures.extend(
+                {"status": status, "table": table, "method": method, "retry_after": retry_after}
+                for _ in range(count)
+            )
+
+    def rows(self, table: str) -> list[dict]:
+        """Every row of *table*, in insertion order."""
+        with self._lock:
+            return [json.loads(doc) for (doc,) in self._conn.execute(f"SELECT doc FROM {self._table(table)} ORDER BY rowid")]
+
+    def _injected(self, method: str, table: str) -> Optional[dict]:
+        for i, failure in enumerate(self._failures):
+            if failure["table"] in (None, table) and failure["method"] in (None, method):
+                return self._failures.pop(i)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return {"status": self.error_status, "retry_after": self.retry_after}
+        return None
+
+    # -- storage ------------------------------------------------------------
+
+    def _table(self, table: str) -> str:
+        if table not in self._tables:
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS "t_{table}" (pk TEXT PRIMARY KEY, doc TEXT NOT NULL)')
+            self._tables.add(table)
+        return f'"t_{table}"'
+
+    def _index(self, table: str, column: str) -> None:
+        if (table, column) in self._indexes:
+            return
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table}_{column}" ON {self._table(table)} ({_expr(column)})')
+        self._indexes.add((table, column))
+
+    def _source(self, table: str) -> str:
+        """FROM clause for *table*: its SQLite table, or a LATEST_VIEWS window over the base table."""
+        if table not in LATEST_VIEWS:
+            return self._table(table)
+        base, partition, newest = LATEST_VIEWS[table]
+        return (
+            f"(SELECT pk, doc, rid AS rowid FROM (SELECT pk, doc, rowid AS rid, ROW_NUMBER() OVER ("
+            f"PARTITION BY {_expr(partition)} ORDER BY {_expr(newest)} DESC) AS rn "
+            f"FROM {self._table(base)}) WHERE rn = 1)"
+        )
+
+    def _where(self, table: str, filters: list[tuple[str, str]]) -> tuple[str, list]:
+        conditions, params = [], []
+        for column, spec in filters:
+            self._index(LATEST_VIEWS[table][0] if table in LATEST_VIEWS else table, column)
+            sql, values = _filter_sql(column, spec)
+            conditions.append(sql)
+            params.extend(values)
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def _select(self, table: str, filters, order=None, limit=None, offset=None) -> list[tuple[str, dict]]:
+        where, params = self._where(table, filters)
+        sql = f"SELECT pk, doc FROM {self._source(table)}{where} ORDER BY "
+        sql += (_order_sql(order) + ", rowid") if order else "rowid"
+        if limit is not None or offset is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else int(limit), int(offset or 0)]
+        return [(pk, json.loads(doc)) for pk, doc in self._conn.execute(sql, params)]
+
+    def _conflicting(self, table: str, columns: list[str], row: dict) -> list[tuple[str, dict]]:
+        """Existing rows equal to *row* on every conflict column (NULLs never conflict)."""
+        values = [row.get(c) for c in columns]
+        if any(v is None for v in values):
+            return []
+        for column in columns:
+            self._index(table, column)
+        where = " AND ".join(f"{_expr(c)} = ?" for c in columns)
+        sql = f"SELECT pk, doc FROM {self._table(table)} WHERE {where} LIMIT 1"
+        return [(pk, json.loads(doc)) for pk, doc in self._conn.execute(sql, values)]
+
+    def _check_unique(self, table: str, pk: str, conflict: list[str], row: dict) -> None:
+        """409 if *row* collides with another row on a unique key other than the *conflict* target."""
+        for columns in self.unique_keys.get(table, ()):
+            if list(columns) == conflict:
+                continue
+            if any(existing[pk] != row[pk] for _, existing in self._conflicting(table, list(columns), row)):
+                name = f"{table}_{'_'.join(columns)}_key"
+                raise StubError(409, "23505", f'duplicate key value violates unique constraint "{name}"')
+
+    def _insert(self, table: str, rows: list[dict], on_conflict: Optional[str], resolution: Optional[str]) -> list[dict]:
+        pk = self.primary_keys.get(table, DEFAULT_PRIMARY_KEY)
+        conflict = [_ident(c) for c in on_conflict.split(",")] if on_conflict else [pk]
+        written = []
+        for row in rows:
+            row = {pk: str(uuid.uuid4()), **row} if row.get(pk) is None else dict(row)
+            match = self._conflicting(table, conflict, row) if resolution else []
+            if match:
+                if resolution == "ignore-duplicates":
+                    continue
+                key, existing = match[0]
+                merged = {**existing, **row, pk: existing[pk]}
+                self._conn.execute(f"UPDATE {self._table(table)} SET doc = ? WHERE pk = ?", (json.dumps(merged), key))
+                written.append(merged)
+                continue
+            self._check_unique(table, pk, conflict, row)
+            try:
+                self._conn.execute(
+                    f"INSERT INTO {self._table(table)} (pk, doc) VALUES (?, ?)", (str(row[pk]), json.dumps(row)),
+                )
+            except sqlite3.IntegrityError:
+                raise StubError(409, "23505", f'duplicate key value violates unique constraint "{table}_pkey"')
+            written.append(row)
+        return written
+
+    # -- request handling ---------------------------------------------------
+
+    def handle(self, method: str, target: str, headers, body: bytes) -> tuple[int, dict, bytes]:
+        """Serve one request; returns (status, headers, body)."""
+        if self.latency or self.latency_jitter:
+            time.sleep(self.latency + self.rng.uniform(0, self.latency_jitter))
+        parts = urlsplit(target)
+        table = parts.path[len(REST_PREFIX):] if parts.path.startswith(REST_PREFIX) else ""
+        with self._lock:
+            self.stats["requests"] += 1
+            by_method = self.stats["by_table"].setdefault(table, {})
+            by_method[method] = by_method.get(method, 0) + 1
+            failure = self._injected(method, table)
+            if failure:
+                self.stats["injected_errors"] += 1
+                extra = {"Retry-After": str(failure["retry_after"])} if failure.get("retry_after") is not None else {}
+                return self._error(StubError(failure["status"], "STUB", "injected failure"), extra)
+            try:
+                if self.service_role_key is not None and headers.get("apikey") != self.service_role_key:
+                    raise StubError(401, "PGRST301", "Invalid API key")
+                if not table or not _IDENT.match(table):
+                    raise StubError(404, "PGRST205", f"relation {table!r} not found")
+                self._conn.execute("BEGIN")
+                try:
+                    status, payload = self._dispatch(method, table, parse_qsl(parts.query, keep_blank_values=True),
+                                                     _prefer(headers), body)
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    self._tables.clear()        # DDL of this request was rolled back too
+                    self._indexes.clear()
+                    raise
+                self._conn.execute("COMMIT")
+            except StubError as exc:
+                return self._error(exc)
+            except (sqlite3.Error, ValueError, TypeError) as exc:
+                return self._error(StubError(500, "XX000", str(exc)))
+        if payload is None:
+            return status, {}, b""
+        return status, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8")
+
+    def _dispatch(self, method: str, table: str, query: list, prefer: dict, body: bytes) -> tuple[int, Optional[list]]:
+        params = {key: value for key, value in query if key in RESERVED_PARAMS}
+        filters = [(_ident(key), value) for key, value in query if key not in RESERVED_PARAMS]
+        select = params.get("select")
+        representation = prefer.get("return") == "representation"
+
+        if method == "GET":
+            rows = self._select(table, filters, params.get("order"), params.get("limit"), params.get("offset"))
+            return 200, [_project(row, select) for _, row in rows]
+        if table in LATEST_VIEWS:
+            raise StubError(405, "PGRST117", f"{table} is a read-only view")
+
+        if method == "DELETE":
+            rows = self._select(table, filters)
+            self._conn.executemany(f"DELETE FROM {self._table(table)} WHERE pk = ?", [(pk,) for pk, _ in rows])
+            return (200, [_project(row, select) for _, row in rows]) if representation else (204, None)
+
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            raise StubError(400, "PGRST102", "Empty or invalid json")
+
+        if method == "PATCH":
+            if not isinstance(data, dict):
+                raise StubError(400, "PGRST102", "PATCH body must be a JSON object")
+            updated = []
+            for pk, row in self._select(table, filters):
+                row = {**row, **data}
+                self._conn.execute(f"UPDATE {self._table(table)} SET doc = ? WHERE pk = ?", (json.dumps(row), pk))
+                updated.append(row)
+            return (200, [_project(row, select) for row in updated]) if representation else (204, None)
+
+        if method == "POST":
+            rows = data if isinstance(data, list) else [data]
+            if not all(isinstance(row, dict) for row in rows):
+                raise StubError(400, "PGRST102", "POST body must be an object or an array of objects")
+            if rows and any(set(row) != set(rows[0]) for row in rows):
+                raise StubError(400, "PGRST102", "All object keys must match")
+            written = self._insert(table, rows, params.get("on_conflict"), prefer.get("resolution"))
+            return (201, [_project(row, select) for row in written]) if representation else (201, None)
+
+        raise StubError(405, "PGRST117", f"Unsupported HTTP method {method}")
+
+    @staticmethod
+    def _error(exc: StubError, headers: Optional[dict] = None) -> tuple[int, dict, bytes]:
+        payload = {"code": exc.code, "message": str(exc), "details": None, "hint": None}
+        return exc.status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(payload).encode("utf-8")
@@ -0,0 +1,274 @@
+"""
+readiness_scoring.py — Batch implementation of kb/rules/readiness_scoring_model.json.
+
+US-G2 | FR-K3: the readiness scorecard (preparation completeness, never an
+outcome prediction).  Mirrors computeReadinessScore() in
+app/lib/export-builder.ts, with weights, flag penalties, the flag → severity
+mapping and score bands read from the model file:
+
+    evidence_coverage      supported / total_required            (0 when total is 0)
+    timeline_completeness  1 - largest_timeline_gap_days / 365   (gap defaults to 0)
+    consistency_score      1 - consistency_flag_count * 0.1      (count defaults to 0)
+    risk_indicator_score   1 - min(1, Σ penalty(severity(flag)))
+    readiness_score        round(100 × Σ weight × component)
+
+Components are clamped to [0, 1].  Bands are assigned on readiness_score / 100
+against each band's ``min`` (as the app does).
+
+    model = load_model()                    # parsed once per file mtime
+    result = model.score_columns(columns)   # {column: per-case list}
+    model.score(cases)                      # [per-case dict]
+
+score_columns() is a single column-wise pass; numpy is used when installed
+(``pip install -e ".[numpy]"``), else plain lists.  Flag sets are priced
+once per distinct set, so the frozensets from flag_rules.RuleEngine.evaluate()
+can be passed straight in.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency — fall back to plain lists
+    np = None
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+MODEL_PATH = Path(__file__).parent.parent.parent / "kb" / "rules" / "readiness_scoring_model.json"
+BACKENDS = ("numpy", "python")
+DEFAULT_BACKEND = "numpy" if np is not None else "python"
+
+# Constants inside the model's component formulas
+TIMELINE_GAP_DAYS = 365
+CONSISTENCY_STEP = 0.1
+
+# Input columns (see score_columns)
+CASE_FIELDS = (
+    "supported_evidence_items",
+    "total_required_evidence_items",
+    "largest_timeline_gap_days",
+    "consistency_flag_count",
+    "flags",
+)
+
+# Output columns named as in public.case_scores, plus the band
+SCORE_COLUMNS = (
+    "readiness_score",
+    "evidence_coverage",
+    "timeline_completeness",
+    "consistency_score",
+    "risk_indicator_score",
+    "unresolved_flags_count",
+)
+
+
+def _clamp(value: float) -> float:
+    return 0.0 if value < 0 else 1.0 if value > 1 else value
+
+
+def _round_half_up(value: float) -> int:
+    """Math.round semantics (0.5 rounds up), unlike Python's round()."""
+    return int(math.floor(value + 0.5))
+
+
+class ReadinessModel:
+    """
+    Parsed scoring model.
+
+    Attributes::
+
+        version     str
+        weights     {component: float}      # evidence_coverage, timeline_completeness,
+                                            # consistency_score, risk_flags
+        penalties   {severity: float}
+        severity    {flag_code: severity}
+        bands       [(min, key, label)]     # highest min first
+    """
+
+    def __init__(self, model: Mapping, backend: Optional[str] = None) -> None:
+        backend = backend or DEFAULT_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+        if backend == "numpy" and np is None:
+            raise ImportError("numpy backend requested but numpy is not installed")
+        self.backend = backend
+        self.version = str(model.get("version", ""))
+        self.weights = {name: float(c["weight"]) for name, c in model["score_components"].items()}
+        missing = {"evidence_coverage", "timeline_completeness", "consistency_score", "risk_flags"} - set(self.weights)
+        if missing:
+            raise ValueError(f"Scoring model lacks components: {sorted(missing)}")
+        self.penalties = {sev: float(p) for sev, p in model.get("flag_penalties", {}).items()}
+        self.severity = dict(model.get("flag_severity_mapping", {}))
+        self.bands = sorted(
+            ((float(b["min"]), key, b.get("label", key)) for key, b in model.get("score_bands", {}).items()),
+            reverse=True,
+        )
+        self._flag_penalty_cache: dict[frozenset, float] = {}
+
+    # -- components ----------------------------------------------------------
+
+    def flag_penalty(self, flags: Iterable[str]) -> float:
+        """Total penalty for a set of flag codes, capped at 1 (unmapped flags cost 0)."""
+        key = flags if isinstance(flags, frozenset) else frozenset(flags)
+        penalty = self._flag_penalty_cache.get(key)
+        if penalty is None:
+            total = sum(self.penalties.get(self.severity.get(flag, ""), 0.0) for flag in key)
+            penalty = self._flag_penalty_cache[key] = min(1.0, total)
+        return penalty
+
+    def band(self, readiness_score: float) -> tuple[str, str]:
+        """(band key, label) for a 0–100 readiness score."""
+        for minimum, key, label in self.bands:
+            if readiness_score / 100 >= minimum:
+                return key, label
+        return self.bands[-1][1], self.bands[-1][2]
+
+    # -- batches -------------------------------------------------------------
+
+    def score_columns(self, columns: Mapping[str, Sequence], n: Optional[int] = None) -> dict[str, list]:
+        """
+        Score every case in *columns* (CASE_FIELDS → per-case values; absent
+        columns and None values take the defaults above; "flags" holds an
+        iterable of flag codes per case).
+
+        Returns::
+
+            {
+                "readiness_score": list[int],         # 0–100
+                "evidence_coverage": list[float],     # components, 0–1
+                "timeline_completeness": list[float],
+                "consistency_score": list[float],
+                "risk_indicator_score": list[float],
+                "unresolved_flags_count": list[int],
+                "band": list[str],                    # score_bands key
+                "band_label": list[str],
+            }
+        """
+        if n is None:
+            n = len(next(iter(columns.values()))) if columns else 0
+        # Explicit None checks: numpy arrays (the column or a case's codes) have no truth value.
+        flags = columns.get("flags")
+        if flags is None:
+            flags = [()] * n
+        flags = [() if f is None else f for f in flags]
+        penalties = [self.flag_penalty(f) for f in flags]
+        flag_counts = [len(f) for f in flags]
+
+        if self.backend == "numpy":
+            result = self._numpy_components(columns, n, penalties)
+        else:
+            result = self._python_components(columns, n, penalties)
+
+        result["unresolved_flags_count"] = flag_counts
+        bands = {score: self.band(score) for score in set(result["readiness_score"])}
+        result["band"] = [bands[score][0] for score in result["readiness_score"]]
+        result["band_label"] = [bands[score][1] for score in result["readiness_score"]]
+        return result
+
+    def _python_components(self, columns, n: int, penalties: list[float]) -> dict[str, list]:
+        def column(name: str, default: float) -> list:
+            values = columns.get(name)
+            if values is None:
+                return [default] * n
+            return [default if v is None else float(v) for v in values]
+
+        supported = column("supported_evidence_items", 0.0)
+        total = column("total_required_evidence_items", 0.0)
+        gaps = column("largest_timeline_gap_days", 0.0)
+        inconsistencies = column("consistency_flag_count", 0.0)
+
+        evidence = [_clamp(s / t) if t > 0 else 0.0 for s, t in zip(supported, total)]
+        timeline = [_clamp(1 - g / TIMELINE_GAP_DAYS) for g in gaps]
+        consistency = [_clamp(1 - c * CONSISTENCY_STEP) for c in inconsistencies]
+        risk = [1 - p for p in penalties]
+
+        w = self.weights
+        scores = [
+            _round_half_up(100 * (
+                e * w["evidence_coverage"] + t * w["timeline_completeness"]
+                + c * w["consistency_score"] + r * w["risk_flags"]
+            ))
+            for e, t, c, r in zip(evidence, timeline, consistency, risk)
+        ]
+        return {
+            "readiness_score": scores,
+            "evidence_coverage": evidence,
+            "timeline_completeness": timeline,
+            "consistency_score": consistency,
+            "risk_indicator_score": risk,
+        }
+
+    def _numpy_components(self, columns, n: int, penalties: list[float]) -> dict[str, list]:
+        def column(name: str, default: float):
+            values = columns.get(name)
+            if values is None:
+                return np.full(n, default)
+            array = np.array([np.nan if v is None else v for v in values], dtype=float)
+            return np.where(np.isnan(array), default, array)
+
+        supported = column("supported_evidence_items", 0.0)
+        total = column("total_required_evidence_items", 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            evidence = np.where(total > 0, np.clip(supported / np.where(total > 0, total, 1), 0, 1), 0.0)
+        timeline = np.clip(1 - column("largest_timeline_gap_days", 0.0) / TIMELINE_GAP_DAYS, 0, 1)
+        consistency = np.clip(1 - column("consistency_flag_count", 0.0) * CONSISTENCY_STEP, 0, 1)
+        risk = 1 - np.asarray(penalties, dtype=float)
+
+        w = self.weights
+        raw = (
+            evidence * w["evidence_coverage"] + timeline * w["timeline_completeness"]
+            + consistency * w["consistency_score"] + risk * w["risk_flags"]
+        )
+        return {
+            "readiness_score": np.floor(100 * raw + 0.5).astype(int).tolist(),
+            "evidence_coverage": evidence.tolist(),
+            "timeline_completeness": timeline.tolist(),
+            "consistency_score": consistency.tolist(),
+            "risk_indicator_score": risk.tolist(),
+        }
+
+    def score(self, cases: Sequence[Mapping]) -> list[dict]:
+        """Score a list of case dicts (CASE_FIELDS keys); one result dict per case."""
+        columns = {field: [case.get(field) for case in cases] for field in CASE_FIELDS}
+        result = self.score_columns(columns, n=len(cases))
+        return [dict(zip(result, values)) for values in zip(*result.values())]
+
+
+def case_score_rows(case_ids: Sequence[str], result: Mapping[str, list], scored_at: str) -> list[dict]:
+    """
+    public.case_scores rows for *case_ids* from a score_columns() *result*,
+    ready to upsert (e.g. with seed_loader.UpsertEngine).
+    """
+    return [
+        {"case_id": case_id, **{col: result[col][i] for col in SCORE_COLUMNS}, "last_scored_at": scored_at}
+        for i, case_id in enumerate(case_ids)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+_cache: dict[tuple[Path, str], tuple[int, ReadinessModel]] = {}
+
+
+def load_model(path: Optional[Path] = None, backend: Optional[str] = None) -> ReadinessModel:
+    """
+    Parse *path* (default kb/rules/readiness_scoring_model.json).
+    Re-read only when the file's mtime changes.
+    """
+    path = Path(path or MODEL_PATH)
+    backend = backend or DEFAULT_BACKEND
+    mtime = path.stat().st_mtime_ns
+    cached = _cache.get((path, backend))
+    if cached and cached[0] == mtime:
+        return cached[1]
+    model = ReadinessModel(json.loads(path.read_text(encoding="utf-8")), backend=backend)
+    _cache[(path, backend)] = (mtime, model)
+    return model
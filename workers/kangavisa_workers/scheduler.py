@@ -0,0 +1,228 @@
+"""
+scheduler.py — Tiered polling scheduler for the ingestion watchers.
+
+US-G1 | FR-K4: poll each source at its kb/sources.yml cadence
+(frl_daily, homeaffairs_weekly, datagov_weekly) instead of fetching every
+target on every run.
+
+Targets come from sources.watch_targets() and intervals from
+sources.polling_cadences(); both are re-read whenever sources.yml changes,
+so a running daemon picks up edits on its next tick.  Each target's
+next-due time is kept in a local JSON state file:
+
+    {
+        "version": 1,
+        "targets": {
+            target_id: {                 # source_id, or dataset_id for data.gov.au
+                "group": str,            # frl | homeaffairs | datagov
+                "next_due": str,         # ISO-8601 UTC
+                "last_run": str | None,
+                "last_ok": bool | None,
+                "failures": int,         # consecutive
+            },
+        },
+    }
+
+A target never seen before is due at once.  After a successful run it is
+next due one interval later, ± *jitter* × interval so targets of a group
+drift apart instead of all firing together; after a failure it is retried
+after min(interval, RETRY_SECONDS), with the same jitter.
+
+    scheduler = Scheduler()
+    scheduler.tick(run_due)      # run_due({group: [target]}) → result dicts
+    scheduler.run_forever(run_due, tick_seconds=300)
+
+run_watchers.py --schedule wires run_due to the watcher pipelines.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from kangavisa_workers import sources
+
+logger = logging.getLogger("scheduler")
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+STATE_PATH = Path(os.environ.get(
+    "KANGAVISA_SCHEDULER_STATE", sources.KB_DIR / ".scheduler_state.json",
+))
+STATE_VERSION = 1
+DEFAULT_JITTER = 0.1          # ± fraction of the interval
+DEFAULT_TICK_SECONDS = 300
+RETRY_SECONDS = 60 * 60       # failed targets are retried within the hour
+MIN_SLEEP_SECONDS = 1
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def target_id(target: dict) -> str:
+    """Scheduler key for *target*: its source_id, or dataset_id for data.gov.au."""
+    return target.get("source_id") or target["dataset_id"]
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+class Scheduler:
+    """
+    Due-time bookkeeping for every enabled watch target.
+
+    *clock* returns the current aware datetime and *rng* draws the jitter;
+    both are injectable for tests.
+    """
+
+    def __init__(
+        self,
+        state_path: Optional[Path] = None,
+        sources_path: Optional[Path] = None,
+        jitter: float = DEFAULT_JITTER,
+        rng: Optional[random.Random] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError(f"jitter must be in [0, 1), got {jitter}")
+        self.state_path = Path(state_path or STATE_PATH)
+        self.sources_path = sources_path
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.clock = clock or _utcnow
+        self.state: dict[str, dict] = self._read()
+
+    # -- state file ----------------------------------------------------------
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable scheduler state %s: %s", self.state_path, exc)
+            return {}
+        if data.get("version") != STATE_VERSION:
+            logger.info("Scheduler state %s is for another version — starting afresh", self.state_path)
+            return {}
+        return data.get("targets") or {}
+
+    def save(self) -> None:
+        """Write the state file atomically, dropping targets no longer in sources.yml."""
+        known = {target_id(t) for targets in self.targets().values() for t in targets}
+        self.state = {key: entry for key, entry in self.state.items() if key in known}
+        data = {"version": STATE_VERSION, "targets": self.state}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    # -- targets -------------------------------------------------------------
+
+    def cadences(self) -> dict[str, int]:
+        return sources.polling_cadences(self.sources_path)
+
+    def targets(self) -> dict[str, list[dict]]:
+        """Watch targets of every group with polling enabled."""
+        cadences = self.cadences()
+        return {
+            group: targets
+            for group, targets in sources.watch_targets(self.sources_path).items()
+            if group in cadences
+        }
+
+    def next_due(self, key: str) -> Optional[datetime]:
+        entry = self.state.get(key)
+        return datetime.fromisoformat(entry["next_due"]) if entry else None
+
+    def due(self, now: Optional[datetime] = None) -> dict[str, list[dict]]:
+        """``{group: [target]}`` of targets due at *now* (groups with none omitted)."""
+        now = now or self.clock()
+        due: dict[str, list[dict]] = {}
+        for group, targets in self.targets().items():
+            for target in targets:
+                next_due = self.next_due(target_id(target))
+                if next_due is None or next_due <= now:
+                    due.setdefault(group, []).append(target)
+        return due
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Earliest next-due time over all targets (None if none are enabled)."""
+        times = [
+            self.next_due(target_id(t)) or datetime.min.replace(tzinfo=timezone.utc)
+            for targets in self.targets().values() for t in targets
+        ]
+        return min(times) if times else None
+
+    def record(self, group: str, key: str, ok: bool, now: Optional[datetime] = None) -> datetime:
+        """Record a run of target *key* and schedule its next one.  Returns the next-due time."""
+        now = now or self.clock()
+        interval = self.cadences().get(group)
+        if interval is None:
+            raise ValueError(f"Polling is not enabled for group '{group}'")
+        failures = 0 if ok else self.state.get(key, {}).get("failures", 0) + 1
+        base = interval if ok else min(interval, RETRY_SECONDS)
+        delay = base * (1 + self.rng.uniform(-self.jitter, self.jitter))
+        next_due = now + timedelta(seconds=delay)
+        self.state[key] = {
+            "group": group,
+            "next_due": next_due.isoformat(),
+            "last_run": now.isoformat(),
+            "last_ok": ok,
+            "failures": failures,
+        }
+        return next_due
+
+    # -- running -------------------------------------------------------------
+
+    def tick(self, run_due: Callable[[dict[str, list[dict]]], list[dict]]) -> list[dict]:
+        """
+        Run every due target once through *run_due* — called with
+        ``{group: [target]}``, returning run_watchers-style result dicts
+        (``{"source_id", "ok", ...}``) — then record the outcomes and save.
+        Targets missing from the results count as failed.
+        """
+        now = self.clock()
+        due = self.due(now)
+        if not due:
+            return []
+        results = run_due(due)
+        ok_by_id = {entry["source_id"]: entry["ok"] for entry in results}
+        for group, targets in due.items():
+            for target in targets:
+                key = target_id(target)
+                self.record(group, key, ok_by_id.get(key, False), now)
+        self.save()
+        return results
+
+    def run_forever(
+        self,
+        run_due: Callable[[dict[str, list[dict]]], list[dict]],
+        tick_seconds: int = DEFAULT_TICK_SECONDS,
+        max_ticks: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Tick, then sleep until the next target is due (at most *tick_seconds*),
+        forever or for *max_ticks* ticks.
+        """
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            self.tick(run_due)
+            ticks += 1
+            if max_ticks is not None and ticks >= max_ticks:
+                return
+            wakeup = self.next_wakeup()
+            wait = tick_seconds
+            if wakeup is not None:
+                wait = min(tick_seconds, (wakeup - self.clock()).total_seconds())
+            sleep(max(wait, MIN_SLEEP_SECONDS))
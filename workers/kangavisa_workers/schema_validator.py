@@ -4,6 +4,10 @@ JSON Schema validator for KangaVisa KB model objects.
 Validates Requirement, EvidenceItem, FlagTemplate, Instrument
 against the canonical JSON Schemas in kb/*.jsonschema.
 
+Compiled validators are cached per process, keyed by model type and the
+schema file's mtime + size, so validating the whole KB costs one schema
+read + compile per model type; editing a .jsonschema invalidates its entry.
+
 Used in:
   - workers/tests/test_schema_validation.py (automated)
   - CI pipeline (python -m pytest workers/tests/)
@@ -14,10 +18,12 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import jsonschema
 from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
 
 # ---------------------------------------------------------------------------
 # Schema paths
@@ -43,30 +49,88 @@ def load_schema(model_type: str) -> dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+# ---------------------------------------------------------------------------
+# Compiled-validator cache
+# ---------------------------------------------------------------------------
+
+# model_type → ((schema path, mtime_ns, size), compiled validator)
+_validators: dict[str, tuple[tuple, Validator]] = {}
+
+
+def get_validator(model_type: str) -> Validator:
+    """
+    Return the compiled ``Draft*Validator`` for *model_type*.
+
+    The schema is read, checked against its metaschema and compiled once per
+    process; a cached validator is reused until the schema file changes.
+    Raises ``ValueError`` for unknown model_type.
+    """
+    path = SCHEMA_PATHS.get(model_type)
+    if path is None:
+        load_schema(model_type)  # raises the standard unknown-type ValueError
+    stat = path.stat()
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    cached = _validators.get(model_type)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    schema = load_schema(model_type)
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+    _validators[model_type] = (key, validator)
+    return validator
+
+
+def clear_validator_cache() -> None:
+    """Drop every cached validator (next use recompiles)."""
+    _validators.clear()
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
 def validate(obj: dict[str, Any], model_type: str) -> None:
     """
     Validate *obj* against the JSON Schema for *model_type*.
 
-    Raises ``jsonschema.ValidationError`` on failure.
+    Raises ``jsonschema.ValidationError`` on failure (the most relevant
+    error, as ``jsonschema.validate`` reports it).
     Raises ``ValueError`` for unknown model_type.
     """
-    schema = load_schema(model_type)
-    jsonschema.validate(instance=obj, schema=schema)
+    error = best_match(get_validator(model_type).iter_errors(obj))
+    if error is not None:
+        raise error
+
+
+def iter_errors(
+    items: Iterable[dict[str, Any]],
+    model_type: str,
+) -> Iterator[tuple[int, ValidationError]]:
+    """
+    Validate each of *items* with the one cached validator for *model_type*
+    and yield ``(index, error)`` for every error found, lazily.
+    """
+    validator = get_validator(model_type)
+    for i, item in enumerate(items):
+        for error in validator.iter_errors(item):
+            yield i, error
+
+
+def format_error(index: int, error: ValidationError) -> str:
+    """Render an iter_errors() pair as ``[index] message (path: [...])``."""
+    return f"[{index}] {error.message} (path: {list(error.absolute_path)})"
 
 
 def validate_file(file_path: Path, model_type: str) -> list[str]:
     """
     Load a JSON file (single object or list) and validate each item.
 
-    Returns a list of error strings (empty = all valid).
+    Returns a list of error strings (empty = all valid) — every error of
+    every item, not just the first per item.
     """
     data = json.loads(file_path.read_text(encoding="utf-8"))
     items = data if isinstance(data, list) else [data]
-
-    errors: list[str] = []
-    for i, item in enumerate(items):
-        try:
-            validate(item, model_type)
-        except ValidationError as exc:
-            errors.append(f"[{i}] {exc.message} (path: {list(exc.absolute_path)})")
-    return errors
+    return [format_error(i, error) for i, error in iter_errors(items, model_type)]
@@ -6,10 +6,29 @@ US-F6 | US-G1 | FR-K1, FR-K2, FR-K3: Populates structured KB objects
 `kb/seed/*.json` files using the service role key.
 
 Usage:
-    python3 -m kangavisa_workers.seed_loader [--dry-run]
+    python3 -m kangavisa_workers.seed_loader [--dry-run] [--incremental] [--chunk-size N] [--parallelism N]
 
 All operations are UPSERT — safe to re-run. No existing rows are deleted.
 
+--incremental consults a local manifest (kb/.seed_manifest.json, or
+KANGAVISA_SEED_MANIFEST) holding the hash of every seed file and of every
+normalised row, keyed by subclass_code|stream / requirement_id /
+evidence_id / flag_id.  Unchanged files are skipped; of the rest,
+only new or changed rows are sent.  The manifest is updated table by table
+as each commits, never on --dry-run (which logs the delta instead).  The
+manifest is tied to SUPABASE_URL: pointing at another project starts afresh.
+
+To see what a load would change remotely, and to retire rows removed from
+kb/seed, use seed_reconcile (plan / apply).
+
+Rows go through one UpsertEngine per run: a single pooled HTTP client,
+rows split into chunks of --chunk-size, up to --parallelism chunks in
+flight, and retries under a fetch_policy.FetchPolicy (jittered backoff on
+429 / 5xx / transport errors, Retry-After in seconds or as an HTTP date,
+circuit breaker on the Supabase host).  Tables load in TABLE_ORDER and each table's chunks all commit
+before the next table starts, so FK children (requirement → evidence_item)
+never race their parents.  Per-table rows/s is logged at the end of run().
+
 Environment variables required:
     SUPABASE_URL              — e.g. https://xxxx.supabase.co
     SUPABASE_SERVICE_ROLE_KEY — secret key
@@ -18,14 +37,23 @@ Environment variables required:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Optional
 
 import httpx
 
+from kangavisa_workers import kb_model
+from kangavisa_workers.fetch_policy import FetchPolicy
+from kangavisa_workers.kb_model import SeedFile
+
 logger = logging.getLogger("seed_loader")
 
 # ---------------------------------------------------------------------------
@@ -36,32 +64,39 @@ SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
 DEFAULT_TIMEOUT = 30
 
+# Upsert engine tuning
+DEFAULT_CHUNK_SIZE = 500          # rows per POST
+DEFAULT_PARALLELISM = 4           # chunks in flight (and pooled connections)
+MAX_RETRIES = 4                   # retries per chunk after the first attempt
+BACKOFF_BASE = 0.5                # seconds; backoff ceiling doubles per retry
+UPSERT_RATE = 50.0                # requests / second to the Supabase host (headroom, not a throttle)
+
+# FK order: parents first.  Each table fully commits before the next starts.
+TABLE_ORDER = ["visa_subclass", "requirement", "evidence_item", "flag_template"]
+
 # Absolute path to kb/seed/ relative to this repo root.
 # Workers are invoked from kangavisa/ root, so kb/ is a sibling of workers/.
-SEED_DIR = Path(__file__).parent.parent.parent / "kb" / "seed"
+SEED_DIR = kb_model.SEED_DIR
+
+# Incremental mode manifest (local, not committed — see .gitignore)
+MANIFEST_PATH = Path(os.environ.get("KANGAVISA_SEED_MANIFEST", SEED_DIR.parent / ".seed_manifest.json"))
+# Bump when row normalisation in the loaders changes, so every row is resent.
+MANIFEST_VERSION = 1
+
+# Natural key of each table's rows, as recorded in the manifest
+ROW_KEYS = {
+    "visa_subclass": ("subclass_code", "stream"),
+    "requirement": ("requirement_id",),
+    "evidence_item": ("evidence_id",),
+    "flag_template": ("flag_id",),
+}
 
 
 # ---------------------------------------------------------------------------
-# Visa subclass catalog (US-F6: all 5 MVP visa groups)
+# Visa subclass catalog (US-F6: all MVP visa groups — shared via kb_model)
 # ---------------------------------------------------------------------------
 
-VISA_SUBCLASSES = [
-    {"subclass_code": "500", "stream": None, "name": "Student", "description": "International student visa"},
-    {"subclass_code": "485", "stream": None, "name": "Temporary Graduate", "description": "Post-study graduate visa"},
-    {"subclass_code": "482", "stream": "SID", "name": "Temporary Skill Shortage (SID)", "description": "Employer-sponsored TSS — Short-term and Medium-term streams"},
-    {"subclass_code": "417", "stream": None, "name": "Working Holiday", "description": "Working Holiday Maker — first, second, and third grant"},
-    {"subclass_code": "820", "stream": None, "name": "Partner (onshore)", "description": "Partner visa — onshore temporary (820) → permanent (801)"},
-    {"subclass_code": "309", "stream": None, "name": "Partner (offshore)", "description": "Partner visa — offshore temporary (309) → permanent (100)"},
-]
-
-# Mapping from seed filename prefix → subclass_code + stream
-SEED_VISA_MAP = {
-    "visa_500": {"subclass_code": "500", "stream": None},
-    "visa_485": {"subclass_code": "485", "stream": None},
-    "visa_482": {"subclass_code": "482", "stream": "SID"},
-    "visa_417": {"subclass_code": "417", "stream": None},
-    "visa_820": {"subclass_code": "820", "stream": None},
-}
+VISA_SUBCLASSES = kb_model.VISA_SUBCLASSES
 
 
 # ---------------------------------------------------------------------------
@@ -85,42 +120,312 @@ def _rest(table: str) -> str:
     return f"{SUPABASE_URL}/rest/v1/{table}"
 
 
-def upsert(table: str, rows: list[dict], dry_run: bool = False) -> int:
+def _chunks(rows: list[dict], size: int) -> list[list[dict]]:
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+class UpsertEngine:
+    """
+    Chunked, bounded-parallel UPSERT over one pooled httpx.Client.
+
+    Use as a context manager for one seed run::
+
+        with UpsertEngine(chunk_size=200, parallelism=4) as engine:
+            engine.upsert("requirement", rows)      # returns once every chunk committed
+            engine.upsert("evidence_item", rows)
+        engine.stats   # {"requirement": {"rows", "requests", "retries", "seconds", "rows_per_sec"}, ...}
+
+    Every request runs under *policy* (default: a FetchPolicy allowing
+    *max_retries* retries, sleeping with *sleep*).
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        parallelism: int = DEFAULT_PARALLELISM,
+        max_retries: int = MAX_RETRIES,
+        dry_run: bool = False,
+        timeout: int = DEFAULT_TIMEOUT,
+        sleep: Callable[[float], None] = time.sleep,
+        policy: Optional[FetchPolicy] = None,
+    ) -> None:
+        self.chunk_size = max(1, chunk_size)
+        self.parallelism = max(1, parallelism)
+        self.max_retries = max_retries
+        self.dry_run = dry_run
+        self.timeout = timeout
+        self.sleep = sleep
+        self.policy = policy or FetchPolicy(
+            default_rate=UPSERT_RATE, burst=int(UPSERT_RATE),
+            max_retries=max_retries, backoff_base=BACKOFF_BASE, sleep=sleep,
+        )
+        self.stats: dict[str, dict] = {}
+        self._client: Optional[httpx.Client] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()  # guards stats counters bumped by chunk threads
+
+    def __enter__(self) -> "UpsertEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.parallelism,
+                    max_keepalive_connections=self.parallelism,
+                ),
+            )
+        return self._client
+
+    def _table_stats(self, table: str) -> dict:
+        return self.stats.setdefault(
+            table, {"rows": 0, "requests": 0, "retries": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+        )
+
+    def _count(self, table: str, key: str) -> None:
+        with self._lock:
+            self._table_stats(table)[key] += 1
+
+    def _send(
+        self,
+        table: str,
+        method: str,
+        headers: dict,
+        params: Optional[dict] = None,
+        body=None,
+        what: str = "request",
+    ) -> httpx.Response:
+        """One PostgREST request against *table*, retried under the engine's policy."""
+        tries = 0
+
+        def attempt() -> httpx.Response:
+            nonlocal tries
+            if tries:
+                self._count(table, "retries")
+                logger.warning("  Retrying %s for %s (attempt %d/%d)", what, table, tries, self.policy.max_retries)
+            tries += 1
+            self._count(table, "requests")
+            resp = self.client.request(method, _rest(table), headers=headers, params=params, json=body)
+            if resp.status_code not in (200, 201, 204, 206):
+                raise httpx.HTTPStatusError(
+                    f"HTTP {resp.status_code} from {method} {table}", request=resp.request, response=resp,
+                )
+            return resp
+
+        try:
+            return self.policy.call(_rest(table), attempt)
+        except httpx.HTTPStatusError as exc:
+            logger.error(
+                "%s on %s failed: HTTP %s — %s",
+                method, table, exc.response.status_code, exc.response.text[:300]
+            )
+            raise
+
+    def _post_chunk(self, table: str, chunk: list[dict], headers: dict) -> int:
+        self._send(table, "POST", headers, body=chunk, what=f"{len(chunk)}-row chunk")
+        return len(chunk)
+
+    def select(self, table: str, params: dict) -> list[dict]:
+        """GET rows from *table* with PostgREST query *params* (reads run even on dry runs)."""
+        headers = {k: v for k, v in _headers().items() if k != "Prefer"}
+        return self._send(table, "GET", headers, params=params, what="select").json()
+
+    def patch(self, table: str, params: dict, values: dict, rows: int) -> int:
+        """
+        PATCH *values* onto the *rows* rows of *table* matched by *params*.
+        Returns *rows* (logged only on dry runs).
+        """
+        if self.dry_run:
+            logger.info("[DRY RUN] Would patch %d rows of %s with %s", rows, table, json.dumps(values))
+            return rows
+        headers = {**_headers(), "Prefer": "return=minimal"}
+        self._send(table, "PATCH", headers, params=params, body=values, what=f"{rows}-row patch")
+        return rows
+
+    def upsert(self, table: str, rows: list[dict]) -> int:
+        """
+        UPSERT *rows* into *table* in chunks, up to *parallelism* at once.
+        Returns once every chunk has committed (or raises on the first
+        chunk that exhausts its retries).  Returns the number of rows.
+        """
+        if not rows:
+            return 0
+
+        stats = self._table_stats(table)
+        if self.dry_run:
+            logger.info(
+                "[DRY RUN] Would upsert %d rows into %s (%d chunk(s) of ≤%d)",
+                len(rows), table, len(_chunks(rows, self.chunk_size)), self.chunk_size
+            )
+            for row in rows[:3]:
+                logger.info("  Sample row: %s", json.dumps(row)[:120])
+            stats["rows"] += len(rows)
+            return len(rows)
+
+        headers = _headers()
+        chunks = _chunks(rows, self.chunk_size)
+        start = time.perf_counter()
+        if len(chunks) == 1:
+            done = self._post_chunk(table, chunks[0], headers)
+        else:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="upsert")
+            futures = [self._pool.submit(self._post_chunk, table, chunk, headers) for chunk in chunks]
+            done = sum(future.result() for future in futures)
+        stats["seconds"] += time.perf_counter() - start
+        stats["rows"] += done
+        stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+
+        logger.info("  Upserted %d rows into %s (%d chunk(s))", done, table, len(chunks))
+        return done
+
+
+def upsert(
+    table: str,
+    rows: list[dict],
+    dry_run: bool = False,
+    engine: Optional[UpsertEngine] = None,
+) -> int:
     """
     UPSERT rows into *table* via Supabase REST API.
     Returns number of rows processed.
     If dry_run, logs what would be sent without making HTTP calls.
+
+    Pass the run's *engine* to reuse its pooled client; without one a
+    single-use engine is created for this call.
     """
     if not rows:
         return 0
+    if engine is not None:
+        return engine.upsert(table, rows)
+    with UpsertEngine(dry_run=dry_run) as single_use:
+        return single_use.upsert(table, rows)
 
-    if dry_run:
-        logger.info("[DRY RUN] Would upsert %d rows into %s", len(rows), table)
-        for row in rows[:3]:
-            logger.info("  Sample row: %s", json.dumps(row)[:120])
-        return len(rows)
-
-    with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-        resp = client.post(_rest(table), headers=_headers(), json=rows)
-        if resp.status_code not in (200, 201):
-            logger.error(
-                "Upsert into %s failed: HTTP %s — %s",
-                table, resp.status_code, resp.text[:300]
-            )
-            resp.raise_for_status()
 
-    logger.info("  Upserted %d rows into %s", len(rows), table)
-    return len(rows)
+# ---------------------------------------------------------------------------
+# Incremental manifest
+# ---------------------------------------------------------------------------
+
+def row_hash(row: dict) -> str:
+    """Stable SHA-256 hex digest of a normalised row (key order independent)."""
+    canonical = json.dumps(row, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def row_key(table: str, row: dict) -> str:
+    """Manifest key for *row*: its ROW_KEYS values joined with "|"."""
+    return "|".join("" if row.get(k) is None else str(row[k]) for k in ROW_KEYS[table])
+
+
+class SeedManifest:
+    """
+    File and row hashes from the last incremental load::
+
+        {
+            "version": int,                          # MANIFEST_VERSION
+            "target": str,                           # SUPABASE_URL the rows went to
+            "files": {filename: sha256},
+            "rows": {table: {row_key: sha256}},
+        }
+
+    Loaders ask file_unchanged() / changed_rows(); both stage what they see
+    as pending.  commit(table) folds a table's pending hashes in once its
+    upsert has succeeded, and save() writes the file atomically.  A missing,
+    unreadable, outdated or other-target manifest loads as empty.
+    """
+
+    def __init__(self, path: Optional[Path] = None, target: Optional[str] = None) -> None:
+        self.path = Path(path or MANIFEST_PATH)
+        self.target = SUPABASE_URL if target is None else target
+        data = self._read()
+        self.files: dict[str, str] = data.get("files", {})
+        self.rows: dict[str, dict[str, str]] = data.get("rows", {})
+        self.delta: dict[str, dict] = {}
+        self._pending: dict[str, dict] = {}
+
+    def _read(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable seed manifest %s: %s", self.path, exc)
+            return {}
+        if data.get("version") != MANIFEST_VERSION or data.get("target") != self.target:
+            logger.info("Seed manifest %s is for another version/target — starting afresh", self.path)
+            return {}
+        return data
+
+    def _table_delta(self, table: str) -> dict:
+        return self.delta.setdefault(table, {"new": 0, "changed": 0, "unchanged": 0, "files_skipped": 0})
+
+    def _table_pending(self, table: str) -> dict:
+        return self._pending.setdefault(table, {"files": {}, "rows": {}})
+
+    def file_unchanged(self, table: str, seed_file: SeedFile) -> bool:
+        """True if *seed_file* hashes as recorded; otherwise stage its new hash."""
+        if self.files.get(seed_file.name) == seed_file.digest:
+            self._table_delta(table)["files_skipped"] += 1
+            return True
+        self._table_pending(table)["files"][seed_file.name] = seed_file.digest
+        return False
+
+    def changed_rows(self, table: str, rows: list[dict]) -> list[dict]:
+        """Return the new or changed *rows* (staging their hashes); count the rest."""
+        known = self.rows.get(table, {})
+        pending = self._table_pending(table)["rows"]
+        delta = self._table_delta(table)
+        changed = []
+        for row in rows:
+            key, digest = row_key(table, row), row_hash(row)
+            previous = known.get(key)
+            if previous == digest:
+                delta["unchanged"] += 1
+                continue
+            delta["new" if previous is None else "changed"] += 1
+            pending[key] = digest
+            changed.append(row)
+        return changed
+
+    def commit(self, table: str) -> None:
+        """Record *table*'s staged hashes (call once its rows are upserted)."""
+        pending = self._pending.pop(table, None)
+        if pending:
+            self.files.update(pending["files"])
+            self.rows.setdefault(table, {}).update(pending["rows"])
+
+    def save(self) -> None:
+        data = {"version": MANIFEST_VERSION, "target": self.target, "files": self.files, "rows": self.rows}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
 
 
 # ---------------------------------------------------------------------------
 # Loaders
 # ---------------------------------------------------------------------------
 
-def load_visa_subclasses(dry_run: bool = False) -> int:
-    """US-F6: Upsert all 5 MVP visa subclass rows."""
-    logger.info("Loading visa_subclass rows (%d total)...", len(VISA_SUBCLASSES))
-    rows = [
+def visa_subclass_rows() -> list[dict]:
+    """
+    US-F6: Normalised rows for all 5 MVP visa subclasses.  They come from
+    code (kb_model.VISA_SUBCLASSES), not a seed file, so there is no file to
+    skip; incremental loads filter them row by row (load_visa_subclasses).
+    """
+    return [
         {
             "subclass_code": v["subclass_code"],
             "stream": v["stream"],
@@ -129,44 +434,32 @@ def load_visa_subclasses(dry_run: bool = False) -> int:
         }
         for v in VISA_SUBCLASSES
     ]
-    return upsert("visa_subclass", rows, dry_run)
 
 
-def _load_json_seed(filename: str) -> list[dict]:
-    path = SEED_DIR / filename
-    if not path.exists():
-        logger.warning("Seed file not found, skipping: %s", path)
-        return []
-    with path.open() as f:
-        return json.load(f)
+def load_visa_subclasses(
+    dry_run: bool = False,
+    engine: Optional[UpsertEngine] = None,
+    manifest: Optional[SeedManifest] = None,
+) -> int:
+    """US-F6: Upsert all 5 MVP visa subclass rows."""
+    logger.info("Loading visa_subclass rows (%d total)...", len(VISA_SUBCLASSES))
+    rows = visa_subclass_rows()
+    if manifest is not None:
+        rows = manifest.changed_rows("visa_subclass", rows)
+    return upsert("visa_subclass", rows, dry_run, engine)
 
 
-def _seed_files_matching(pattern: str) -> list[Path]:
+def requirement_rows(manifest: Optional[SeedManifest] = None) -> list[dict]:
     """
-    Return sorted seed files matching *pattern*, excluding visas whose data
-    is loaded via SQL migration rather than seed_loader (e.g. 600).
+    US-F6 | FR-K1: Normalised requirement rows from all visa seed files.
+    With *manifest*, files unchanged since the last incremental load are skipped.
     """
-    # Visas seeded via SQL migrations — their JSON files use a different
-    # schema and must not be processed by seed_loader.
-    SQL_SEEDED_VISAS = {"600", "189", "190", "491"}
-    files = []
-    for path in sorted(SEED_DIR.glob(pattern)):
-        # Extract visa code from filename, e.g. "visa_600_evidence_items.json" → "600"
-        parts = path.stem.split("_")  # ["visa", "600", "evidence", "items"]
-        visa_code = parts[1] if len(parts) >= 2 else ""
-        if visa_code in SQL_SEEDED_VISAS:
-            logger.debug("Skipping %s — seeded via SQL migration", path.name)
+    table_rows: list[dict] = []
+    for seed_file in kb_model.load_kb(SEED_DIR).files["requirement"]:
+        if manifest is not None and manifest.file_unchanged("requirement", seed_file):
+            logger.info("Skipping %s — unchanged since last incremental load", seed_file.name)
             continue
-        files.append(path)
-    return files
-
-
-
-def load_requirements(dry_run: bool = False) -> int:
-    """US-F6 | FR-K1: Upsert all requirements from all visa seed files."""
-    total = 0
-    for seed_file in _seed_files_matching("visa_*_requirements*.json"):
-        items = _load_json_seed(seed_file.name)
+        items = seed_file.raw
         if not items:
             continue
 
@@ -189,16 +482,34 @@ def load_requirements(dry_run: bool = False) -> int:
             rows.append(row)
 
         logger.info("Loading %d requirements from %s...", len(rows), seed_file.name)
-        total += upsert("requirement", rows, dry_run)
+        table_rows.extend(rows)
 
-    return total
+    return table_rows
 
 
-def load_evidence_items(dry_run: bool = False) -> int:
-    """US-F6 | FR-K2: Upsert all evidence items from all visa seed files."""
-    total = 0
-    for seed_file in _seed_files_matching("visa_*_evidence_items.json"):
-        items = _load_json_seed(seed_file.name)
+def load_requirements(
+    dry_run: bool = False,
+    engine: Optional[UpsertEngine] = None,
+    manifest: Optional[SeedManifest] = None,
+) -> int:
+    """US-F6 | FR-K1: Upsert all requirements from all visa seed files."""
+    rows = requirement_rows(manifest)
+    if manifest is not None:
+        rows = manifest.changed_rows("requirement", rows)
+    return upsert("requirement", rows, dry_run, engine)
+
+
+def evidence_item_rows(manifest: Optional[SeedManifest] = None) -> list[dict]:
+    """
+    US-F6 | FR-K2: Normalised evidence_item rows from all visa seed files.
+    With *manifest*, files unchanged since the last incremental load are skipped.
+    """
+    table_rows: list[dict] = []
+    for seed_file in kb_model.load_kb(SEED_DIR).files["evidence_item"]:
+        if manifest is not None and manifest.file_unchanged("evidence_item", seed_file):
+            logger.info("Skipping %s — unchanged since last incremental load", seed_file.name)
+            continue
+        items = seed_file.raw
         if not items:
             continue
 
@@ -219,16 +530,34 @@ def load_evidence_items(dry_run: bool = False) -> int:
             rows.append(row)
 
         logger.info("Loading %d evidence items from %s...", len(rows), seed_file.name)
-        total += upsert("evidence_item", rows, dry_run)
+        table_rows.extend(rows)
 
-    return total
+    return table_rows
 
 
-def load_flag_templates(dry_run: bool = False) -> int:
-    """US-F6 | FR-K3: Upsert all flag templates from all visa seed files."""
-    total = 0
-    for seed_file in _seed_files_matching("visa_*_flags.json"):
-        raw = _load_json_seed(seed_file.name)
+def load_evidence_items(
+    dry_run: bool = False,
+    engine: Optional[UpsertEngine] = None,
+    manifest: Optional[SeedManifest] = None,
+) -> int:
+    """US-F6 | FR-K2: Upsert all evidence items from all visa seed files."""
+    rows = evidence_item_rows(manifest)
+    if manifest is not None:
+        rows = manifest.changed_rows("evidence_item", rows)
+    return upsert("evidence_item", rows, dry_run, engine)
+
+
+def flag_template_rows(manifest: Optional[SeedManifest] = None) -> list[dict]:
+    """
+    US-F6 | FR-K3: Normalised flag_template rows from all visa seed files.
+    With *manifest*, files unchanged since the last incremental load are skipped.
+    """
+    table_rows: list[dict] = []
+    for seed_file in kb_model.load_kb(SEED_DIR).files["flag_template"]:
+        if manifest is not None and manifest.file_unchanged("flag_template", seed_file):
+            logger.info("Skipping %s — unchanged since last incremental load", seed_file.name)
+            continue
+        raw = seed_file.raw
         if not raw:
             continue
 
@@ -263,17 +592,53 @@ def load_flag_templates(dry_run: bool = False) -> int:
             rows.append(row)
 
         logger.info("Loading %d flag templates from %s...", len(rows), seed_file.name)
-        total += upsert("flag_template", rows, dry_run)
+        table_rows.extend(rows)
+
+    return table_rows
 
-    return total
+
+def load_flag_templates(
+    dry_run: bool = False,
+    engine: Optional[UpsertEngine] = None,
+    manifest: Optional[SeedManifest] = None,
+) -> int:
+    """US-F6 | FR-K3: Upsert all flag templates from all visa seed files."""
+    rows = flag_template_rows(manifest)
+    if manifest is not None:
+        rows = manifest.changed_rows("flag_template", rows)
+    return upsert("flag_template", rows, dry_run, engine)
 
 
 # ---------------------------------------------------------------------------
 # Main entry point
 # ---------------------------------------------------------------------------
 
-def run(dry_run: bool = False) -> dict:
-    """Run the full seed load. Returns counts by table."""
+ROW_BUILDERS = {
+    "visa_subclass": visa_subclass_rows,
+    "requirement": requirement_rows,
+    "evidence_item": evidence_item_rows,
+    "flag_template": flag_template_rows,
+}
+
+LOADERS = {
+    "visa_subclass": load_visa_subclasses,
+    "requirement": load_requirements,
+    "evidence_item": load_evidence_items,
+    "flag_template": load_flag_templates,
+}
+
+
+def run(
+    dry_run: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    parallelism: int = DEFAULT_PARALLELISM,
+    incremental: bool = False,
+    manifest_path: Optional[Path] = None,
+) -> dict:
+    """
+    Run the full seed load. Returns counts by table (rows sent — with
+    *incremental*, only the new or changed ones).
+    """
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s %(levelname)s %(name)s — %(message)s",
@@ -283,16 +648,38 @@ def run(dry_run: bool = False) -> dict:
     if dry_run:
         logger.info("DRY RUN mode — no writes to Supabase")
 
-    counts = {
-        "visa_subclass": load_visa_subclasses(dry_run),
-        "requirement": load_requirements(dry_run),
-        "evidence_item": load_evidence_items(dry_run),
-        "flag_template": load_flag_templates(dry_run),
-    }
+    manifest = SeedManifest(manifest_path) if incremental else None
+    if manifest is not None:
+        logger.info("Incremental mode — manifest %s", manifest.path)
+
+    counts: dict[str, int] = {}
+    with UpsertEngine(chunk_size=chunk_size, parallelism=parallelism, dry_run=dry_run) as engine:
+        # TABLE_ORDER: each table's chunks all commit before the next table starts
+        for table in TABLE_ORDER:
+            counts[table] = LOADERS[table](dry_run, engine, manifest)
+            if manifest is not None and not dry_run:
+                manifest.commit(table)
+                manifest.save()
 
     logger.info("=== Seed load complete ===")
     for table, count in counts.items():
-        logger.info("  %-20s %d rows", table, count)
+        stats = engine.stats.get(table)
+        if stats and stats["seconds"]:
+            logger.info(
+                "  %-20s %d rows  %.0f rows/s  (%d requests, %d retries)",
+                table, count, stats["rows_per_sec"], stats["requests"], stats["retries"]
+            )
+        else:
+            logger.info("  %-20s %d rows", table, count)
+
+    if manifest is not None:
+        logger.info("%sIncremental delta:", "[DRY RUN] " if dry_run else "")
+        for table in TABLE_ORDER:
+            delta = manifest.delta.get(table) or {"new": 0, "changed": 0, "unchanged": 0, "files_skipped": 0}
+            logger.info(
+                "  %-20s %d new, %d changed, %d unchanged, %d unchanged file(s) skipped",
+                table, delta["new"], delta["changed"], delta["unchanged"], delta["files_skipped"]
+            )
 
     return counts
 
@@ -300,8 +687,18 @@ def run(dry_run: bool = False) -> dict:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="KangaVisa KB seed loader")
     parser.add_argument("--dry-run", action="store_true", help="Log what would be upserted without writing to Supabase")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per upsert request")
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_PARALLELISM, help="Upsert requests in flight")
+    parser.add_argument("--incremental", action="store_true", help="Send only rows changed since the last incremental load")
+    parser.add_argument("--manifest", type=Path, default=None, help=f"Incremental manifest path (default: {MANIFEST_PATH})")
     args = parser.parse_args()
-    result = run(dry_run=args.dry_run)
+    result = run(
+        dry_run=args.dry_run,
+        chunk_size=args.chunk_size,
+        parallelism=args.parallelism,
+        incremental=args.incremental,
+        manifest_path=args.manifest,
+    )
     total = sum(result.values())
     print(f"Done. {total} rows processed across {len(result)} tables.")
     sys.exit(0)
@@ -0,0 +1,333 @@
+"""
+seed_reconcile.py — Plan / apply reconciliation of kb/seed against Supabase.
+
+US-F6 | FR-K1, FR-K2, FR-K3: seed_loader only ever upserts, so rows removed
+from kb/seed linger in Supabase and nothing says what a load will change.
+
+    plan   Read every KB table with keyset-paginated PostgREST selects
+           (PAGE_KEYS, PAGE_SIZE rows per request), canonicalise each remote
+           row exactly as the seed side is canonicalised, hash both with
+           seed_loader.row_hash and diff by natural key (seed_loader.ROW_KEYS):
+             insert   key only in the seeds
+             update   key in both, hashes differ
+             retire   key only in Supabase, still current (effective_to null),
+                      and its visa has a JSON seed file (retire_subclasses())
+    apply  Execute a plan: inserts + updates as one chunked upsert per table
+           (TABLE_ORDER, parents first), then retirements as batched PATCHes
+           setting effective_to (children first).  Nothing is deleted.
+
+visa_subclass rows come from seed_loader.VISA_SUBCLASSES and have no
+effective_to, so they are never retired.  Nor is anything outside the JSON
+seeds' visas: rows of kb_model.SQL_SEEDED_VISAS (loaded by
+kb/migrations/seed_*_v1.sql), rows of unknown subclasses, and evidence
+items whose requirement's visa cannot be resolved are left alone.
+
+Usage:
+    python3 -m kangavisa_workers.seed_reconcile plan [--out plan.json]
+    python3 -m kangavisa_workers.seed_reconcile apply [--plan plan.json] [--dry-run]
+
+apply without --plan plans afresh and applies straight away.  A saved plan
+is applied as-is, so apply it before the KB changes again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from kangavisa_workers import db, kb_model, seed_loader
+from kangavisa_workers.seed_loader import ROW_KEYS, TABLE_ORDER, UpsertEngine, row_hash, row_key
+
+logger = logging.getLogger("seed_reconcile")
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+PAGE_SIZE = 1000                  # rows per keyset page
+# Unique column each table is paged on (visa_subclass's natural key is compound)
+PAGE_KEYS = {
+    "visa_subclass": "visa_id",
+    "requirement": "requirement_id",
+    "evidence_item": "evidence_id",
+    "flag_template": "flag_id",
+}
+RETIRABLE_TABLES = ("requirement", "evidence_item", "flag_template")
+RETIRE_CHUNK = 100                # keys per PATCH — bounded by URL length
+# Column that ties a retirable row to its visa (row_subclass())
+SCOPE_COLUMNS = {
+    "requirement": "subclass_code",
+    "evidence_item": "requirement_id",
+    "flag_template": "subclass_code",
+}
+# PostgREST renders timestamptz as "+00:00"; seeds use "Z"
+TIMESTAMP_COLUMNS = frozenset({"last_reviewed_at"})
+
+
+# ---------------------------------------------------------------------------
+# Canonical rows
+# ---------------------------------------------------------------------------
+
+def _utc_iso(value: str) -> str:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def canonical_row(row: dict, columns: list[str]) -> dict:
+    """Project *row* onto *columns* with timestamps normalised to UTC ISO-8601."""
+    canonical = {}
+    for column in columns:
+        value = row.get(column)
+        if column in TIMESTAMP_COLUMNS and isinstance(value, str):
+            value = _utc_iso(value)
+        canonical[column] = value
+    return canonical
+
+
+def _columns(table: str, seed_rows: list[dict]) -> list[str]:
+    if seed_rows:
+        return list(seed_rows[0])
+    if table not in RETIRABLE_TABLES:
+        return list(ROW_KEYS[table])
+    return [*ROW_KEYS[table], SCOPE_COLUMNS[table], "effective_from", "effective_to"]
+
+
+# ---------------------------------------------------------------------------
+# Remote state
+# ---------------------------------------------------------------------------
+
+def fetch_remote(
+    table: str,
+    columns: list[str],
+    engine: UpsertEngine,
+    page_size: int = PAGE_SIZE,
+) -> list[dict]:
+    """Read *columns* of every row in *table*, one keyset page at a time."""
+    page_key = PAGE_KEYS[table]
+    select = ",".join(dict.fromkeys([*columns, page_key]))
+    rows: list[dict] = []
+    last = None
+    while True:
+        params = {"select": select, "order": f"{page_key}.asc", "limit": str(page_size)}
+        if last is not None:
+            params[page_key] = f"gt.{last}"
+        page = engine.select(table, params)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        last = page[-1][page_key]
+
+
+# ---------------------------------------------------------------------------
+# Retirement scope
+# ---------------------------------------------------------------------------
+
+def retire_subclasses(seed_dir: Optional[Path] = None) -> frozenset[str]:
+    """Visa codes whose rows the JSON seeds own: every seed file's visa, minus SQL_SEEDED_VISAS."""
+    kb = kb_model.load_kb(seed_dir or seed_loader.SEED_DIR)
+    return frozenset(
+        seed_file.subclass for files in kb.files.values() for seed_file in files
+    ) - kb_model.SQL_SEEDED_VISAS
+
+
+def row_subclass(table: str, row: dict, requirement_subclass: Optional[dict] = None) -> Optional[str]:
+    """Visa code of *row*; evidence items resolve theirs through *requirement_subclass*."""
+    if table == "evidence_item":
+        return (requirement_subclass or {}).get(row.get("requirement_id"))
+    return row.get("subclass_code")
+
+
+# ---------------------------------------------------------------------------
+# Plan
+# ---------------------------------------------------------------------------
+
+def plan_table(
+    table: str,
+    seed_rows: list[dict],
+    remote_rows: list[dict],
+    retire_on: date,
+    subclasses: frozenset[str] = frozenset(),
+    requirement_subclass: Optional[dict] = None,
+) -> dict:
+    """
+    Diff one table's seed rows against its remote rows.
+
+    Only remote rows whose visa (row_subclass()) is in *subclasses* are
+    retired; *requirement_subclass* maps requirement_id → subclass_code
+    for evidence items.
+
+    Returns::
+
+        {
+            "insert": list[dict],                # seed rows
+            "update": list[dict],                # seed rows
+            "changed_columns": {key: list[str]}, # per update
+            "retire": [{"key": str, "effective_to": "YYYY-MM-DD"}],
+            "unchanged": int,
+            "seed": int,
+            "remote": int,
+        }
+    """
+    columns = _columns(table, seed_rows)
+    seeds = {row_key(table, row): row for row in seed_rows}
+    remote = {row_key(table, row): canonical_row(row, columns) for row in remote_rows}
+
+    result: dict = {
+        "insert": [], "update": [], "changed_columns": {}, "retire": [],
+        "unchanged": 0, "seed": len(seeds), "remote": len(remote),
+    }
+    for key, row in seeds.items():
+        ours = canonical_row(row, columns)
+        theirs = remote.get(key)
+        if theirs is None:
+            result["insert"].append(row)
+        elif row_hash(ours) == row_hash(theirs):
+            result["unchanged"] += 1
+        else:
+            result["update"].append(row)
+            result["changed_columns"][key] = [c for c in columns if ours[c] != theirs.get(c)]
+
+    if table in RETIRABLE_TABLES:
+        for key, row in remote.items():
+            if key in seeds or row.get("effective_to"):
+                continue
+            subclass = row_subclass(table, row, requirement_subclass)
+            if subclass not in subclasses or subclass in kb_model.SQL_SEEDED_VISAS:
+                continue
+            # effective_to may not precede effective_from (CHECK constraint)
+            effective_to = max(retire_on.isoformat(), row.get("effective_from") or "")
+            result["retire"].append({"key": key, "effective_to": effective_to})
+    return result
+
+
+def plan(
+    engine: UpsertEngine,
+    page_size: int = PAGE_SIZE,
+    retire_on: Optional[date] = None,
+) -> dict:
+    """
+    Build the reconciliation plan for every table in TABLE_ORDER.
+
+    Returns::
+
+        {
+            "generated_at": str,
+            "retire_on": "YYYY-MM-DD",
+            "tables": {table: plan_table() dict},
+        }
+    """
+    retire_on = retire_on or date.today()
+    subclasses = retire_subclasses()
+    requirement_subclass: dict[str, str] = {}
+    tables = {}
+    for table in TABLE_ORDER:            # requirement is read before evidence_item
+        seed_rows = seed_loader.ROW_BUILDERS[table]()
+        remote_rows = fetch_remote(table, _columns(table, seed_rows), engine, page_size)
+        if table == "requirement":
+            for row in [*remote_rows, *seed_rows]:
+                requirement_subclass[row["requirement_id"]] = row.get("subclass_code")
+        tables[table] = plan_table(table, seed_rows, remote_rows, retire_on, subclasses, requirement_subclass)
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "retire_on": retire_on.isoformat(),
+        "tables": tables,
+    }
+
+
+def format_plan(the_plan: dict) -> str:
+    """Human-readable plan: per-table totals, then one line per change."""
+    lines = []
+    for table, entry in the_plan["tables"].items():
+        lines.append(
+            f"{table}: {len(entry['insert'])} to insert, {len(entry['update'])} to update, "
+            f"{len(entry['retire'])} to retire, {entry['unchanged']} unchanged"
+        )
+        for row in entry["insert"]:
+            lines.append(f"  + {row_key(table, row)}")
+        for row in entry["update"]:
+            key = row_key(table, row)
+            lines.append(f"  ~ {key} ({', '.join(entry['changed_columns'].get(key, []))})")
+        for retired in entry["retire"]:
+            lines.append(f"  - {retired['key']} (effective_to → {retired['effective_to']})")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Apply
+# ---------------------------------------------------------------------------
+
+def apply(the_plan: dict, engine: UpsertEngine) -> dict:
+    """
+    Execute *the_plan*.  Returns ``{table: {"upserted": int, "retired": int}}``.
+    """
+    counts = {table: {"upserted": 0, "retired": 0} for table in the_plan["tables"]}
+    for table in TABLE_ORDER:
+        entry = the_plan["tables"].get(table)
+        if entry:
+            counts[table]["upserted"] = engine.upsert(table, entry["insert"] + entry["update"])
+
+    for table in reversed(TABLE_ORDER):
+        entry = the_plan["tables"].get(table)
+        if not entry or not entry["retire"]:
+            continue
+        (key_column,) = ROW_KEYS[table]
+        by_date: dict[str, list[str]] = {}
+        for retired in entry["retire"]:
+            by_date.setdefault(retired["effective_to"], []).append(retired["key"])
+        for effective_to, keys in sorted(by_date.items()):
+            for i in range(0, len(keys), RETIRE_CHUNK):
+                chunk = keys[i:i + RETIRE_CHUNK]
+                counts[table]["retired"] += engine.patch(
+                    table, {key_column: db._in_filter(chunk)}, {"effective_to": effective_to}, len(chunk),
+                )
+        logger.info("  Retired %d rows of %s", counts[table]["retired"], table)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcile kb/seed with Supabase (plan / apply)")
+    parser.add_argument("command", choices=["plan", "apply"])
+    parser.add_argument("--out", type=Path, default=None, help="plan: write the plan JSON here")
+    parser.add_argument("--plan", type=Path, default=None, help="apply: execute this saved plan")
+    parser.add_argument("--dry-run", action="store_true", help="apply: log writes instead of sending them")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Rows per keyset page")
+    parser.add_argument("--chunk-size", type=int, default=seed_loader.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--parallelism", type=int, default=seed_loader.DEFAULT_PARALLELISM)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s — %(message)s")
+
+    with UpsertEngine(chunk_size=args.chunk_size, parallelism=args.parallelism, dry_run=args.dry_run) as engine:
+        if args.command == "apply" and args.plan:
+            the_plan = json.loads(args.plan.read_text(encoding="utf-8"))
+        else:
+            the_plan = plan(engine, args.page_size)
+        print(format_plan(the_plan))
+
+        if args.command == "plan":
+            if args.out:
+                args.out.write_text(json.dumps(the_plan, indent=1) + "\n", encoding="utf-8")
+            return 0
+
+        counts = apply(the_plan, engine)
+
+    for table, count in counts.items():
+        print(f"{table:<20} {count['upserted']} upserted, {count['retired']} retired")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+"""
+snapshot_store.py — Content-addressed on-disk store for raw KB snapshots.
+
+US-G1 | FR-K4: Every snapshot stored with hash + timestamps + provenance.
+
+Layout under the snapshots root (default kb/snapshots, override with
+KANGAVISA_SNAPSHOTS_DIR)::
+
+    objects/ab/cd/abcd…ef.zst    one blob per distinct SHA-256, sharded by
+                                 the first two byte-pairs of the hash; the
+                                 suffix names the codec (.zst / .gz / none)
+    refs/{source_id}.jsonl       append-only capture log per source:
+                                 {"captured_at", "content_hash", "byte_size",
+                                  "stored_size", "codec", "path"}
+
+Blobs are written to a temp file in the shard directory and renamed into
+place, so readers never see a partial object and concurrent writers of the
+same content are harmless.  Identical content is stored once — disk use and
+inode counts grow with distinct content, not with runs × targets.
+
+Compression is transparent: blobs are zstd-compressed when the optional
+``zstandard`` package is installed (``pip install -e ".[zstd]"``), else
+gzip from the stdlib.  KANGAVISA_SNAPSHOT_CODEC=zstd|gzip|none overrides.
+The content hash is always of the *uncompressed* bytes, and
+``open_snapshot()`` streams the original bytes back for diffing and replay.
+
+Large documents need never be held in memory: ``stage()`` / ``StagedBlob``
+write a download chunk by chunk to ``tmp/`` under the root while hashing it,
+and ``put_staged()`` moves (or stream-compresses) the staged file into
+``objects/`` without hashing it a second time.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional dependency — fall back to stdlib gzip
+    zstandard = None
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+SNAPSHOTS_DIR = Path(os.getenv("KANGAVISA_SNAPSHOTS_DIR", "kb/snapshots"))
+OBJECTS_DIRNAME = "objects"
+REFS_DIRNAME = "refs"
+STAGING_DIRNAME = "tmp"
+CHUNK_SIZE = 64 * 1024  # bytes per read/write when streaming
+
+# codec name → blob file suffix
+CODEC_SUFFIXES: dict[str, str] = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+DEFAULT_CODEC = os.getenv("KANGAVISA_SNAPSHOT_CODEC") or ("zstd" if zstandard else "gzip")
+
+
+# ---------------------------------------------------------------------------
+# Codecs
+# ---------------------------------------------------------------------------
+
+def _check_codec(codec: str) -> str:
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown snapshot codec '{codec}'. Expected one of: {list(CODEC_SUFFIXES)}")
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("Snapshot codec 'zstd' requires the 'zstandard' package.")
+    return codec
+
+
+def compress(content: bytes, codec: str) -> bytes:
+    """Encode *content* with *codec*."""
+    if _check_codec(codec) == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+    if codec == "gzip":
+        # mtime=0 keeps the output deterministic for identical content
+        return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+    return content
+
+
+def _copy_compressed(src: BinaryIO, dst: BinaryIO, codec: str) -> None:
+    """Stream *src* into *dst*, encoding with *codec* chunk by chunk."""
+    if _check_codec(codec) == "zstd":
+        zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(src, dst, read_size=CHUNK_SIZE)
+    elif codec == "gzip":
+        with gzip.GzipFile(filename="", fileobj=dst, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as gz:
+            shutil.copyfileobj(src, gz, CHUNK_SIZE)
+    else:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+
+def codec_for_path(path: Union[str, Path]) -> str:
+    """Infer the codec from a blob path's suffix (legacy ``.bin`` → none)."""
+    suffix = Path(path).suffix
+    for codec, codec_suffix in CODEC_SUFFIXES.items():
+        if codec_suffix and suffix == codec_suffix:
+            return codec
+    return "none"
+
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+
+def object_path(
+    content_hash: str,
+    root: Optional[Path] = None,
+    codec: str = "none",
+) -> Path:
+    """Return the sharded blob path for *content_hash* stored with *codec*."""
+    root = root or SNAPSHOTS_DIR
+    shard = root / OBJECTS_DIRNAME / content_hash[:2] / content_hash[2:4]
+    return shard / (content_hash + CODEC_SUFFIXES[codec])
+
+
+def find_object(content_hash: str, root: Optional[Path] = None) -> Optional[Path]:
+    """Return the existing blob for *content_hash* under any codec, or None."""
+    for codec in CODEC_SUFFIXES:
+        path = object_path(content_hash, root, codec)
+        if path.exists():
+            return path
+    return None
+
+
+def ref_log_path(source_id: str, root: Optional[Path] = None) -> Path:
+    """Return the capture-log path for *source_id*."""
+    return (root or SNAPSHOTS_DIR) / REFS_DIRNAME / f"{source_id}.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# Write
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def _atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    """Yield a temp file in *path*'s directory; rename it to *path* on success."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    with _atomic_writer(path) as f:
+        f.write(content)
+
+
+def _append_ref(source_id: str, record: dict, root: Path) -> None:
+    path = ref_log_path(source_id, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # One short line per write with O_APPEND — safe for concurrent appenders.
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def _record(
+    path: Path,
+    content_hash: str,
+    byte_size: int,
+    source_id: str,
+    root: Path,
+    deduplicated: bool,
+) -> dict:
+    """Append the capture to *source_id*'s ref log and build the metadata dict."""
+    codec = codec_for_path(path)
+    stored_size = path.stat().st_size
+    captured_at = datetime.now(timezone.utc).isoformat()
+    _append_ref(source_id, {
+        "captured_at": captured_at,
+        "content_hash": content_hash,
+        "byte_size": byte_size,
+        "stored_size": stored_size,
+        "codec": codec,
+        "path": str(path),
+    }, root)
+
+    return {
+        "source_id": source_id,
+        "snapshot_path": str(path),
+        "content_hash": content_hash,
+        "byte_size": byte_size,
+        "stored_size": stored_size,
+        "codec": codec,
+        "captured_at": captured_at,
+        "deduplicated": deduplicated,
+    }
+
+
+def put(
+    content: bytes,
+    source_id: str,
+    root: Optional[Path] = None,
+    codec: Optional[str] = None,
+    content_hash: Optional[str] = None,
+) -> dict:
+    """
+    Store *content* (deduplicated by SHA-256, compressed with *codec* —
+    default DEFAULT_CODEC) and log the capture for *source_id*.  Pass
+    *content_hash* when the caller has already hashed *content*.
+
+    Returns the frl_watcher.snapshot() metadata dict::
+
+        {
+            "source_id": str,
+            "snapshot_path": str,        # blob path; suffix names the codec
+            "content_hash": str,         # SHA-256 of the uncompressed bytes
+            "byte_size": int,            # uncompressed size
+            "stored_size": int,          # size on disk
+            "codec": str,                # "zstd" | "gzip" | "none"
+            "captured_at": str,          # ISO-8601 UTC
+            "deduplicated": bool,        # True if the blob already existed
+        }
+    """
+    root = root or SNAPSHOTS_DIR
+    content_hash = content_hash or hashlib.sha256(content).hexdigest()
+
+    path = find_object(content_hash, root)
+    deduplicated = path is not None
+    if not deduplicated:
+        codec = _check_codec(codec or DEFAULT_CODEC)
+        path = object_path(content_hash, root, codec)
+        _write_atomic(path, compress(content, codec))
+
+    return _record(path, content_hash, len(content), source_id, root, deduplicated)
+
+
+# ---------------------------------------------------------------------------
+# Streaming writes
+# ---------------------------------------------------------------------------
+
+class StagedBlob:
+    """
+    A download being written to ``<root>/tmp/`` and hashed chunk by chunk.
+
+    Call write() per chunk, then close() to finalise ``content_hash``.  Hand
+    the closed blob to put_staged() to move it into the store, or read it in
+    place with view().  Used as a context manager the staging file is removed
+    on exit unless put_staged() already claimed it.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = root or SNAPSHOTS_DIR
+        staging_dir = self.root / STAGING_DIRNAME
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=staging_dir, prefix=".stage-")
+        self.path = Path(tmp_name)
+        self.byte_size = 0
+        self.content_hash: Optional[str] = None
+        self._file: Optional[BinaryIO] = os.fdopen(fd, "wb")
+        self._sha = hashlib.sha256()
+
+    def __enter__(self) -> "StagedBlob":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.discard()
+
+    def write(self, chunk: bytes) -> None:
+        self._sha.update(chunk)
+        self._file.write(chunk)
+        self.byte_size += len(chunk)
+
+    def close(self) -> "StagedBlob":
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self.content_hash = self._sha.hexdigest()
+        return self
+
+    @contextmanager
+    def view(self) -> Iterator[memoryview]:
+        """Yield a read-only memoryview of the staged bytes (memory-mapped)."""
+        self.close()
+        if self.byte_size == 0:
+            yield memoryview(b"")
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                yield view
+            finally:
+                view.release()
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.path.unlink(missing_ok=True)
+
+
+def stage(chunks: Iterable[bytes], root: Optional[Path] = None) -> StagedBlob:
+    """Write *chunks* to a new StagedBlob under *root*, hashing as they arrive."""
+    staged = StagedBlob(root)
+    try:
+        for chunk in chunks:
+            staged.write(chunk)
+        return staged.close()
+    except BaseException:
+        staged.discard()
+        raise
+
+
+def put_staged(
+    staged: StagedBlob,
+    source_id: str,
+    root: Optional[Path] = None,
+    codec: Optional[str] = None,
+) -> dict:
+    """
+    Move a closed StagedBlob into the store and log the capture for
+    *source_id*.  The hash computed while staging is reused; uncompressed
+    blobs are renamed into place, compressed ones are encoded in one
+    streaming pass.  Returns the same metadata dict as put().
+    """
+    root = root or staged.root
+    staged.close()
+    content_hash = staged.content_hash
+
+    path = find_object(content_hash, root)
+    deduplicated = path is not None
+    if not deduplicated:
+        codec = _check_codec(codec or DEFAULT_CODEC)
+        path = object_path(content_hash, root, codec)
+        if codec == "none":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staged.path, path)
+        else:
+            with open(staged.path, "rb") as src, _atomic_writer(path) as dst:
+                _copy_compressed(src, dst, codec)
+    staged.discard()
+
+    return _record(path, content_hash, staged.byte_size, source_id, root, deduplicated)
+
+
+# ---------------------------------------------------------------------------
+# Read
+# ---------------------------------------------------------------------------
+
+def open_snapshot(path: Union[str, Path]) -> BinaryIO:
+    """
+    Open the blob at *path* (e.g. a source_document.raw_blob_uri) and return
+    a binary file object that yields the original, uncompressed bytes.
+    Decompression is streamed — read it in chunks to bound memory.
+    """
+    codec = codec_for_path(path)
+    if codec == "zstd":
+        _check_codec(codec)
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_path(path: Union[str, Path]) -> bytes:
+    """Return the uncompressed bytes of the blob at *path*."""
+    with open_snapshot(path) as f:
+        return f.read()
+
+
+def read(content_hash: str, root: Optional[Path] = None) -> bytes:
+    """Return the stored bytes for *content_hash*. Raises FileNotFoundError."""
+    path = find_object(content_hash, root)
+    if path is None:
+        raise FileNotFoundError(f"No snapshot blob for content_hash={content_hash}")
+    return read_path(path)
+
+
+def history(source_id: str, root: Optional[Path] = None) -> list[dict]:
+    """Return every capture record for *source_id*, oldest first."""
+    path = ref_log_path(source_id, root)
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def latest(source_id: str, root: Optional[Path] = None) -> Optional[dict]:
+    """Return the most recent capture record for *source_id*, or None."""
+    records = history(source_id, root)
+    return records[-1] if records else None
@@ -0,0 +1,92 @@
+"""
+sources.py — Loader for the curated KB watch list in kb/sources.yml.
+
+US-G1 | FR-K4: Curated source tiers, polling cadences and review gates.
+
+    load_sources()          → parsed kb/sources.yml (cached per path + mtime)
+    review_gate_keywords()  → review_gates.high_impact_instrument_keywords
+    watch_targets()         → watch_targets: {group: [target dict]}
+    polling_cadences()      → polling: {group: interval seconds}, enabled groups only
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+KB_DIR = Path(__file__).parent.parent.parent / "kb"
+SOURCES_PATH = KB_DIR / "sources.yml"
+
+# Watcher groups, in run order; each is a watch_targets key
+WATCHER_GROUPS = ("frl", "homeaffairs", "datagov")
+# polling key suffix → interval
+CADENCE_SECONDS = {
+    "hourly": 60 * 60,
+    "daily": 24 * 60 * 60,
+    "weekly": 7 * 24 * 60 * 60,
+}
+
+_cache: dict[Path, tuple[float, dict]] = {}
+
+
+def load_sources(path: Optional[Path] = None) -> dict:
+    """
+    Parse *path* (default kb/sources.yml) and return the mapping.
+    Re-read only when the file's mtime changes.
+
+    Raises FileNotFoundError if the file does not exist.
+    """
+    path = Path(path or SOURCES_PATH)
+    mtime = path.stat().st_mtime
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    _cache[path] = (mtime, data)
+    return data
+
+
+def review_gate_keywords(path: Optional[Path] = None) -> list[str]:
+    """Return review_gates.high_impact_instrument_keywords ([] if the file is absent)."""
+    try:
+        sources = load_sources(path)
+    except FileNotFoundError:
+        return []
+    gates = sources.get("review_gates") or {}
+    return [str(kw) for kw in gates.get("high_impact_instrument_keywords") or []]
+
+
+def watch_targets(path: Optional[Path] = None) -> dict[str, list[dict]]:
+    """
+    Return watch_targets as ``{group: [target dict]}`` for every group in
+    WATCHER_GROUPS (absent groups are empty).  FRL and Home Affairs targets
+    carry url / source_id / canonical_url / title (+ source_type for FRL);
+    data.gov.au targets carry dataset_id / canonical_url / title.
+    """
+    targets = load_sources(path).get("watch_targets") or {}
+    return {group: [dict(t) for t in targets.get(group) or []] for group in WATCHER_GROUPS}
+
+
+def polling_cadences(path: Optional[Path] = None) -> dict[str, int]:
+    """
+    Return ``{group: interval seconds}`` for every enabled polling key
+    ("<group>_<hourly|daily|weekly>": true).
+
+    Raises ValueError for a key with an unknown group or cadence.
+    """
+    cadences = {}
+    for key, enabled in (load_sources(path).get("polling") or {}).items():
+        group, _, cadence = str(key).rpartition("_")
+        if group not in WATCHER_GROUPS or cadence not in CADENCE_SECONDS:
+            raise ValueError(
+                f"Unknown polling key '{key}'. Expected <group>_<cadence> with group in "
+                f"{list(WATCHER_GROUPS)} and cadence in {list(CADENCE_SECONDS)}"
+            )
+        if enabled:
+            cadences[group] = CADENCE_SECONDS[cadence]
+    return cadences
@@ -0,0 +1,234 @@
+"""
+text_diff.py — Line-aligned diff used to size a change for impact scoring.
+
+US-G2 | FR-K4: change_event impact reflects how much text actually changed.
+
+Documents are split into units — lines, plus a break between adjacent tags
+(``><``) so minified HTML still yields usable units — and each distinct unit
+is interned to an int.  Units are aligned with a patience diff:
+
+  1. strip the common prefix / suffix
+  2. anchor on units that occur exactly once in both sides, keeping the
+     longest run of anchors that appear in the same order (LIS)
+  3. repeat on the gaps between anchors; a gap with no unique units falls
+     back to difflib when small, else counts as replaced
+
+An insertion at the top of the Migration Act shifts nothing: only the
+inserted lines are reported, unlike a positional byte comparison.
+
+Pure functions — no I/O.  Callers load the previous snapshot themselves
+(see frl_watcher.previous_content).
+"""
+
+from __future__ import annotations
+
+import difflib
+from bisect import bisect_left
+from collections import Counter
+from typing import Optional, Sequence, Union
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+UNIT_BREAK = b"\n"
+TAG_BOUNDARY = b"><"
+# memoryview inputs (memory-mapped snapshots) are split in windows this size
+SPLIT_WINDOW = 1 << 20
+# Largest anchorless gap (len(a) * len(b)) handed to difflib; bigger gaps
+# are counted as wholly replaced.
+FALLBACK_MAX_CELLS = 250_000
+
+
+# ---------------------------------------------------------------------------
+# Units
+# ---------------------------------------------------------------------------
+
+def _split(content: bytes) -> list[bytes]:
+    return content.replace(TAG_BOUNDARY, b">" + UNIT_BREAK + b"<").split(UNIT_BREAK)
+
+
+def split_units(content: Union[bytes, memoryview]) -> list[bytes]:
+    """Split *content* into diff units (lines, and tag boundaries)."""
+    if isinstance(content, bytes):
+        return _split(content)
+    units: list[bytes] = []
+    carry = b""
+    for start in range(0, len(content), SPLIT_WINDOW):
+        parts = _split(carry + bytes(content[start:start + SPLIT_WINDOW]))
+        carry = parts.pop()
+        units.extend(parts)
+    units.append(carry)
+    return units
+
+
+def _intern(units: list[bytes], table: dict[bytes, int]) -> list[int]:
+    return [table.setdefault(unit, len(table)) for unit in units]
+
+
+# ---------------------------------------------------------------------------
+# Alignment
+# ---------------------------------------------------------------------------
+
+def _unique_anchors(
+    a: Sequence[int], b: Sequence[int], alo: int, ahi: int, blo: int, bhi: int,
+) -> list[tuple[int, int]]:
+    """Return the ordered (i, j) anchors: units unique in both ranges, LIS by j."""
+    a_counts = Counter(a[alo:ahi])
+    b_counts = Counter(b[blo:bhi])
+    b_pos = {
+        unit: j for j, unit in enumerate(b[blo:bhi], blo)
+        if b_counts[unit] == 1 and a_counts.get(unit) == 1
+    }
+    pairs = [(i, b_pos[unit]) for i, unit in enumerate(a[alo:ahi], alo) if unit in b_pos]
+
+    # Longest increasing subsequence of j (patience sorting)
+    tails: list[int] = []
+    tail_index: list[int] = []
+    back: list[int] = [-1] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(k)
+        else:
+            tails[pos] = j
+            tail_index[pos] = k
+        back[k] = tail_index[pos - 1] if pos else -1
+
+    anchors = []
+    k = tail_index[-1] if tail_index else -1
+    while k != -1:
+        anchors.append(pairs[k])
+        k = back[k]
+    anchors.reverse()
+    return anchors
+
+
+def matching_blocks(a: Sequence[int], b: Sequence[int]) -> list[tuple[int, int, int]]:
+    """
+    Align *a* and *b* and return difflib-style matching blocks: sorted
+    ``(i, j, size)`` triples with ``a[i:i+size] == b[j:j+size]``, ending with
+    the ``(len(a), len(b), 0)`` sentinel.
+    """
+    blocks: list[tuple[int, int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        size = 0
+        while alo + size < ahi and blo + size < bhi and a[alo + size] == b[blo + size]:
+            size += 1
+        if size:
+            blocks.append((alo, blo, size))
+            alo, blo = alo + size, blo + size
+
+        size = 0
+        while ahi - size > alo and bhi - size > blo and a[ahi - size - 1] == b[bhi - size - 1]:
+            size += 1
+        if size:
+            blocks.append((ahi - size, bhi - size, size))
+            ahi, bhi = ahi - size, bhi - size
+
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if not anchors:
+            if (ahi - alo) * (bhi - blo) <= FALLBACK_MAX_CELLS:
+                matcher = difflib.SequenceMatcher(None, a[alo:ahi], b[blo:bhi], autojunk=False)
+                blocks.extend(
+                    (alo + i, blo + j, n) for i, j, n in matcher.get_matching_blocks() if n
+                )
+            continue
+
+        i_prev, j_prev = alo, blo
+        for i, j in anchors:
+            stack.append((i_prev, i, j_prev, j))
+            blocks.append((i, j, 1))
+            i_prev, j_prev = i + 1, j + 1
+        stack.append((i_prev, ahi, j_prev, bhi))
+
+    blocks.sort()
+    merged: list[tuple[int, int, int]] = []
+    for i, j, n in blocks:
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + n)
+        else:
+            merged.append((i, j, n))
+    merged.append((len(a), len(b), 0))
+    return merged
+
+
+def opcodes(a: Sequence[int], b: Sequence[int]) -> list[tuple[str, int, int, int, int]]:
+    """Return difflib-style ``(tag, i1, i2, j1, j2)`` opcodes turning *a* into *b*."""
+    ops = []
+    i = j = 0
+    for ai, bj, size in matching_blocks(a, b):
+        if i < ai and j < bj:
+            ops.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            ops.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            ops.append(("insert", i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            ops.append(("equal", ai, i, bj, j))
+    return ops
+
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+def diff_stats(
+    prev: Union[bytes, memoryview],
+    curr: Union[bytes, memoryview],
+    base_units: Optional[int] = None,
+) -> dict:
+    """
+    Diff *prev* against *curr* and summarise the change.
+
+    A replaced run of units counts as "changed" up to the shorter side; the
+    remainder is "inserted" or "deleted".  Ratios are relative to the number
+    of units in *prev* (inserted_ratio can exceed 1.0), or to *base_units*
+    when *prev* is an excerpt — e.g. only the changed sections of a page.
+
+    Returns::
+
+        {
+            "prev_units": int,
+            "curr_units": int,
+            "inserted": int,
+            "deleted": int,
+            "changed": int,
+            "inserted_ratio": float,
+            "deleted_ratio": float,
+            "changed_ratio": float,
+            "diff_ratio": float,      # (inserted + deleted + changed) / prev_units
+        }
+    """
+    table: dict[bytes, int] = {}
+    a = _intern(split_units(prev), table)
+    b = _intern(split_units(curr), table)
+
+    inserted = deleted = changed = 0
+    for tag, i1, i2, j1, j2 in opcodes(a, b):
+        if tag == "equal":
+            continue
+        common = min(i2 - i1, j2 - j1)
+        changed += common
+        deleted += (i2 - i1) - common
+        inserted += (j2 - j1) - common
+
+    base = max(len(a) if base_units is None else base_units, 1)
+    return {
+        "prev_units": len(a),
+        "curr_units": len(b),
+        "inserted": inserted,
+        "deleted": deleted,
+        "changed": changed,
+        "inserted_ratio": inserted / base,
+        "deleted_ratio": deleted / base,
+        "changed_ratio": changed / base,
+        "diff_ratio": (inserted + deleted + changed) / base,
+    }
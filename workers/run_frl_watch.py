@@ -6,6 +6,7 @@ Usage:
     cd workers/
     python3 run_frl_watch.py
 
+Targets are read from kb/sources.yml (watch_targets.frl).
 Reads SUPABASE_URL + SUPABASE_SERVICE_ROLE_KEY from .env.
 Writes source_document + change_event rows to Supabase if content changed.
 Snapshots saved to kb/snapshots/.
@@ -22,33 +23,12 @@ from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent / ".env")
 
 from kangavisa_workers.frl_watcher import run_frl_watch_and_persist  # noqa: E402
+from kangavisa_workers.sources import watch_targets  # noqa: E402
 
 # ---------------------------------------------------------------------------
-# FRL targets — expand as new instruments are identified
+# FRL targets — kb/sources.yml watch_targets.frl (shared with run_watchers.py)
 # ---------------------------------------------------------------------------
-FRL_TARGETS = [
-    {
-        "url": "https://www.legislation.gov.au/Details/C2024C00075",
-        "source_id": "frl_migration_act",
-        "source_type": "FRL_ACT",
-        "canonical_url": "https://www.legislation.gov.au/Details/C2024C00075",
-        "title": "Migration Act 1958 (current compilation)",
-    },
-    {
-        "url": "https://www.legislation.gov.au/Details/F2024L00481",
-        "source_id": "frl_migration_regs",
-        "source_type": "FRL_REGS",
-        "canonical_url": "https://www.legislation.gov.au/Details/F2024L00481",
-        "title": "Migration Regulations 1994 (current compilation)",
-    },
-    {
-        "url": "https://www.legislation.gov.au/Details/F2016L00610",
-        "source_id": "frl_lin_18_036",
-        "source_type": "FRL_INSTRUMENT",
-        "canonical_url": "https://www.legislation.gov.au/Details/F2016L00610",
-        "title": "LIN 18/036 — Student visa English exemptions",
-    },
-]
+FRL_TARGETS = watch_targets()["frl"]
 
 
 def main() -> None:
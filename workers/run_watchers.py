@@ -10,6 +10,38 @@ Runs all three watcher pipelines in sequence:
 Usage:
     cd workers/
     python3 run_watchers.py
+    python3 run_watchers.py --async [--host-limit legislation.gov.au=2 ...]
+    python3 run_watchers.py --rate legislation.gov.au=1 [--max-retries 3]
+    python3 run_watchers.py --queue kb/.watch_queue.sqlite [--workers 4] [--run-id ID]
+    python3 run_watchers.py --queue kb/.watch_queue.sqlite --worker
+    python3 run_watchers.py --schedule [--tick 300] [--state PATH] [--once]
+
+--async runs every target concurrently (kangavisa_workers.async_runner) with
+a per-host cap on in-flight requests; the default is the sequential loop.
+
+--queue PATH runs the targets through a durable SQLite job queue
+(kangavisa_workers.job_queue) with --workers N local processes; more
+workers — on this host, or others sharing the file with --no-wal — join with
+--queue PATH --worker.  A crashed run resumes with --run-id RUN_ID: finished
+jobs are kept and expired leases are re-queued.
+
+--schedule runs as a long-lived daemon (kangavisa_workers.scheduler): each
+tick runs only the targets due under the kb/sources.yml polling cadences,
+and next-due times persist in a state file (KANGAVISA_SCHEDULER_STATE,
+default kb/.scheduler_state.json).  --once runs a single tick and exits,
+for cron.  Combine with --async to run each tick's due targets concurrently.
+
+Every upstream fetch goes through kangavisa_workers.fetch_policy: a per-host
+token bucket (--rate HOST=R requests/second), retries with jittered backoff
+that honour Retry-After (--max-retries), and a circuit breaker that fails a
+host's remaining targets fast once it is clearly down.  Retry, throttle and
+circuit-trip counts are printed with the summary.
+
+source_document / change_event inserts are written behind in bulk
+(db.WriteBehindSession, --write-batch rows per flush) with client-generated
+IDs; targets whose rows fail to flush are reported as transient failures.
+
+Targets are read from kb/sources.yml (watch_targets).
 
 Reads SUPABASE_URL + SUPABASE_SERVICE_ROLE_KEY from .env.
 Writes source_document + change_event rows to Supabase if content changed.
@@ -20,121 +52,35 @@ Replaces: run_frl_watch.py
 
 from __future__ import annotations
 
+import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 
 # Load workers/.env (relative to this script)
 load_dotenv(Path(__file__).parent / ".env")
 
+from kangavisa_workers import db, fetch_policy, sources                      # noqa: E402
 from kangavisa_workers.frl_watcher import run_frl_watch_and_persist          # noqa: E402
 from kangavisa_workers.homeaffairs_watcher import run_homeaffairs_watch_and_persist  # noqa: E402
 from kangavisa_workers.datagov_watcher import run_datagov_watch_and_persist   # noqa: E402
+from kangavisa_workers.async_runner import run_async                         # noqa: E402
+from kangavisa_workers.scheduler import DEFAULT_JITTER, DEFAULT_TICK_SECONDS, Scheduler  # noqa: E402
+from kangavisa_workers.job_queue import DEFAULT_LEASE_SECONDS, JobQueue, work  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
-# FRL targets — authoritative legal sources (legislation.gov.au)
+# Targets — kb/sources.yml watch_targets (FRL, Home Affairs, data.gov.au)
 # ---------------------------------------------------------------------------
-FRL_TARGETS = [
-    {
-        "url": "https://www.legislation.gov.au/Details/C2024C00075",
-        "source_id": "frl_migration_act",
-        "source_type": "FRL_ACT",
-        "canonical_url": "https://www.legislation.gov.au/Details/C2024C00075",
-        "title": "Migration Act 1958 (current compilation)",
-    },
-    {
-        "url": "https://www.legislation.gov.au/Details/F2024L00481",
-        "source_id": "frl_migration_regs",
-        "source_type": "FRL_REGS",
-        "canonical_url": "https://www.legislation.gov.au/Details/F2024L00481",
-        "title": "Migration Regulations 1994 (current compilation)",
-    },
-    {
-        "url": "https://www.legislation.gov.au/Details/F2016L00610",
-        "source_id": "frl_lin_18_036",
-        "source_type": "FRL_INSTRUMENT",
-        "canonical_url": "https://www.legislation.gov.au/Details/F2016L00610",
-        "title": "LIN 18/036 — Student visa English exemptions",
-    },
-]
-
-# ---------------------------------------------------------------------------
-# Home Affairs targets — MVP 5 pathways (immi.homeaffairs.gov.au)
-# ---------------------------------------------------------------------------
-HOMEAFFAIRS_TARGETS = [
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/visitor-600",
-        "source_id": "ha_visitor_600",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/visitor-600",
-        "title": "Visitor visa (subclass 600) — Home Affairs",
-    },
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/student-500",
-        "source_id": "ha_student_500",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/student-500",
-        "title": "Student visa (subclass 500) — Home Affairs",
-    },
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/temporary-graduate-485",
-        "source_id": "ha_temp_graduate_485",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/temporary-graduate-485",
-        "title": "Temporary Graduate visa (subclass 485) — Home Affairs",
-    },
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/skilled-independent-189",
-        "source_id": "ha_skilled_189",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/skilled-independent-189",
-        "title": "Skilled Independent visa (subclass 189) — Home Affairs",
-    },
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/skilled-nominated-190",
-        "source_id": "ha_skilled_190",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/skilled-nominated-190",
-        "title": "Skilled Nominated visa (subclass 190) — Home Affairs",
-    },
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/skilled-work-regional-491",
-        "source_id": "ha_skilled_491",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/skilled-work-regional-491",
-        "title": "Skilled Work Regional visa (subclass 491) — Home Affairs",
-    },
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/partner-820-801",
-        "source_id": "ha_partner_820",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/partner-820-801",
-        "title": "Partner visa (subclass 820/801) — Home Affairs",
-    },
-    {
-        "url": "https://immi.homeaffairs.gov.au/visas/help-and-support/check-twice-submit-once",
-        "source_id": "ha_check_twice_visitor",
-        "canonical_url": "https://immi.homeaffairs.gov.au/visas/help-and-support/check-twice-submit-once",
-        "title": "Check Twice, Submit Once — Home Affairs",
-    },
-]
-
-# ---------------------------------------------------------------------------
-# data.gov.au targets — CKAN dataset IDs for GovData pipeline
-# ---------------------------------------------------------------------------
-DATAGOV_TARGETS = [
-    {
-        "dataset_id": "student-visas",
-        "canonical_url": "https://data.gov.au/data/dataset/student-visas",
-        "title": "Student Visas dataset — data.gov.au",
-    },
-    {
-        "dataset_id": "temporary-graduate-visas",
-        "canonical_url": "https://data.gov.au/data/en/dataset/temporary-graduate-visas",
-        "title": "Temporary Graduate Visas dataset — data.gov.au",
-    },
-    {
-        "dataset_id": "visa-working-holiday-maker",
-        "canonical_url": "https://www.data.gov.au/data/dataset/visa-working-holiday-maker",
-        "title": "Working Holiday Maker Visas dataset — data.gov.au",
-    },
-]
+WATCH_TARGETS = sources.watch_targets()
+FRL_TARGETS = WATCH_TARGETS["frl"]
+HOMEAFFAIRS_TARGETS = WATCH_TARGETS["homeaffairs"]
+DATAGOV_TARGETS = WATCH_TARGETS["datagov"]
 
 
 # ---------------------------------------------------------------------------
@@ -150,9 +96,28 @@ def _print_result(source_id: str, result: dict) -> None:
     )
 
 
-def run_frl(results: list) -> None:
+def _prefetch_prev_docs(session: db.SupabaseSession, targets: dict) -> Optional[dict]:
+    """
+    Load previous state for every target in *targets* ({group: [target]}) in
+    one bulk query.  On failure each pipeline falls back to its own lookup
+    (and reports the error itself).
+    """
+    urls = [t["canonical_url"] for group in targets.values() for t in group]
+    try:
+        return session.get_latest_source_docs(urls)
+    except Exception as exc:
+        print(f"  ⚠ Prefetch of previous state failed, using per-target lookups: {exc}")
+        return None
+
+
+def run_frl(
+    results: list,
+    session: db.SupabaseSession,
+    prev_docs: Optional[dict],
+    targets: Optional[list] = None,
+) -> None:
     print("\n=== FRL Watcher (legislation.gov.au) ===\n")
-    for target in FRL_TARGETS:
+    for target in FRL_TARGETS if targets is None else targets:
         print(f"[{target['source_id']}] {target['url']}")
         try:
             result = run_frl_watch_and_persist(
@@ -161,6 +126,8 @@ def run_frl(results: list) -> None:
                 source_type=target["source_type"],
                 canonical_url=target["canonical_url"],
                 title=target["title"],
+                session=session,
+                prev_docs=prev_docs,
             )
             _print_result(target["source_id"], result)
             results.append({"source_id": target["source_id"], "ok": True, **result})
@@ -172,9 +139,14 @@ def run_frl(results: list) -> None:
             results.append({"source_id": target["source_id"], "ok": False, "error": str(exc), "fatal": False})
 
 
-def run_homeaffairs(results: list) -> None:
+def run_homeaffairs(
+    results: list,
+    session: db.SupabaseSession,
+    prev_docs: Optional[dict],
+    targets: Optional[list] = None,
+) -> None:
     print("\n=== Home Affairs Watcher (immi.homeaffairs.gov.au) ===\n")
-    for target in HOMEAFFAIRS_TARGETS:
+    for target in HOMEAFFAIRS_TARGETS if targets is None else targets:
         print(f"[{target['source_id']}] {target['url']}")
         try:
             result = run_homeaffairs_watch_and_persist(
@@ -182,6 +154,8 @@ def run_homeaffairs(results: list) -> None:
                 source_id=target["source_id"],
                 canonical_url=target["canonical_url"],
                 title=target["title"],
+                session=session,
+                prev_docs=prev_docs,
             )
             _print_result(target["source_id"], result)
             results.append({"source_id": target["source_id"], "ok": True, **result})
@@ -193,15 +167,22 @@ def run_homeaffairs(results: list) -> None:
             results.append({"source_id": target["source_id"], "ok": False, "error": str(exc), "fatal": False})
 
 
-def run_datagov(results: list) -> None:
+def run_datagov(
+    results: list,
+    session: db.SupabaseSession,
+    prev_docs: Optional[dict],
+    targets: Optional[list] = None,
+) -> None:
     print("\n=== data.gov.au Watcher (CKAN API) ===\n")
-    for target in DATAGOV_TARGETS:
+    for target in DATAGOV_TARGETS if targets is None else targets:
         print(f"[{target['dataset_id']}] {target['canonical_url']}")
         try:
             result = run_datagov_watch_and_persist(
                 dataset_id=target["dataset_id"],
                 canonical_url=target["canonical_url"],
                 title=target["title"],
+                session=session,
+                prev_docs=prev_docs,
             )
             _print_result(target["dataset_id"], result)
             results.append({"source_id": target["dataset_id"], "ok": True, **result})
@@ -213,11 +194,209 @@ def run_datagov(results: list) -> None:
             results.append({"source_id": target["dataset_id"], "ok": False, "error": str(exc), "fatal": False})
 
 
+def run_all_async(
+    results: list,
+    host_limits: dict,
+    targets: Optional[dict] = None,
+    write_batch_size: int = db.WRITE_BATCH_SIZE,
+) -> None:
+    print("\n=== All watchers (async, per-host limits) ===\n")
+
+    def on_result(entry: dict) -> None:
+        if entry["ok"]:
+            print(f"[{entry['source_id']}]", end="")
+            _print_result(entry["source_id"], entry)
+        elif entry["fatal"]:
+            print(f"[{entry['source_id']}]  ✗ FATAL (missing secrets): {entry['error']}")
+        else:
+            print(f"[{entry['source_id']}]  ⚠ WARNING (transient): {entry['error']}")
+
+    targets = WATCH_TARGETS if targets is None else targets
+    results.extend(run_async(
+        targets.get("frl", []), targets.get("homeaffairs", []), targets.get("datagov", []),
+        host_limits=host_limits, on_result=on_result, policy=fetch_policy.DEFAULT_POLICY,
+        write_batch_size=write_batch_size,
+    ))
+
+
+def run_targets(
+    targets: dict,
+    use_async: bool,
+    host_limits: dict,
+    write_batch_size: int = db.WRITE_BATCH_SIZE,
+) -> list:
+    """Run *targets* ({group: [target]}) and return the result dicts."""
+    results: list = []
+    if use_async:
+        run_all_async(results, host_limits, targets, write_batch_size)
+        return results
+    # One pooled Supabase connection for the whole sequential run; inserts
+    # are buffered and written in bulk (flushed at batch size, timer, run end)
+    with db.SupabaseSession() as session, db.WriteBehindSession(session, batch_size=write_batch_size) as writer:
+        prev_docs = _prefetch_prev_docs(session, targets)
+        if targets.get("frl"):
+            run_frl(results, writer, prev_docs, targets["frl"])
+        if targets.get("homeaffairs"):
+            run_homeaffairs(results, writer, prev_docs, targets["homeaffairs"])
+        if targets.get("datagov"):
+            run_datagov(results, writer, prev_docs, targets["datagov"])
+    _report_writes(writer, results)
+    return results
+
+
+def _report_writes(writer: db.WriteBehindSession, results: list) -> None:
+    """Apply flush failures to *results* and print the write-behind counters."""
+    failed = writer.apply_failures(results)
+    stats = writer.stats
+    print(f"\nDB writes: {stats['source_documents']} source_document + {stats['change_events']} "
+          f"change_event rows in {stats['requests']} requests ({stats['flushes']} flushes)")
+    for line in fetch_policy.format_stats(writer.policy.stats()):
+        print(f"  {line}")
+    if failed:
+        print(f"  ⚠ WARNING (transient): {failed} target(s) lost their rows in a failed flush")
+
+
+RUNNERS = {"frl": run_frl, "homeaffairs": run_homeaffairs, "datagov": run_datagov}
+
+
+def run_queue_worker(
+    queue_path: Path,
+    run_id: Optional[str],
+    lease_seconds: float,
+    wal: bool,
+    rates: Optional[dict] = None,
+    max_retries: int = fetch_policy.MAX_RETRIES,
+) -> int:
+    """
+    Work off the job queue until it is empty (one process).  Returns jobs run.
+
+    The process's fetch_policy.DEFAULT_POLICY is built here from *rates* and
+    *max_retries*, so a worker honours --rate / --max-retries however it was
+    started (fork, spawn or forkserver).
+    """
+    fetch_policy.DEFAULT_POLICY = fetch_policy.FetchPolicy(rates=rates, max_retries=max_retries)
+    queue = JobQueue(queue_path, lease_seconds=lease_seconds, wal=wal)
+    with db.SupabaseSession() as session:
+        def run_job(watcher: str, target: dict) -> dict:
+            results: list = []
+            RUNNERS[watcher](results, session, None, [target])
+            return results[0]
+
+        jobs = work(queue, run_job=run_job, run_id=run_id)
+    _print_fetch_stats()
+    return jobs
+
+
+def run_queued(args) -> list:
+    """--queue: enqueue this run (unless --worker), work it with --workers processes, return results."""
+    queue = JobQueue(args.queue, lease_seconds=args.lease, wal=args.wal)
+    run_id = args.run_id
+    if not args.worker:
+        run_id = queue.enqueue_run(WATCH_TARGETS, run_id)
+        print(f"\n=== Job queue {args.queue} — run {run_id} ===")
+
+    worker_args = (args.queue, run_id, args.lease, args.wal, dict(args.rate), args.max_retries)
+    if args.workers <= 1:
+        run_queue_worker(*worker_args)
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for future in [pool.submit(run_queue_worker, *worker_args) for _ in range(args.workers)]:
+                future.result()
+
+    if run_id is None:
+        return []
+    counts = queue.summary(run_id)
+    print(f"\nQueue: {counts['done']} done · {counts['failed']} failed · "
+          f"{counts['queued'] + counts['leased']} still queued or leased by other workers")
+    return queue.results(run_id)
+
+
+def run_scheduled(args) -> None:
+    """--schedule: run due targets each tick, forever (or once with --once)."""
+    scheduler = Scheduler(state_path=args.state, jitter=args.jitter)
+
+    def run_due(due: dict) -> list:
+        counts = ", ".join(f"{group} {len(targets)}" for group, targets in due.items())
+        print(f"\n=== Scheduled tick {datetime.now(timezone.utc):%Y-%m-%d %H:%M:%SZ} — due: {counts} ===")
+        results = run_targets(due, args.use_async, dict(args.host_limit), args.write_batch)
+        ok = sum(1 for r in results if r["ok"])
+        changed = sum(1 for r in results if r.get("change_event_id"))
+        print(f"Tick complete: {ok}/{len(results)} OK · {changed} change events")
+        _print_fetch_stats()
+        return results
+
+    if args.once:
+        if not scheduler.tick(run_due):
+            print("No targets due.")
+        return
+    scheduler.run_forever(run_due, tick_seconds=args.tick)
+
+
+def _print_fetch_stats() -> None:
+    """Per-host fetch policy counters (cumulative for this process)."""
+    for line in fetch_policy.format_stats(fetch_policy.DEFAULT_POLICY.stats()):
+        print(f"  fetch {line}")
+
+
+def _parse_rate(value: str) -> tuple:
+    host, _, rate = value.partition("=")
+    try:
+        parsed = float(rate)
+    except ValueError:
+        parsed = 0.0
+    if not host or parsed <= 0:
+        raise argparse.ArgumentTypeError(f"expected HOST=R (R > 0 requests/second), got {value!r}")
+    return host, parsed
+
+
+def _parse_host_limit(value: str) -> tuple:
+    host, _, limit = value.partition("=")
+    if not host or not limit.isdigit() or int(limit) < 1:
+        raise argparse.ArgumentTypeError(f"expected HOST=N (N >= 1), got {value!r}")
+    return host, int(limit)
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="KangaVisa combined ingestion watcher")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run all targets concurrently with per-host limits")
+    parser.add_argument("--host-limit", type=_parse_host_limit, action="append", default=[],
+                        metavar="HOST=N",
+                        help="Max in-flight requests for HOST (repeatable; 'supabase' = SUPABASE_URL host)")
+    parser.add_argument("--rate", type=_parse_rate, action="append", default=[], metavar="HOST=R",
+                        help="Max requests/second to upstream HOST (repeatable)")
+    parser.add_argument("--max-retries", type=int, default=fetch_policy.MAX_RETRIES,
+                        help="Retries per upstream fetch on 429 / 5xx / timeouts")
+    parser.add_argument("--write-batch", type=int, default=db.WRITE_BATCH_SIZE,
+                        help="source_document rows buffered per bulk insert (1 = flush after every one)")
+    parser.add_argument("--schedule", action="store_true",
+                        help="Daemon mode: run only targets due under the sources.yml polling cadences")
+    parser.add_argument("--tick", type=int, default=DEFAULT_TICK_SECONDS,
+                        help="--schedule: max seconds between due checks")
+    parser.add_argument("--state", type=Path, default=None,
+                        help="--schedule: state file (default: kb/.scheduler_state.json)")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER,
+                        help="--schedule: ± fraction of each interval added to next-due times")
+    parser.add_argument("--once", action="store_true", help="--schedule: run one tick and exit")
+    parser.add_argument("--queue", type=Path, default=None,
+                        help="Run targets through the SQLite job queue at this path")
+    parser.add_argument("--workers", type=int, default=1, help="--queue: local worker processes")
+    parser.add_argument("--worker", action="store_true",
+                        help="--queue: only work off jobs already queued (join another run)")
+    parser.add_argument("--run-id", default=None, help="--queue: run to create, resume or join")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="--queue: lease seconds before a silent worker's job is re-queued")
+    parser.add_argument("--no-wal", dest="wal", action="store_false",
+                        help="--queue: rollback journal instead of WAL (queue file on a network filesystem)")
+    args = parser.parse_args()
+    fetch_policy.DEFAULT_POLICY = fetch_policy.FetchPolicy(
+        rates=dict(args.rate), max_retries=args.max_retries,
+    )
+
     print("=" * 60)
     print("KangaVisa — Combined Ingestion Watcher")
     print("=" * 60)
@@ -233,11 +412,16 @@ def main() -> None:
         print("  → Locally: populate workers/.env (see workers/.env.example)")
         sys.exit(1)
 
-    results: list = []
+    if args.schedule:
+        run_scheduled(args)
+        return
 
-    run_frl(results)
-    run_homeaffairs(results)
-    run_datagov(results)
+    if args.queue:
+        results = run_queued(args)
+        if args.worker:
+            return
+    else:
+        results = run_targets(WATCH_TARGETS, args.use_async, dict(args.host_limit), args.write_batch)
 
     ok = sum(1 for r in results if r["ok"])
     changed = sum(1 for r in results if r.get("change_event_id"))
@@ -249,6 +433,7 @@ def main() -> None:
         f"Complete: {ok}/{len(results)} OK · {changed} change events "
         f"· {fatal_errors} fatal errors · {transient_errors} transient warnings"
     )
+    _print_fetch_stats()
     print("=" * 60)
 
     # Only fail CI for fatal errors (config/auth) or majority failure (>50%).
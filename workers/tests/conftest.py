@@ -29,3 +29,13 @@ def _reload_db_env(request):
     # Re-read from environment each test
     db_module.SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
     db_module.SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_fetch_policy(monkeypatch):
+    """
+    Give every test its own fetch_policy.DEFAULT_POLICY so token buckets and
+    circuit breakers never carry over between tests.
+    """
+    from kangavisa_workers import fetch_policy
+    monkeypatch.setattr(fetch_policy, "DEFAULT_POLICY", fetch_policy.FetchPolicy())
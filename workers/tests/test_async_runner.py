@@ -0,0 +1,255 @@
+"""
+Tests for async_runner.py — concurrent watcher execution with per-host limits.
+
+Uses pytest-httpx to mock upstream + Supabase responses on the AsyncClient.
+No live network or real Supabase project required.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from kangavisa_workers import db
+from kangavisa_workers.async_runner import AsyncWatchRunner, HostLimiter, _BridgedSession, run_async
+from kangavisa_workers.fetch_policy import FetchPolicy
+from kangavisa_workers.frl_watcher import hash_content
+
+FRL_URL = "https://www.legislation.gov.au/Details/C2024C00075"
+FRL_BODY = b"<html><body><h1>Migration Act 1958</h1></body></html>"
+
+FRL_TARGET = {
+    "url": FRL_URL,
+    "source_id": "frl_migration_act",
+    "source_type": "FRL_ACT",
+    "canonical_url": FRL_URL,
+    "title": "Migration Act 1958",
+}
+
+SOURCE_DOC_URL = re.compile(r".*source_document.*")
+CHANGE_EVENT_URL = re.compile(r".*change_event.*")
+
+
+@pytest.fixture
+def supabase_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "SUPABASE_URL", "https://test.supabase.co")
+    monkeypatch.setattr(db, "SERVICE_ROLE_KEY", "sb_secret_test_key")
+    monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+
+
+# ---------------------------------------------------------------------------
+# HostLimiter
+# ---------------------------------------------------------------------------
+
+class TestHostLimiter:
+    def test_subdomain_shares_parent_limit(self):
+        limiter = HostLimiter({"data.gov.au": 3})
+        assert limiter.limit_for("https://www.data.gov.au/x") == 3
+        assert limiter.limit_for("https://data.gov.au/api/3/action/package_show") == 3
+
+    def test_supabase_alias_resolves_to_supabase_url_host(self, supabase_env):
+        limiter = HostLimiter({"supabase": 5})
+        assert limiter.limit_for("https://test.supabase.co/rest/v1/source_document") == 5
+
+    def test_unknown_host_uses_default(self):
+        limiter = HostLimiter(default=7)
+        assert limiter.limit_for("https://example.com/") == 7
+
+    def test_semaphore_caps_in_flight_requests(self):
+        limiter = HostLimiter({"legislation.gov.au": 2})
+        state = {"active": 0, "peak": 0}
+
+        async def request():
+            async with limiter.semaphore(FRL_URL):
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+                await asyncio.sleep(0.01)
+                state["active"] -= 1
+
+        async def main():
+            await asyncio.gather(*(request() for _ in range(10)))
+
+        asyncio.run(main())
+        assert state["peak"] == 2
+
+
+# ---------------------------------------------------------------------------
+# AsyncWatchRunner
+# ---------------------------------------------------------------------------
+
+class TestAsyncWatchRunner:
+    def test_change_detected_returns_pipeline_result(self, httpx_mock, supabase_env):
+        httpx_mock.add_response(url=FRL_URL, content=FRL_BODY)
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="GET", json=[])
+        httpx_mock.add_response(
+            url=SOURCE_DOC_URL, method="POST", status_code=201,
+            json=[{"source_doc_id": "new-source-uuid"}],
+        )
+        httpx_mock.add_response(
+            url=CHANGE_EVENT_URL, method="POST", status_code=201,
+            json=[{"change_event_id": "new-event-uuid"}],
+        )
+
+        results = run_async(frl_targets=[FRL_TARGET], write_batch_size=None)
+
+        assert len(results) == 1
+        assert results[0]["ok"] is True
+        assert results[0]["source_id"] == "frl_migration_act"
+        assert results[0]["source_doc_id"] == "new-source-uuid"
+        assert results[0]["change_event_id"] == "new-event-uuid"
+        assert results[0]["snapshot"]["content_hash"] == hash_content(FRL_BODY)
+
+    def test_write_behind_bulk_inserts(self, httpx_mock, supabase_env):
+        targets = [dict(FRL_TARGET, source_id=f"frl_{i}", url=f"{FRL_URL}?v={i}", canonical_url=f"{FRL_URL}?v={i}")
+                   for i in range(5)]
+        for t in targets:
+            httpx_mock.add_response(url=t["url"], content=FRL_BODY + t["source_id"].encode())
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="GET", json=[])
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201, is_reusable=True)
+        httpx_mock.add_response(url=CHANGE_EVENT_URL, method="POST", status_code=201, is_reusable=True)
+
+        results = run_async(frl_targets=targets, write_batch_size=10)
+
+        posts = [r for r in httpx_mock.get_requests() if r.method == "POST"]
+        assert len(posts) == 2
+        docs, events = (json.loads(r.content) for r in posts)
+        assert {d["source_doc_id"] for d in docs} == {r["source_doc_id"] for r in results}
+        assert {e["source_doc_id_new"] for e in events} == {r["source_doc_id"] for r in results}
+        assert {e["change_event_id"] for e in events} == {r["change_event_id"] for r in results}
+        assert all(r["ok"] for r in results)
+
+    def test_failed_flush_marks_targets_transient(self, httpx_mock, supabase_env):
+        httpx_mock.add_response(url=FRL_URL, content=FRL_BODY)
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="GET", json=[])
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=400)
+
+        results = run_async(frl_targets=[FRL_TARGET])
+
+        assert results[0]["ok"] is False
+        assert results[0]["fatal"] is False
+        assert "flush failed" in results[0]["error"]
+
+    def test_no_change_skips_inserts(self, httpx_mock, supabase_env):
+        httpx_mock.add_response(url=FRL_URL, content=FRL_BODY)
+        httpx_mock.add_response(
+            url=SOURCE_DOC_URL, method="GET",
+            json=[{
+                "canonical_url": FRL_URL,
+                "source_doc_id": "prev-uuid",
+                "content_hash": hash_content(FRL_BODY),
+            }],
+        )
+
+        results = run_async(frl_targets=[FRL_TARGET])
+
+        assert results[0]["ok"] is True
+        assert results[0]["change_event_id"] is None
+        assert results[0]["source_doc_id"] == "prev-uuid"
+
+    def test_304_sends_stored_validators(self, httpx_mock, supabase_env):
+        httpx_mock.add_response(
+            url=SOURCE_DOC_URL, method="GET",
+            json=[{
+                "canonical_url": FRL_URL,
+                "source_doc_id": "prev-uuid",
+                "content_hash": "abc",
+                "metadata_json": {"validators": {"etag": '"v1"'}},
+            }],
+        )
+        httpx_mock.add_response(url=FRL_URL, status_code=304, match_headers={"If-None-Match": '"v1"'})
+
+        results = run_async(frl_targets=[FRL_TARGET])
+
+        assert results[0]["ok"] is True
+        assert results[0]["change_event_id"] is None
+        assert results[0]["snapshot"] is None
+
+    def test_prev_state_prefetched_in_one_request(self, httpx_mock, supabase_env):
+        targets = [
+            dict(FRL_TARGET, source_id=f"frl_{i}", url=f"{FRL_URL}/{i}", canonical_url=f"{FRL_URL}/{i}")
+            for i in range(3)
+        ]
+        httpx_mock.add_response(
+            url=SOURCE_DOC_URL, method="GET",
+            json=[
+                {"canonical_url": t["canonical_url"], "source_doc_id": f"prev-{i}",
+                 "content_hash": hash_content(FRL_BODY)}
+                for i, t in enumerate(targets)
+            ],
+        )
+        for t in targets:
+            httpx_mock.add_response(url=t["url"], content=FRL_BODY)
+
+        results = run_async(frl_targets=targets)
+
+        lookups = [r for r in httpx_mock.get_requests() if "source_document" in str(r.url)]
+        assert len(lookups) == 1
+        assert [r["source_doc_id"] for r in results] == ["prev-0", "prev-1", "prev-2"]
+
+    def test_write_behind_session_prefetches_through_bridge(self, httpx_mock, supabase_env):
+        httpx_mock.add_response(
+            url=SOURCE_DOC_URL, method="GET",
+            json=[{"canonical_url": FRL_URL, "source_doc_id": "prev-uuid", "content_hash": "abc"}],
+        )
+        runner = AsyncWatchRunner()
+
+        async def prefetch():
+            runner._loop = asyncio.get_running_loop()
+            async with httpx.AsyncClient() as client:
+                runner._client = client
+                writer = db.WriteBehindSession(_BridgedSession(runner), flush_interval=None)
+                return await runner._loop.run_in_executor(None, writer.get_latest_source_docs, [FRL_URL])
+
+        latest = asyncio.run(prefetch())
+        assert latest[FRL_URL]["source_doc_id"] == "prev-uuid"
+        assert db.LATEST_SOURCE_DOC_VIEW in str(httpx_mock.get_requests()[0].url)
+
+    def test_upstream_error_is_transient(self, httpx_mock, supabase_env):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="GET", json=[])
+        httpx_mock.add_response(url=FRL_URL, status_code=503, is_reusable=True)
+        policy = FetchPolicy(max_retries=2, backoff_base=0)
+
+        results = run_async(frl_targets=[FRL_TARGET], policy=policy)
+
+        assert results[0]["ok"] is False
+        assert results[0]["fatal"] is False
+        assert policy.stats()["legislation.gov.au"]["retries"] == 2
+
+    def test_upstream_429_retried_then_succeeds(self, httpx_mock, supabase_env):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="GET", json=[])
+        httpx_mock.add_response(url=FRL_URL, status_code=429, headers={"Retry-After": "0"})
+        httpx_mock.add_response(url=FRL_URL, content=FRL_BODY)
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", json=[{"source_doc_id": "doc-1"}])
+        httpx_mock.add_response(url=CHANGE_EVENT_URL, method="POST", json=[{"change_event_id": "ce-1"}])
+        policy = FetchPolicy(backoff_base=0)
+
+        results = run_async(frl_targets=[FRL_TARGET], policy=policy)
+
+        assert results[0]["ok"] is True
+        assert policy.stats()["legislation.gov.au"]["retries"] == 1
+
+    def test_missing_secrets_is_fatal(self, monkeypatch):
+        monkeypatch.setattr(db, "SUPABASE_URL", "")
+        monkeypatch.setattr(db, "SERVICE_ROLE_KEY", "")
+
+        results = run_async(frl_targets=[FRL_TARGET])
+
+        assert results[0]["ok"] is False
+        assert results[0]["fatal"] is True
+
+    def test_on_result_called_per_target(self, monkeypatch):
+        monkeypatch.setattr(db, "SUPABASE_URL", "")
+        seen = []
+        targets = [dict(FRL_TARGET, source_id=f"frl_{i}") for i in range(3)]
+
+        results = asyncio.run(AsyncWatchRunner().run(targets, on_result=seen.append))
+
+        assert [r["source_id"] for r in results] == ["frl_0", "frl_1", "frl_2"]
+        assert sorted(r["source_id"] for r in seen) == ["frl_0", "frl_1", "frl_2"]
+
+    def test_no_targets_returns_empty(self):
+        assert run_async() == []
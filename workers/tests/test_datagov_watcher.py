@@ -106,8 +106,8 @@ class TestFetchDatasetMetadata:
 class TestRunDatagovWatchAndPersist:
     def _mock_fetch(self, monkeypatch, data: dict):
         monkeypatch.setattr(
-            "kangavisa_workers.datagov_watcher.fetch_dataset_metadata",
-            lambda dataset_id, **kw: data,
+            "kangavisa_workers.datagov_watcher.fetch_dataset_metadata_conditional",
+            lambda dataset_id, **kw: {"not_modified": False, "metadata": data, "validators": {}},
         )
 
     def test_no_change_returns_none_event_id(self, monkeypatch, tmp_path):
@@ -7,8 +7,10 @@ No live network or real Supabase project required.
 
 from __future__ import annotations
 
+import json
 import os
 import re
+import time
 import pytest
 import httpx
 
@@ -17,6 +19,7 @@ os.environ["SUPABASE_URL"] = "https://test.supabase.co"
 os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "sb_secret_test_key"
 
 from kangavisa_workers import db
+from kangavisa_workers.fetch_policy import FetchPolicy
 
 # ---------------------------------------------------------------------------
 # Test data
@@ -120,3 +123,236 @@ class TestInsertChangeEvent:
         httpx_mock.add_response(url=CHANGE_EVENT_URL, status_code=500)
         with pytest.raises(httpx.HTTPStatusError):
             db.insert_change_event(SAMPLE_CHANGE_EVENT)
+
+
+# ---------------------------------------------------------------------------
+# SupabaseSession
+# ---------------------------------------------------------------------------
+
+class TestSupabaseSession:
+    def test_reuses_one_client_across_calls(self, httpx_mock):
+        """One pooled client serves every call made through the session."""
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="GET", json=[])
+        httpx_mock.add_response(
+            url=SOURCE_DOC_URL, method="POST", status_code=201,
+            json=[{"source_doc_id": FAKE_SOURCE_DOC_ID}],
+        )
+        httpx_mock.add_response(
+            url=CHANGE_EVENT_URL, method="POST", status_code=201,
+            json=[{"change_event_id": FAKE_CHANGE_EVENT_ID}],
+        )
+        with db.SupabaseSession() as session:
+            client = session.client
+            assert session.get_latest_source_doc("https://example.com/page") is None
+            assert session.insert_source_document(SAMPLE_SOURCE_DOC_META) == FAKE_SOURCE_DOC_ID
+            assert session.insert_change_event(SAMPLE_CHANGE_EVENT) == FAKE_CHANGE_EVENT_ID
+            assert session.client is client
+        assert client.is_closed
+
+    def test_headers_are_cached(self):
+        session = db.SupabaseSession()
+        assert session.headers() is session.headers()
+        session.close()
+
+    def test_headers_follow_module_config(self, monkeypatch):
+        session = db.SupabaseSession()
+        monkeypatch.setattr(db, "SERVICE_ROLE_KEY", "sb_secret_rotated")
+        assert session.headers()["apikey"] == "sb_secret_rotated"
+        session.close()
+
+    def test_explicit_credentials(self, httpx_mock):
+        httpx_mock.add_response(url=re.compile(r"https://other\.supabase\.co/.*"), json=[])
+        with db.SupabaseSession("https://other.supabase.co", "sb_secret_other") as session:
+            session.get_latest_source_doc("https://example.com/page")
+        request = httpx_mock.get_requests()[0]
+        assert request.headers["apikey"] == "sb_secret_other"
+
+    def test_missing_credentials_raise_environment_error(self):
+        with db.SupabaseSession("", "") as session:
+            with pytest.raises(EnvironmentError):
+                session.get_latest_source_doc("https://example.com/page")
+
+    def test_module_functions_use_default_session(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, json=[])
+        httpx_mock.add_response(url=SOURCE_DOC_URL, json=[])
+        db.get_latest_source_doc("https://example.com/a")
+        db.get_latest_source_doc("https://example.com/b")
+        assert db.default_session() is db.default_session()
+
+    def test_update_source_document_metadata_patches_row(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="PATCH", json=[])
+        db.update_source_document_metadata(FAKE_SOURCE_DOC_ID, {"validators": {"etag": '"v1"'}})
+        request = httpx_mock.get_requests()[0]
+        assert f"source_doc_id=eq.{FAKE_SOURCE_DOC_ID}" in str(request.url)
+
+
+# ---------------------------------------------------------------------------
+# get_latest_source_docs (bulk prefetch)
+# ---------------------------------------------------------------------------
+
+class TestGetLatestSourceDocs:
+    def test_single_request_for_all_urls(self, httpx_mock):
+        """US-G1: One in.(...) request against the latest view, one row per URL."""
+        httpx_mock.add_response(url=SOURCE_DOC_URL, json=[
+            {"canonical_url": "https://a", "source_doc_id": "a-new", "content_hash": "a2"},
+            {"canonical_url": "https://b", "source_doc_id": "b-only", "content_hash": "b1"},
+        ])
+        result = db.get_latest_source_docs(["https://a", "https://b", "https://c"])
+
+        assert len(httpx_mock.get_requests()) == 1
+        request = httpx_mock.get_requests()[0]
+        assert request.url.path.endswith(f"/rest/v1/{db.LATEST_SOURCE_DOC_VIEW}")
+        assert request.url.params["canonical_url"] == 'in.("https://a","https://b","https://c")'
+        assert request.url.params["limit"] == "3"
+        assert result["https://a"]["source_doc_id"] == "a-new"
+        assert result["https://b"]["content_hash"] == "b1"
+        assert result["https://c"] is None
+
+    def test_batches_large_url_lists(self, httpx_mock, monkeypatch):
+        monkeypatch.setattr(db, "PREFETCH_BATCH_SIZE", 2)
+        httpx_mock.add_response(url=SOURCE_DOC_URL, json=[], is_reusable=True)
+        result = db.get_latest_source_docs([f"https://{i}" for i in range(5)])
+        assert len(httpx_mock.get_requests()) == 3
+        assert len(result) == 5
+
+    def test_missing_view_leaves_urls_unprefetched(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, status_code=404, json={"code": "PGRST205"})
+        assert db.get_latest_source_docs(["https://a", "https://b"]) == {}
+
+    def test_quotes_are_escaped(self):
+        assert db._in_filter(['a"b']) == 'in.("a\\"b")'
+
+
+# ---------------------------------------------------------------------------
+# WriteBehindSession
+# ---------------------------------------------------------------------------
+
+def _change(session, i: int, **meta) -> tuple:
+    doc_id = session.insert_source_document({**SAMPLE_SOURCE_DOC_META, "canonical_url": f"https://x/{i}", **meta})
+    event_id = session.insert_change_event({**SAMPLE_CHANGE_EVENT, "source_doc_id_new": doc_id})
+    return doc_id, event_id
+
+
+class TestWriteBehindSession:
+    def test_forty_changes_in_four_requests(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201, is_reusable=True)
+        httpx_mock.add_response(url=CHANGE_EVENT_URL, method="POST", status_code=201, is_reusable=True)
+        with db.SupabaseSession() as session, db.WriteBehindSession(session, flush_interval=None) as writer:
+            pairs = [_change(writer, i) for i in range(40)]
+
+        requests = httpx_mock.get_requests()
+        assert len(requests) == 4
+        assert writer.stats == {"source_documents": 40, "change_events": 40, "requests": 4, "flushes": 2}
+        docs = [row for r in requests if "source_document" in str(r.url) for row in json.loads(r.content)]
+        events = [row for r in requests if "change_event" in str(r.url) for row in json.loads(r.content)]
+        assert [d["source_doc_id"] for d in docs] == [doc_id for doc_id, _ in pairs]
+        assert [(e["source_doc_id_new"], e["change_event_id"]) for e in events] == pairs
+        assert requests[0].headers["Prefer"] == db.BULK_INSERT_PREFER
+        assert requests[0].url.params["on_conflict"] == "source_doc_id"
+
+    def test_metadata_update_of_pending_row_is_folded_in(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201)
+        with db.SupabaseSession() as session, db.WriteBehindSession(session, flush_interval=None) as writer:
+            doc_id = writer.insert_source_document(SAMPLE_SOURCE_DOC_META)
+            writer.update_source_document_metadata(doc_id, {"validators": {"etag": '"v2"'}})
+        (request,) = httpx_mock.get_requests()
+        assert json.loads(request.content)[0]["metadata_json"] == {"validators": {"etag": '"v2"'}}
+
+    def test_optional_keys_split_into_uniform_requests(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201, is_reusable=True)
+        with db.SupabaseSession() as session, db.WriteBehindSession(session, flush_interval=None) as writer:
+            writer.insert_source_document(SAMPLE_SOURCE_DOC_META)
+            writer.insert_source_document({**SAMPLE_SOURCE_DOC_META, "effective_from": "2026-07-01"})
+        assert len(httpx_mock.get_requests()) == 2
+
+    def test_retryable_error_retried_with_same_ids(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=503)
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201)
+        delays = []
+        with db.SupabaseSession() as session:
+            writer = db.WriteBehindSession(session, flush_interval=None, sleep=delays.append)
+            writer.insert_source_document(SAMPLE_SOURCE_DOC_META)
+            assert writer.flush() == 1
+        first, second = httpx_mock.get_requests()
+        assert first.content == second.content
+        assert len(delays) == 1
+        assert writer.failed == {}
+
+    def test_retry_after_honoured(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=429, headers={"Retry-After": "3"})
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201)
+        now, delays = [0.0], []
+
+        def sleep(seconds):
+            delays.append(seconds)
+            now[0] += seconds
+
+        policy = FetchPolicy(clock=lambda: now[0], sleep=sleep)
+        with db.SupabaseSession() as session:
+            writer = db.WriteBehindSession(session, flush_interval=None, policy=policy)
+            writer.insert_source_document(SAMPLE_SOURCE_DOC_META)
+            assert writer.flush() == 1
+        assert delays == [3.0]
+
+    def test_open_circuit_fails_fast(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=503)
+        policy = FetchPolicy(max_retries=5, failure_threshold=1, sleep=lambda _: None)
+        with db.SupabaseSession() as session:
+            writer = db.WriteBehindSession(session, flush_interval=None, policy=policy)
+            first = writer.insert_source_document(SAMPLE_SOURCE_DOC_META)
+            writer.flush()
+            second = writer.insert_source_document(SAMPLE_SOURCE_DOC_META)
+            writer.flush()
+        assert len(httpx_mock.get_requests()) == 1
+        assert writer.failed[first][1] is False
+        assert "Circuit open" in writer.failed[second][0]
+
+    def test_failed_source_flush_drops_events_and_marks_results(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=400)
+        with db.SupabaseSession() as session, db.WriteBehindSession(session, flush_interval=None) as writer:
+            doc_id, event_id = _change(writer, 0)
+        assert len(httpx_mock.get_requests()) == 1          # no change_event POST
+        assert set(writer.failed) == {doc_id, event_id}
+        results = [
+            {"source_id": "a", "ok": True, "source_doc_id": doc_id, "change_event_id": event_id},
+            {"source_id": "b", "ok": True, "source_doc_id": "prev", "change_event_id": None},
+        ]
+        assert writer.apply_failures(results) == 1
+        assert results[0]["ok"] is False and results[0]["fatal"] is False
+        assert results[1]["ok"] is True
+
+    def test_failed_batch_leaves_committed_batch_written(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201)
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=409)
+        httpx_mock.add_response(url=CHANGE_EVENT_URL, method="POST", status_code=201)
+        with db.SupabaseSession() as session, db.WriteBehindSession(session, flush_interval=None) as writer:
+            landed = _change(writer, 0)
+            rejected = _change(writer, 1, effective_from="2026-07-01")
+        events = json.loads(httpx_mock.get_requests(url=CHANGE_EVENT_URL)[0].content)
+        assert [e["change_event_id"] for e in events] == [landed[1]]
+        assert set(writer.failed) == set(rejected)
+        assert writer.stats["source_documents"] == 1 and writer.stats["change_events"] == 1
+
+    def test_rejected_batch_bisected_to_offending_row(self, httpx_mock):
+        def insert(request):
+            rows = json.loads(request.content)
+            bad = any(r["canonical_url"] == "https://x/2" for r in rows)
+            return httpx.Response(409 if bad else 201)
+
+        httpx_mock.add_callback(insert, url=SOURCE_DOC_URL, method="POST", is_reusable=True)
+        httpx_mock.add_response(url=CHANGE_EVENT_URL, method="POST", status_code=201)
+        with db.SupabaseSession() as session, db.WriteBehindSession(session, flush_interval=None) as writer:
+            pairs = [_change(writer, i) for i in range(4)]
+        assert set(writer.failed) == set(pairs[2])
+        assert writer.stats["source_documents"] == 3 and writer.stats["change_events"] == 3
+
+    def test_timer_flushes_idle_buffer(self, httpx_mock):
+        httpx_mock.add_response(url=SOURCE_DOC_URL, method="POST", status_code=201)
+        with db.SupabaseSession() as session:
+            writer = db.WriteBehindSession(session, flush_interval=0.01)
+            writer.insert_source_document(SAMPLE_SOURCE_DOC_META)
+            for _ in range(200):
+                if writer.pending() == 0 and writer.stats["source_documents"]:
+                    break
+                time.sleep(0.01)
+            assert writer.stats["source_documents"] == 1
@@ -0,0 +1,196 @@
+"""
+Tests for fetch_policy.py — per-host token bucket, retry/backoff, circuit breaker.
+Fake clock and sleep; pytest-httpx for the watcher fetch integration.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from kangavisa_workers.fetch_policy import (
+    CircuitOpenError,
+    FetchPolicy,
+    TokenBucket,
+    retry_after_seconds,
+)
+from kangavisa_workers.frl_watcher import fetch_frl_conditional
+
+FRL_URL = "https://www.legislation.gov.au/Details/C2024C00075"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: list = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _policy(clock: _Clock, **kwargs) -> FetchPolicy:
+    return FetchPolicy(clock=clock, sleep=clock.sleep, rng=random.Random(23), **kwargs)
+
+
+def _status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", FRL_URL)
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(str(status), request=request, response=response)
+
+
+def _attempts(*outcomes):
+    """Attempt callable raising / returning *outcomes* in turn; counts calls."""
+    calls = []
+
+    def attempt():
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return attempt, calls
+
+
+class TestTokenBucket:
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+        assert [bucket.reserve(0.0) for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+        assert bucket.reserve(10.0) == 0.0          # refilled, capped at burst
+
+    def test_pause_delays_next_token(self):
+        bucket = TokenBucket(rate=1.0, burst=4, now=0.0)
+        bucket.pause(0.0, 5.0)
+        assert bucket.reserve(1.0) == pytest.approx(4.0)
+        assert bucket.reserve(1.0) == pytest.approx(5.0)
+
+    def test_policy_throttles_and_counts(self):
+        clock = _Clock()
+        policy = _policy(clock, rates={"legislation.gov.au": 1.0}, burst=2)
+        for _ in range(4):
+            policy.call(FRL_URL, lambda: "ok")
+        assert clock.sleeps == [1.0, 1.0]
+        stats = policy.stats()["legislation.gov.au"]
+        assert stats["requests"] == 4
+        assert stats["throttled"] == 2
+        assert stats["throttle_seconds"] == 2.0
+
+
+class TestRetry:
+    def test_retries_5xx_with_jittered_backoff(self):
+        clock = _Clock()
+        policy = _policy(clock, backoff_base=1.0)
+        attempt, calls = _attempts(_status_error(503), httpx.ReadTimeout("slow"), "body")
+        assert policy.call(FRL_URL, attempt) == "body"
+        assert len(calls) == 3
+        assert 0 <= clock.sleeps[0] <= 1.0 and 0 <= clock.sleeps[1] <= 2.0
+        assert policy.stats()["legislation.gov.au"]["retries"] == 2
+
+    def test_retry_after_honoured_and_pauses_host(self):
+        clock = _Clock()
+        policy = _policy(clock)
+        attempt, _ = _attempts(_status_error(429, {"Retry-After": "7"}), "body")
+        assert policy.call(FRL_URL, attempt) == "body"
+        assert clock.sleeps == [7.0]
+        clock.now -= 7.0                            # another caller right after the 429 …
+        assert policy._before("legislation.gov.au") >= 7.0   # … waits it out too
+
+    def test_retry_after_too_long_gives_up(self):
+        policy = _policy(_Clock(), max_retry_after=60)
+        attempt, calls = _attempts(_status_error(503, {"Retry-After": "3600"}), "body")
+        with pytest.raises(httpx.HTTPStatusError):
+            policy.call(FRL_URL, attempt)
+        assert len(calls) == 1
+
+    def test_client_errors_not_retried(self):
+        policy = _policy(_Clock())
+        attempt, calls = _attempts(_status_error(404), "body")
+        with pytest.raises(httpx.HTTPStatusError):
+            policy.call(FRL_URL, attempt)
+        assert len(calls) == 1
+        assert policy.stats()["legislation.gov.au"]["retries"] == 0
+
+    def test_gives_up_after_max_retries(self):
+        policy = _policy(_Clock(), max_retries=2)
+        attempt, calls = _attempts(_status_error(502))
+        with pytest.raises(httpx.HTTPStatusError):
+            policy.call(FRL_URL, attempt)
+        assert len(calls) == 3
+
+    def test_retry_after_http_date(self):
+        now = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        resp = httpx.Response(503, headers={"Retry-After": format_datetime(now + timedelta(seconds=30), usegmt=True)})
+        assert retry_after_seconds(resp, now) == 30.0
+        assert retry_after_seconds(httpx.Response(503, headers={"Retry-After": "soon"})) is None
+
+
+class TestCircuitBreaker:
+    def test_trips_then_fails_fast_then_recovers(self):
+        clock = _Clock()
+        policy = _policy(clock, max_retries=10, failure_threshold=3, cooldown=60)
+        attempt, calls = _attempts(httpx.ConnectError("refused"))
+        with pytest.raises(httpx.ConnectError):
+            policy.call(FRL_URL, attempt)
+        assert len(calls) == 3                      # tripped before max_retries
+
+        with pytest.raises(CircuitOpenError):
+            policy.call(FRL_URL, attempt)
+        assert len(calls) == 3
+
+        clock.now += 61
+        assert policy.call(FRL_URL, lambda: "body") == "body"     # half-open probe
+        stats = policy.stats()["legislation.gov.au"]
+        assert (stats["trips"], stats["rejected"], stats["state"]) == (1, 1, "closed")
+
+    def test_failed_probe_reopens(self):
+        clock = _Clock()
+        policy = _policy(clock, failure_threshold=1, cooldown=30)
+        attempt, _ = _attempts(_status_error(503))
+        with pytest.raises(httpx.HTTPStatusError):
+            policy.call(FRL_URL, attempt)
+        clock.now += 30
+        with pytest.raises(httpx.HTTPStatusError):
+            policy.call(FRL_URL, attempt)
+        with pytest.raises(CircuitOpenError):
+            policy.call(FRL_URL, attempt)
+        assert policy.stats()["legislation.gov.au"]["trips"] == 2
+
+    def test_hosts_are_independent(self):
+        policy = _policy(_Clock(), failure_threshold=1)
+        with pytest.raises(httpx.HTTPStatusError):
+            policy.call(FRL_URL, _attempts(_status_error(500))[0])
+        assert policy.call("https://data.gov.au/api/3/action/package_show", lambda: "ok") == "ok"
+
+
+class TestIntegration:
+    def test_subdomain_shares_host_key(self):
+        policy = FetchPolicy()
+        assert policy.host_key(FRL_URL) == "legislation.gov.au"
+        assert policy.host_key("https://example.com/x") == "example.com"
+
+    def test_conditional_fetch_retries_503(self, httpx_mock):
+        httpx_mock.add_response(url=FRL_URL, status_code=503)
+        httpx_mock.add_response(url=FRL_URL, content=b"<html/>")
+        clock = _Clock()
+        result = fetch_frl_conditional(FRL_URL, policy=_policy(clock))
+        assert result["content"] == b"<html/>"
+        assert len(clock.sleeps) == 1
+
+    def test_async_call(self):
+        attempt, calls = _attempts(_status_error(503), "body")
+
+        async def aattempt():
+            return attempt()
+
+        policy = FetchPolicy(backoff_base=0)
+        assert asyncio.run(policy.acall(FRL_URL, aattempt)) == "body"
+        assert len(calls) == 2
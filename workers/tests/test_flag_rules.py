@@ -0,0 +1,158 @@
+"""
+Tests for flag_rules.py — compiled evaluator for kb/rules/flag_detection_rules.json.
+Uses the repo's rule file; no network.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+
+import pytest
+
+from kangavisa_workers import flag_rules
+from kangavisa_workers.flag_rules import RuleEngine, compile_condition, load_engine
+
+RULES = json.loads(flag_rules.RULES_PATH.read_text())["rules"]
+SUBCLASSES = ["600", "500", "485", "482", "820", "309", "417", "462", "189", "999"]
+
+
+def _random_record(rng: random.Random, fields) -> dict:
+    record = {"subclass": rng.choice(SUBCLASSES)}
+    for field in fields:
+        roll = rng.random()
+        if roll < 0.15:
+            continue                                  # absent
+        if roll < 0.25:
+            record[field] = None
+        elif roll < 0.6:
+            record[field] = rng.random() < 0.5
+        else:
+            record[field] = rng.choice([0, 1, 2, 3, 30, 90, 91, 119, 120, 0.3, 0.36, 0.5, 5000, 10000])
+    return record
+
+
+MIXED_VALUES = [0, 3, 120, 0.36, True, False, None, float("nan"), "100", "abc", "", [1]]
+
+
+def _mixed_record(rng: random.Random, fields) -> dict:
+    """Answers as they arrive from intake forms: numbers, bools, numeric strings, junk."""
+    record = {"subclass": rng.choice(SUBCLASSES)}
+    for field in fields:
+        if rng.random() < 0.9:
+            record[field] = rng.choice(MIXED_VALUES)
+    return record
+
+
+class TestCompile:
+    def test_repo_rules_compile(self):
+        engine = RuleEngine(RULES, backend="python")
+        assert len(engine.rules) == len(RULES)
+        assert "RF_TIMELINE_GAP" in engine.flags
+        assert {"available_funds", "estimated_trip_cost"} <= engine.fields
+
+    def test_unknown_operator_rejected(self):
+        with pytest.raises(ValueError):
+            compile_condition({"field": "x", "operator": "~=", "value": 1})
+
+    def test_unknown_shape_rejected(self):
+        with pytest.raises(ValueError):
+            compile_condition({"operator": ">", "value": 1})
+
+    def test_per_subclass_tables(self):
+        engine = RuleEngine(RULES, backend="python")
+        ids_600 = {rule.rule_id for rule in engine.table("600")}
+        assert {"R001", "R005", "R030"} <= ids_600
+        assert "R006" not in ids_600
+        assert {rule.rule_id for rule in engine.table("999")} == {"R030"}
+
+
+class TestEvaluateRecord:
+    engine = RuleEngine(RULES, backend="python")
+
+    def test_value_comparison(self):
+        assert "RF_TIMELINE_GAP" in self.engine.evaluate_record({"largest_timeline_gap_days": 91}, "500")
+        assert "RF_TIMELINE_GAP" not in self.engine.evaluate_record({"largest_timeline_gap_days": 90}, "500")
+
+    def test_scoped_by_subclass(self):
+        record = {"largest_timeline_gap_days": 200}
+        assert self.engine.evaluate_record(record, "482") == frozenset()
+
+    def test_field_comparison(self):
+        record = {"subclass": "600", "available_funds": 1000, "estimated_trip_cost": 4000}
+        assert "RF_FINANCIAL_FUNDS_LOW" in self.engine.evaluate_record(record)
+
+    def test_all_condition_needs_every_leaf(self):
+        record = {"currently_employed": True, "leave_approval_present": False}
+        assert self.engine.evaluate_record(record, "600", by="rule") >= {"R012"}
+        record["leave_approval_present"] = True
+        assert "R012" not in self.engine.evaluate_record(record, "600", by="rule")
+
+    def test_missing_values_raise_nothing(self):
+        record = {"employment_dates_consistent": None, "available_funds": 10}
+        assert self.engine.evaluate_record(record, "600") == frozenset()
+
+    def test_incomparable_values_never_match(self):
+        assert flag_rules.compare("<", "100", 120) is False
+        assert flag_rules.compare(">", [1], 0) is False
+        assert flag_rules.compare("!=", float("nan"), 1) is False
+        assert flag_rules.compare("==", "100", 100) is False
+        assert flag_rules.compare("<", True, 2) is True
+        record = {"bank_statement_months": "1", "passport_uploaded": True}
+        assert self.engine.evaluate_record(record, "600") == frozenset()
+
+
+class TestBatch:
+    def test_matches_per_record_evaluation(self):
+        engine = RuleEngine(RULES, backend="python")
+        rng = random.Random(7)
+        records = [_random_record(rng, sorted(engine.fields)) for _ in range(2000)]
+        expected = [engine.evaluate_record(r) for r in records]
+        assert engine.evaluate(records) == expected
+        assert engine.evaluate(records, by="rule") == [engine.evaluate_record(r, by="rule") for r in records]
+
+    def test_single_subclass_columns(self):
+        engine = RuleEngine(RULES, backend="python")
+        columns = {"bank_statement_months": [1, 6, None], "passport_uploaded": [False, True, True]}
+        result = engine.evaluate_columns(columns, "600")
+        assert result[0] == {"RF_FINANCIAL_DOCS_INCOMPLETE", "RF_EVIDENCE_PRIMARY_DOC_MISSING"}
+        assert result[1] == result[2] == frozenset()
+
+    def test_results_share_frozensets(self):
+        engine = RuleEngine(RULES, backend="python")
+        result = engine.evaluate([{"passport_uploaded": False}] * 3, subclass="600")
+        assert result[0] is result[1] is result[2]
+
+    def test_numpy_backend_matches_python(self):
+        pytest.importorskip("numpy")
+        python, vectorised = RuleEngine(RULES, backend="python"), RuleEngine(RULES, backend="numpy")
+        rng = random.Random(11)
+        records = [_random_record(rng, sorted(python.fields)) for _ in range(2000)]
+        assert vectorised.evaluate(records) == python.evaluate(records)
+        assert vectorised.evaluate(records, subclass="600") == python.evaluate(records, subclass="600")
+
+
+    @pytest.mark.parametrize("backend", flag_rules.BACKENDS)
+    def test_backends_agree_on_mixed_types(self, backend):
+        if backend == "numpy":
+            pytest.importorskip("numpy")
+        engine = RuleEngine(RULES, backend=backend)
+        rng = random.Random(17)
+        records = [_mixed_record(rng, sorted(engine.fields)) for _ in range(1000)]
+        expected = [engine.evaluate_record(r, by="rule") for r in records]
+        assert engine.evaluate(records, by="rule") == expected
+        assert any(expected)
+
+
+class TestLoadEngine:
+    def test_cached_until_file_changes(self, tmp_path):
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rules": RULES[:2]}))
+        first = load_engine(path, backend="python")
+        assert load_engine(path, backend="python") is first
+
+        path.write_text(json.dumps({"rules": RULES[:3]}))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert len(load_engine(path, backend="python").rules) == 3
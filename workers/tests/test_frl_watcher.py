@@ -9,9 +9,16 @@ from pathlib import Path
 
 import pytest
 
+from kangavisa_workers import snapshot_store
 from kangavisa_workers.frl_watcher import (
+    conditional_headers,
     create_change_event,
+    fetch_frl_conditional,
+    fetch_frl_streaming,
     hash_content,
+    previous_content,
+    previous_source_doc,
+    run_frl_watch_and_persist,
     snapshot,
 )
 
@@ -101,7 +108,7 @@ class TestSnapshot:
     def test_snapshot_file_content_intact(self, tmp_path):
         """Written file bytes must be identical to input."""
         meta = snapshot(FRL_FIXTURE_HTML, "frl_test", snapshots_dir=tmp_path)
-        on_disk = Path(meta["snapshot_path"]).read_bytes()
+        on_disk = snapshot_store.read_path(meta["snapshot_path"])
         assert on_disk == FRL_FIXTURE_HTML
 
 
@@ -154,3 +161,205 @@ class TestCreateChangeEvent:
         h2 = hash_content(FRL_FIXTURE_HTML_CHANGED)
         event = create_change_event("frl_act", prev_hash=h1, curr_hash=h2, snapshot_path="/snap.bin")
         assert event["impact_score"] is None
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET (ETag / Last-Modified)
+# ---------------------------------------------------------------------------
+
+FRL_URL = "https://www.legislation.gov.au/Details/C2024C00075"
+VALIDATORS = {"etag": '"v1"', "last_modified": "Mon, 01 Jul 2024 00:00:00 GMT"}
+
+
+class _StubSession:
+    """In-memory stand-in for the db module."""
+
+    def __init__(self, prev_doc=None):
+        self.prev_doc = prev_doc
+        self.inserted = []
+        self.updated = []
+
+    def get_latest_source_doc(self, canonical_url):
+        return self.prev_doc
+
+    def insert_source_document(self, meta):
+        self.inserted.append(meta)
+        return "new-source-uuid"
+
+    def insert_change_event(self, event):
+        return "new-event-uuid"
+
+    def update_source_document_metadata(self, source_doc_id, metadata_json):
+        self.updated.append((source_doc_id, metadata_json))
+
+
+class TestConditionalGet:
+    def test_conditional_headers_from_validators(self):
+        headers = conditional_headers(VALIDATORS)
+        assert headers == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Jul 2024 00:00:00 GMT",
+        }
+
+    def test_no_validators_no_headers(self):
+        assert conditional_headers(None) == {}
+
+    def test_sends_validators_and_handles_304(self, httpx_mock):
+        httpx_mock.add_response(url=FRL_URL, status_code=304)
+        result = fetch_frl_conditional(FRL_URL, validators=VALIDATORS)
+        request = httpx_mock.get_requests()[0]
+        assert request.headers["If-None-Match"] == '"v1"'
+        assert result["not_modified"] is True
+        assert result["content"] is None
+        assert result["validators"] == VALIDATORS
+
+    def test_200_returns_content_and_new_validators(self, httpx_mock):
+        httpx_mock.add_response(
+            url=FRL_URL,
+            content=FRL_FIXTURE_HTML,
+            headers={"ETag": '"v2"', "Last-Modified": "Tue, 15 Oct 2024 00:00:00 GMT"},
+        )
+        result = fetch_frl_conditional(FRL_URL)
+        assert result["not_modified"] is False
+        assert result["content"] == FRL_FIXTURE_HTML
+        assert result["validators"] == {
+            "etag": '"v2"',
+            "last_modified": "Tue, 15 Oct 2024 00:00:00 GMT",
+        }
+
+    def test_304_short_circuits_pipeline(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, status_code=304)
+        session = _StubSession({
+            "source_doc_id": "prev-uuid",
+            "content_hash": "abc",
+            "metadata_json": {"validators": VALIDATORS},
+        })
+
+        result = run_frl_watch_and_persist(
+            url=FRL_URL, source_id="frl_migration_act", source_type="FRL_ACT",
+            canonical_url=FRL_URL, session=session,
+        )
+
+        assert result["change_event_id"] is None
+        assert result["source_doc_id"] == "prev-uuid"
+        assert result["snapshot"] is None
+        assert "304" in result["signals"][0]
+        assert session.inserted == []
+        assert list(tmp_path.iterdir()) == []
+
+    def test_new_document_stores_validators(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, content=FRL_FIXTURE_HTML, headers={"ETag": '"v2"'})
+        session = _StubSession()
+
+        run_frl_watch_and_persist(
+            url=FRL_URL, source_id="frl_migration_act", source_type="FRL_ACT",
+            canonical_url=FRL_URL, session=session,
+        )
+
+        assert session.inserted[0]["metadata_json"]["validators"] == {"etag": '"v2"'}
+
+    def test_unchanged_content_refreshes_validators(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, content=FRL_FIXTURE_HTML, headers={"ETag": '"v2"'})
+        session = _StubSession({
+            "source_doc_id": "prev-uuid",
+            "content_hash": hash_content(FRL_FIXTURE_HTML),
+            "metadata_json": {"source_id": "frl_migration_act", "validators": VALIDATORS},
+        })
+
+        run_frl_watch_and_persist(
+            url=FRL_URL, source_id="frl_migration_act", source_type="FRL_ACT",
+            canonical_url=FRL_URL, session=session,
+        )
+
+        assert session.updated == [(
+            "prev-uuid",
+            {"source_id": "frl_migration_act", "validators": {"etag": '"v2"'}},
+        )]
+
+
+class TestStreamingFetch:
+    def test_body_staged_and_hashed(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, content=FRL_FIXTURE_HTML, headers={"ETag": '"v2"'})
+
+        result = fetch_frl_streaming(FRL_URL)
+
+        assert result["content"] is None
+        assert result["staged"].content_hash == hash_content(FRL_FIXTURE_HTML)
+        assert result["staged"].path.read_bytes() == FRL_FIXTURE_HTML
+        assert result["validators"] == {"etag": '"v2"'}
+        result["staged"].discard()
+
+    def test_304_stages_nothing(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, status_code=304)
+        result = fetch_frl_streaming(FRL_URL, validators=VALIDATORS)
+        assert result["not_modified"] is True
+        assert result["staged"] is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_pipeline_does_not_rehash_staged_body(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, content=FRL_FIXTURE_HTML)
+        hashed = []
+        sha256 = hashlib.sha256
+        monkeypatch.setattr(hashlib, "sha256", lambda *a: hashed.append(a) or sha256(*a))
+
+        result = run_frl_watch_and_persist(
+            url=FRL_URL, source_id="frl_migration_act", source_type="FRL_ACT",
+            canonical_url=FRL_URL, session=_StubSession(),
+        )
+
+        assert len(hashed) == 1  # the incremental hasher, fed while streaming
+        assert result["snapshot"]["content_hash"] == hash_content(FRL_FIXTURE_HTML)
+        assert snapshot_store.read_path(result["snapshot"]["snapshot_path"]) == FRL_FIXTURE_HTML
+        assert list((tmp_path / "tmp").iterdir()) == []
+
+
+class TestPreviousContent:
+    def test_loaded_from_store_by_hash(self, tmp_path):
+        snapshot(FRL_FIXTURE_HTML, "frl_migration_act", tmp_path)
+        assert previous_content(hash_content(FRL_FIXTURE_HTML), tmp_path) == FRL_FIXTURE_HTML
+
+    def test_missing_blob_or_no_prev(self, tmp_path):
+        assert previous_content("0" * 64, tmp_path) is None
+        assert previous_content(None, tmp_path) is None
+
+    def test_pipeline_diffs_against_previous_snapshot(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        snapshot(FRL_FIXTURE_HTML, "frl_migration_act", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, content=FRL_FIXTURE_HTML_CHANGED)
+        session = _StubSession({"source_doc_id": "prev-uuid", "content_hash": hash_content(FRL_FIXTURE_HTML)})
+
+        result = run_frl_watch_and_persist(
+            url=FRL_URL, source_id="frl_migration_act", source_type="FRL_ACT",
+            canonical_url=FRL_URL, session=session,
+        )
+
+        assert not any("initial snapshot" in s for s in result["signals"])
+        assert any("large diff" in s and "changed)" in s for s in result["signals"])
+
+
+class TestPrefetchedState:
+    def test_prev_docs_map_skips_lookup(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.frl_watcher.SNAPSHOTS_DIR", tmp_path)
+        httpx_mock.add_response(url=FRL_URL, content=FRL_FIXTURE_HTML)
+        session = _StubSession()
+        session.get_latest_source_doc = lambda url: pytest.fail("unexpected per-target lookup")
+        prev_docs = {FRL_URL: {"source_doc_id": "prev-uuid", "content_hash": hash_content(FRL_FIXTURE_HTML)}}
+
+        result = run_frl_watch_and_persist(
+            url=FRL_URL, source_id="frl_migration_act", source_type="FRL_ACT",
+            canonical_url=FRL_URL, session=session, prev_docs=prev_docs,
+        )
+
+        assert result["source_doc_id"] == "prev-uuid"
+        assert result["change_event_id"] is None
+
+    def test_url_missing_from_map_falls_back_to_lookup(self, tmp_path):
+        session = _StubSession({"source_doc_id": "looked-up"})
+        assert previous_source_doc(session, FRL_URL, {"https://other": None}) == {"source_doc_id": "looked-up"}
+        assert previous_source_doc(session, FRL_URL, {FRL_URL: None}) is None
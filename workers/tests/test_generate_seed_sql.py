@@ -0,0 +1,76 @@
+"""
+test_generate_seed_sql.py — Tests for scripts/generate_seed_sql.py
+
+US-F6 | FR-K1, FR-K2, FR-K3
+
+Generates SQL from the real kb/seed files into memory; no database required.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import re
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent.parent.parent / "scripts" / "generate_seed_sql.py"
+_spec = importlib.util.spec_from_file_location("generate_seed_sql", SCRIPT)
+gen = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(gen)
+
+
+def _render(fmt: str) -> tuple[str, dict]:
+    out = io.StringIO()
+    counts = gen.write_seed_sql(out, fmt)
+    return out.getvalue(), counts
+
+
+class TestFormats:
+    def test_all_formats_cover_the_same_rows(self):
+        counts = {fmt: _render(fmt)[1] for fmt in gen.FORMATS}
+        assert counts["multirow"] == counts["rows"] == counts["copy"]
+        assert counts["multirow"]["requirement"] > 0
+
+    def test_rows_emits_one_insert_per_row(self):
+        sql, counts = _render("rows")
+        assert sql.count("INSERT INTO ") == sum(counts.values())
+
+    def test_multirow_emits_one_insert_per_table_and_subclass(self):
+        sql, counts = _render("multirow")
+        inserts = sql.count("INSERT INTO ")
+        assert inserts < sum(counts.values()) / 2
+        assert sql.count("INSERT INTO visa_subclass") == 1
+        assert sql.count("DO NOTHING;") == inserts
+
+    def test_copy_emits_one_insert_per_table(self):
+        sql, counts = _render("copy")
+        assert sql.count("INSERT INTO ") == len(counts)
+        assert sql.count("\n\\.\n") == len(counts)
+        assert sql.rstrip().endswith("COMMIT;")
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            gen.write_seed_sql(io.StringIO(), "csv")
+
+
+class TestRendering:
+    def test_sql_value_escapes_and_casts(self):
+        assert gen.sql_value("it's", None) == "'it''s'"
+        assert gen.sql_value("genuine", "kb_requirement_type") == "'genuine'::kb_requirement_type"
+        assert gen.sql_value({"a": "b"}, "jsonb") == "'{\"a\": \"b\"}'::jsonb"
+        assert gen.sql_value(None, "uuid") == "NULL"
+        assert gen.sql_value(2, None) == "2"
+
+    def test_copy_value_escapes_control_characters(self):
+        assert gen.copy_value("a\tb\nc\\d", None) == "a\\tb\\nc\\\\d"
+        assert gen.copy_value(None, "date") == "\\N"
+        assert gen.copy_value(["x\ny"], "jsonb") == '["x\\\\ny"]'
+
+    def test_copy_lines_have_one_field_per_column(self):
+        sql, _ = _render("copy")
+        block = re.search(r"COPY _seed_requirement \((.*?)\) FROM STDIN;\n(.*?)\n\\\.", sql, re.S)
+        columns = block.group(1).split(", ")
+        for line in block.group(2).split("\n"):
+            assert len(line.split("\t")) == len(columns)
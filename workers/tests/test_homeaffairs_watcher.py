@@ -8,10 +8,14 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from kangavisa_workers import homeaffairs_watcher, snapshot_store
 from kangavisa_workers.homeaffairs_watcher import (
     extract_sections,
     fetch_homeaffairs,
     run_homeaffairs_watch_and_persist,
+    section_changes,
+    section_fingerprint,
+    split_sections,
 )
 from kangavisa_workers.frl_watcher import hash_content
 
@@ -134,8 +138,8 @@ class TestFetchHomeaffairs:
 class TestRunHomeaffairsWatchAndPersist:
     def _mock_fetch(self, monkeypatch, html: bytes):
         monkeypatch.setattr(
-            "kangavisa_workers.homeaffairs_watcher.fetch_homeaffairs",
-            lambda url, **kw: html,
+            "kangavisa_workers.homeaffairs_watcher.fetch_homeaffairs_conditional",
+            lambda url, **kw: {"not_modified": False, "content": html, "validators": {}},
         )
 
     def test_no_change_returns_none_event_id(self, monkeypatch, tmp_path):
@@ -228,3 +232,139 @@ class TestRunHomeaffairsWatchAndPersist:
             f"Expected 'new_instrument' but got '{captured['ev']['change_type']}'. "
             "The kb_change_type enum does not include 'initial_snapshot'."
         )
+
+
+# ---------------------------------------------------------------------------
+# Section fingerprints
+# ---------------------------------------------------------------------------
+
+HA_FIXTURE_HTML_SECTIONS = b"""
+<html><body><main>
+  <p>Important: processing times have been updated.</p>
+  <h2>Who can apply</h2>
+  <p>You can apply if you want to visit Australia temporarily.</p>
+  <h3>Family sponsored stream</h3>
+  <p>A family member must sponsor you.</p>
+  <h2>Cost</h2>
+  <p>From AUD 195.</p>
+</main></body></html>
+"""
+
+
+def _fingerprint(html: bytes) -> list:
+    return section_fingerprint(split_sections(html))
+
+
+class TestSplitSections:
+    def test_sections_in_page_order(self):
+        sections = split_sections(HA_FIXTURE_HTML_SECTIONS)
+        assert [(s["level"], s["heading"]) for s in sections] == [
+            (0, ""), (2, "Who can apply"), (3, "Family sponsored stream"), (2, "Cost"),
+        ]
+        assert sections[3]["text"] == "Cost\nFrom AUD 195."
+        assert sections[3]["hash"] == hash_content(b"Cost\nFrom AUD 195.")
+
+    def test_joined_sections_equal_extract_sections(self):
+        for html in (HA_FIXTURE_HTML, HA_FIXTURE_HTML_CHANGED, HA_FIXTURE_HTML_NO_MAIN, HA_FIXTURE_HTML_SECTIONS):
+            joined = "\n".join(s["text"] for s in split_sections(html))
+            assert joined == extract_sections(html)
+
+    def test_banner_change_moves_only_the_intro_hash(self):
+        before = _fingerprint(HA_FIXTURE_HTML_SECTIONS)
+        after = _fingerprint(HA_FIXTURE_HTML_SECTIONS.replace(b"have been updated", b"are unchanged"))
+        assert [entry[2] for entry in before[1:]] == [entry[2] for entry in after[1:]]
+        assert before[0][2] != after[0][2]
+
+
+class TestSectionChanges:
+    prev = [[0, "", "h0", 1], [2, "A", "h1", 2], [2, "B", "h2", 2], [3, "C", "h3", 2]]
+
+    def test_identical(self):
+        changes = section_changes(self.prev, self.prev)
+        assert changes == {"changed": [], "added": [], "removed": [], "unchanged": 4}
+
+    def test_changed_added_removed(self):
+        curr = [[0, "", "h0", 1], [2, "A", "h1x", 2], [2, "D", "h4", 1], [3, "C", "h3", 2]]
+        changes = section_changes(self.prev, curr)
+        assert changes["changed"] == [(1, 1)]
+        assert changes["added"] == [2]
+        assert changes["removed"] == [2]
+        assert changes["unchanged"] == 2
+
+    def test_moved_section_is_unchanged(self):
+        curr = [self.prev[0], self.prev[3], self.prev[1], self.prev[2]]
+        changes = section_changes(self.prev, curr)
+        assert changes == {"changed": [], "added": [], "removed": [], "unchanged": 4}
+
+
+class _Session:
+    def __init__(self, prev_doc):
+        self.prev_doc = prev_doc
+        self.inserted: list = []
+        self.events: list = []
+
+    def get_latest_source_doc(self, canonical_url):
+        return self.prev_doc
+
+    def insert_source_document(self, meta):
+        self.inserted.append(meta)
+        return "new-source-uuid"
+
+    def insert_change_event(self, event):
+        self.events.append(event)
+        return "new-event-uuid"
+
+
+class TestSectionLevelPipeline:
+    URL = "https://immi.homeaffairs.gov.au/visas/getting-a-visa/visa-listing/visitor-600"
+
+    def _run(self, html: bytes, session):
+        return run_homeaffairs_watch_and_persist(
+            url=self.URL, source_id="ha_visitor_600", canonical_url=self.URL,
+            fetch=lambda url, **kw: {"not_modified": False, "content": html, "validators": {}},
+            session=session,
+        )
+
+    def test_first_run_records_fingerprint_and_all_sections(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(homeaffairs_watcher, "SNAPSHOTS_DIR", tmp_path)
+        session = _Session(None)
+        result = self._run(HA_FIXTURE_HTML_SECTIONS, session)
+
+        assert result["sections"] is None
+        fingerprint = session.inserted[0]["metadata_json"]["sections"]
+        assert fingerprint == _fingerprint(HA_FIXTURE_HTML_SECTIONS)
+        refs = snapshot_store.history("ha_visitor_600.sections", tmp_path)
+        assert {r["content_hash"] for r in refs} == {entry[2] for entry in fingerprint}
+
+    def test_change_scores_and_snapshots_only_changed_sections(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(homeaffairs_watcher, "SNAPSHOTS_DIR", tmp_path)
+        first = _Session(None)
+        self._run(HA_FIXTURE_HTML_SECTIONS, first)
+        prev_doc = {
+            "source_doc_id": "prev-uuid",
+            "content_hash": first.inserted[0]["content_hash"],
+            "metadata_json": first.inserted[0]["metadata_json"],
+        }
+        before = len(snapshot_store.history("ha_visitor_600.sections", tmp_path))
+
+        session = _Session(prev_doc)
+        result = self._run(HA_FIXTURE_HTML_SECTIONS.replace(b"AUD 195", b"AUD 200"), session)
+
+        assert result["change_event_id"] == "new-event-uuid"
+        assert result["sections"] == {"changed": ["Cost"], "added": [], "removed": [], "unchanged": 3}
+        assert "Sections: Cost." in session.events[0]["summary"]
+        assert len(snapshot_store.history("ha_visitor_600.sections", tmp_path)) == before + 1
+        # "visa" appears only in unchanged sections, so no keyword signal
+        assert not any(signal.startswith("keyword match") for signal in result["signals"])
+
+    def test_missing_section_blobs_fall_back_to_whole_page(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(homeaffairs_watcher, "SNAPSHOTS_DIR", tmp_path)
+        prev_doc = {
+            "source_doc_id": "prev-uuid",
+            "content_hash": "0" * 64,
+            "metadata_json": {"sections": _fingerprint(HA_FIXTURE_HTML_SECTIONS)},
+        }
+        result = self._run(HA_FIXTURE_HTML_SECTIONS.replace(b"AUD 195", b"AUD 200"), _Session(prev_doc))
+
+        assert result["sections"] is None
+        assert result["change_event_id"] == "new-event-uuid"
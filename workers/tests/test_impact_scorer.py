@@ -7,7 +7,7 @@ All tests are fixture-based; no network or Supabase required.
 from __future__ import annotations
 
 import pytest
-from kangavisa_workers.impact_scorer import REVIEW_THRESHOLD, score
+from kangavisa_workers.impact_scorer import REVIEW_THRESHOLD, keyword_hits, score
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -127,3 +127,58 @@ class TestRequiresReview:
         result = score(PLAIN_HTML, boring_changed, "DATAGOV_DATASET")
         # May or may not hit threshold — just verify the field is a bool
         assert isinstance(result["requires_review"], bool)
+
+
+# ---------------------------------------------------------------------------
+# Aligned diff
+# ---------------------------------------------------------------------------
+
+ACT_TEXT = b"\n".join(f"{n}  Section {n} text of the Act.".encode() for n in range(1, 101))
+
+
+class TestDiffScoring:
+    def test_insertion_at_top_is_small_diff(self):
+        """One inserted line must not make every following byte 'differ'."""
+        result = score(ACT_TEXT, b"Compilation No. 151\n" + ACT_TEXT, "DATAGOV_DATASET")
+        assert result["diff"]["inserted"] == 1
+        assert not any("large diff" in s for s in result["signals"])
+
+    def test_large_diff_reports_ratios(self):
+        lines = ACT_TEXT.split(b"\n")
+        result = score(ACT_TEXT, b"\n".join(lines[:80]), "DATAGOV_DATASET")
+        assert result["diff"]["deleted_ratio"] == pytest.approx(0.2)
+        signal = next(s for s in result["signals"] if "large diff" in s)
+        assert "20.0% deleted" in signal
+
+    def test_no_prev_has_no_diff(self):
+        assert score(None, ACT_TEXT, "FRL_ACT")["diff"] is None
+
+
+# ---------------------------------------------------------------------------
+# Keyword hits
+# ---------------------------------------------------------------------------
+
+class TestKeywordHits:
+    def test_counts_and_offsets(self):
+        content = b"Visa holder. Visa condition 8105."
+        assert keyword_hits(content)["visa"] == {"count": 2, "offsets": [0, 13]}
+
+    def test_whole_words_only(self):
+        assert "visa" not in keyword_hits(b"advisable")
+
+    def test_plural_trigger_terms_fire(self):
+        hits = keyword_hits(b"New requirements; regulations amended; schedules; visas; the criterion's scope")
+        assert {"requirement", "regulation", "schedule", "visa", "criterion"} <= set(hits)
+        assert any("(+30)" in s for s in score(None, b"Amended regulations", "FRL_ACT")["signals"])
+
+    def test_review_gate_keywords_from_sources_yml(self):
+        """'exemptions' is only listed in kb/sources.yml review_gates."""
+        assert "exemptions" in keyword_hits(b"English test exemptions")
+
+    def test_signal_reports_counts(self):
+        result = score(None, b"visa visa schedule", "HOMEAFFAIRS_PAGE")
+        assert "keyword match: schedule ×1, visa ×2 (+30)" in result["signals"]
+
+    def test_memoryview_input(self):
+        result = score(None, memoryview(KEYWORD_HTML), "FRL_ACT")
+        assert result == score(None, KEYWORD_HTML, "FRL_ACT")
@@ -0,0 +1,150 @@
+"""
+Tests for job_queue.py — SQLite watch job queue with leases.
+Temp database files only; no network.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from kangavisa_workers.job_queue import JobQueue, work
+
+TARGETS = {
+    "frl": [{"source_id": "frl_a", "url": "https://frl/a"}],
+    "homeaffairs": [{"source_id": "ha_b", "url": "https://ha/b"}],
+    "datagov": [{"dataset_id": "dg_c"}],
+}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _queue(tmp_path, clock=None, lease=60.0) -> JobQueue:
+    return JobQueue(tmp_path / "queue.sqlite", lease_seconds=lease, clock=clock or _Clock())
+
+
+class TestEnqueue:
+    def test_one_job_per_target_and_wal(self, tmp_path):
+        queue = _queue(tmp_path)
+        run_id = queue.enqueue_run(TARGETS)
+        assert queue.summary(run_id) == {"queued": 3, "leased": 0, "done": 0, "failed": 0}
+        conn = sqlite3.connect(tmp_path / "queue.sqlite")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_reenqueue_same_run_keeps_finished_jobs(self, tmp_path):
+        queue = _queue(tmp_path)
+        run_id = queue.enqueue_run(TARGETS, "run-1")
+        job = queue.claim("w1")
+        queue.complete(job.job_id, "w1", {"ok": True})
+        assert queue.enqueue_run(TARGETS, "run-1") == "run-1"
+        assert queue.summary(run_id) == {"queued": 2, "leased": 0, "done": 1, "failed": 0}
+
+
+class TestLeases:
+    def test_claim_in_order_then_empty(self, tmp_path):
+        queue = _queue(tmp_path)
+        queue.enqueue_run(TARGETS)
+        claimed = [queue.claim("w1") for _ in range(3)]
+        assert [(j.watcher, j.target_id) for j in claimed] == [
+            ("frl", "frl_a"), ("homeaffairs", "ha_b"), ("datagov", "dg_c"),
+        ]
+        assert claimed[2].target == {"dataset_id": "dg_c"}
+        assert queue.claim("w2") is None
+
+    def test_expired_lease_requeued_then_failed(self, tmp_path):
+        clock = _Clock()
+        queue = _queue(tmp_path, clock)
+        run_id = queue.enqueue_run({"frl": TARGETS["frl"]}, max_attempts=2)
+
+        first = queue.claim("crashed")
+        clock.now += 61
+        second = queue.claim("w2")
+        assert second.job_id == first.job_id
+        assert second.attempts == 2
+        assert not queue.complete(first.job_id, "crashed", {"ok": True})   # stale owner
+
+        clock.now += 61
+        assert queue.claim("w3") is None
+        assert queue.summary(run_id)["failed"] == 1
+        (entry,) = queue.results(run_id)
+        assert entry["ok"] is False
+        assert "lease expired" in entry["error"]
+
+    def test_heartbeat_keeps_lease(self, tmp_path):
+        clock = _Clock()
+        queue = _queue(tmp_path, clock)
+        queue.enqueue_run({"frl": TARGETS["frl"]})
+        job = queue.claim("w1")
+        for _ in range(3):
+            clock.now += 45
+            assert queue.heartbeat(job.job_id, "w1")
+        assert queue.claim("w2") is None
+        assert not queue.heartbeat(job.job_id, "w2")
+
+    def test_fail_retries_until_max_attempts(self, tmp_path):
+        queue = _queue(tmp_path)
+        run_id = queue.enqueue_run({"frl": TARGETS["frl"]}, max_attempts=2)
+        job = queue.claim("w1")
+        queue.fail(job.job_id, "w1", "timeout")
+        assert queue.summary(run_id)["queued"] == 1
+        job = queue.claim("w1")
+        queue.fail(job.job_id, "w1", "timeout")
+        assert queue.summary(run_id)["failed"] == 1
+
+    def test_fatal_failure_not_retried(self, tmp_path):
+        queue = _queue(tmp_path)
+        run_id = queue.enqueue_run({"frl": TARGETS["frl"]})
+        job = queue.claim("w1")
+        queue.fail(job.job_id, "w1", "missing secrets", {"ok": False, "fatal": True}, retry=False)
+        (entry,) = queue.results(run_id)
+        assert entry["fatal"] is True
+        assert entry["attempts"] == 1
+
+
+class TestWork:
+    def test_results_and_retries(self, tmp_path):
+        queue = _queue(tmp_path)
+        run_id = queue.enqueue_run(TARGETS)
+        calls: list = []
+
+        def run_job(watcher, target):
+            calls.append(target.get("source_id") or target["dataset_id"])
+            if target.get("source_id") == "ha_b" and calls.count("ha_b") == 1:
+                raise RuntimeError("connection reset")
+            return {"source_id": calls[-1], "ok": True, "change_event_id": None}
+
+        assert work(queue, "w1", run_job, heartbeat_seconds=0.01) == 4
+        assert calls == ["frl_a", "ha_b", "dg_c", "ha_b"]
+        results = {r["source_id"]: r for r in queue.results(run_id)}
+        assert all(r["ok"] for r in results.values())
+        assert results["ha_b"]["attempts"] == 2
+
+    def test_concurrent_workers_run_each_job_once(self, tmp_path):
+        queue = JobQueue(tmp_path / "queue.sqlite", lease_seconds=60)
+        targets = {"frl": [{"source_id": f"t{i:03d}"} for i in range(120)]}
+        run_id = queue.enqueue_run(targets)
+        seen: list = []
+        lock = threading.Lock()
+
+        def run_job(watcher, target):
+            with lock:
+                seen.append(target["source_id"])
+            return {"source_id": target["source_id"], "ok": True}
+
+        threads = [
+            threading.Thread(target=work, args=(JobQueue(tmp_path / "queue.sqlite"), f"w{n}", run_job))
+            for n in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(seen) == [t["source_id"] for t in targets["frl"]]
+        assert queue.summary(run_id)["done"] == 120
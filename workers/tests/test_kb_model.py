@@ -0,0 +1,89 @@
+"""
+Tests for kb_model.py — shared, indexed in-memory KB seed model.
+Uses the repo's kb/seed/ for indexes and tmp_path copies for caching.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+
+import pytest
+
+from kangavisa_workers import kb_model
+from kangavisa_workers.kb_model import SEED_DIR, load_kb, seed_files
+
+
+@pytest.fixture()
+def seed_dir(tmp_path):
+    for path in SEED_DIR.glob("*.json"):
+        (tmp_path / path.name).write_bytes(path.read_bytes())
+    return tmp_path
+
+
+class TestSeedFiles:
+    def test_sql_seeded_visas_excluded(self):
+        names = [p.name for p in seed_files("visa_*_requirements*.json")]
+        assert "visa_500_requirements_extra.json" in names
+        assert not [n for n in names if n.startswith("visa_600_")]
+
+
+class TestIndexes:
+    def test_requirement_by_id(self):
+        kb = load_kb()
+        req = kb.requirement_by_id["REQ-417-GEN-001"]
+        assert req["visa"]["subclass"] == "417"
+        assert len(kb.requirement_by_id) == len(kb.items("requirement"))
+
+    def test_evidence_by_requirement(self):
+        kb = load_kb()
+        for rid, items in kb.evidence_by_requirement.items():
+            assert all(item["requirement_id"] == rid for item in items)
+        assert sum(map(len, kb.evidence_by_requirement.values())) == len(kb.items("evidence_item"))
+
+    def test_flags_unwrapped_and_indexed_by_subclass(self):
+        kb = load_kb()
+        assert {"485", "500", "820"} <= set(kb.flags_by_subclass)
+        assert all("flag_id" in flag for flags in kb.flags_by_subclass.values() for flag in flags)
+
+    def test_by_subclass_uses_file_visa_code(self):
+        kb = load_kb()
+        assert len(kb.by_subclass["500"]["requirement"]) == sum(
+            len(f.items) for f in kb.files["requirement"] if f.subclass == "500"
+        )
+        assert "600" not in kb.by_subclass
+
+
+class TestCaching:
+    def test_unchanged_tree_returns_same_model(self, seed_dir):
+        assert load_kb(seed_dir) is load_kb(seed_dir)
+
+    def test_each_file_parsed_once(self, seed_dir, monkeypatch):
+        kb_model.clear_cache()
+        parsed = []
+        real_loads = json.loads
+        monkeypatch.setattr(kb_model.json, "loads", lambda data: parsed.append(1) or real_loads(data))
+        load_kb(seed_dir)
+        load_kb(seed_dir)
+        assert len(parsed) == sum(len(files) for files in load_kb(seed_dir).files.values())
+
+    def test_edited_file_reparsed_alone(self, seed_dir, monkeypatch):
+        before = load_kb(seed_dir)
+        path = seed_dir / "visa_485_requirements.json"
+        items = json.loads(path.read_text())
+        items[0]["title"] = "Edited"
+        path.write_text(json.dumps(items))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        after = load_kb(seed_dir)
+        assert after is not before
+        assert after.requirement_by_id[items[0]["requirement_id"]]["title"] == "Edited"
+        # Untouched files come from the parse cache, not a re-read
+        assert all(a.raw is b.raw for a, b in zip(after.files["evidence_item"], before.files["evidence_item"]))
+
+    def test_digest_tracks_bytes(self, seed_dir):
+        kb = load_kb(seed_dir)
+        seed = kb.files["requirement"][0]
+        assert seed.digest == hashlib.sha256(seed.path.read_bytes()).hexdigest()
@@ -0,0 +1,83 @@
+"""
+Tests for kb_validate.py — whole-KB seed validation command.
+Uses the repo's kb/seed/ for discovery and tmp_path seed dirs for results.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from kangavisa_workers.kb_validate import discover, main, validate_kb, validate_seed_file
+
+VALID_EVIDENCE = {
+    "evidence_id": "EV-TEST-001",
+    "requirement_id": "REQ-TEST-001",
+    "label": "Test Document",
+    "what_it_proves": "This document proves the applicant meets the test requirement.",
+    "examples": ["Example document A"],
+    "common_gaps": ["Gap 1"],
+    "priority": 2,
+    "effective": {"from": "2024-01-01", "to": None},
+}
+
+
+@pytest.fixture
+def seed_dir(tmp_path):
+    (tmp_path / "visa_500_evidence_items.json").write_text(json.dumps([VALID_EVIDENCE]))
+    (tmp_path / "visa_485_evidence_items.json").write_text(json.dumps([dict(VALID_EVIDENCE, priority=9)]))
+    (tmp_path / "visa_600_evidence_items.json").write_text("not json — seeded via SQL, never read")
+    (tmp_path / "visa_417_evidence_items.json").write_text("{broken")
+    return tmp_path
+
+
+class TestDiscover:
+    def test_repo_seed_files_mapped_to_model_types(self):
+        mapping = {path.name: model for path, model in discover()}
+        assert mapping["visa_500_requirements.json"] == "Requirement"
+        assert mapping["visa_500_requirements_extra.json"] == "Requirement"
+        assert mapping["visa_500_evidence_items.json"] == "EvidenceItem"
+        assert mapping["visa_500_flags.json"] == "FlagTemplate"
+
+    def test_sql_seeded_visas_excluded(self):
+        assert not [path for path, _ in discover() if path.name.startswith("visa_600_")]
+
+
+class TestValidateKb:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_report(self, seed_dir, workers, monkeypatch):
+        monkeypatch.setattr("kangavisa_workers.kb_validate.MIN_FILES_FOR_POOL", 1)
+        report = validate_kb(seed_dir, workers=workers)
+        by_name = {Path(r["file"]).name: r for r in report["results"]}
+
+        assert report["ok"] is False
+        assert report["files"] == 3
+        assert by_name["visa_500_evidence_items.json"]["errors"] == []
+        assert by_name["visa_485_evidence_items.json"]["errors"][0].startswith("[0] 9 is greater")
+        assert "unreadable" in by_name["visa_417_evidence_items.json"]["errors"][0]
+        assert all(r["seconds"] >= 0 for r in report["results"])
+
+    def test_results_streamed_per_file(self, seed_dir):
+        seen = []
+        validate_kb(seed_dir, workers=1, on_result=seen.append)
+        assert len(seen) == 3
+
+    def test_wrapped_flag_file_unwrapped(self, tmp_path):
+        path = tmp_path / "visa_500_flags.json"
+        path.write_text(json.dumps({"version": "1", "flags": [{}, {}]}))
+        assert validate_seed_file(path, "FlagTemplate")["items"] == 2
+
+
+class TestCli:
+    def test_exit_code_and_json_report(self, seed_dir, tmp_path, capsys):
+        report_path = tmp_path / "report.json"
+        assert main(["--seed-dir", str(seed_dir), "--workers", "1", "--report", str(report_path)]) == 1
+        report = json.loads(report_path.read_text())
+        assert report["error_count"] == 2
+        assert "FAIL" in capsys.readouterr().out
+
+    def test_valid_kb_exits_zero(self, tmp_path):
+        (tmp_path / "visa_500_evidence_items.json").write_text(json.dumps([VALID_EVIDENCE]))
+        assert main(["--seed-dir", str(tmp_path), "--workers", "1"]) == 0
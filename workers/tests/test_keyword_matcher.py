@@ -0,0 +1,66 @@
+"""
+Tests for keyword_matcher.py — word-level Aho-Corasick keyword scan.
+Pure functions; no network or filesystem.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from kangavisa_workers import keyword_matcher
+from kangavisa_workers.keyword_matcher import KeywordMatcher
+
+TEXT = b"Specified  work visa conditions. Visas are not advisable. VISA holders: specified\nwork."
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(["visa", "specified work", "work", "Condition"])
+
+
+class TestScan:
+    def test_counts_and_offsets(self, matcher):
+        hits = matcher.scan(TEXT)
+        assert hits["visa"] == {"count": 3, "offsets": [16, 33, 58]}
+        assert hits["specified work"] == {"count": 2, "offsets": [0, 72]}
+
+    def test_nested_keywords_both_reported(self, matcher):
+        assert matcher.scan(TEXT)["work"]["count"] == 2
+
+    def test_word_boundaries(self, matcher):
+        assert matcher.scan(b"advisable workforce preconditions visaholder") == {}
+
+    def test_plurals_match_keyword(self):
+        matcher = KeywordMatcher(["requirement", "regulation", "exemption", "schedule", "visa", "specified work", "duty"])
+        hits = matcher.scan(b"Requirements, regulations and exemptions in schedules; visas; specified works; duties")
+        assert set(hits) == {"requirement", "regulation", "exemption", "schedule", "visa", "specified work", "duty"}
+        assert hits["visa"]["offsets"] == [55]
+
+    def test_possessive_and_literal_plural_keyword(self):
+        hits = KeywordMatcher(["criterion", "criteria", "work", "works"]).scan(b"the criterion's works")
+        assert hits["criterion"]["count"] == 1
+        assert hits["works"]["count"] == 1 and "work" not in hits
+
+    def test_phrase_not_joined_across_punctuation(self, matcher):
+        assert "specified work" not in matcher.scan(b"as specified. Work is")
+
+    def test_overlapping_phrases(self):
+        hits = KeywordMatcher(["a b c", "b c d", "b"]).scan(b"a b c d")
+        assert hits == {
+            "a b c": {"count": 1, "offsets": [0]},
+            "b": {"count": 1, "offsets": [2]},
+            "b c d": {"count": 1, "offsets": [2]},
+        }
+
+    def test_windowed_scan_matches_single_pass(self, matcher, monkeypatch):
+        expected = matcher.scan(TEXT)
+        monkeypatch.setattr(keyword_matcher, "SCAN_WINDOW", 5)
+        assert matcher.scan(memoryview(TEXT)) == expected
+
+    def test_empty_inputs(self, matcher):
+        assert matcher.scan(b"") == {}
+        assert KeywordMatcher([]).scan(TEXT) == {}
+
+    def test_hyphenated_keyword(self):
+        hits = KeywordMatcher(["post-study"]).scan(b"Post-study work rights; post study")
+        assert hits["post-study"]["offsets"][0] == 0
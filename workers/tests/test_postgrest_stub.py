@@ -0,0 +1,230 @@
+"""
+Tests for postgrest_stub.py — SQLite-backed PostgREST stand-in.
+
+Query semantics go through handle() directly; the db.py / seed_loader
+round trips run against the real local HTTP server.  No external network.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from kangavisa_workers import db, seed_loader, seed_reconcile
+from kangavisa_workers.postgrest_stub import PostgrestStub
+
+KEY = "sb_secret_stub"
+REPRESENTATION = {"Prefer": "return=representation"}
+
+
+def _call(stub, method, target, body=None, headers=None):
+    status, _, payload = stub.handle(
+        method, "/rest/v1/" + target, {"apikey": KEY, **(headers or {})},
+        json.dumps(body).encode() if body is not None else b"",
+    )
+    return status, (json.loads(payload) if payload else None)
+
+
+@pytest.fixture
+def stub():
+    stub = PostgrestStub(service_role_key=KEY)
+    yield stub
+    stub.stop()
+
+
+def _docs(stub, rows):
+    return _call(stub, "POST", "source_document", rows, REPRESENTATION)
+
+
+class TestQueries:
+    ROWS = [
+        {"source_doc_id": "a1", "canonical_url": "https://a", "retrieved_at": "2026-01-01", "status": "current"},
+        {"source_doc_id": "a2", "canonical_url": "https://a", "retrieved_at": "2026-03-01", "status": "current"},
+        {"source_doc_id": "b1", "canonical_url": "https://b c", "retrieved_at": "2026-02-01", "status": None},
+    ]
+
+    def test_eq_order_limit_select(self, stub):
+        _docs(stub, self.ROWS)
+        status, rows = _call(stub, "GET", "source_document?canonical_url=eq.https://a&order=retrieved_at.desc"
+                                          "&limit=1&select=source_doc_id,retrieved_at")
+        assert status == 200
+        assert rows == [{"source_doc_id": "a2", "retrieved_at": "2026-03-01"}]
+
+    def test_in_filter_with_quoted_values(self, stub):
+        _docs(stub, self.ROWS)
+        query = str(httpx.QueryParams({"canonical_url": db._in_filter(["https://b c", "https://a"])}))
+        _, rows = _call(stub, "GET", f"source_document?{query}")
+        assert [r["canonical_url"] for r in rows] == ["https://a", "https://a", "https://b c"]
+
+    def test_latest_view_one_row_per_url(self, stub):
+        _docs(stub, self.ROWS)
+        query = str(httpx.QueryParams(db._latest_source_docs_params(["https://b c", "https://a"])))
+        _, rows = _call(stub, "GET", f"{db.LATEST_SOURCE_DOC_VIEW}?{query}")
+        assert sorted(r["source_doc_id"] for r in rows) == ["a2", "b1"]
+        assert _call(stub, "POST", db.LATEST_SOURCE_DOC_VIEW, {"canonical_url": "x"})[0] == 405
+
+    def test_comparison_and_null_filters(self, stub):
+        _docs(stub, self.ROWS)
+        _, rows = _call(stub, "GET", "source_document?source_doc_id=gt.a2&select=source_doc_id")
+        assert rows == [{"source_doc_id": "b1"}]
+        _, rows = _call(stub, "GET", "source_document?status=is.null&select=source_doc_id")
+        assert rows == [{"source_doc_id": "b1"}]
+
+    def test_numeric_and_boolean_equality(self, stub):
+        _call(stub, "POST", "change_event", [
+            {"change_event_id": "e1", "impact_score": 60, "requires_review": True},
+            {"change_event_id": "e2", "impact_score": 5, "requires_review": False},
+        ])
+        _, rows = _call(stub, "GET", "change_event?impact_score=gte.10&requires_review=eq.true")
+        assert [r["change_event_id"] for r in rows] == ["e1"]
+
+    def test_patch_and_delete(self, stub):
+        _docs(stub, self.ROWS)
+        status, _ = _call(stub, "PATCH", "source_document?source_doc_id=eq.a1", {"status": "superseded"})
+        assert status == 204
+        assert stub.rows("source_document")[0]["status"] == "superseded"
+        status, _ = _call(stub, "DELETE", "source_document?canonical_url=eq.https://a")
+        assert [r["source_doc_id"] for r in stub.rows("source_document")] == ["b1"]
+
+
+class TestWrites:
+    def test_generated_key_returned_with_representation(self, stub):
+        status, rows = _docs(stub, {"canonical_url": "https://a"})
+        assert status == 201
+        assert len(rows[0]["source_doc_id"]) == 36
+
+    def test_minimal_returns_empty_body(self, stub):
+        assert _call(stub, "POST", "source_document", {"canonical_url": "https://a"}) == (201, None)
+
+    def test_duplicate_key_conflicts_without_resolution(self, stub):
+        _docs(stub, {"source_doc_id": "a1"})
+        status, error = _docs(stub, [{"source_doc_id": "a2"}, {"source_doc_id": "a1"}])
+        assert status == 409
+        assert error["code"] == "23505"
+        assert len(stub.rows("source_document")) == 1          # whole request rolled back
+
+    def test_merge_duplicates_on_natural_key(self, stub):
+        prefer = {"Prefer": "resolution=merge-duplicates,return=representation"}
+        _call(stub, "POST", "visa_subclass?on_conflict=subclass_code,stream",
+              [{"subclass_code": "500", "stream": "main", "name": "Student"}], prefer)
+        _, rows = _call(stub, "POST", "visa_subclass?on_conflict=subclass_code,stream",
+                        [{"subclass_code": "500", "stream": "main", "name": "Student visa"}], prefer)
+        (stored,) = stub.rows("visa_subclass")
+        assert stored["name"] == "Student visa"
+        assert rows[0]["visa_id"] == stored["visa_id"]
+
+    def test_ignore_duplicates_keeps_first(self, stub):
+        prefer = {"Prefer": "resolution=ignore-duplicates"}
+        _call(stub, "POST", "change_event", [{"change_event_id": "e1", "summary": "first"}], prefer)
+        _call(stub, "POST", "change_event", [{"change_event_id": "e1", "summary": "second"}], prefer)
+        assert [r["summary"] for r in stub.rows("change_event")] == ["first"]
+
+    def test_secondary_unique_key_conflicts_despite_resolution(self, stub):
+        prefer = {"Prefer": "resolution=ignore-duplicates"}
+        doc = {"canonical_url": "https://a", "content_hash": "h1"}
+        _call(stub, "POST", "source_document?on_conflict=source_doc_id", {"source_doc_id": "a1", **doc}, prefer)
+        assert _call(stub, "POST", "source_document?on_conflict=source_doc_id",
+                     {"source_doc_id": "a1", **doc}, prefer)[0] == 201          # same row replayed
+        status, error = _call(stub, "POST", "source_document?on_conflict=source_doc_id",
+                              {"source_doc_id": "a3", **doc}, prefer)
+        assert (status, error["code"]) == (409, "23505")
+
+    def test_unique_keys_overridable(self):
+        with PostgrestStub(service_role_key=KEY, unique_keys={"source_document": []}) as stub:
+            doc = {"canonical_url": "https://a", "content_hash": "h1"}
+            assert _docs(stub, [{"source_doc_id": "a1", **doc}, {"source_doc_id": "a2", **doc}])[0] == 201
+
+    def test_non_uniform_array_rejected(self, stub):
+        status, error = _docs(stub, [{"source_doc_id": "a1"}, {"source_doc_id": "a2", "effective_from": "2026-07-01"}])
+        assert (status, error["code"]) == (400, "PGRST102")
+
+    def test_wrong_key_unauthorised(self, stub):
+        status, _, _ = stub.handle("GET", "/rest/v1/source_document", {"apikey": "nope"}, b"")
+        assert status == 401
+
+
+class TestInjection:
+    def test_fail_next_matches_table_and_method(self, stub):
+        stub.fail_next(status=503, table="change_event", method="POST", retry_after=2)
+        assert _call(stub, "GET", "change_event")[0] == 200
+        status, headers, _ = stub.handle("POST", "/rest/v1/change_event", {"apikey": KEY}, b"{}")
+        assert (status, headers["Retry-After"]) == (503, "2")
+        assert stub.stats["injected_errors"] == 1
+
+    def test_error_rate(self):
+        stub = PostgrestStub(error_rate=1.0, error_status=500)
+        assert stub.handle("GET", "/rest/v1/source_document", {}, b"")[0] == 500
+        stub.stop()
+
+    def test_latency_overlaps_across_connections(self):
+        with PostgrestStub(latency=0.2) as stub:
+            def get():
+                httpx.get(f"{stub.url}/rest/v1/source_document")
+            threads = [threading.Thread(target=get) for _ in range(4)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert time.perf_counter() - start < 0.6
+            assert stub.stats["requests"] == 4
+
+
+class TestWorkersAgainstStub:
+    def test_db_session_round_trip(self):
+        meta = {
+            "source_type": "FRL_ACT", "title": "Migration Act 1958", "canonical_url": "https://frl/a",
+            "content_hash": "h1", "raw_blob_uri": "/tmp/a", "retrieved_at": "2026-03-01T00:00:00+00:00",
+        }
+        with PostgrestStub(service_role_key=KEY) as stub, db.SupabaseSession(stub.url, KEY) as session:
+            first = session.insert_source_document(meta)
+            second = session.insert_source_document({**meta, "content_hash": "h2", "retrieved_at": "2026-03-02T00:00:00+00:00"})
+            session.insert_change_event({
+                "source_doc_id_new": second, "source_doc_id_old": first,
+                "impact_score": 40, "summary": "changed", "requires_review": True,
+            })
+            session.update_source_document_metadata(second, {"validators": {"etag": '"v2"'}})
+
+            latest = session.get_latest_source_doc("https://frl/a")
+            assert (latest["source_doc_id"], latest["metadata_json"]) == (second, {"validators": {"etag": '"v2"'}})
+            latest = session.get_latest_source_docs(["https://frl/a", "https://frl/b"])
+            assert (latest["https://frl/a"]["source_doc_id"], latest["https://frl/b"]) == (second, None)
+            assert stub.rows("change_event")[0]["source_doc_id_old"] == first
+
+    def test_write_behind_reverted_page_fails_alone(self):
+        meta = {
+            "source_type": "FRL_ACT", "title": "Migration Act 1958", "raw_blob_uri": "/tmp/a",
+            "retrieved_at": "2026-03-01T00:00:00+00:00",
+        }
+        with PostgrestStub(service_role_key=KEY) as stub, db.SupabaseSession(stub.url, KEY) as session:
+            writer = db.WriteBehindSession(session, flush_interval=None)
+            writer.insert_source_document({**meta, "canonical_url": "https://frl/a", "content_hash": "A"})
+            writer.insert_source_document({**meta, "canonical_url": "https://frl/a", "content_hash": "B"})
+            writer.flush()
+            docs = [writer.insert_source_document({**meta, "canonical_url": url, "content_hash": content})
+                    for url, content in [("https://frl/b", "B"), ("https://frl/a", "A"), ("https://frl/c", "C")]]
+            events = [writer.insert_change_event({"source_doc_id_new": doc, "impact_score": 40, "summary": "changed",
+                                                "requires_review": True})
+                      for doc in docs]
+            writer.close()
+            assert set(writer.failed) == {docs[1], events[1]}
+            assert len(stub.rows("source_document")) == 4
+            assert sorted(r["change_event_id"] for r in stub.rows("change_event")) == sorted([events[0], events[2]])
+
+    def test_seed_upsert_retries_and_is_idempotent(self, monkeypatch):
+        rows = seed_loader.ROW_BUILDERS["requirement"]()
+        with PostgrestStub(service_role_key=KEY) as stub:
+            monkeypatch.setattr(seed_loader, "SUPABASE_URL", stub.url)
+            monkeypatch.setattr(seed_loader, "SERVICE_ROLE_KEY", KEY)
+            stub.fail_next(status=503, retry_after=0)
+            with seed_loader.UpsertEngine(chunk_size=7, parallelism=3, sleep=lambda _: None) as engine:
+                engine.upsert("requirement", rows)
+                engine.upsert("requirement", rows)
+                assert engine.stats["requirement"]["retries"] == 1
+                remote = seed_reconcile.fetch_remote("requirement", ["requirement_id"], engine, page_size=5)
+            assert len(stub.rows("requirement")) == len(rows)
+            assert sorted(r["requirement_id"] for r in remote) == sorted(r["requirement_id"] for r in rows)
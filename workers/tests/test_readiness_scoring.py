@@ -0,0 +1,154 @@
+"""
+Tests for readiness_scoring.py — batch scorer for kb/rules/readiness_scoring_model.json.
+Uses the repo's model file; no network.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+
+import pytest
+
+from kangavisa_workers import readiness_scoring
+from kangavisa_workers.readiness_scoring import ReadinessModel, case_score_rows, load_model
+
+MODEL = json.loads(readiness_scoring.MODEL_PATH.read_text())
+
+
+def _reference(case: dict) -> int:
+    """computeReadinessScore() from app/lib/export-builder.ts, transcribed."""
+    total = case.get("total_required_evidence_items") or 0
+    evidence = min(1, max(0, (case.get("supported_evidence_items") or 0) / total)) if total > 0 else 0
+    timeline = max(0, 1 - (case.get("largest_timeline_gap_days") or 0) / 365)
+    consistency = max(0, 1 - (case.get("consistency_flag_count") or 0) * 0.1)
+    penalty = min(1, sum(
+        MODEL["flag_penalties"].get(MODEL["flag_severity_mapping"].get(f, ""), 0) for f in set(case.get("flags") or ())
+    ))
+    w = {name: c["weight"] for name, c in MODEL["score_components"].items()}
+    raw = (
+        evidence * w["evidence_coverage"] + timeline * w["timeline_completeness"]
+        + consistency * w["consistency_score"] + (1 - penalty) * w["risk_flags"]
+    )
+    return math.floor(raw * 100 + 0.5)
+
+
+def _random_case(rng: random.Random) -> dict:
+    flags = list(MODEL["flag_severity_mapping"]) + ["RF_UNMAPPED"]
+    total = rng.choice([0, 1, 5, 12, 20])
+    return {
+        "supported_evidence_items": rng.randint(0, total + 2) if rng.random() > 0.1 else None,
+        "total_required_evidence_items": total,
+        "largest_timeline_gap_days": rng.choice([None, 0, 30, 180, 365, 900]),
+        "consistency_flag_count": rng.choice([None, 0, 1, 3, 12]),
+        "flags": rng.sample(flags, rng.randint(0, 6)),
+    }
+
+
+class TestComponents:
+    model = ReadinessModel(MODEL, backend="python")
+
+    def test_perfect_case(self):
+        (result,) = self.model.score([{"supported_evidence_items": 10, "total_required_evidence_items": 10}])
+        assert result["readiness_score"] == 100
+        assert result["band"] == "excellent"
+        assert result["band_label"] == "Strong readiness"
+        assert result["unresolved_flags_count"] == 0
+
+    def test_no_required_evidence_scores_zero_coverage(self):
+        (result,) = self.model.score([{"total_required_evidence_items": 0}])
+        assert result["evidence_coverage"] == 0.0
+        assert result["readiness_score"] == 65
+
+    def test_components_clamped(self):
+        (result,) = self.model.score([{
+            "supported_evidence_items": 15, "total_required_evidence_items": 10,
+            "largest_timeline_gap_days": 1000, "consistency_flag_count": 20,
+        }])
+        assert result["evidence_coverage"] == 1.0
+        assert result["timeline_completeness"] == 0.0
+        assert result["consistency_score"] == 0.0
+
+    def test_flag_penalty_capped_and_unmapped_free(self):
+        critical = [f for f, s in MODEL["flag_severity_mapping"].items() if s == "critical"]
+        assert self.model.flag_penalty(critical * 3 + ["RF_UNMAPPED"]) == pytest.approx(
+            min(1.0, len(set(critical)) * MODEL["flag_penalties"]["critical"])
+        )
+        assert self.model.flag_penalty(["RF_UNMAPPED"]) == 0.0
+        assert self.model.flag_penalty(critical * 10) <= 1.0
+
+    def test_band_edges(self):
+        assert self.model.band(85) == ("excellent", "Strong readiness")
+        assert self.model.band(84) == ("good", "Moderate readiness")
+        assert self.model.band(70)[0] == "good"
+        assert self.model.band(50)[0] == "needs_work"
+        assert self.model.band(49)[0] == "early_stage"
+        assert self.model.band(0)[0] == "early_stage"
+
+    def test_missing_component_rejected(self):
+        broken = {**MODEL, "score_components": {"evidence_coverage": {"weight": 1}}}
+        with pytest.raises(ValueError):
+            ReadinessModel(broken)
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            ReadinessModel(MODEL, backend="fortran")
+
+
+class TestBatch:
+    def test_matches_reference_formula(self):
+        rng = random.Random(18)
+        cases = [_random_case(rng) for _ in range(2000)]
+        results = ReadinessModel(MODEL, backend="python").score(cases)
+        assert [r["readiness_score"] for r in results] == [_reference(c) for c in cases]
+
+    def test_columns_and_absent_columns(self):
+        model = ReadinessModel(MODEL, backend="python")
+        result = model.score_columns({"flags": [(), frozenset({"RF_TIMELINE_GAP"})]})
+        assert result["evidence_coverage"] == [0.0, 0.0]
+        assert result["unresolved_flags_count"] == [0, 1]
+        assert result["readiness_score"][0] > result["readiness_score"][1]
+
+    def test_array_like_flags_not_truth_tested(self):
+        class Ambiguous(list):
+            def __bool__(self):
+                raise ValueError("The truth value of an array with more than one element is ambiguous")
+
+        model = ReadinessModel(MODEL, backend="python")
+        flags = Ambiguous([Ambiguous(["RF_TIMELINE_GAP", "RF_TIMELINE_GAP"]), None])
+        result = model.score_columns({"flags": flags})
+        assert result["unresolved_flags_count"] == [2, 0]
+        assert result["risk_indicator_score"][0] < result["risk_indicator_score"][1]
+
+    def test_numpy_backend_matches_python(self):
+        pytest.importorskip("numpy")
+        rng = random.Random(7)
+        cases = [_random_case(rng) for _ in range(1000)]
+        assert ReadinessModel(MODEL, backend="numpy").score(cases) == ReadinessModel(MODEL, backend="python").score(cases)
+
+    def test_case_score_rows(self):
+        model = ReadinessModel(MODEL, backend="python")
+        result = model.score_columns({"supported_evidence_items": [4], "total_required_evidence_items": [8]})
+        (row,) = case_score_rows(["case-1"], result, "2026-01-01T00:00:00+00:00")
+        assert row["case_id"] == "case-1"
+        assert row["evidence_coverage"] == 0.5
+        assert row["last_scored_at"] == "2026-01-01T00:00:00+00:00"
+        assert "band" not in row
+
+
+class TestLoadModel:
+    def test_cached_until_mtime_changes(self, tmp_path):
+        path = tmp_path / "model.json"
+        path.write_text(json.dumps(MODEL))
+        first = load_model(path, backend="python")
+        assert load_model(path, backend="python") is first
+
+        bumped = {**MODEL, "version": "9.9"}
+        path.write_text(json.dumps(bumped))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        reloaded = load_model(path, backend="python")
+        assert reloaded is not first
+        assert reloaded.version == "9.9"
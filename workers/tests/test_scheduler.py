@@ -0,0 +1,157 @@
+"""
+Tests for scheduler.py — tiered polling driven by kb/sources.yml cadences.
+Uses a temp sources.yml and a fake clock; no network.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from kangavisa_workers.scheduler import RETRY_SECONDS, Scheduler
+
+SOURCES_YML = """
+watch_targets:
+  frl:
+    - {url: https://frl/a, source_id: frl_a, source_type: FRL_ACT, canonical_url: https://frl/a, title: A}
+  homeaffairs:
+    - {url: https://ha/b, source_id: ha_b, canonical_url: https://ha/b, title: B}
+    - {url: https://ha/c, source_id: ha_c, canonical_url: https://ha/c, title: C}
+  datagov:
+    - {dataset_id: dg_d, canonical_url: https://dg/d, title: D}
+polling:
+  frl_daily: true
+  homeaffairs_weekly: true
+  datagov_weekly: false
+"""
+
+START = datetime(2026, 3, 2, 0, 0, tzinfo=timezone.utc)
+
+
+class _Clock:
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@pytest.fixture
+def sources_path(tmp_path):
+    path = tmp_path / "sources.yml"
+    path.write_text(SOURCES_YML)
+    return path
+
+
+def _scheduler(tmp_path, sources_path, clock, jitter=0.0) -> Scheduler:
+    return Scheduler(
+        state_path=tmp_path / "state.json", sources_path=sources_path,
+        jitter=jitter, rng=random.Random(21), clock=clock,
+    )
+
+
+def _ok_runner(calls: list):
+    def run_due(due: dict) -> list:
+        calls.append({group: [t.get("source_id") or t["dataset_id"] for t in targets] for group, targets in due.items()})
+        return [{"source_id": t.get("source_id") or t["dataset_id"], "ok": True} for ts in due.values() for t in ts]
+    return run_due
+
+
+class TestDue:
+    def test_new_targets_due_at_once_disabled_groups_skipped(self, tmp_path, sources_path):
+        scheduler = _scheduler(tmp_path, sources_path, _Clock(START))
+        due = scheduler.due()
+        assert {g: [t["source_id"] for t in ts] for g, ts in due.items()} == {
+            "frl": ["frl_a"], "homeaffairs": ["ha_b", "ha_c"],
+        }
+
+    def test_weekly_targets_run_once_a_week(self, tmp_path, sources_path):
+        clock = _Clock(START)
+        scheduler = _scheduler(tmp_path, sources_path, clock)
+        calls: list = []
+        run_due = _ok_runner(calls)
+        for _ in range(14):                      # two weeks of daily ticks
+            scheduler.tick(run_due)
+            clock.now += timedelta(days=1)
+        frl_runs = sum(1 for c in calls if "frl" in c)
+        ha_runs = sum(1 for c in calls if "homeaffairs" in c)
+        assert frl_runs == 14
+        assert ha_runs == 2
+
+    def test_nothing_due_runs_nothing(self, tmp_path, sources_path):
+        clock = _Clock(START)
+        scheduler = _scheduler(tmp_path, sources_path, clock)
+        scheduler.tick(_ok_runner([]))
+        clock.now += timedelta(hours=1)
+        calls: list = []
+        assert scheduler.tick(_ok_runner(calls)) == []
+        assert calls == []
+
+
+class TestRecord:
+    def test_jitter_bounds(self, tmp_path, sources_path):
+        scheduler = _scheduler(tmp_path, sources_path, _Clock(START), jitter=0.1)
+        for _ in range(200):
+            next_due = scheduler.record("homeaffairs", "ha_b", True, START)
+            assert timedelta(days=6.3) <= next_due - START <= timedelta(days=7.7)
+
+    def test_failure_retried_sooner_and_counted(self, tmp_path, sources_path):
+        scheduler = _scheduler(tmp_path, sources_path, _Clock(START))
+        next_due = scheduler.record("homeaffairs", "ha_b", False, START)
+        assert next_due - START == timedelta(seconds=RETRY_SECONDS)
+        scheduler.record("homeaffairs", "ha_b", False, START)
+        assert scheduler.state["ha_b"]["failures"] == 2
+        scheduler.record("homeaffairs", "ha_b", True, START)
+        assert scheduler.state["ha_b"]["failures"] == 0
+
+    def test_missing_result_counts_as_failure(self, tmp_path, sources_path):
+        scheduler = _scheduler(tmp_path, sources_path, _Clock(START))
+        scheduler.tick(lambda due: [{"source_id": "frl_a", "ok": True}])
+        assert scheduler.state["frl_a"]["last_ok"] is True
+        assert scheduler.state["ha_b"]["last_ok"] is False
+
+    def test_disabled_group_rejected(self, tmp_path, sources_path):
+        scheduler = _scheduler(tmp_path, sources_path, _Clock(START))
+        with pytest.raises(ValueError):
+            scheduler.record("datagov", "dg_d", True, START)
+
+
+class TestState:
+    def test_state_survives_restart(self, tmp_path, sources_path):
+        clock = _Clock(START)
+        _scheduler(tmp_path, sources_path, clock).tick(_ok_runner([]))
+
+        clock.now += timedelta(days=1)
+        restarted = _scheduler(tmp_path, sources_path, clock)
+        assert list(restarted.due()) == ["frl"]
+
+    def test_removed_targets_pruned_on_save(self, tmp_path, sources_path):
+        clock = _Clock(START)
+        scheduler = _scheduler(tmp_path, sources_path, clock)
+        scheduler.tick(_ok_runner([]))
+        sources_path.write_text(SOURCES_YML.replace("homeaffairs_weekly: true", "homeaffairs_weekly: false"))
+        scheduler.save()
+        saved = json.loads((tmp_path / "state.json").read_text())
+        assert set(saved["targets"]) == {"frl_a"}
+
+    def test_unreadable_state_starts_afresh(self, tmp_path, sources_path):
+        (tmp_path / "state.json").write_text("{not json")
+        scheduler = _scheduler(tmp_path, sources_path, _Clock(START))
+        assert scheduler.state == {}
+
+
+class TestRunForever:
+    def test_sleeps_until_next_due(self, tmp_path, sources_path):
+        clock = _Clock(START)
+        scheduler = _scheduler(tmp_path, sources_path, clock)
+        sleeps: list = []
+
+        def sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+            clock.now += timedelta(seconds=seconds)
+
+        scheduler.run_forever(_ok_runner([]), tick_seconds=7 * 24 * 3600, max_ticks=3, sleep=sleep)
+        assert sleeps == [24 * 3600, 24 * 3600]
@@ -11,7 +11,8 @@ from pathlib import Path
 import pytest
 from jsonschema import ValidationError
 
-from kangavisa_workers.schema_validator import validate, validate_file, load_schema
+from kangavisa_workers import schema_validator
+from kangavisa_workers.schema_validator import get_validator, iter_errors, load_schema, validate, validate_file
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -142,3 +143,61 @@ class TestLoadSchema:
     def test_unknown_model_type_raises_value_error(self):
         with pytest.raises(ValueError, match="Unknown model type"):
             load_schema("UnknownType")
+
+
+# ---------------------------------------------------------------------------
+# Compiled-validator cache + batch API
+# ---------------------------------------------------------------------------
+
+class TestValidatorCache:
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self):
+        schema_validator.clear_validator_cache()
+        yield
+        schema_validator.clear_validator_cache()
+
+    def test_whole_file_compiles_schema_once(self, monkeypatch):
+        loads = []
+        real_load = schema_validator.load_schema
+        monkeypatch.setattr(schema_validator, "load_schema", lambda t: loads.append(t) or real_load(t))
+
+        validate_file(SEED_DIR / "visa_500_requirements.json", "Requirement")
+        validate_file(SEED_DIR / "visa_500_requirements.json", "Requirement")
+
+        assert loads == ["Requirement"]
+
+    def test_schema_change_invalidates_entry(self, tmp_path, monkeypatch):
+        schema_path = tmp_path / "evidence_item.jsonschema"
+        schema_path.write_text((KB_DIR / "evidence_item.jsonschema").read_text())
+        monkeypatch.setitem(schema_validator.SCHEMA_PATHS, "EvidenceItem", schema_path)
+
+        first = get_validator("EvidenceItem")
+        assert get_validator("EvidenceItem") is first
+
+        schema = json.loads(schema_path.read_text())
+        schema_path.write_text(json.dumps(schema, indent=1))
+        assert get_validator("EvidenceItem") is not first
+
+    def test_unknown_model_type(self):
+        with pytest.raises(ValueError, match="Unknown model type"):
+            get_validator("UnknownType")
+
+    def test_iter_errors_reports_every_error_with_index(self):
+        items = [
+            {"evidence_id": "EV-TEST-001"},
+            TestEvidenceItemSchema()._valid_evidence_item(),
+            dict(TestEvidenceItemSchema()._valid_evidence_item(), priority=9, label=""),
+        ]
+        errors = list(iter_errors(items, "EvidenceItem"))
+        indexes = {i for i, _ in errors}
+        assert indexes == {0, 2}
+        assert len([e for i, e in errors if i == 2]) >= 1
+        assert all(isinstance(e, ValidationError) for _, e in errors)
+
+    def test_validate_file_lists_all_errors(self, tmp_path):
+        bad = dict(TestEvidenceItemSchema()._valid_evidence_item(), priority=0, what_it_proves="short")
+        path = tmp_path / "items.json"
+        path.write_text(json.dumps([bad]))
+        errors = validate_file(path, "EvidenceItem")
+        assert len(errors) == 2
+        assert all(e.startswith("[0] ") for e in errors)
@@ -12,9 +12,12 @@ from __future__ import annotations
 import json
 import os
 import re
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 from pathlib import Path
 from unittest.mock import patch
 
+import httpx
 import pytest
 
 # Set dummy env vars before importing seed_loader
@@ -22,6 +25,7 @@ os.environ["SUPABASE_URL"] = "https://test.supabase.co"
 os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "sb_secret_test_key"
 
 from kangavisa_workers import seed_loader
+from kangavisa_workers.fetch_policy import FetchPolicy
 
 UPSERT_URL = re.compile(r".*supabase.*")
 SEED_DIR = seed_loader.SEED_DIR
@@ -160,3 +164,177 @@ class TestUpsert:
         """upsert() with empty list must not make any HTTP call."""
         seed_loader.upsert("visa_subclass", [], dry_run=False)
         assert httpx_mock.get_requests() == []
+
+
+def _recording_policy(delays: list) -> FetchPolicy:
+    """FetchPolicy whose clock advances by each sleep it records in *delays*."""
+    now = [0.0]
+
+    def sleep(seconds):
+        delays.append(seconds)
+        now[0] += seconds
+
+    return FetchPolicy(clock=lambda: now[0], sleep=sleep)
+
+
+class TestUpsertEngine:
+    ROWS = [{"requirement_id": f"REQ-{i:03d}"} for i in range(5)]
+
+    def test_rows_split_into_chunks(self, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201, is_reusable=True)
+        with seed_loader.UpsertEngine(chunk_size=2, parallelism=2) as engine:
+            assert engine.upsert("requirement", self.ROWS) == 5
+        sizes = sorted(len(json.loads(r.content)) for r in httpx_mock.get_requests())
+        assert sizes == [1, 2, 2]
+        assert engine.stats["requirement"]["rows"] == 5
+        assert engine.stats["requirement"]["rows_per_sec"] > 0
+
+    def test_retries_5xx_then_succeeds(self, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=503)
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201)
+        delays = []
+        with seed_loader.UpsertEngine(sleep=delays.append) as engine:
+            engine.upsert("requirement", self.ROWS)
+        assert len(delays) == 1
+        assert engine.stats["requirement"]["retries"] == 1
+
+    def test_429_honours_retry_after(self, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=429, headers={"Retry-After": "7"})
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201)
+        delays = []
+        with seed_loader.UpsertEngine(policy=_recording_policy(delays)) as engine:
+            engine.upsert("requirement", self.ROWS)
+        assert delays == [7.0]
+
+    def test_429_honours_http_date_retry_after(self, httpx_mock):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        httpx_mock.add_response(url=UPSERT_URL, status_code=429, headers={"Retry-After": format_datetime(retry_at, usegmt=True)})
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201)
+        delays = []
+        with seed_loader.UpsertEngine(policy=_recording_policy(delays)) as engine:
+            engine.upsert("requirement", self.ROWS)
+        assert len(delays) == 1 and 25 < delays[0] <= 30
+        assert engine.stats["requirement"]["retries"] == 1
+
+    def test_gives_up_after_max_retries(self, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=502, is_reusable=True)
+        with seed_loader.UpsertEngine(max_retries=2, sleep=lambda _: None) as engine:
+            with pytest.raises(httpx.HTTPStatusError):
+                engine.upsert("requirement", self.ROWS)
+        assert len(httpx_mock.get_requests()) == 3
+
+    def test_4xx_not_retried(self, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=409, text="conflict")
+        with seed_loader.UpsertEngine(sleep=lambda _: pytest.fail("must not retry")) as engine:
+            with pytest.raises(httpx.HTTPStatusError):
+                engine.upsert("requirement", self.ROWS)
+
+    def test_one_client_reused_across_tables(self, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201, is_reusable=True)
+        with seed_loader.UpsertEngine(chunk_size=1) as engine:
+            engine.upsert("requirement", self.ROWS[:2])
+            client = engine.client
+            engine.upsert("evidence_item", self.ROWS[:2])
+            assert engine.client is client
+
+
+class TestRunOrdering:
+    def test_parents_commit_before_children(self, httpx_mock, caplog):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201, is_reusable=True)
+        with caplog.at_level("INFO", logger="seed_loader"):
+            counts = seed_loader.run(chunk_size=2, parallelism=3)
+
+        tables = [r.url.path.rsplit("/", 1)[-1] for r in httpx_mock.get_requests()]
+        first_evidence = tables.index("evidence_item")
+        assert "requirement" not in tables[first_evidence:]
+        assert "visa_subclass" not in tables[tables.index("requirement"):]
+        assert counts["requirement"] > 0
+        assert "rows/s" in caplog.text
+
+
+class TestIncremental:
+    @pytest.fixture()
+    def seed_dir(self, tmp_path, monkeypatch):
+        seed_dir = tmp_path / "seed"
+        seed_dir.mkdir()
+        for path in SEED_DIR.glob("*.json"):
+            (seed_dir / path.name).write_bytes(path.read_bytes())
+        monkeypatch.setattr(seed_loader, "SEED_DIR", seed_dir)
+        return seed_dir
+
+    @staticmethod
+    def _sent(httpx_mock) -> dict:
+        sent: dict[str, list] = {}
+        for request in httpx_mock.get_requests():
+            sent.setdefault(request.url.path.rsplit("/", 1)[-1], []).extend(json.loads(request.content))
+        return sent
+
+    def test_unchanged_seeds_send_nothing(self, seed_dir, tmp_path, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201, is_reusable=True)
+        manifest_path = tmp_path / "manifest.json"
+        first = seed_loader.run(incremental=True, manifest_path=manifest_path)
+        assert first == seed_loader.run(dry_run=True)
+        assert manifest_path.exists()
+
+        requests_before = len(httpx_mock.get_requests())
+        second = seed_loader.run(incremental=True, manifest_path=manifest_path)
+        assert set(second.values()) == {0}
+        assert len(httpx_mock.get_requests()) == requests_before
+
+    def test_only_changed_row_sent(self, seed_dir, tmp_path, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201, is_reusable=True)
+        manifest_path = tmp_path / "manifest.json"
+        seed_loader.run(incremental=True, manifest_path=manifest_path)
+        httpx_mock.reset()
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201, is_reusable=True)
+
+        path = seed_dir / "visa_485_requirements.json"
+        items = json.loads(path.read_text())
+        items[0]["title"] += " (amended)"
+        path.write_text(json.dumps(items, indent=4))
+
+        counts = seed_loader.run(incremental=True, manifest_path=manifest_path)
+        assert counts["requirement"] == 1
+        sent = self._sent(httpx_mock)
+        assert list(sent) == ["requirement"]
+        assert sent["requirement"][0]["requirement_id"] == items[0]["requirement_id"]
+
+    def test_reformatted_file_sends_nothing(self, seed_dir, tmp_path, httpx_mock):
+        httpx_mock.add_response(url=UPSERT_URL, status_code=201, is_reusable=True)
+        manifest_path = tmp_path / "manifest.json"
+        seed_loader.run(incremental=True, manifest_path=manifest_path)
+        httpx_mock.reset()
+
+        path = seed_dir / "visa_500_evidence_items.json"
+        path.write_text(json.dumps(json.loads(path.read_text())))
+        counts = seed_loader.run(incremental=True, manifest_path=manifest_path)
+        assert counts["evidence_item"] == 0
+        assert httpx_mock.get_requests() == []
+
+    def test_dry_run_logs_delta_without_writing_manifest(self, seed_dir, tmp_path, caplog):
+        manifest_path = tmp_path / "manifest.json"
+        with caplog.at_level("INFO", logger="seed_loader"):
+            counts = seed_loader.run(dry_run=True, incremental=True, manifest_path=manifest_path)
+        assert counts["requirement"] > 0
+        assert not manifest_path.exists()
+        assert "[DRY RUN] Incremental delta" in caplog.text
+        assert f"{counts['requirement']} new, 0 changed" in caplog.text
+
+    def test_failed_table_not_recorded(self, seed_dir, tmp_path, httpx_mock):
+        httpx_mock.add_response(url=re.compile(r".*/visa_subclass$"), status_code=201)
+        httpx_mock.add_response(url=re.compile(r".*/requirement$"), status_code=400, text="bad row")
+        manifest_path = tmp_path / "manifest.json"
+        with pytest.raises(httpx.HTTPStatusError):
+            seed_loader.run(incremental=True, manifest_path=manifest_path)
+        manifest = seed_loader.SeedManifest(manifest_path)
+        assert manifest.rows["visa_subclass"]
+        assert "requirement" not in manifest.rows
+        assert not any("requirements" in name for name in manifest.files)
+
+    def test_other_target_starts_afresh(self, tmp_path):
+        manifest = seed_loader.SeedManifest(tmp_path / "manifest.json", target="https://a.supabase.co")
+        manifest.changed_rows("requirement", [{"requirement_id": "REQ-1", "title": "x"}])
+        manifest.commit("requirement")
+        manifest.save()
+        assert seed_loader.SeedManifest(manifest.path, target="https://a.supabase.co").rows
+        assert seed_loader.SeedManifest(manifest.path, target="https://b.supabase.co").rows == {}
@@ -0,0 +1,179 @@
+"""
+test_seed_reconcile.py — Tests for seed_reconcile.py
+
+US-F6 | FR-K1, FR-K2, FR-K3
+
+Uses pytest-httpx to mock the PostgREST reads and writes.
+No live network or Supabase project required.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from datetime import date
+from urllib.parse import parse_qs
+
+import pytest
+
+os.environ["SUPABASE_URL"] = "https://test.supabase.co"
+os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "sb_secret_test_key"
+
+from kangavisa_workers import kb_model, seed_loader, seed_reconcile
+from kangavisa_workers.seed_reconcile import apply, canonical_row, fetch_remote, format_plan, plan, plan_table
+
+TODAY = date(2026, 3, 1)
+JSON_VISAS = frozenset({"500"})
+
+
+def _req(rid: str, title: str = "Title", **extra) -> dict:
+    row = {
+        "requirement_id": rid,
+        "subclass_code": "500",
+        "title": title,
+        "effective_from": "2024-01-01",
+        "effective_to": None,
+        "last_reviewed_at": "2025-02-01T00:00:00Z",
+    }
+    row.update(extra)
+    return row
+
+
+class TestCanonicalRow:
+    def test_timestamps_normalised(self):
+        ours = canonical_row({"last_reviewed_at": "2025-02-01T00:00:00Z"}, ["last_reviewed_at"])
+        theirs = canonical_row({"last_reviewed_at": "2025-02-01T11:00:00+11:00"}, ["last_reviewed_at"])
+        assert ours == theirs
+
+    def test_projects_onto_seed_columns(self):
+        assert canonical_row({"a": 1, "visa_id": "uuid"}, ["a", "b"]) == {"a": 1, "b": None}
+
+
+class TestPlanTable:
+    def test_insert_update_retire_unchanged(self):
+        seeds = [_req("REQ-1"), _req("REQ-2", "New title"), _req("REQ-3")]
+        remote = [
+            _req("REQ-1", last_reviewed_at="2025-02-01T00:00:00+00:00"),
+            _req("REQ-2", "Old title"),
+            _req("REQ-9"),
+            _req("REQ-8", effective_to="2025-01-01"),
+        ]
+        result = plan_table("requirement", seeds, remote, TODAY, JSON_VISAS)
+        assert [r["requirement_id"] for r in result["insert"]] == ["REQ-3"]
+        assert [r["requirement_id"] for r in result["update"]] == ["REQ-2"]
+        assert result["changed_columns"] == {"REQ-2": ["title"]}
+        assert result["retire"] == [{"key": "REQ-9", "effective_to": "2026-03-01"}]
+        assert result["unchanged"] == 1
+
+    def test_retire_never_precedes_effective_from(self):
+        result = plan_table("requirement", [], [_req("REQ-F", effective_from="2027-07-01")], TODAY, JSON_VISAS)
+        assert result["retire"] == [{"key": "REQ-F", "effective_to": "2027-07-01"}]
+
+    def test_only_json_seeded_visas_retired(self):
+        remote = [_req("REQ-600", subclass_code="600"), _req("REQ-999", subclass_code="999"), _req("REQ-500")]
+        result = plan_table("requirement", [], remote, TODAY, JSON_VISAS | {"600"})
+        assert [r["key"] for r in result["retire"]] == ["REQ-500"]
+        assert plan_table("requirement", [], remote, TODAY)["retire"] == []
+
+    def test_evidence_scoped_through_requirement(self):
+        remote = [
+            {"evidence_id": "EV-1", "requirement_id": "REQ-500", "effective_to": None},
+            {"evidence_id": "EV-2", "requirement_id": "REQ-600", "effective_to": None},
+            {"evidence_id": "EV-3", "requirement_id": "REQ-GONE", "effective_to": None},
+        ]
+        result = plan_table("evidence_item", [], remote, TODAY, JSON_VISAS, {"REQ-500": "500", "REQ-600": "600"})
+        assert [r["key"] for r in result["retire"]] == ["EV-1"]
+
+    def test_retire_subclasses_excludes_sql_seeded(self):
+        subclasses = seed_reconcile.retire_subclasses()
+        assert "500" in subclasses
+        assert not subclasses & kb_model.SQL_SEEDED_VISAS
+
+    def test_visa_subclass_never_retired(self):
+        remote = [{"subclass_code": "999", "stream": None, "name": "x", "description": "y"}]
+        result = plan_table("visa_subclass", seed_loader.visa_subclass_rows(), remote, TODAY)
+        assert result["retire"] == []
+        assert len(result["insert"]) == len(seed_loader.VISA_SUBCLASSES)
+
+
+class TestFetchRemote:
+    def test_keyset_pages(self, httpx_mock, monkeypatch):
+        monkeypatch.setattr(seed_reconcile, "PAGE_SIZE", 2)
+        httpx_mock.add_response(url=re.compile(r".*/requirement\?.*"), json=[_req("A"), _req("B")])
+        httpx_mock.add_response(url=re.compile(r".*/requirement\?.*gt.B.*"), json=[_req("C")])
+        with seed_loader.UpsertEngine() as engine:
+            rows = fetch_remote("requirement", ["requirement_id", "title"], engine, page_size=2)
+        assert [r["requirement_id"] for r in rows] == ["A", "B", "C"]
+        first, second = (parse_qs(r.url.query.decode()) for r in httpx_mock.get_requests())
+        assert first["order"] == ["requirement_id.asc"]
+        assert first["limit"] == ["2"]
+        assert "requirement_id" not in first
+        assert second["requirement_id"] == ["gt.B"]
+
+
+class TestPlanAndApply:
+    @pytest.fixture()
+    def remote(self, httpx_mock):
+        """
+        Supabase already holds every seed row, plus one stale requirement and
+        the SQL-seeded visa 600 catalogue (requirement, evidence item, flag).
+        """
+        sql_seeded = {
+            "requirement": _req("REQ-600-SQL", subclass_code="600"),
+            "evidence_item": {"evidence_id": "EV-600-SQL", "requirement_id": "REQ-600-SQL", "effective_to": None},
+            "flag_template": {"flag_id": "FLAG-600-SQL", "subclass_code": "600", "effective_to": None},
+        }
+        for table, build in seed_loader.ROW_BUILDERS.items():
+            rows = [dict(row) for row in build()]
+            if table == "requirement":
+                rows[0]["title"] = "Stale title"
+                rows.append(_req("REQ-REMOVED"))
+            if table in sql_seeded:
+                rows.append(sql_seeded[table])
+            httpx_mock.add_response(method="GET", url=re.compile(rf".*/{table}\?.*"), json=rows)
+        return httpx_mock
+
+    def test_plan_is_minimal(self, remote):
+        with seed_loader.UpsertEngine() as engine:
+            the_plan = plan(engine, retire_on=TODAY)
+        requirement = the_plan["tables"]["requirement"]
+        assert len(requirement["update"]) == 1
+        assert requirement["insert"] == []
+        assert requirement["retire"] == [{"key": "REQ-REMOVED", "effective_to": "2026-03-01"}]
+        for table in ("visa_subclass", "evidence_item", "flag_template"):
+            entry = the_plan["tables"][table]
+            assert not (entry["insert"] or entry["update"] or entry["retire"]), table
+        assert "~ " in format_plan(the_plan)
+        assert "- REQ-REMOVED" in format_plan(the_plan)
+
+    def test_apply_sends_one_upsert_and_one_patch(self, remote):
+        remote.add_response(method="POST", url=re.compile(r".*/requirement$"), status_code=201)
+        remote.add_response(method="PATCH", url=re.compile(r".*/requirement\?.*"), status_code=204)
+        with seed_loader.UpsertEngine() as engine:
+            counts = apply(plan(engine, retire_on=TODAY), engine)
+
+        writes = [r for r in remote.get_requests() if r.method != "GET"]
+        assert [r.method for r in writes] == ["POST", "PATCH"]
+        assert len(json.loads(writes[0].content)) == 1
+        assert parse_qs(writes[1].url.query.decode())["requirement_id"] == ['in.("REQ-REMOVED")']
+        assert json.loads(writes[1].content) == {"effective_to": "2026-03-01"}
+        assert counts["requirement"] == {"upserted": 1, "retired": 1}
+
+    def test_apply_dry_run_only_reads(self, remote):
+        with seed_loader.UpsertEngine(dry_run=True) as engine:
+            counts = apply(plan(engine, retire_on=TODAY), engine)
+        assert {r.method for r in remote.get_requests()} == {"GET"}
+        assert counts["requirement"]["retired"] == 1
+
+    def test_retire_filter_quotes_like_db(self, httpx_mock):
+        httpx_mock.add_response(method="PATCH", url=re.compile(r".*/requirement\?.*"), status_code=204)
+        keys = ["REQ-500-Café", 'REQ-500-"x"']
+        the_plan = {"tables": {"requirement": {
+            "insert": [], "update": [], "retire": [{"key": k, "effective_to": "2026-03-01"} for k in keys],
+        }}}
+        with seed_loader.UpsertEngine() as engine:
+            apply(the_plan, engine)
+        (request,) = httpx_mock.get_requests()
+        assert parse_qs(request.url.query.decode())["requirement_id"] == [seed_reconcile.db._in_filter(keys)]
+        assert "\\u" not in request.url.query.decode()
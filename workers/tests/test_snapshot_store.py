@@ -0,0 +1,174 @@
+"""
+Tests for snapshot_store.py — content-addressed snapshot storage.
+All tests use tmp_path; no network required.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from kangavisa_workers import snapshot_store
+from kangavisa_workers.frl_watcher import hash_content
+
+CONTENT = b"<html><body><h1>Migration Act 1958</h1></body></html>"
+CONTENT_CHANGED = b"<html><body><h1>Migration Act 1958 (amended)</h1></body></html>"
+
+
+class TestPut:
+    def test_blob_is_sharded_by_hash(self, tmp_path):
+        meta = snapshot_store.put(CONTENT, "frl_migration_act", tmp_path)
+        h = hash_content(CONTENT)
+        path = Path(meta["snapshot_path"])
+        assert path.parent == tmp_path / "objects" / h[:2] / h[2:4]
+        assert path.name.startswith(h)
+        assert snapshot_store.read_path(path) == CONTENT
+
+    def test_identical_content_stored_once(self, tmp_path):
+        first = snapshot_store.put(CONTENT, "frl_migration_act", tmp_path)
+        second = snapshot_store.put(CONTENT, "frl_migration_act", tmp_path)
+        assert first["deduplicated"] is False
+        assert second["deduplicated"] is True
+        assert first["snapshot_path"] == second["snapshot_path"]
+        blobs = [p for p in (tmp_path / "objects").rglob("*") if p.is_file()]
+        assert len(blobs) == 1
+
+    def test_dedup_across_sources(self, tmp_path):
+        a = snapshot_store.put(CONTENT, "source_a", tmp_path)
+        b = snapshot_store.put(CONTENT, "source_b", tmp_path)
+        assert a["snapshot_path"] == b["snapshot_path"]
+
+    def test_no_temp_files_left_behind(self, tmp_path):
+        snapshot_store.put(CONTENT, "frl_migration_act", tmp_path)
+        assert not [p for p in tmp_path.rglob(".tmp-*")]
+
+    def test_metadata_keys(self, tmp_path):
+        meta = snapshot_store.put(CONTENT, "frl_migration_act", tmp_path)
+        for key in ("source_id", "snapshot_path", "content_hash", "byte_size", "captured_at", "deduplicated"):
+            assert key in meta, f"Missing key: {key}"
+        assert meta["byte_size"] == len(CONTENT)
+
+    def test_codec_recorded_in_metadata_and_ref_log(self, tmp_path):
+        meta = snapshot_store.put(CONTENT, "frl_test", tmp_path, codec="gzip")
+        assert meta["codec"] == "gzip"
+        assert meta["snapshot_path"].endswith(".gz")
+        assert snapshot_store.latest("frl_test", tmp_path)["codec"] == "gzip"
+
+
+class TestCodecs:
+    LARGE = b"<p>Subclass 600 visitor visa requirements.</p>\n" * 2000
+
+    @pytest.mark.parametrize("codec", ["gzip", "none"])
+    def test_round_trip(self, tmp_path, codec):
+        meta = snapshot_store.put(self.LARGE, "frl_test", tmp_path, codec=codec)
+        assert snapshot_store.read(meta["content_hash"], tmp_path) == self.LARGE
+        assert meta["content_hash"] == hash_content(self.LARGE)
+
+    def test_zstd_round_trip(self, tmp_path):
+        pytest.importorskip("zstandard")
+        meta = snapshot_store.put(self.LARGE, "frl_test", tmp_path, codec="zstd")
+        assert meta["snapshot_path"].endswith(".zst")
+        assert meta["stored_size"] < meta["byte_size"]
+        assert snapshot_store.read_path(meta["snapshot_path"]) == self.LARGE
+
+    def test_compressed_blob_smaller_on_disk(self, tmp_path):
+        meta = snapshot_store.put(self.LARGE, "frl_test", tmp_path, codec="gzip")
+        assert meta["stored_size"] == Path(meta["snapshot_path"]).stat().st_size
+        assert meta["stored_size"] < meta["byte_size"] // 10
+
+    def test_dedup_across_codecs(self, tmp_path):
+        first = snapshot_store.put(CONTENT, "frl_test", tmp_path, codec="gzip")
+        second = snapshot_store.put(CONTENT, "frl_test", tmp_path, codec="none")
+        assert second["deduplicated"] is True
+        assert second["snapshot_path"] == first["snapshot_path"]
+        assert second["codec"] == "gzip"
+
+    def test_open_snapshot_streams_in_chunks(self, tmp_path):
+        meta = snapshot_store.put(self.LARGE, "frl_test", tmp_path, codec="gzip")
+        chunks = []
+        with snapshot_store.open_snapshot(meta["snapshot_path"]) as f:
+            while chunk := f.read(4096):
+                chunks.append(chunk)
+        assert len(chunks) > 1
+        assert b"".join(chunks) == self.LARGE
+
+    def test_legacy_uncompressed_blob_readable(self, tmp_path):
+        legacy = tmp_path / "frl_test_20240101T000000Z.bin"
+        legacy.write_bytes(CONTENT)
+        assert snapshot_store.read_path(legacy) == CONTENT
+
+    def test_unknown_codec_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown snapshot codec"):
+            snapshot_store.put(CONTENT, "frl_test", tmp_path, codec="lz4")
+
+
+class TestRefLog:
+    def test_history_records_every_capture(self, tmp_path):
+        snapshot_store.put(CONTENT, "ha_visitor_600", tmp_path)
+        snapshot_store.put(CONTENT, "ha_visitor_600", tmp_path)
+        snapshot_store.put(CONTENT_CHANGED, "ha_visitor_600", tmp_path)
+        records = snapshot_store.history("ha_visitor_600", tmp_path)
+        assert [r["content_hash"] for r in records] == [
+            hash_content(CONTENT), hash_content(CONTENT), hash_content(CONTENT_CHANGED),
+        ]
+
+    def test_same_second_captures_do_not_collide(self, tmp_path):
+        a = snapshot_store.put(CONTENT, "frl_test", tmp_path)
+        b = snapshot_store.put(CONTENT_CHANGED, "frl_test", tmp_path)
+        assert snapshot_store.read_path(a["snapshot_path"]) == CONTENT
+        assert snapshot_store.read_path(b["snapshot_path"]) == CONTENT_CHANGED
+
+    def test_latest_and_read(self, tmp_path):
+        snapshot_store.put(CONTENT, "frl_test", tmp_path)
+        snapshot_store.put(CONTENT_CHANGED, "frl_test", tmp_path)
+        latest = snapshot_store.latest("frl_test", tmp_path)
+        assert snapshot_store.read(latest["content_hash"], tmp_path) == CONTENT_CHANGED
+
+    def test_unknown_source_has_no_history(self, tmp_path):
+        assert snapshot_store.history("never_seen", tmp_path) == []
+        assert snapshot_store.latest("never_seen", tmp_path) is None
+
+
+class TestStaged:
+    def test_stage_hashes_while_writing(self, tmp_path):
+        staged = snapshot_store.stage([CONTENT[:10], CONTENT[10:]], tmp_path)
+        assert staged.content_hash == hash_content(CONTENT)
+        assert staged.byte_size == len(CONTENT)
+        with staged.view() as view:
+            assert view == CONTENT
+        staged.discard()
+
+    def test_put_staged_moves_into_store(self, tmp_path):
+        staged = snapshot_store.stage([CONTENT], tmp_path)
+        meta = snapshot_store.put_staged(staged, "frl_test", tmp_path)
+        assert meta["content_hash"] == hash_content(CONTENT)
+        assert meta["deduplicated"] is False
+        assert snapshot_store.read_path(meta["snapshot_path"]) == CONTENT
+        assert list((tmp_path / "tmp").iterdir()) == []
+
+    @pytest.mark.parametrize("codec", ["gzip", "none"])
+    def test_put_staged_matches_put(self, tmp_path, codec):
+        staged = snapshot_store.stage([CONTENT], tmp_path / "a")
+        a = snapshot_store.put_staged(staged, "frl_test", codec=codec)
+        b = snapshot_store.put(CONTENT, "frl_test", tmp_path / "b", codec=codec)
+        assert snapshot_store.read_path(a["snapshot_path"]) == snapshot_store.read_path(b["snapshot_path"])
+        assert a["codec"] == b["codec"] == codec
+        assert a["content_hash"] == b["content_hash"]
+
+    def test_put_staged_dedups(self, tmp_path):
+        snapshot_store.put(CONTENT, "frl_test", tmp_path)
+        meta = snapshot_store.put_staged(snapshot_store.stage([CONTENT], tmp_path), "frl_test", tmp_path)
+        assert meta["deduplicated"] is True
+        assert list((tmp_path / "tmp").iterdir()) == []
+
+    def test_context_manager_discards(self, tmp_path):
+        with snapshot_store.StagedBlob(tmp_path) as staged:
+            staged.write(CONTENT)
+        assert not staged.path.exists()
+
+    def test_empty_body(self, tmp_path):
+        staged = snapshot_store.stage([], tmp_path)
+        with staged.view() as view:
+            assert len(view) == 0
+        assert snapshot_store.put_staged(staged, "frl_test")["content_hash"] == hash_content(b"")
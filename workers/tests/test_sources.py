@@ -0,0 +1,51 @@
+"""
+Tests for sources.py — kb/sources.yml loader.
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from kangavisa_workers.sources import (
+    CADENCE_SECONDS,
+    load_sources,
+    polling_cadences,
+    review_gate_keywords,
+    watch_targets,
+)
+
+
+class TestSources:
+    def test_repo_sources_yml_parses(self):
+        sources = load_sources()
+        assert "tiers" in sources
+        assert "specified work" in review_gate_keywords()
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        path = tmp_path / "sources.yml"
+        path.write_text("review_gates:\n  high_impact_instrument_keywords: [english]\n")
+        assert review_gate_keywords(path) == ["english"]
+        path.write_text("review_gates:\n  high_impact_instrument_keywords: [english, occupation]\n")
+        os.utime(path, (1, 1))
+        assert review_gate_keywords(path) == ["english", "occupation"]
+
+    def test_missing_file_has_no_keywords(self, tmp_path):
+        assert review_gate_keywords(tmp_path / "absent.yml") == []
+
+    def test_repo_watch_targets_and_cadences(self):
+        targets = watch_targets()
+        assert [t["source_id"] for t in targets["frl"]][:2] == ["frl_migration_act", "frl_migration_regs"]
+        assert all("dataset_id" in t for t in targets["datagov"])
+        assert polling_cadences() == {
+            "frl": CADENCE_SECONDS["daily"],
+            "homeaffairs": CADENCE_SECONDS["weekly"],
+            "datagov": CADENCE_SECONDS["weekly"],
+        }
+
+    def test_unknown_polling_key_rejected(self, tmp_path):
+        path = tmp_path / "sources.yml"
+        path.write_text("polling:\n  frl_fortnightly: true\n")
+        with pytest.raises(ValueError):
+            polling_cadences(path)
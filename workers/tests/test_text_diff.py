@@ -0,0 +1,96 @@
+"""
+Tests for text_diff.py — line-aligned diff for impact scoring.
+Pure functions; no network or filesystem.
+"""
+
+from __future__ import annotations
+
+import difflib
+
+import pytest
+
+from kangavisa_workers import text_diff
+from kangavisa_workers.text_diff import diff_stats, matching_blocks, opcodes, split_units
+
+ACT = b"\n".join(f"{n}  Section {n}: the applicant must satisfy criterion {n}.".encode() for n in range(1, 201))
+
+
+def _lines(doc: bytes) -> list[bytes]:
+    return doc.split(b"\n")
+
+
+class TestSplitUnits:
+    def test_lines(self):
+        assert split_units(b"a\nb\nc") == [b"a", b"b", b"c"]
+
+    def test_adjacent_tags_split(self):
+        assert split_units(b"<p>one</p><p>two</p>") == [b"<p>one</p>", b"<p>two</p>"]
+
+    def test_memoryview_matches_bytes_across_windows(self, monkeypatch):
+        monkeypatch.setattr(text_diff, "SPLIT_WINDOW", 7)
+        doc = b"<h2>Visa</h2><p>criterion one</p>\nline two\n<p>x</p><p>y</p>"
+        assert split_units(memoryview(doc)) == split_units(doc)
+
+
+class TestAlignment:
+    def test_blocks_cover_equal_content(self):
+        a, b = [1, 2, 3, 4], [0, 1, 2, 3, 4]
+        blocks = matching_blocks(a, b)
+        assert blocks == [(0, 1, 4), (4, 5, 0)]
+
+    def test_opcodes_reconstruct_target(self):
+        a = [1, 2, 3, 4, 5, 6, 7]
+        b = [1, 9, 3, 4, 8, 8, 6, 7, 10]
+        rebuilt = []
+        for tag, i1, i2, j1, j2 in opcodes(a, b):
+            rebuilt.extend(a[i1:i2] if tag == "equal" else b[j1:j2])
+        assert rebuilt == b
+
+    def test_anchorless_gap_falls_back_to_difflib(self):
+        a = [1, 1, 2, 2, 1, 1]
+        b = [1, 2, 2, 1]
+        matched = sum(n for _, _, n in matching_blocks(a, b))
+        expected = sum(n for _, _, n in difflib.SequenceMatcher(None, a, b, autojunk=False).get_matching_blocks())
+        assert matched == expected
+
+
+class TestDiffStats:
+    def test_identical(self):
+        stats = diff_stats(ACT, ACT)
+        assert stats["diff_ratio"] == 0
+        assert stats["prev_units"] == stats["curr_units"] == 200
+
+    def test_insertion_at_top_is_not_a_whole_document_change(self):
+        stats = diff_stats(ACT, b"Compilation No. 151\n" + ACT)
+        assert stats["inserted"] == 1
+        assert stats["deleted"] == stats["changed"] == 0
+        assert stats["diff_ratio"] == pytest.approx(1 / 200)
+
+    def test_deleted_block(self):
+        lines = _lines(ACT)
+        stats = diff_stats(ACT, b"\n".join(lines[:50] + lines[70:]))
+        assert (stats["inserted"], stats["deleted"], stats["changed"]) == (0, 20, 0)
+        assert stats["deleted_ratio"] == pytest.approx(0.1)
+
+    def test_changed_lines(self):
+        lines = _lines(ACT)
+        for i in (10, 90, 150):
+            lines[i] += b" (as amended)"
+        stats = diff_stats(ACT, b"\n".join(lines))
+        assert (stats["inserted"], stats["deleted"], stats["changed"]) == (0, 0, 3)
+
+    def test_moved_block_counted(self):
+        lines = _lines(ACT)
+        moved = lines[:10] + lines[20:] + lines[10:20]
+        stats = diff_stats(ACT, b"\n".join(moved))
+        assert stats["inserted"] == stats["deleted"] == 10
+
+    def test_empty_prev(self):
+        stats = diff_stats(b"", ACT)
+        assert stats["prev_units"] == 1
+        assert stats["changed"] + stats["inserted"] == 200
+
+    def test_base_units_rescales_ratios(self):
+        stats = diff_stats(b"a\nb", b"a\nc", base_units=100)
+        assert stats["changed"] == 1
+        assert stats["diff_ratio"] == pytest.approx(0.01)